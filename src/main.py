@@ -3,9 +3,10 @@
 
 from cli_utils import cli_create_arg_parser
 from log_utils import set_global_log_config
+from mqtt.mqtt_async_pub_sub import start_async_pub_sub
 from mqtt.mqtt_pub_sub import start_pub_sub
 from settings.settings import read_settings
-from settings.types import Settings
+from settings.types import Engine, Settings
 
 if __name__ == "__main__":
     # Read user settings
@@ -24,4 +25,7 @@ if __name__ == "__main__":
     # print_sensor_availability(all_sensors)
 
     # Connect to MQTT and publish & subscribe
-    start_pub_sub(user_settings=user_settings)
+    if user_settings.script.engine == Engine.ASYNCIO:
+        start_async_pub_sub(user_settings=user_settings)
+    else:
+        start_pub_sub(user_settings=user_settings)
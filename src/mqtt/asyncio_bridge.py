@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Bridge running the paho mqtt client network loop on an asyncio event loop"""
+
+import asyncio
+import logging
+import socket
+from collections.abc import Callable
+from typing import Any
+
+import paho.mqtt.client as mqtt
+
+
+class AsyncioMqttBridge:
+    """Drives the paho mqtt client from an asyncio event loop, instead of the background thread started by
+    loop_start(). The client socket is watched by the event loop, which calls loop_read() and loop_write() when the
+    socket is ready, while loop_misc() handles keepalive and reconnection once a second."""
+
+    _logger: logging.Logger
+    _loop: asyncio.AbstractEventLoop
+    _client: mqtt.Client
+    _misc_task: asyncio.Task | None = None
+
+    min_reconnect_delay_sec: float = 1.0
+    max_reconnect_delay_sec: float = 60.0
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, client: mqtt.Client):
+        self._logger = logging.getLogger(__name__)
+        self._loop = loop
+        self._client = client
+
+        self._client.on_socket_open = self._on_socket_open
+        self._client.on_socket_close = self._on_socket_close
+        self._client.on_socket_register_write = self._on_socket_register_write
+        self._client.on_socket_unregister_write = self._on_socket_unregister_write
+
+    def start(self):
+        """Start the task calling loop_misc() and reconnecting to the broker when the connection is lost"""
+
+        if self._misc_task is None:
+            self._misc_task = self._loop.create_task(self._misc_loop(), name="mqtt_misc_loop")
+
+    def stop(self):
+        """Stop the task calling loop_misc()"""
+
+        if self._misc_task is not None:
+            self._misc_task.cancel()
+            self._misc_task = None
+
+    # noinspection PyUnusedLocal
+    # pylint: disable=W0613
+    def _on_socket_open(self, client: mqtt.Client, userdata, sock: socket.socket):
+        self._logger.debug("Socket opened, watching socket for reading")
+        self._loop.add_reader(sock, client.loop_read)
+
+    # noinspection PyUnusedLocal
+    # pylint: disable=W0613
+    def _on_socket_close(self, client: mqtt.Client, userdata, sock: socket.socket):
+        self._logger.debug("Socket closed, stop watching socket")
+        self._loop.remove_reader(sock)
+        self._loop.remove_writer(sock)
+
+    # noinspection PyUnusedLocal
+    # pylint: disable=W0613
+    def _on_socket_register_write(self, client: mqtt.Client, userdata, sock: socket.socket):
+        self._call_in_loop(self._loop.add_writer, sock, client.loop_write)
+
+    # noinspection PyUnusedLocal
+    # pylint: disable=W0613
+    def _on_socket_unregister_write(self, client: mqtt.Client, userdata, sock: socket.socket):
+        self._call_in_loop(self._loop.remove_writer, sock)
+
+    def _call_in_loop(self, callback: Callable[..., Any], *args):
+        """Call the callback directly when on the event loop, otherwise schedule it thread-safe on the event loop.
+        Messages published from other threads register the socket for writing from those threads."""
+
+        try:
+            running_loop: asyncio.AbstractEventLoop | None = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+
+        if running_loop is self._loop:
+            callback(*args)
+        else:
+            self._loop.call_soon_threadsafe(callback, *args)
+
+    async def _misc_loop(self):
+        reconnect_delay_sec: float = self.min_reconnect_delay_sec
+
+        while True:
+            if self._client.loop_misc() == mqtt.MQTT_ERR_NO_CONN:
+                await asyncio.sleep(reconnect_delay_sec)
+
+                # noinspection PyBroadException
+                # pylint: disable=W0718
+                try:
+                    self._logger.info("Reconnecting to MQTT broker")
+                    self._client.reconnect()
+                    reconnect_delay_sec = self.min_reconnect_delay_sec
+                except Exception:
+                    self._logger.warning("Failed reconnecting to MQTT broker", exc_info=True)
+                    reconnect_delay_sec = min(reconnect_delay_sec * 2, self.max_reconnect_delay_sec)
+            else:
+                await asyncio.sleep(1.0)
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""Deadbands of the numeric fields of the sensor states, suppressing small changes in changed publish mode"""
+
+import fnmatch
+from collections import OrderedDict
+from typing import Any
+
+from settings.types import Deadband
+
+
+class DeadbandFilter:  # pylint: disable=R0903
+    """Keeps the last published value of each numeric field with a deadband. A value within the deadband of the kept
+    value is replaced by the kept value, so that the state does not count as changed, and a value outside replaces the
+    kept value. A value is kept at most for the max silence, then the value as read is kept and published, so that a
+    small but lasting change is published eventually. The deadband of a field is the deadband with the longest
+    pattern matching the path of the field or a parent of it, i.e. 'temperature' for 'temperature.cpu_thermal.current'.
+    Not thread safe, the caller holds the lock of the published states."""
+
+    _deadbands: dict[str, Deadband]
+    _max_silence: float
+    _kept_values: dict[tuple[str, ...], tuple[float, float]]
+    """Last published value and its monotonic timestamp, keyed by path of the field"""
+    _matched_deadbands: dict[tuple[str, ...], Deadband | None]
+    """Deadband of each field seen, as matching the patterns per field on every update is costly"""
+
+    def __init__(self, deadbands: dict[str, Deadband], max_silence: float):
+        self._deadbands = deadbands
+        self._max_silence = max_silence
+        self._kept_values = {}
+        self._matched_deadbands = {}
+
+    def apply(self, states: OrderedDict, now: float, keyframe: bool = False) -> OrderedDict:
+        """Returns the sensor states with the values within the deadband of the last published value replaced by it.
+        On a keyframe the values as read are returned and kept."""
+
+        if not self._deadbands:
+            return states
+
+        return OrderedDict((name, self._apply(state, (name,), now, keyframe)) for name, state in states.items())
+
+    def _apply(self, state: Any, path: tuple[str, ...], now: float, keyframe: bool) -> Any:
+        if isinstance(state, dict):
+            return {key: self._apply(value, (*path, str(key)), now, keyframe) for key, value in state.items()}
+
+        # bool is a subclass of int, but has no deadband
+        if not isinstance(state, (int, float)) or isinstance(state, bool) or (deadband := self._deadband(path)) is None:
+            return state
+
+        kept: tuple[float, float] | None = self._kept_values.get(path)
+
+        if (
+            kept is not None
+            and not keyframe
+            and now - kept[1] < self._max_silence
+            and abs(state - kept[0]) <= max(deadband.absolute, abs(kept[0]) * deadband.relative_pct / 100.0)
+        ):
+            return kept[0]
+
+        self._kept_values[path] = (state, now)
+        return state
+
+    def _deadband(self, path: tuple[str, ...]) -> Deadband | None:
+        if path not in self._matched_deadbands:
+            parents: list[str] = [".".join(path[:length]) for length in range(len(path), 0, -1)]
+            patterns: list[str] = [
+                pattern
+                for pattern in self._deadbands
+                if any(fnmatch.fnmatchcase(parent, pattern) for parent in parents)
+            ]
+            self._matched_deadbands[path] = self._deadbands[max(patterns, key=len)] if patterns else None
+
+        return self._matched_deadbands[path]
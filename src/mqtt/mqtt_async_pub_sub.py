@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Main module starting MQTT pub and sub on an asyncio event loop"""
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from time import monotonic
+
+from mqtt.asyncio_bridge import AsyncioMqttBridge
+from mqtt.mqtt_client import RpiMqttClient
+from mqtt.mqtt_pub import RpiMqttPublisher
+from mqtt.pub_sub_utils import (
+    close_sensors_and_client,
+    create_all_sensors,
+    create_mqtt_client,
+    create_mqtt_topics,
+    create_publisher,
+    exit_process,
+)
+from mqtt.scheduler import FixedRateSchedule, tick
+from sensors.main import create_sensors
+from sensors.network.rtnetlink import network_monitor
+from sensors.types import AllRpiSensors, RpiSensor
+from settings.types import Settings
+
+
+async def _repeat(name: str, interval: float, function: Callable[[], Awaitable[None] | None]):
+    """Call the function, which may be a coroutine function, at the fixed rate of every interval seconds until
+    cancelled. Exceptions raised by the function are logged and counted, and do not stop the repetition. The missed
+    ticks and periodically the counters of the schedule are logged, as by the FixedRateScheduler."""
+
+    logger: logging.Logger = logging.getLogger(f"{__name__}.{name}")
+    schedule = FixedRateSchedule(interval=interval, start=monotonic())
+
+    while True:
+        await asyncio.sleep(schedule.seconds_until_next(monotonic()))
+
+        if monotonic() < schedule.next_deadline:
+            continue
+
+        with tick(schedule=schedule, logger=logger):
+            result = function()
+            if asyncio.iscoroutine(result):
+                await result
+
+
+async def _pub_sub(user_settings: Settings):
+    """Coroutine running the MQTT pub and sub until cancelled"""
+
+    # Define logger
+    logger: logging.Logger = logging.getLogger(__name__)
+
+    # Mqtt Topics
+    mqtt_topics = create_mqtt_topics(user_settings=user_settings, logger=logger)
+
+    logger.info("Publish & Subscribe main script, running on asyncio event loop")
+
+    lwt_update_interval_sec: int = 60
+    sensor_update_interval_sec: int = user_settings.script.update_interval
+
+    publisher: RpiMqttPublisher | None = None
+    mqtt_client: RpiMqttClient | None = None
+    mqtt_bridge: AsyncioMqttBridge | None = None
+    all_sensors: AllRpiSensors | None = None
+
+    try:
+        # Mqtt client
+        mqtt_client = create_mqtt_client(user_settings=user_settings, mqtt_topics=mqtt_topics)
+        mqtt_bridge = await mqtt_client.connect_and_bridge(loop=asyncio.get_running_loop())
+
+        # Sensor states, sensors read their initial state when created
+        sensors: list[RpiSensor] = await asyncio.to_thread(create_sensors, user_settings.sensors)
+        all_sensors = create_all_sensors(user_settings=user_settings, sensors=sensors)
+
+        # Mqtt publisher
+        publisher = create_publisher(
+            user_settings=user_settings, mqtt_client=mqtt_client, mqtt_topics=mqtt_topics, all_sensors=all_sensors
+        )
+
+        # Publish LWT messages and sensor data initially
+        publisher.pub_online_lwt()
+        await publisher.pub_sensor_updates_async()
+
+        # Publish discovery messages
+        publisher.pub_discovery_message()
+
+        # Publish network sensors as soon as the kernel reports a network change, reported from the monitor thread
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        network_monitor.add_listener(
+            lambda: asyncio.run_coroutine_threadsafe(publisher.pub_network_updates_async(), loop)
+        )
+
+        # Publish LWT messages and sensor data in repeat
+        await asyncio.gather(
+            _repeat(name="lwt_update_scheduler", interval=lwt_update_interval_sec, function=publisher.pub_online_lwt),
+            _repeat(
+                name="sensor_update_scheduler",
+                interval=sensor_update_interval_sec,
+                function=publisher.pub_sensor_updates_async,
+            ),
+        )
+    finally:
+        if publisher is not None:
+            # Stop in a thread, the event loop must keep reading the acknowledgements of the queued messages. The
+            # bridge makes the client safe to publish from the worker thread of the queue.
+            await asyncio.to_thread(publisher.stop_publish_queue)
+            await publisher.pub_offline_lwt_async()
+
+        # Stop watching the client socket before disconnecting from MQTT
+        if mqtt_bridge is not None:
+            mqtt_bridge.stop()
+
+        close_sensors_and_client(all_sensors=all_sensors, mqtt_client=mqtt_client, logger=logger)
+
+
+def start_async_pub_sub(user_settings: Settings):
+    """Function starting the MQTT pub and sub on an asyncio event loop"""
+
+    # Define logger
+    logger: logging.Logger = logging.getLogger(__name__)
+
+    # noinspection PyBroadException
+    # pylint: disable=W0718
+    try:
+        asyncio.run(_pub_sub(user_settings=user_settings))
+    except Exception:
+        logger.error("Exception occurred", exc_info=True)
+    finally:
+        exit_process(logger=logger)
@@ -1,13 +1,16 @@
 #!/usr/bin/env python3
 """Subclass of the paho mqtt client"""
 
+import asyncio
 import logging
 import os
 import sys
+from collections.abc import Callable
 from time import sleep
 
 import paho.mqtt.client as mqtt
 
+from mqtt.asyncio_bridge import AsyncioMqttBridge
 from mqtt.constants import PAYLOAD_LWT_OFFLINE
 from mqtt.types import RpiMqttTopics
 from settings.types import MqttSettings
@@ -19,10 +22,14 @@ class RpiMqttClient(mqtt.Client):
     settings: MqttSettings
     _rpi_mqtt_logger: logging.Logger
     mqtt_topics: RpiMqttTopics
+    _connect_listeners: list[Callable[[], None]]
 
-    def __init__(self, settings: MqttSettings, mqtt_topics: RpiMqttTopics):
+    def __init__(self, settings: MqttSettings, mqtt_topics: RpiMqttTopics, max_queued_messages: int = 0):
         super().__init__(client_id=settings.client_id, callback_api_version=mqtt.CallbackAPIVersion.VERSION2)
 
+        # Bound the outgoing queue of messages not yet acknowledged by the broker, 0 means unlimited
+        self.max_queued_messages_set(max_queued_messages)
+
         self.on_connect = self.on_connect_callback
         self.on_message = self.on_message_callback
         self.on_disconnect = self.on_disconnect_callback
@@ -30,17 +37,22 @@ class RpiMqttClient(mqtt.Client):
 
         self.settings = settings
         self.mqtt_topics = mqtt_topics
+        self._connect_listeners = []
 
         self._rpi_mqtt_logger = logging.getLogger(__name__)
         self.enable_logger()
 
-    def connect_and_loop(self):
-        """Connect to the broker and use loop_start() to set a thread running to call loop()"""
+    def _set_lwt_will(self):
+        """Define will message for lwt topics"""
 
-        # Define will message for lwt topics
         for lwt_topic in self.mqtt_topics.lwt_topic_names:
             self.will_set(lwt_topic, payload=PAYLOAD_LWT_OFFLINE, retain=True)
 
+    def connect_and_loop(self):
+        """Connect to the broker and use loop_start() to set a thread running to call loop()"""
+
+        self._set_lwt_will()
+
         # noinspection PyBroadException
         # pylint: disable=W0718
         try:
@@ -56,6 +68,40 @@ class RpiMqttClient(mqtt.Client):
             self._rpi_mqtt_logger.error("Failed connecting to MQTT broker", exc_info=True)
             sys.exit(1)
 
+    async def connect_and_bridge(self, loop: asyncio.AbstractEventLoop) -> AsyncioMqttBridge:
+        """Connect to the broker and run the network loop on the asyncio event loop instead of a thread.
+        Returns the started bridge, which must be stopped before disconnecting."""
+
+        self._set_lwt_will()
+
+        bridge = AsyncioMqttBridge(loop=loop, client=self)
+
+        # noinspection PyBroadException
+        # pylint: disable=W0718
+        try:
+            self.connect(host=self.settings.hostname, port=self.settings.port, keepalive=60)
+            bridge.start()
+
+            while not self.is_connected():  # wait for mqtt connection in loop, 1 sec sleep
+                self._rpi_mqtt_logger.debug("Wait on MQTT connection")
+                await asyncio.sleep(1.0)
+        except Exception:
+            self._rpi_mqtt_logger.error("Failed connecting to MQTT broker", exc_info=True)
+            sys.exit(1)
+
+        return bridge
+
+    def add_connect_listener(self, listener: Callable[[], None]):
+        """Add the listener, called from the network loop after each successful connection to the broker"""
+
+        self._connect_listeners.append(listener)
+
+    def remove_connect_listener(self, listener: Callable[[], None]):
+        """Remove the listener"""
+
+        if listener in self._connect_listeners:
+            self._connect_listeners.remove(listener)
+
     # noinspection PyMethodOverriding, PyUnusedLocal
     # pylint: disable=W0613, R0913, R0917
     def on_connect_callback(self, client: mqtt.Client, userdata, flags, reason_code: mqtt.ReasonCode, properties):
@@ -88,6 +134,14 @@ class RpiMqttClient(mqtt.Client):
             )
             # client.subscribe("$SYS/#")
 
+            for listener in list(self._connect_listeners):
+                # noinspection PyBroadException
+                # pylint: disable=W0718
+                try:
+                    listener()
+                except Exception:
+                    self._rpi_mqtt_logger.error("Listener of MQTT connections failed", exc_info=True)
+
     # noinspection PyMethodOverriding, PyUnusedLocal
     # pylint: disable=W0613
     def on_message_callback(self, client, userdata, msg: mqtt.MQTTMessage):
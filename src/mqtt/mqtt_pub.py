@@ -1,18 +1,24 @@
 #!/usr/bin/env python3
 """Class responsible for publishing messages to the MQTT broker"""
 
-import _thread
+import asyncio
 import json
 import logging
+import threading
 from collections import OrderedDict
-from time import sleep
-from typing import List
+from time import monotonic
+from typing import Any, List
 
 from paho.mqtt.client import Client, MQTTMessageInfo
 
 from mqtt.constants import PAYLOAD_LWT_OFFLINE, PAYLOAD_LWT_ONLINE
+from mqtt.deadband import DeadbandFilter
+from mqtt.mqtt_client import RpiMqttClient
+from mqtt.publish_queue import PublishMessage, PublishQueue, PublishQueueStats
 from mqtt.types import RpiMqttTopics
 from sensors.types import AllRpiSensors, MqttDiscoveryMessage
+from sensors.utils import flatten_state
+from settings.types import PublishMode, PublishSettings, TopicLayout
 
 
 class RpiMqttPublisher:
@@ -22,12 +28,56 @@ class RpiMqttPublisher:
     mqtt_client: Client
     mqtt_topics: RpiMqttTopics
     all_sensors: AllRpiSensors
+    publish_settings: PublishSettings
+    publish_queue: PublishQueue
+    _states_lock: threading.Lock
+    _deadband_filter: DeadbandFilter
+    _published_states: dict[str, Any]
+    """Sensor states last published to the monitor topic in changed mode, keyed by sensor name"""
+    _published_payloads: dict[str, str]
+    """Payloads last published to the sensor state topics with the sensor and field topic layouts, keyed by topic"""
+    _discovered_sensors: set[str]
+    """Names of the sensors with discovery messages, whose entities read their state from the sensor states topic"""
+    _keyframe_ts: float | None = None
+    """Monotonic timestamp of the last publish of all sensor states in changed mode"""
+    _lost_messages: int = 0
+    """Number of messages dropped or failed by the publish queue, when last published"""
 
-    def __init__(self, mqtt_client: Client, mqtt_topics: RpiMqttTopics, all_sensors: AllRpiSensors):
+    def __init__(
+        self,
+        mqtt_client: Client,
+        mqtt_topics: RpiMqttTopics,
+        all_sensors: AllRpiSensors,
+        publish_settings: PublishSettings = PublishSettings(),
+    ):
         self._logger = logging.getLogger(__name__)
         self.mqtt_client = mqtt_client
         self.mqtt_topics = mqtt_topics
         self.all_sensors = all_sensors
+        self.publish_settings = publish_settings
+        self._states_lock = threading.Lock()
+        self._deadband_filter = DeadbandFilter(
+            deadbands=publish_settings.deadbands, max_silence=publish_settings.max_silence
+        )
+        self._published_states = {}
+        self._published_payloads = {}
+        self._discovered_sensors = set()
+
+        # Sensor states are published from a bounded queue by a single worker thread
+        self.publish_queue = PublishQueue(mqtt_client=mqtt_client, settings=publish_settings)
+        self.publish_queue.start()
+
+        # Messages buffered on disk while disconnected are replayed after reconnecting
+        if isinstance(mqtt_client, RpiMqttClient):
+            mqtt_client.add_connect_listener(self.publish_queue.replay)
+
+    def stop_publish_queue(self):
+        """Stop the worker publishing the queued sensor states, after publishing the queued messages if connected"""
+
+        if isinstance(self.mqtt_client, RpiMqttClient):
+            self.mqtt_client.remove_connect_listener(self.publish_queue.replay)
+
+        self.publish_queue.stop(timeout=self.publish_settings.publish_timeout)
 
     def pub_online_lwt(self):
         """Publish online LWT status message for all lwt topics"""
@@ -50,6 +100,26 @@ class RpiMqttPublisher:
             msg_info.wait_for_publish(timeout=wait_timeout_seconds)
             self._logger.info("Published '%s' lwt message to MQTT topic '%s'", PAYLOAD_LWT_OFFLINE, lwt_topic)
 
+    async def pub_offline_lwt_async(self):
+        """Publish offline LWT status message for all lwt topics, when the network loop runs on the asyncio event
+        loop. Waiting with wait_for_publish() would block the event loop writing the messages."""
+
+        # Handle cases where we have lost connection to the broker, but need to exit
+        if not self.mqtt_client.is_connected():
+            return
+
+        wait_timeout_seconds = 2
+        msg_infos: List[MQTTMessageInfo] = []
+
+        for lwt_topic in self.mqtt_topics.lwt_topic_names:
+            msg_infos.append(self.mqtt_client.publish(lwt_topic, payload=PAYLOAD_LWT_OFFLINE, retain=False))
+
+        deadline: float = monotonic() + wait_timeout_seconds
+        while not all(msg_info.is_published() for msg_info in msg_infos) and monotonic() < deadline:
+            await asyncio.sleep(0.05)
+
+        self._logger.info("Published '%s' lwt message to MQTT lwt topics", PAYLOAD_LWT_OFFLINE)
+
     def pub_discovery_message(self):
         """Publish discovery messages to discovery topics"""
 
@@ -70,6 +140,7 @@ class RpiMqttPublisher:
                 self.mqtt_client.publish(
                     topic=discovery_topic, payload=json.dumps(discovery_payload), qos=1, retain=True
                 )
+                self._discovered_sensors.add(sensor.name)
                 self._logger.info("Published '%s' discovery message to MQTT topic '%s'", sensor.name, discovery_topic)
 
     def pub_sensor_updates(self, refresh_sensors: bool = True):
@@ -78,13 +149,151 @@ class RpiMqttPublisher:
         if refresh_sensors:
             self.all_sensors.refresh_available_sensors()
 
-        sensor_data: OrderedDict = self.all_sensors.as_dict()
-        _thread.start_new_thread(self._pub_sensor_updates, (sensor_data,))
+        self._publish_sensor_states(self.all_sensors.as_dict())
+
+        self._logger.info("Queued updated sensor states for state topic")
+
+    def pub_network_updates(self):
+        """Refresh the network sensors and publish the sensor states, when the kernel reported a network change"""
+
+        self.all_sensors.refresh_available_sensors(sensors=self.all_sensors.network_event_sensors)
+        # The statistics of the sampled sensors are taken on the scheduled updates only, so that they cover the interval
+        self._publish_sensor_states(self.all_sensors.as_dict(take_stats=False))
+
+        self._logger.info("Queued updated network sensor states for state topic")
+
+    async def pub_sensor_updates_async(self, refresh_sensors: bool = True):
+        """Publish sensor states to state topic, refreshing the sensors as coroutines on the asyncio event loop"""
+
+        if refresh_sensors:
+            await self.all_sensors.refresh_available_sensors_async()
+
+        # Queued in a thread, a full queue with the block overflow policy blocks until the worker of the queue has
+        # published a message, for which the event loop must keep reading the acknowledgements
+        await asyncio.to_thread(self._publish_sensor_states, self.all_sensors.as_dict())
+
+        self._logger.info("Queued updated sensor states for state topic")
+
+    async def pub_network_updates_async(self):
+        """Refresh the network sensors as coroutines and publish the sensor states, when the kernel reported a network
+        change"""
+
+        await self.all_sensors.refresh_available_sensors_async(sensors=self.all_sensors.network_event_sensors)
+        # The statistics of the sampled sensors are taken on the scheduled updates only, so that they cover the interval
+        await asyncio.to_thread(self._publish_sensor_states, self.all_sensors.as_dict(take_stats=False))
+
+        self._logger.info("Queued updated network sensor states for state topic")
 
-        self._logger.info("Publishing updated sensor states to state topic")
+    def _publish_sensor_states(self, states: OrderedDict):
+        messages: list[PublishMessage] = []
 
-    def _pub_sensor_updates(self, payload: OrderedDict):
-        self.mqtt_client.publish(
-            topic=self.mqtt_topics.sensor_states_topic, payload=json.dumps(payload), qos=1, retain=False
+        with self._states_lock:
+            keyframe: bool = True
+
+            if self.publish_settings.mode == PublishMode.CHANGED:
+                keyframe = self._keyframe()
+                # Values within their deadband are replaced by the last published value, so do not count as changed
+                states = self._deadband_filter.apply(states, now=monotonic(), keyframe=keyframe)
+
+            if self.publish_settings.topic_layout == TopicLayout.MONITOR or self.publish_settings.monitor_topic:
+                payload: OrderedDict = (
+                    self._changed_sensor_states(states, keyframe)
+                    if self.publish_settings.mode == PublishMode.CHANGED
+                    else states
+                )
+                messages.append(
+                    PublishMessage(
+                        topic=self.mqtt_topics.sensor_states_topic, payload=json.dumps(payload), qos=1, retain=False
+                    )
+                )
+
+            if self.publish_settings.topic_layout != TopicLayout.MONITOR:
+                messages.extend(self._sensor_state_messages(states, keyframe))
+
+        for message in messages:
+            self.publish_queue.put(message)
+
+    def _keyframe(self) -> bool:
+        """Returns whether the states of all sensors are published as keyframe in changed mode: on the first publish,
+        after the keyframe interval and after the publish queue lost messages, so that consumers catch up on missed
+        changes"""
+
+        stats: PublishQueueStats = self.publish_queue.stats
+        lost_messages: int = stats.dropped + stats.failed
+        keyframe: bool = (
+            self._keyframe_ts is None
+            or monotonic() - self._keyframe_ts >= self.publish_settings.keyframe_interval
+            or lost_messages != self._lost_messages
+        )
+
+        if keyframe:
+            self._keyframe_ts = monotonic()
+
+        self._lost_messages = lost_messages
+
+        return keyframe
+
+    def _changed_sensor_states(self, states: OrderedDict, keyframe: bool) -> OrderedDict:
+        """Returns the sensor states changed since last published, with the metadata, or the states of all sensors as
+        keyframe. Sensors with discovery messages are always returned, as the templates of their entities fail on a
+        sensor states message without their state."""
+
+        changed_states: OrderedDict = OrderedDict(
+            (name, state)
+            for name, state in states.items()
+            if keyframe
+            or name == "metadata"
+            or name in self._discovered_sensors
+            or name not in self._published_states
+            or self._published_states[name] != state
         )
-        sleep(0.5)  # some slack for the publishing roundtrip and callback function
+        changed_states["metadata"] = {**states["metadata"], "keyframe": keyframe}
+
+        self._published_states = {name: state for name, state in states.items() if name != "metadata"}
+
+        return changed_states
+
+    def _sensor_state_messages(self, states: OrderedDict, keyframe: bool) -> list[PublishMessage]:
+        """Returns the messages to the topic of each sensor state, or of each field of the sensor states, with the
+        sensor and field topic layouts. In changed mode, only the messages whose payload changed since last published
+        and the metadata are returned, unless keyframe."""
+
+        payloads: dict[str, str] = {}
+        metadata_topics: set[str] = set()
+
+        for name, state in states.items():
+            if name == "metadata" and self.publish_settings.mode == PublishMode.CHANGED:
+                state = {**state, "keyframe": keyframe}
+
+            fields_and_payloads: list[tuple[tuple[str, ...], str]] = (
+                [((), json.dumps(state))]
+                if self.publish_settings.topic_layout == TopicLayout.SENSOR
+                else [(fields, _field_payload(value)) for fields, value in flatten_state(state)]
+            )
+
+            for fields, payload in fields_and_payloads:
+                topic: str = self.mqtt_topics.sensor_state_topic(name, *fields)
+                payloads[topic] = payload
+
+                if name == "metadata":
+                    metadata_topics.add(topic)
+
+        messages: list[PublishMessage] = [
+            PublishMessage(topic=topic, payload=payload, qos=1, retain=False)
+            for topic, payload in payloads.items()
+            if self.publish_settings.mode == PublishMode.FULL
+            or keyframe
+            or topic in metadata_topics
+            or self._published_payloads.get(topic) != payload
+        ]
+
+        self._published_payloads = payloads
+
+        return messages
+
+
+def _field_payload(value: Any) -> str:
+    """Returns the payload of a field of the sensor states. Strings are published as is, so that entities can compare
+    the payload, other values as json."""
+
+    return value if isinstance(value, str) else json.dumps(value)
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""Append-only log of segment files on disk, buffering the messages published while disconnected from the broker"""
+
+import logging
+import os
+import struct
+import threading
+import zlib
+from collections import deque
+from dataclasses import dataclass
+from typing import BinaryIO
+
+from settings.types import OfflineBufferSettings
+
+SEGMENT_SUFFIX = ".seg"
+POSITION_FILE = "position"
+"""File keeping the segment and offset of the next record to replay across restarts"""
+
+# Length and crc32 of the body, and timestamp of the record
+_RECORD_HEADER = struct.Struct("<IId")
+# Qos, retain and length of the topic
+_BODY_HEADER = struct.Struct("<BBH")
+
+
+@dataclass
+class OfflineRecord:
+    """Message buffered in the offline log"""
+
+    ts: float
+    """Seconds since epoch when the message was buffered"""
+    topic: str
+    payload: str
+    qos: int = 1
+    retain: bool = False
+
+
+class OfflineLog:
+    """Bounded log of messages in segment files of the directory, named by sequence number. Records are appended to
+    the newest segment, a new segment is started when it is full, and the oldest segment is deleted when there are
+    more than the max segments. Records are read in order from the oldest segment, which is deleted once read. Each
+    record has a crc32, so that a record torn by a crash ends its segment. The position of the next record to read is
+    saved when closed, a crash replays the oldest segment again."""
+
+    directory: str
+    segment_size: int
+    max_segments: int
+    dropped: int = 0
+    """Number of records deleted unread with the oldest segment"""
+    _logger: logging.Logger
+    _lock: threading.Lock
+    _segments: deque[int]
+    """Sequence numbers of the segments, oldest first"""
+    _write_file: BinaryIO | None = None
+    _read_file: BinaryIO | None = None
+    _read_offset: int = 0
+    """Offset of the next record to read in the oldest segment"""
+    _next_offset: int = 0
+    """Offset after the record last read"""
+
+    def __init__(self, settings: OfflineBufferSettings):
+        self.directory = settings.directory
+        self.segment_size = settings.segment_size_kib * 1024
+        self.max_segments = settings.max_segments
+        self._logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._segments = deque(
+            sorted(
+                int(name.removesuffix(SEGMENT_SUFFIX))
+                for name in os.listdir(self.directory)
+                if name.endswith(SEGMENT_SUFFIX) and name.removesuffix(SEGMENT_SUFFIX).isdigit()
+            )
+        )
+        self._read_offset = self._load_position()
+
+        if self._segments:
+            self._logger.info("Found %d segments of buffered messages in %s", len(self._segments), self.directory)
+
+    def append(self, record: OfflineRecord):
+        """Appends the record to the newest segment, starting a new segment if full. Raises OSError if the record
+        could not be written."""
+
+        topic: bytes = record.topic.encode("utf-8")
+        body: bytes = _BODY_HEADER.pack(record.qos, record.retain, len(topic)) + topic + record.payload.encode("utf-8")
+
+        with self._lock:
+            if self._write_file is None or self._write_file.tell() >= self.segment_size:
+                self._start_segment()
+
+            # One write per record, so that a reader of the same segment sees whole records
+            self._write_file.write(_RECORD_HEADER.pack(len(body), zlib.crc32(body), record.ts) + body)
+            self._write_file.flush()
+
+    def peek(self) -> OfflineRecord | None:
+        """Returns the oldest record not yet replayed, None if all records are replayed. Segments read to the end are
+        deleted, except the segment records are appended to."""
+
+        with self._lock:
+            while self._segments:
+                if (record := self._read_record()) is not None:
+                    return record
+
+                if self._write_file is not None and self._segments[0] == self._segments[-1]:
+                    return None
+
+                self._delete_oldest_segment()
+
+            return None
+
+    def advance(self):
+        """Marks the record returned by peek() as replayed"""
+
+        with self._lock:
+            self._read_offset = self._next_offset
+
+    def close(self):
+        """Closes the segments and saves the position of the next record to replay"""
+
+        with self._lock:
+            for file in (self._write_file, self._read_file):
+                if file is not None:
+                    file.close()
+
+            self._write_file = self._read_file = None
+            self._save_position()
+
+    def _start_segment(self):
+        if self._write_file is not None:
+            os.fsync(self._write_file.fileno())
+            self._write_file.close()
+
+        sequence: int = self._segments[-1] + 1 if self._segments else 1
+        # pylint: disable=R1732
+        self._write_file = open(self._segment_path(sequence), "ab")
+        self._segments.append(sequence)
+
+        while len(self._segments) > self.max_segments:
+            dropped: int = self._count_records(self._segments[0], self._read_offset)
+            self.dropped += dropped
+            self._logger.warning("Offline buffer is full, dropped %d oldest buffered messages", dropped)
+            self._delete_oldest_segment()
+
+    def _read_record(self) -> OfflineRecord | None:
+        """Returns the record at the read offset of the oldest segment, None at the end of the segment"""
+
+        if self._read_file is None:
+            # pylint: disable=R1732
+            self._read_file = open(self._segment_path(self._segments[0]), "rb")
+
+        self._read_file.seek(self._read_offset)
+        header: bytes = self._read_file.read(_RECORD_HEADER.size)
+        if len(header) < _RECORD_HEADER.size:
+            return None
+
+        length, crc, ts = _RECORD_HEADER.unpack(header)
+        body: bytes = self._read_file.read(length)
+        if len(body) < length or zlib.crc32(body) != crc:
+            self._logger.warning("Skipping torn record at the end of buffered messages segment %d", self._segments[0])
+            return None
+
+        self._next_offset = self._read_offset + _RECORD_HEADER.size + length
+        qos, retain, topic_length = _BODY_HEADER.unpack_from(body)
+        topic_end: int = _BODY_HEADER.size + topic_length
+
+        return OfflineRecord(
+            ts=ts,
+            topic=body[_BODY_HEADER.size : topic_end].decode("utf-8"),
+            payload=body[topic_end:].decode("utf-8"),
+            qos=qos,
+            retain=bool(retain),
+        )
+
+    def _count_records(self, sequence: int, offset: int) -> int:
+        """Returns the number of records in the segment from the offset"""
+
+        count: int = 0
+
+        with open(self._segment_path(sequence), "rb") as file:
+            file.seek(offset)
+            while len(header := file.read(_RECORD_HEADER.size)) == _RECORD_HEADER.size:
+                file.seek(_RECORD_HEADER.unpack(header)[0], os.SEEK_CUR)
+                count += 1
+
+        return count
+
+    def _delete_oldest_segment(self):
+        if self._read_file is not None:
+            self._read_file.close()
+            self._read_file = None
+
+        os.remove(self._segment_path(self._segments.popleft()))
+        self._read_offset = self._next_offset = 0
+
+    def _load_position(self) -> int:
+        """Returns the saved offset of the next record to replay, if saved for the oldest segment"""
+
+        try:
+            with open(os.path.join(self.directory, POSITION_FILE), "r", encoding="utf-8") as file:
+                sequence, offset = (int(value) for value in file.read().split())
+        except (OSError, ValueError):
+            return 0
+
+        return offset if self._segments and sequence == self._segments[0] else 0
+
+    def _save_position(self):
+        path: str = os.path.join(self.directory, POSITION_FILE)
+
+        try:
+            # Replaced atomically, so that a crash keeps the previous position
+            with open(f"{path}.tmp", "w", encoding="utf-8") as file:
+                file.write(f"{self._segments[0] if self._segments else 0} {self._read_offset}\n")
+            os.replace(f"{path}.tmp", path)
+        except OSError as err:
+            self._logger.warning("Failed saving the position of the buffered messages: %s", err)
+
+    def _segment_path(self, sequence: int) -> str:
+        return os.path.join(self.directory, f"{sequence:010d}{SEGMENT_SUFFIX}")
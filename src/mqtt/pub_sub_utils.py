@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Utility functions shared by the MQTT pub and sub running on threads and on an asyncio event loop"""
+
+import logging
+import os
+import sys
+
+from mqtt.mqtt_client import RpiMqttClient
+from mqtt.mqtt_pub import RpiMqttPublisher
+from mqtt.types import RpiMqttTopics
+from sensors.network.sensor import HostnameSensor
+from sensors.types import AllRpiSensors, RpiSensor, SensorNotAvailableException
+from settings.types import MqttSettings, Settings
+
+
+def sensor_name(mqtt_settings: MqttSettings, logger: logging.Logger) -> str:
+    """Returns the sensor name of the settings, with the hostname of this Rpi if the default name is set. Exits if
+    the hostname cannot be read."""
+
+    name: str = mqtt_settings.sensor_name.lower()
+
+    if name == "rpi-{hostname}":
+        try:
+            hostname_sensor = HostnameSensor(enabled=True)
+            hostname_sensor.refresh_state()
+            hostname = hostname_sensor.state
+
+            name = f"rpi-{hostname}"
+        except SensorNotAvailableException:
+            logger.error(
+                "Not possible to read hostname of this Rpi. Please set the 'mqtt.sensor_name' manually in settings.yml"
+            )
+            sys.exit(130)
+
+    return name
+
+
+def create_mqtt_topics(user_settings: Settings, logger: logging.Logger) -> RpiMqttTopics:
+    """Returns the MQTT topics of this Rpi"""
+
+    mqtt_settings: MqttSettings = user_settings.mqtt
+
+    return RpiMqttTopics(
+        mqtt_settings=mqtt_settings,
+        sensor_name=sensor_name(mqtt_settings=mqtt_settings, logger=logger),
+        topic_layout=user_settings.publish.topic_layout,
+    )
+
+
+def create_mqtt_client(user_settings: Settings, mqtt_topics: RpiMqttTopics) -> RpiMqttClient:
+    """Returns the MQTT client, not yet connected"""
+
+    return RpiMqttClient(
+        settings=user_settings.mqtt, mqtt_topics=mqtt_topics, max_queued_messages=user_settings.publish.queue_size
+    )
+
+
+def create_all_sensors(user_settings: Settings, sensors: list[RpiSensor]) -> AllRpiSensors:
+    """Returns all sensors of the user settings"""
+
+    return AllRpiSensors(sensors=sensors, script_settings=user_settings.script, sensor_settings=user_settings.sensors)
+
+
+def create_publisher(
+    user_settings: Settings, mqtt_client: RpiMqttClient, mqtt_topics: RpiMqttTopics, all_sensors: AllRpiSensors
+) -> RpiMqttPublisher:
+    """Returns the MQTT publisher of the sensor states"""
+
+    return RpiMqttPublisher(
+        mqtt_client=mqtt_client,
+        mqtt_topics=mqtt_topics,
+        all_sensors=all_sensors,
+        publish_settings=user_settings.publish,
+    )
+
+
+def close_sensors_and_client(
+    all_sensors: AllRpiSensors | None, mqtt_client: RpiMqttClient | None, logger: logging.Logger
+):
+    """Closes the sensors and disconnects from the MQTT broker, stopping the background thread running loop()"""
+
+    if all_sensors is not None:
+        all_sensors.close()
+
+    if mqtt_client is not None:
+        mqtt_client.disconnect()
+        logger.info("Disconnected from MQTT broker")
+
+
+def exit_process(logger: logging.Logger):
+    """Exits the process with code 130, also when called from a thread other than the main thread"""
+
+    try:
+        logger.info("Exiting system with code 130")
+        sys.exit(130)
+    except SystemExit:
+        logger.info("Exiting os with code 130")
+        # noinspection PyUnresolvedReferences,PyProtectedMember
+        os._exit(130)
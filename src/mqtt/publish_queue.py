@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""Bounded queue of messages published to the MQTT broker by a single worker thread"""
+
+import itertools
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from time import monotonic, time
+
+from paho.mqtt.client import Client, MQTTMessageInfo
+
+from mqtt.offline_log import OfflineLog, OfflineRecord
+from settings.types import OverflowPolicy, PublishSettings
+
+
+@dataclass
+class PublishMessage:
+    """Message to be published to the MQTT broker"""
+
+    topic: str
+    payload: str
+    qos: int = 1
+    retain: bool = False
+
+
+@dataclass
+class PublishQueueStats:
+    """Counters of a publish queue"""
+
+    depth: int = 0
+    """Number of messages waiting in the queue"""
+
+    published: int = 0
+    """Number of messages acknowledged by the MQTT broker"""
+
+    dropped: int = 0
+    """Number of messages dropped or replaced because the queue was full"""
+
+    failed: int = 0
+    """Number of messages failed or not acknowledged by the MQTT broker in time"""
+
+    buffered: int = 0
+    """Number of messages written to the offline buffer while disconnected"""
+
+    replayed: int = 0
+    """Number of messages of the offline buffer acknowledged by the MQTT broker"""
+
+
+class PublishQueue:
+    """Bounded queue of messages published by a single long-lived worker thread. The worker publishes one message at a
+    time and waits for the broker to acknowledge it, and holds the messages in the queue while the client is
+    disconnected, so a slow or unreachable broker only fills this queue up to its size. When the queue is full, the
+    overflow policy decides which message is dropped.
+
+    With the offline buffer enabled, messages put while disconnected are written to a log on disk instead, together
+    with the messages still queued. After the client connected again, the buffered messages are replayed in order at
+    the replay rate, before the messages queued meanwhile. The payloads are replayed as published, with the timestamps
+    of the sensor states they contain."""
+
+    _logger: logging.Logger
+    _mqtt_client: Client
+    _settings: PublishSettings
+    _messages: OrderedDict
+    _keys: itertools.count
+    _condition: threading.Condition
+    _stats: PublishQueueStats
+    _worker: threading.Thread | None = None
+    _stopped: bool = False
+    _offline_log: OfflineLog | None = None
+    """Log on disk of the messages put while disconnected, None if the offline buffer is not enabled or available"""
+    _replaying: bool = False
+    """Whether the buffered messages are replayed before the queued messages"""
+    _replay_ts: float = 0.0
+    """Monotonic timestamp when the next buffered message may be replayed"""
+    _replayed_logged: int = 0
+    """Number of replayed messages when the end of a replay was last logged"""
+
+    connection_check_interval_sec: float = 1.0
+
+    def __init__(self, mqtt_client: Client, settings: PublishSettings):
+        self._logger = logging.getLogger(__name__)
+        self._mqtt_client = mqtt_client
+        self._settings = settings
+        self._messages = OrderedDict()
+        self._keys = itertools.count()
+        self._condition = threading.Condition()
+        self._stats = PublishQueueStats()
+
+        if settings.offline_buffer.enabled:
+            try:
+                self._offline_log = OfflineLog(settings.offline_buffer)
+            except OSError as err:
+                self._logger.warning(
+                    "Offline buffer %s not available, queueing messages in memory: %s",
+                    settings.offline_buffer.directory,
+                    err,
+                )
+
+        # Messages buffered before a restart are replayed once connected
+        self._replaying = self._offline_log is not None
+
+    @property
+    def stats(self) -> PublishQueueStats:
+        """Copy of the counters of this queue"""
+
+        with self._condition:
+            return replace(
+                self._stats,
+                depth=len(self._messages),
+                dropped=self._stats.dropped + (self._offline_log.dropped if self._offline_log is not None else 0),
+            )
+
+    def start(self):
+        """Start the worker thread publishing the queued messages"""
+
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run, name="publish_queue_worker", daemon=True)
+            self._worker.start()
+
+    def replay(self):
+        """Replay the messages of the offline buffer, called when the client connected to the broker"""
+
+        with self._condition:
+            if self._offline_log is not None:
+                self._replaying = True
+                self._condition.notify_all()
+
+    def stop(self, timeout: float | None = None):
+        """Stop the worker thread, after publishing the queued messages within timeout seconds if the client is
+        connected. Messages left in the queue are written to the offline buffer if enabled."""
+
+        if timeout is not None and self._mqtt_client.is_connected():
+            deadline: float = monotonic() + timeout
+            with self._condition:
+                while self._messages and monotonic() < deadline:
+                    self._condition.wait(deadline - monotonic())
+
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+
+        if self._worker is not None:
+            self._worker.join(timeout=self._settings.publish_timeout)
+            self._worker = None
+
+        if self._offline_log is not None:
+            with self._condition:
+                self._buffer_queued_messages()
+
+            self._offline_log.close()
+
+        stats: PublishQueueStats = self.stats
+        self._logger.info(
+            "Stopped publish queue, %d messages published, %d dropped, %d failed and %d left in queue",
+            stats.published,
+            stats.dropped,
+            stats.failed,
+            stats.depth,
+        )
+
+    def put(self, message: PublishMessage) -> bool:
+        """Add the message to the queue, applying the overflow policy when the queue is full. Returns False if the
+        message itself was dropped."""
+
+        policy: OverflowPolicy = self._settings.overflow_policy
+
+        with self._condition:
+            if self._offline_log is not None and not self._mqtt_client.is_connected():
+                # Queued messages are older, so they are buffered first
+                self._buffer_queued_messages()
+                return self._buffer(message)
+
+            if policy == OverflowPolicy.LATEST_PER_TOPIC and message.topic in self._messages:
+                # Replace the queued message for the topic, keeping its position in the queue
+                self._messages[message.topic] = message
+                self._stats.dropped += 1
+                self._logger.debug("Replaced queued message for MQTT topic '%s'", message.topic)
+                return True
+
+            if len(self._messages) >= self._settings.queue_size:
+                if policy == OverflowPolicy.BLOCK:
+                    # The worker does not empty the queue while disconnected, so wait for free space only while
+                    # connected, and stop waiting if the connection is lost
+                    deadline: float = monotonic() + self._settings.block_timeout
+                    while (
+                        len(self._messages) >= self._settings.queue_size
+                        and self._mqtt_client.is_connected()
+                        and monotonic() < deadline
+                    ):
+                        self._condition.wait(min(deadline - monotonic(), self.connection_check_interval_sec))
+
+                    if len(self._messages) >= self._settings.queue_size:
+                        self._stats.dropped += 1
+                        self._logger.warning(
+                            "Publish queue is full, dropped message for MQTT topic '%s'", message.topic
+                        )
+                        return False
+                else:
+                    _, dropped_message = self._messages.popitem(last=False)
+                    self._stats.dropped += 1
+                    self._logger.warning(
+                        "Publish queue is full, dropped oldest message for MQTT topic '%s'", dropped_message.topic
+                    )
+
+            key = message.topic if policy == OverflowPolicy.LATEST_PER_TOPIC else next(self._keys)
+            self._messages[key] = message
+            self._condition.notify_all()
+
+        return True
+
+    def _buffer(self, message: PublishMessage) -> bool:
+        """Write the message to the offline buffer. Returns False if the message was dropped."""
+
+        try:
+            self._offline_log.append(
+                OfflineRecord(
+                    ts=time(), topic=message.topic, payload=message.payload, qos=message.qos, retain=message.retain
+                )
+            )
+        except OSError as err:
+            self._stats.dropped += 1
+            self._logger.warning("Failed buffering message for MQTT topic '%s': %s", message.topic, err)
+            return False
+
+        self._stats.buffered += 1
+        return True
+
+    def _buffer_queued_messages(self):
+        while self._messages:
+            self._buffer(self._messages.popitem(last=False)[1])
+
+        self._condition.notify_all()
+
+    def _next_message(self) -> tuple[PublishMessage, bool] | None:
+        """Wait for a message while the client is connected, returns None when stopped. Buffered messages are returned
+        first while replaying, at the replay rate. Returns the message and whether it is buffered."""
+
+        with self._condition:
+            while True:
+                while not self._stopped and (
+                    not (self._messages or self._replaying) or not self._mqtt_client.is_connected()
+                ):
+                    if self._offline_log is not None and self._messages and not self._mqtt_client.is_connected():
+                        # Messages queued when the connection was lost survive a restart in the offline buffer
+                        self._buffer_queued_messages()
+
+                    self._condition.wait(self.connection_check_interval_sec)
+
+                if self._stopped:
+                    return None
+
+                if not self._replaying:
+                    break
+
+                if (record := self._offline_log.peek()) is None:
+                    self._replaying = False
+                    if self._stats.replayed > self._replayed_logged:
+                        self._logger.info("Replayed %d buffered messages", self._stats.replayed - self._replayed_logged)
+                        self._replayed_logged = self._stats.replayed
+                elif (delay := self._replay_ts - monotonic()) > 0:
+                    self._condition.wait(delay)
+                else:
+                    self._replay_ts = (
+                        max(self._replay_ts, monotonic()) + 1.0 / self._settings.offline_buffer.replay_rate
+                    )
+                    return (
+                        PublishMessage(
+                            topic=record.topic, payload=record.payload, qos=record.qos, retain=record.retain
+                        ),
+                        True,
+                    )
+
+            _, message = self._messages.popitem(last=False)
+            self._condition.notify_all()
+
+            return message, False
+
+    def _run(self):
+        while (next_message := self._next_message()) is not None:
+            message, buffered = next_message
+            published: bool = self._publish(message)
+
+            if buffered:
+                with self._condition:
+                    # A message not acknowledged after the connection was lost is replayed again once connected
+                    if published or self._mqtt_client.is_connected():
+                        self._offline_log.advance()
+
+                    if published:
+                        self._stats.replayed += 1
+
+    def _publish(self, message: PublishMessage) -> bool:
+        """Publish the message and wait for the broker to acknowledge it. Returns True if acknowledged."""
+
+        published: bool = False
+
+        # noinspection PyBroadException
+        # pylint: disable=W0718
+        try:
+            msg_info: MQTTMessageInfo = self._mqtt_client.publish(
+                topic=message.topic, payload=message.payload, qos=message.qos, retain=message.retain
+            )
+            msg_info.wait_for_publish(timeout=self._settings.publish_timeout)
+            published = msg_info.is_published()
+
+            if published:
+                self._logger.debug("Published message to MQTT topic '%s'", message.topic)
+            else:
+                self._logger.warning("Message to MQTT topic '%s' not acknowledged by the MQTT broker", message.topic)
+        except Exception:
+            self._logger.warning("Failed publishing message to MQTT topic '%s'", message.topic, exc_info=True)
+
+        with self._condition:
+            if published:
+                self._stats.published += 1
+            else:
+                self._stats.failed += 1
+
+        return published
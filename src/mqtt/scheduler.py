@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""Scheduler running a function at a fixed rate in a separate thread"""
+
+import logging
+import math
+import threading
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from time import monotonic
+
+STATS_LOG_INTERVAL_SEC: float = 3600.0
+"""Seconds between logging the counters of a schedule"""
+
+
+@dataclass
+class SchedulerStats:
+    """Counters of a fixed rate schedule"""
+
+    runs: int = 0
+    """Number of times the function has been executed"""
+
+    failures: int = 0
+    """Number of times the function raised an exception"""
+
+    missed_ticks: int = 0
+    """Number of ticks skipped because the function was still running when they were due"""
+
+    last_lateness_sec: float = 0.0
+    """Seconds between the deadline and the start of the last execution"""
+
+    max_lateness_sec: float = 0.0
+    """Maximum seconds between the deadline and the start of an execution"""
+
+
+class FixedRateSchedule:
+    """Deadlines at fixed offsets from the start on the monotonic clock: start + n * interval. The deadlines do not
+    depend on how long the function runs, so the executions do not drift. Ticks passing while the function overruns
+    are coalesced into the next deadline instead of running back-to-back."""
+
+    interval: float
+    next_deadline: float
+    _stats: SchedulerStats
+    _stats_logged_at: float
+
+    def __init__(self, interval: float, start: float):
+        self.interval = interval
+        self.next_deadline = start + interval
+        self._stats = SchedulerStats()
+        self._stats_logged_at = start
+
+    @property
+    def stats(self) -> SchedulerStats:
+        """Copy of the counters of this schedule"""
+
+        return replace(self._stats)
+
+    def seconds_until_next(self, now: float) -> float:
+        """Returns seconds until the next deadline, 0 if it has passed"""
+
+        return max(self.next_deadline - now, 0.0)
+
+    def begin_tick(self, now: float):
+        """Records the start of an execution at monotonic timestamp now"""
+
+        lateness: float = max(now - self.next_deadline, 0.0)
+        self._stats.last_lateness_sec = lateness
+        self._stats.max_lateness_sec = max(self._stats.max_lateness_sec, lateness)
+
+    def end_tick(self, now: float, failed: bool) -> int:
+        """Records the end of an execution at monotonic timestamp now and moves to the next deadline in the future.
+        Returns number of missed ticks."""
+
+        self._stats.runs += 1
+        if failed:
+            self._stats.failures += 1
+
+        self.next_deadline += self.interval
+        missed_ticks: int = 0
+
+        if now >= self.next_deadline:
+            missed_ticks = math.floor((now - self.next_deadline) / self.interval) + 1
+            self.next_deadline += missed_ticks * self.interval
+            self._stats.missed_ticks += missed_ticks
+
+        return missed_ticks
+
+    def stats_log_due(self, now: float) -> bool:
+        """Returns True if STATS_LOG_INTERVAL_SEC have passed since the counters were last logged, and records that
+        they are logged at monotonic timestamp now"""
+
+        if now - self._stats_logged_at < STATS_LOG_INTERVAL_SEC:
+            return False
+
+        self._stats_logged_at = now
+        return True
+
+
+class FixedRateScheduler(threading.Thread):
+    """Thread running a function at a fixed rate, aligned to the deadlines of a FixedRateSchedule. Exceptions raised by
+    the function are logged and counted, and do not stop the scheduler."""
+
+    _logger: logging.Logger
+    _function: Callable
+    _finished: threading.Event
+    _schedule: FixedRateSchedule
+
+    def __init__(self, name: str, interval: float, function: Callable):
+        super().__init__(name=name, daemon=True)
+        logger_name: str = f"{__name__}.{name}"
+        self._logger = logging.getLogger(logger_name)
+        self._function = function
+        self._finished = threading.Event()
+        self._schedule = FixedRateSchedule(interval=interval, start=monotonic())
+
+    @property
+    def stats(self) -> SchedulerStats:
+        """Counters of runs, failures, missed ticks and lateness of this scheduler"""
+
+        return self._schedule.stats
+
+    def run(self):
+        self._schedule = FixedRateSchedule(interval=self._schedule.interval, start=monotonic())
+
+        while not self._finished.wait(self._schedule.seconds_until_next(monotonic())):
+            run_tick(schedule=self._schedule, function=self._function, logger=self._logger)
+
+    def start(self):
+        super().start()
+        self._logger.debug("Started scheduler")
+
+    def cancel(self):
+        """Stop the scheduler, a running execution of the function is completed"""
+
+        self._finished.set()
+        self._logger.debug("Cancelled scheduler")
+
+
+def run_tick(schedule: FixedRateSchedule, function: Callable, logger: logging.Logger) -> bool:
+    """Executes the function if the next deadline of the schedule has passed, and records the execution in the
+    schedule. Returns False if the deadline has not passed yet, for example when a wait returned early."""
+
+    if monotonic() < schedule.next_deadline:
+        return False
+
+    with tick(schedule=schedule, logger=logger):
+        function()
+
+    return True
+
+
+@contextmanager
+def tick(schedule: FixedRateSchedule, logger: logging.Logger) -> Iterator[None]:
+    """Context executing the function of the schedule once its deadline has passed. Records the execution in the
+    schedule, logs an exception raised in the context instead of raising it, and logs the missed ticks and
+    periodically the counters of the schedule."""
+
+    schedule.begin_tick(monotonic())
+    failed: bool = False
+
+    # noinspection PyBroadException
+    # pylint: disable=W0718
+    try:
+        yield
+        logger.info("Executed function")
+    except Exception:
+        failed = True
+        logger.error("Failed executing function", exc_info=True)
+
+    now: float = monotonic()
+    missed_ticks: int = schedule.end_tick(now, failed=failed)
+    if missed_ticks > 0:
+        logger.warning("Function overran the interval, skipped %d tick(s)", missed_ticks)
+
+    if schedule.stats_log_due(now):
+        stats: SchedulerStats = schedule.stats
+        logger.info(
+            "Executed function %d times, %d failed, %d ticks missed, lateness %.3f sec last and %.3f sec max",
+            stats.runs,
+            stats.failures,
+            stats.missed_ticks,
+            stats.last_lateness_sec,
+            stats.max_lateness_sec,
+        )
@@ -4,7 +4,7 @@
 from dataclasses import dataclass
 
 from mqtt.constants import TOPIC_COMMANDS_LWT_POSTFIX, TOPIC_SENSOR_STATES_LWT_POSTFIX, TOPIC_SENSOR_STATES_POSTFIX
-from settings.types import MqttSettings
+from settings.types import MqttSettings, TopicLayout
 
 
 @dataclass()
@@ -15,6 +15,9 @@ class RpiMqttTopics:
     _discovery_topic_prefix: str
     _sensor_name: str
 
+    topic_layout: TopicLayout
+    """Layout of the sensor states topics"""
+
     sensor_states_base_topic: str
     sensor_states_topic: str
     sensor_states_topic_abbr: str
@@ -28,10 +31,11 @@ class RpiMqttTopics:
     lwt_topic_names: list[str]
     """List of LWT topic names"""
 
-    def __init__(self, mqtt_settings: MqttSettings, sensor_name: str):
+    def __init__(self, mqtt_settings: MqttSettings, sensor_name: str, topic_layout: TopicLayout = TopicLayout.MONITOR):
         self._topic_prefix = mqtt_settings.base_topic.lower()
         self._discovery_topic_prefix = mqtt_settings.discovery_topic_prefix.lower()
         self._sensor_name = sensor_name
+        self.topic_layout = topic_layout
 
         # Base topics
         self.sensor_states_base_topic = f"{self._topic_prefix}/sensor/{self._sensor_name}"
@@ -59,3 +63,40 @@ class RpiMqttTopics:
         <discovery_prefix>/<component>/<node_id>]<unique_id>/config"""
 
         return f"{self._discovery_topic_prefix}/{component}/{self._sensor_name}/{unique_id}/config"
+
+    def sensor_state_topic(self, name: str, *fields: str) -> str:
+        """Returns name of the topic of the sensor state, or of a field of the sensor state, with the sensor and field
+        topic layouts. Example: 'rpi-mqtt/sensor/rpi/memory_use/used_pct'"""
+
+        return "/".join([self.sensor_states_base_topic, *(topic_level(level) for level in (name, *fields))])
+
+    def discovery_state(self, name: str, *fields: str) -> tuple[str, str]:
+        """Returns the abbreviated state topic and the value template of a discovery entity reading the field of the
+        sensor state, in the topic layout"""
+
+        if self.topic_layout == TopicLayout.FIELD:
+            return f"~/{'/'.join(topic_level(level) for level in (name, *fields))}", "{{ value }}"
+
+        if self.topic_layout == TopicLayout.SENSOR:
+            return f"~/{topic_level(name)}", f"{{{{ value_json{''.join(f'.{field}' for field in fields)} }}}}"
+
+        return self.sensor_states_topic_abbr, f"{{{{ value_json.{'.'.join((name, *fields))} }}}}"
+
+    def discovery_json_attributes(self, name: str) -> tuple[str | None, str | None]:
+        """Returns the abbreviated topic and the template of the json attributes of a discovery entity, the sensor
+        state. None with the field topic layout, without a topic holding the whole sensor state."""
+
+        if self.topic_layout == TopicLayout.FIELD:
+            return None, None
+
+        if self.topic_layout == TopicLayout.SENSOR:
+            return f"~/{topic_level(name)}", "{{ value_json | tojson }}"
+
+        return self.sensor_states_topic_abbr, f"{{{{ value_json.{name} | tojson }}}}"
+
+
+def topic_level(key: str) -> str:
+    """Returns the key of a sensor state as topic level, replacing the characters not allowed within a topic level.
+    Example: '/mnt/usb' returns '_mnt_usb'"""
+
+    return str(key).replace("/", "_").replace("+", "_").replace("#", "_")
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""Refresh interval of a numeric sensor, adapted to the volatility of its value"""
+
+from settings.types import AdaptiveUpdateInterval
+
+
+class AdaptiveInterval:
+    """Tracks the rate of change of a sensor value per second as exponentially weighted moving average (EWMA), and
+    derives the refresh interval in which the value changes by the target change. The interval shortens down to the
+    min interval as the value gets volatile, and stretches up to the max interval while the value is stable. The first
+    interval is the min interval, until the rate of change is known."""
+
+    settings: AdaptiveUpdateInterval
+    rate: float | None = None
+    """Moving average of the absolute change of the value per second, None until two values were observed"""
+    _previous: tuple[float, float] | None = None
+    """Previous value and its monotonic timestamp"""
+
+    def __init__(self, settings: AdaptiveUpdateInterval):
+        self.settings = settings
+
+    def update(self, value: float, now: float) -> int:
+        """Observe the value read at monotonic timestamp now, and returns the next refresh interval in seconds"""
+
+        if self._previous is not None and now > self._previous[1]:
+            change_rate: float = abs(value - self._previous[0]) / (now - self._previous[1])
+            self.rate = (
+                change_rate
+                if self.rate is None
+                else self.settings.smoothing * change_rate + (1 - self.settings.smoothing) * self.rate
+            )
+
+        self._previous = (value, now)
+
+        return self.interval
+
+    @property
+    def interval(self) -> int:
+        """Refresh interval in seconds at the current rate of change"""
+
+        min_interval: int = min(self.settings.min_interval, self.settings.max_interval)
+
+        if self.rate is None:
+            return min_interval
+
+        if self.rate <= 0.0:
+            return self.settings.max_interval
+
+        return max(min_interval, min(round(self.settings.target_change / self.rate), self.settings.max_interval))
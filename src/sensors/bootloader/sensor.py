@@ -7,14 +7,18 @@ from typing import List
 from mqtt.constants import PAYLOAD_LWT_OFFLINE, PAYLOAD_LWT_ONLINE
 from mqtt.types import RpiMqttTopics
 from sensors.bootloader.types import BootloaderVersion
+from sensors.constants import UPDATE_INTERVAL_SLOW
 from sensors.types import MqttDiscoveryEntity, MqttDiscoveryMessage, RpiSensor, SensorNotAvailableException
-from sensors.utils import date_and_timestamp_to_iso_datetime
+from sensors.utils import date_and_timestamp_to_iso_datetime, run_command_async
+
+RPI_EEPROM_UPDATE_ARGS = ["rpi-eeprom-update"]
 
 
 class BootloaderSensor(RpiSensor):
     """Sensor for bootloader version"""
 
     _state: BootloaderVersion | None = None
+    default_update_interval = UPDATE_INTERVAL_SLOW
 
     @property
     def name(self) -> str:
@@ -28,21 +32,24 @@ class BootloaderSensor(RpiSensor):
     # noinspection DuplicatedCode
     # TODO: clean up the duplicated code
     def mqtt_discovery_messages(self, topics: RpiMqttTopics) -> List[MqttDiscoveryMessage]:
+        state_topic, value_template = topics.discovery_state(self.name, "status")
+        json_attributes_topic, json_attributes_template = topics.discovery_json_attributes(self.name)
+
         binary_sensor = MqttDiscoveryEntity(
             name="Bootloader update",
             unique_id="rpi_bootloader_update",
             component="binary_sensor",
             device_class="update",
-            value_template=f"{{{{ value_json.{self.name}.status }}}}",
+            value_template=value_template,
             base_topic=topics.sensor_states_base_topic,
-            state_topic=topics.sensor_states_topic_abbr,
+            state_topic=state_topic,
             availability_topic=topics.sensor_states_lwt_topic_abbr,
             payload_available=PAYLOAD_LWT_ONLINE,
             payload_not_available=PAYLOAD_LWT_OFFLINE,
             payload_on="update available",
             payload_off="up to date",
-            json_attributes_topic=topics.sensor_states_topic_abbr,
-            json_attributes_template=f"{{{{ value_json.{self.name} | tojson }}}}",
+            json_attributes_topic=json_attributes_topic,
+            json_attributes_template=json_attributes_template,
         )
 
         binary_sensor_dict: dict = vars(binary_sensor)
@@ -71,18 +78,37 @@ class BootloaderSensor(RpiSensor):
         self._state = self._read_rpi_bootloader_version()
         self.logger.debug("Refreshing sensor state successfully")
 
+    async def refresh_state_async(self) -> None:
+        self.logger.debug("Refreshing sensor state")
+        self._state = await self._read_rpi_bootloader_version_async()
+        self.logger.debug("Refreshing sensor state successfully")
+
     def _read_rpi_bootloader_version(self) -> BootloaderVersion:
         """Read current Rpi bootloader version and check for updates"""
 
         # doc: https://www.raspberrypi.com/documentation/computers/raspberry-pi.html#updating-the-eeprom-configuration
-        args = ["rpi-eeprom-update"]
+        try:
+            result = subprocess.run(RPI_EEPROM_UPDATE_ARGS, capture_output=True, text=True, check=False)
+        except FileNotFoundError as err:
+            self.logger.warning("Failed calling process rpi-eeprom-update: %s", str(err))
+            raise SensorNotAvailableException("rpi-eeprom-update not available for this Rpi") from err
+
+        return self._parse_rpi_bootloader_version(result)
+
+    async def _read_rpi_bootloader_version_async(self) -> BootloaderVersion:
+        """Read current Rpi bootloader version and check for updates as asyncio subprocess"""
 
         try:
-            result = subprocess.run(args, capture_output=True, text=True, check=False)
+            result = await run_command_async(RPI_EEPROM_UPDATE_ARGS)
         except FileNotFoundError as err:
             self.logger.warning("Failed calling process rpi-eeprom-update: %s", str(err))
             raise SensorNotAvailableException("rpi-eeprom-update not available for this Rpi") from err
 
+        return self._parse_rpi_bootloader_version(result)
+
+    def _parse_rpi_bootloader_version(self, result: subprocess.CompletedProcess) -> BootloaderVersion:
+        """Parse bootloader version from the completed 'rpi-eeprom-update' process"""
+
         if result.returncode != 0:
             self.logger.warning(
                 "Process 'rpi-eeprom-update' returned code %s: %s", str(result.returncode), str(result.stderr)
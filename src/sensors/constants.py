@@ -0,0 +1,8 @@
+#!/usr/bin/env python3
+"""Constants in Sensors module"""
+
+UPDATE_INTERVAL_STATIC = 24 * 60 * 60
+"""Default refresh interval in seconds for sensors reading values that do not change while the Rpi is running"""
+
+UPDATE_INTERVAL_SLOW = 60 * 60
+"""Default refresh interval in seconds for sensors reading values that change rarely"""
@@ -1,17 +1,28 @@
 #!/usr/bin/env python3
 """Service for reading the Rpi CPU usage"""
 
-import psutil
+from dataclasses import astuple
 
-from sensors.cpu.types import LoadAverage
+from sensors.cpu.types import CpuTimes, CpuUsage, LoadAverage
+from sensors.procfs import ProcfsSnapshot, procfs_snapshot
 from sensors.types import RpiSensor, SensorNotAvailableException
 from sensors.utils import round_percent
 
 
 class CpuUsePctSensor(RpiSensor):
-    """Sensor for CPU usage in percent"""
+    """Sensor for system-wide CPU usage in percent. The utilization is computed from the difference of the CPU time
+    counters in /proc/stat since the previous refresh, so it covers the whole interval without sleeping to measure.
+    The first refresh covers the time since boot."""
 
-    _state: float | None = None
+    _usage: CpuUsage | None = None
+    _procfs: ProcfsSnapshot
+    _previous_times: dict[str, CpuTimes]
+    """CPU time counters per CPU line (cpu, cpu0, cpu1, ..) read in the previous refresh"""
+
+    def __init__(self, enabled: bool, procfs: ProcfsSnapshot = procfs_snapshot):
+        self._procfs = procfs
+        self._previous_times = {}
+        super().__init__(enabled=enabled)
 
     @property
     def name(self) -> str:
@@ -19,30 +30,113 @@ class CpuUsePctSensor(RpiSensor):
 
     @property
     def state(self) -> float | None:
-        return self._state
+        return self._usage.use_pct if self._usage is not None else None
+
+    def adaptive_value(self) -> float | None:
+        return self.state
 
     def refresh_state(self) -> None:
         self.logger.debug("Refreshing sensor state")
-        self._state = self._read_cpu_use_percent()
+        self._usage = self._read_cpu_usage()
         self.logger.debug("Refreshing sensor state successfully")
 
-    def _read_cpu_use_percent(self) -> float:
-        """Return a float representing the current system-wide CPU utilization as a percentage"""
+    def _read_cpu_usage(self) -> CpuUsage:
+        """Return the CPU utilization since the previous refresh, system-wide, per state and per core"""
+
+        # doc: https://www.kernel.org/doc/html/latest/filesystems/proc.html#miscellaneous-kernel-statistics-in-proc-stat
+        try:
+            current_times: dict[str, CpuTimes] = parse_cpu_times(self._procfs.read("stat"))
+        except OSError as err:
+            self.logger.warning("/proc/stat not available for this Rpi")
+            raise SensorNotAvailableException("/proc/stat not available for this Rpi") from err
+
+        if "cpu" not in current_times:
+            raise SensorNotAvailableException("Bad content of /proc/stat, none cpu line")
+
+        previous_times: dict[str, CpuTimes] = self._previous_times
+        self._previous_times = current_times
+
+        total: CpuTimes = self._delta(current_times["cpu"], previous_times.get("cpu"))
+        cores: list[str] = sorted((name for name in current_times if name != "cpu"), key=lambda name: int(name[3:]))
+
+        return CpuUsage(
+            use_pct=self._share(total.busy, total),
+            user_pct=self._share(total.user + total.nice, total),
+            system_pct=self._share(total.system, total),
+            iowait_pct=self._share(total.iowait, total),
+            irq_pct=self._share(total.irq + total.softirq, total),
+            steal_pct=self._share(total.steal, total),
+            cores_use_pct=[
+                self._share(core.busy, core)
+                for core in (self._delta(current_times[name], previous_times.get(name)) for name in cores)
+            ],
+        )
+
+    @staticmethod
+    def _delta(current: CpuTimes, previous: CpuTimes | None) -> CpuTimes:
+        """Returns the CPU time spent per state between the previous and current counters. The counters restart when
+        a core is taken offline, then the current counters are used."""
+
+        if previous is None or current.total < previous.total:
+            return current
 
-        # doc: https://psutil.readthedocs.io/en/latest/
-        if not hasattr(psutil, "cpu_percent"):
-            self.logger.warning("This platform does not support psutil.cpu_percent()")
-            raise SensorNotAvailableException("cpu_percent() not available for this Rpi")
+        return CpuTimes(
+            *[
+                max(current_value - previous_value, 0)
+                for current_value, previous_value in zip(astuple(current), astuple(previous))
+            ]
+        )
+
+    @staticmethod
+    def _share(value: int, times: CpuTimes) -> float:
+        """Returns the value as percent of the total CPU time"""
+
+        if times.total <= 0:
+            return 0.0
 
-        cpu_use_percent: float = psutil.cpu_percent(interval=0.1)
+        return round_percent(value / times.total * 100)
 
-        return cpu_use_percent
+
+class CpuUseBreakdownSensor(CpuUsePctSensor):
+    """Sensor for CPU usage in percent, system-wide, per state and per core, since the previous refresh of this
+    sensor"""
+
+    @property
+    def name(self) -> str:
+        return "cpu_use_breakdown"
+
+    @property
+    def state(self) -> CpuUsage | None:
+        return self._usage
+
+
+def parse_cpu_times(proc_stat: str) -> dict[str, CpuTimes]:
+    """Parse CPU time counters per CPU line from the content of /proc/stat.
+    Example line: 'cpu0 28443 0 2262 152289 166 0 5 430 0 0'"""
+
+    cpu_times: dict[str, CpuTimes] = {}
+
+    for line in proc_stat.splitlines():
+        if not line.startswith("cpu"):
+            continue
+
+        fields: list[str] = line.split()
+        # Older kernels do not report all states, missing states are 0
+        values: list[int] = [int(value) for value in fields[1:9]] + [0] * max(9 - len(fields), 0)
+        cpu_times[fields[0]] = CpuTimes(*values)
+
+    return cpu_times
 
 
 class CpuLoadAvgSensor(RpiSensor):
     """Sensor for CPU load in average"""
 
     _state: LoadAverage | None = None
+    _procfs: ProcfsSnapshot
+
+    def __init__(self, enabled: bool, procfs: ProcfsSnapshot = procfs_snapshot):
+        self._procfs = procfs
+        super().__init__(enabled=enabled)
 
     @property
     def name(self) -> str:
@@ -52,6 +146,9 @@ class CpuLoadAvgSensor(RpiSensor):
     def state(self) -> LoadAverage | None:
         return self._state
 
+    def adaptive_value(self) -> float | None:
+        return self._state.load_1min_pct if self._state is not None else None
+
     def refresh_state(self) -> None:
         self.logger.debug("Refreshing sensor state")
         self._state = self._read_load_average()
@@ -60,17 +157,16 @@ class CpuLoadAvgSensor(RpiSensor):
     def _read_load_average(self) -> LoadAverage:
         """Return the average system load in percent related to number of cpu cores over the last 1, 5 and 15 minutes"""
 
-        # doc: https://psutil.readthedocs.io/en/latest/
-        if not hasattr(psutil, "cpu_count"):
-            self.logger.warning("This platform does not support psutil.cpu_count()")
-            raise SensorNotAvailableException("cpu_count() not available for this Rpi")
+        try:
+            cpu_cores: int = len([name for name in parse_cpu_times(self._procfs.read("stat")) if name != "cpu"])
+            load_avg: tuple[float, float, float] = self._procfs.loadavg()
+        except OSError as err:
+            self.logger.warning("/proc/stat or /proc/loadavg not available for this Rpi")
+            raise SensorNotAvailableException("load average not available for this Rpi") from err
 
-        if not hasattr(psutil, "getloadavg"):
-            self.logger.warning("This platform does not support psutil.getloadavg()")
-            raise SensorNotAvailableException("getloadavg() not available for this Rpi")
+        if cpu_cores == 0:
+            raise SensorNotAvailableException("Bad content of /proc/stat, none cpu core line")
 
-        cpu_cores: int = psutil.cpu_count()
-        load_avg: tuple[float, float, float] = psutil.getloadavg()
         load_avg_percent: list[float] = [x / cpu_cores * 100 for x in load_avg]
 
         return LoadAverage(
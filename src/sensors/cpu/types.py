@@ -19,3 +19,55 @@ class LoadAverage:
 
     load_15min_pct: float
     """Average system load over the last 15 minute, in percent. Example: '0.52'"""
+
+
+@dataclass
+class CpuTimes:
+    """Class representing the cumulative CPU time per state of a CPU line in /proc/stat, in clock ticks"""
+
+    user: int
+    nice: int
+    system: int
+    idle: int
+    iowait: int
+    irq: int
+    softirq: int
+    steal: int
+
+    @property
+    def total(self) -> int:
+        """Total CPU time of all states. Guest time is already included in user and nice time."""
+
+        return self.user + self.nice + self.system + self.idle + self.iowait + self.irq + self.softirq + self.steal
+
+    @property
+    def busy(self) -> int:
+        """CPU time not idle and not waiting for I/O"""
+
+        return self.total - self.idle - self.iowait
+
+
+@dataclass
+class CpuUsage:
+    """Class representing CPU utilization since the previous refresh, in percent of the CPU time"""
+
+    use_pct: float
+    """System-wide CPU utilization, time not idle and not waiting for I/O. Example: '12.5'"""
+
+    user_pct: float
+    """Share of time running user space processes, including niced processes. Example: '9.8'"""
+
+    system_pct: float
+    """Share of time running the kernel. Example: '2.1'"""
+
+    iowait_pct: float
+    """Share of time idle while waiting for I/O to complete. Example: '0.4'"""
+
+    irq_pct: float
+    """Share of time servicing hardware and software interrupts. Example: '0.3'"""
+
+    steal_pct: float
+    """Share of time stolen by the hypervisor for other virtual machines. Example: '0.0'"""
+
+    cores_use_pct: list[float]
+    """CPU utilization per (logical) CPU core, ordered by core number. Example: '[15.0, 10.0, 12.5, 12.5]'"""
@@ -1,13 +1,27 @@
 #!/usr/bin/env python3
 """Service for reading the Rpi disk usage"""
 
+import os
+import re
 from collections import namedtuple
+from dataclasses import astuple
+from typing import Any
 
 import psutil
 
-from sensors.disk.types import DiskUse
+from sensors.disk.types import DiskCounters, DiskIo, DiskUse, Mount
+from sensors.procfs import ProcfsSnapshot, procfs_snapshot
 from sensors.types import RpiSensor, SensorNotAvailableException
-from sensors.utils import bytes_to_gibibytes, round_percent
+from sensors.utils import bytes_to_gibibytes, counter_delta, round_percent
+
+SECTOR_SIZE = 512
+"""Size in bytes of the sectors counted in /proc/diskstats, independent of the sector size of the device"""
+
+IGNORED_DEVICE_PREFIXES = ("loop", "ram")
+"""Prefixes of the block devices not reported by the disk I/O sensor"""
+
+_PARTITION_SUFFIX_PATTERN = re.compile(r"^p?\d+$")
+_OCTAL_ESCAPE_PATTERN = re.compile(r"\\([0-7]{3})")
 
 
 class DiskUseSensor(RpiSensor):
@@ -46,3 +60,236 @@ class DiskUseSensor(RpiSensor):
             used_pct=round_percent(disk_usage.percent),
             free_gib=bytes_to_gibibytes(disk_usage.free),
         )
+
+
+class DiskMountsSensor(RpiSensor):
+    """Sensor for the disk usage of multiple mount points. Without configured mount points, the filesystems of block
+    devices in /proc/self/mountinfo are enumerated once, and again after a mount point failed, i.e. was unmounted."""
+
+    _state: dict[str, DiskUse] | None = None
+    _procfs: ProcfsSnapshot
+    _mount_points: list[str]
+    """The configured mount points, empty to report all filesystems of block devices"""
+    _mounts: list[Mount] | None = None
+    """The enumerated filesystems, None if they must be enumerated on the next refresh"""
+
+    def __init__(self, enabled: bool, mount_points: list[str] | None = None, procfs: ProcfsSnapshot = procfs_snapshot):
+        self._procfs = procfs
+        self._mount_points = list(mount_points or [])
+        super().__init__(enabled=enabled)
+
+    @property
+    def name(self) -> str:
+        return "disk_mounts"
+
+    @property
+    def state(self) -> dict[str, DiskUse] | None:
+        return self._state
+
+    @property
+    def state_as_dict(self) -> dict[str, dict[str, Any]] | None:
+        return self._nested_state_as_dict
+
+    def refresh_state(self) -> None:
+        self.logger.debug("Refreshing sensor state")
+        self._state = self._read_disk_mounts()
+        self.logger.debug("Refreshing sensor state successfully")
+
+    def _read_disk_mounts(self) -> dict[str, DiskUse]:
+        """Read statistics about disk usage per mount point"""
+
+        disk_mounts: dict[str, DiskUse] = {}
+
+        for mount_point in self._mount_points or [mount.mount_point for mount in self._enumerate_mounts()]:
+            try:
+                disk_mounts[mount_point] = read_disk_use(mount_point)
+            except OSError as err:
+                self.logger.warning("Failed to read disk usage of mount point '%s': %s", mount_point, err)
+                self._mounts = None
+
+        if not disk_mounts:
+            raise SensorNotAvailableException("none mount points available for this Rpi")
+
+        return disk_mounts
+
+    def _enumerate_mounts(self) -> list[Mount]:
+        if self._mounts is None:
+            try:
+                self._mounts = parse_mounts(self._procfs.read("self/mountinfo"))
+            except OSError as err:
+                self.logger.warning("/proc/self/mountinfo not available for this Rpi")
+                raise SensorNotAvailableException("/proc/self/mountinfo not available for this Rpi") from err
+
+            self.logger.debug("Enumerated %d mounted filesystems", len(self._mounts))
+
+        return self._mounts
+
+
+class DiskIoSensor(RpiSensor):
+    """Sensor for the I/O of the block devices. The rates and latencies are computed from the difference of the
+    counters in /proc/diskstats since the previous refresh. The first refresh covers the time since boot. Partitions,
+    loop and ram devices, and devices without any I/O are not reported."""
+
+    _state: dict[str, DiskIo] | None = None
+    _procfs: ProcfsSnapshot
+    _previous_counters: dict[str, DiskCounters]
+    """I/O counters per block device read in the previous refresh"""
+    _previous_uptime: float = 0.0
+    """Seconds since boot of the previous refresh"""
+
+    def __init__(self, enabled: bool, procfs: ProcfsSnapshot = procfs_snapshot):
+        self._procfs = procfs
+        self._previous_counters = {}
+        super().__init__(enabled=enabled)
+
+    @property
+    def name(self) -> str:
+        return "disk_io"
+
+    @property
+    def state(self) -> dict[str, DiskIo] | None:
+        return self._state
+
+    @property
+    def state_as_dict(self) -> dict[str, dict[str, Any]] | None:
+        return self._nested_state_as_dict
+
+    def refresh_state(self) -> None:
+        self.logger.debug("Refreshing sensor state")
+        self._state = self._read_disk_io()
+        self.logger.debug("Refreshing sensor state successfully")
+
+    def _read_disk_io(self) -> dict[str, DiskIo]:
+        """Read the I/O per block device since the previous refresh"""
+
+        # doc: https://www.kernel.org/doc/html/latest/admin-guide/iostats.html
+        try:
+            current_counters: dict[str, DiskCounters] = parse_disk_counters(self._procfs.read("diskstats"))
+            uptime: float = self._procfs.uptime()
+        except (OSError, ValueError, IndexError) as err:
+            self.logger.warning("/proc/diskstats not available for this Rpi")
+            raise SensorNotAvailableException("/proc/diskstats not available for this Rpi") from err
+
+        elapsed: float = uptime - self._previous_uptime
+        previous_counters: dict[str, DiskCounters] = self._previous_counters
+        self._previous_counters = current_counters
+        self._previous_uptime = uptime
+
+        return {
+            name: self._disk_io(self._delta(counters, previous_counters.get(name)), elapsed)
+            for name, counters in current_counters.items()
+        }
+
+    @staticmethod
+    def _delta(current: DiskCounters, previous: DiskCounters | None) -> DiskCounters:
+        """Returns the I/O between the previous and current counters, devices added since are counted from 0"""
+
+        if previous is None:
+            return current
+
+        return DiskCounters(
+            *[
+                counter_delta(current_value, previous_value)
+                for current_value, previous_value in zip(astuple(current), astuple(previous))
+            ]
+        )
+
+    @staticmethod
+    def _disk_io(delta: DiskCounters, elapsed: float) -> DiskIo:
+        def per_sec(value: int) -> float:
+            return round(value / elapsed, 1) if elapsed > 0 else 0.0
+
+        def latency(time_ms: int, ios: int) -> float:
+            return round(time_ms / ios, 2) if ios > 0 else 0.0
+
+        return DiskIo(
+            read_bytes_per_sec=per_sec(delta.sectors_read * SECTOR_SIZE),
+            write_bytes_per_sec=per_sec(delta.sectors_written * SECTOR_SIZE),
+            read_iops=per_sec(delta.reads),
+            write_iops=per_sec(delta.writes),
+            read_latency_ms=latency(delta.read_time_ms, delta.reads),
+            write_latency_ms=latency(delta.write_time_ms, delta.writes),
+            busy_pct=round_percent(min(delta.io_time_ms / 10 / elapsed, 100.0)) if elapsed > 0 else 0.0,
+        )
+
+
+def read_disk_use(path: str) -> DiskUse:
+    """Returns the disk usage of the filesystem mounted at the path, computed as psutil.disk_usage() does. Raises
+    OSError if the path is not available."""
+
+    stat: os.statvfs_result = os.statvfs(path)
+    total: int = stat.f_blocks * stat.f_frsize
+    free: int = stat.f_bavail * stat.f_frsize
+    used: int = (stat.f_blocks - stat.f_bfree) * stat.f_frsize
+
+    # The blocks reserved for root are neither used nor free for users, as in the percent reported by 'df'
+    return DiskUse(
+        path=path,
+        total_gib=bytes_to_gibibytes(total),
+        used_gib=bytes_to_gibibytes(used),
+        used_pct=round_percent(used / (used + free) * 100) if used + free > 0 else 0.0,
+        free_gib=bytes_to_gibibytes(free),
+    )
+
+
+def parse_mounts(mountinfo: str) -> list[Mount]:
+    """Parse the filesystems mounted from block devices from the content of /proc/self/mountinfo, without bind mounts
+    of sub-directories. Example line: '24 1 179:2 / / rw,noatime shared:1 - ext4 /dev/mmcblk0p2 rw'"""
+
+    mounts: dict[str, Mount] = {}
+
+    for line in mountinfo.splitlines():
+        fields, _, fs_fields = line.partition(" - ")
+        fields_split: list[str] = fields.split()
+        fs_fields_split: list[str] = fs_fields.split()
+
+        if len(fields_split) < 5 or len(fs_fields_split) < 2:
+            continue
+
+        root, mount_point, fs_type, device = fields_split[3], fields_split[4], fs_fields_split[0], fs_fields_split[1]
+        if root != "/" or not device.startswith("/dev/"):
+            continue
+
+        # Spaces, tabs and newlines are escaped as octal, and a later mount over the same mount point hides earlier ones
+        mount_point = _OCTAL_ESCAPE_PATTERN.sub(lambda match: chr(int(match.group(1), 8)), mount_point)
+        mounts.pop(mount_point, None)
+        mounts[mount_point] = Mount(mount_point=mount_point, device=device, fs_type=fs_type)
+
+    return list(mounts.values())
+
+
+def parse_disk_counters(diskstats: str) -> dict[str, DiskCounters]:
+    """Parse the I/O counters per block device from the content of /proc/diskstats, without partitions, loop and ram
+    devices, and devices without any I/O.
+    Example line: ' 179       0 mmcblk0 30217 9452 2210538 41623 8841 12339 682128 98812 0 58244 144052 0 0 0 0'"""
+
+    counters: dict[str, DiskCounters] = {}
+
+    for line in diskstats.splitlines():
+        fields: list[str] = line.split()
+        if len(fields) < 14 or fields[2].startswith(IGNORED_DEVICE_PREFIXES):
+            continue
+
+        values: list[int] = [int(value) for value in fields[3:14]]
+        if values[0] == 0 and values[4] == 0:
+            continue
+
+        counters[fields[2]] = DiskCounters(
+            reads=values[0],
+            sectors_read=values[2],
+            read_time_ms=values[3],
+            writes=values[4],
+            sectors_written=values[6],
+            write_time_ms=values[7],
+            io_time_ms=values[9],
+        )
+
+    # A partition is named after its device, with the partition number and a 'p' if the device name ends with a digit
+    return {
+        name: device_counters
+        for name, device_counters in counters.items()
+        if not any(
+            name != device and name.startswith(device) and _PARTITION_SUFFIX_PATTERN.match(name[len(device) :])
+            for device in counters
+        )
+    }
@@ -22,3 +22,56 @@ class DiskUse:
 
     free_gib: float
     """Free disk space, in gibibytes (GiB). Example: '16.28'"""
+
+
+@dataclass
+class Mount:
+    """Class representing a mounted filesystem of a block device in /proc/self/mountinfo"""
+
+    mount_point: str
+    """The mount path. Example: '/boot/firmware'"""
+
+    device: str
+    """The mounted block device. Example: '/dev/mmcblk0p1'"""
+
+    fs_type: str
+    """The filesystem type. Example: 'vfat'"""
+
+
+@dataclass
+class DiskCounters:
+    """Class representing the cumulative I/O counters of a block device in /proc/diskstats"""
+
+    reads: int
+    sectors_read: int
+    read_time_ms: int
+    writes: int
+    sectors_written: int
+    write_time_ms: int
+    io_time_ms: int
+
+
+@dataclass
+class DiskIo:
+    """Class representing the I/O of a block device since the previous refresh"""
+
+    read_bytes_per_sec: float
+    """Bytes read per second. Example: '524288.0'"""
+
+    write_bytes_per_sec: float
+    """Bytes written per second. Example: '81920.0'"""
+
+    read_iops: float
+    """Completed reads per second. Example: '12.5'"""
+
+    write_iops: float
+    """Completed writes per second. Example: '3.2'"""
+
+    read_latency_ms: float
+    """Average time of the completed reads, in milliseconds, 0 if none. Example: '1.25'"""
+
+    write_latency_ms: float
+    """Average time of the completed writes, in milliseconds, 0 if none. Example: '8.5'"""
+
+    busy_pct: float
+    """Share of the time the device had I/O in progress, in percent. Example: '4.52'"""
@@ -1,10 +1,11 @@
 #!/usr/bin/env python3
 """Service for reading the Rpi fans speed"""
-from typing import Any
 
-import psutil
+from typing import Any
 
 from sensors.fan.types import FanSpeed
+from sensors.hwmon.reader import HwmonReader, hwmon_reader
+from sensors.hwmon.types import HwmonInput
 from sensors.types import RpiSensor, SensorNotAvailableException
 
 
@@ -12,6 +13,11 @@ class FanSpeedSensor(RpiSensor):
     """Sensor for fan speed"""
 
     _state: dict[str, FanSpeed] | None = None
+    _hwmon: HwmonReader
+
+    def __init__(self, enabled: bool, hwmon: HwmonReader = hwmon_reader):
+        self._hwmon = hwmon
+        super().__init__(enabled=enabled)
 
     @property
     def name(self) -> str:
@@ -47,22 +53,16 @@ class FanSpeedSensor(RpiSensor):
         """
 
         # RPi doc: https://www.raspberrypi.com/documentation/computers/raspberry-pi-5.html#cooling-raspberry-pi-5
-        # psutil doc: https://psutil.readthedocs.io/en/latest/
+        # hwmon doc: https://www.kernel.org/doc/html/latest/hwmon/sysfs-interface.html
         fans_speed: dict[str, FanSpeed] = {}
 
-        if not hasattr(psutil, "sensors_fans"):
-            self.logger.warning("This platform does not support psutil.sensors_fans()")
-            raise SensorNotAvailableException("sensors_fans() not available for this Rpi")
-
-        fans: dict[str, list] = psutil.sensors_fans()
+        fans: list[tuple[HwmonInput, int]] = self._hwmon.fans()
 
         if not fans:
             self.logger.warning("None fans detected for this Rpi")
             raise SensorNotAvailableException("none fans detected for this Rpi")
 
-        for fan_name, fan_measurements in fans.items():
-            for fan_measurement in fan_measurements:
-                name: str = fan_measurement.label or fan_name
-                fans_speed[name] = FanSpeed(curr_speed_rpm=fan_measurement.current)
+        for hw_input, speed_rpm in fans:
+            fans_speed[hw_input.name] = FanSpeed(curr_speed_rpm=speed_rpm)
 
         return fans_speed
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""Compact in-memory history of the numeric fields of the sensor states, compressed as in Facebook's Gorilla"""
+
+import math
+import struct
+import threading
+from collections import deque
+from collections.abc import Iterator
+from dataclasses import dataclass
+from typing import Any
+
+from sensors.utils import flatten_state
+
+# doc: https://www.vldb.org/pvldb/vol8/p1816-teller.pdf
+BLOCK_SIZE = 4096
+"""Bytes per block of the history, each block decodes on its own so that the oldest block can be dropped"""
+
+_MAX_SAMPLE_BITS = 4 + 32 + 2 + 5 + 6 + 64
+"""Bits of a sample in the worst case, the largest timestamp and value encodings"""
+
+_BLOCK_HEADER_BITS = 64 + 64
+"""Bits of the first timestamp and value of a block, stored as is"""
+
+# Prefix, number of value bits and range of the delta of delta of the timestamps
+_DOD_ENCODINGS: list[tuple[int, int, int]] = [(0b10, 2, 7), (0b110, 3, 9), (0b1110, 4, 12)]
+
+
+@dataclass
+class _Block:
+    """Block of the buffer, with the state of the encoder to append samples"""
+
+    offset: int
+    """Byte offset of the block in the buffer"""
+    first_ts: int
+    last_ts: int
+    count: int = 0
+    bit_length: int = 0
+    """Bits written to the block"""
+    delta: int = 0
+    """Delta of the last two timestamps"""
+    value_bits: int = 0
+    """Last value as 64 bit integer"""
+    leading: int = -1
+    """Leading zero bits of the last XOR encoded value with meaningful bits, -1 if none encoded yet"""
+    trailing: int = 0
+    """Trailing zero bits of the last XOR encoded value with meaningful bits"""
+
+
+class HistoryRing:
+    """History of a numeric field in a bytearray preallocated with the size given, as timestamps in whole seconds and
+    float values. Timestamps are encoded as delta of the delta to the previous timestamp, which is a single bit at a
+    constant rate. Values are XOR encoded with the previous value, storing only the meaningful bits in between the
+    leading and trailing zero bits, which is a single bit for an unchanged value. The buffer is split into blocks
+    decoded on their own, and the oldest block is dropped when the buffer is full. At one sample per second a slowly
+    changing value, like a temperature, takes 2 to 3 bytes per minute."""
+
+    _buffer: bytearray
+    _blocks: deque[_Block]
+    _free_offsets: list[int]
+
+    def __init__(self, size: int):
+        block_count: int = max(size // BLOCK_SIZE, 2)
+        self._buffer = bytearray(block_count * BLOCK_SIZE)
+        self._blocks = deque()
+        self._free_offsets = [index * BLOCK_SIZE for index in reversed(range(block_count))]
+
+    def __len__(self) -> int:
+        return sum(block.count for block in self._blocks)
+
+    @property
+    def size(self) -> int:
+        """Bytes of the preallocated buffer"""
+
+        return len(self._buffer)
+
+    @property
+    def used(self) -> int:
+        """Bytes of the buffer holding samples"""
+
+        return sum((block.bit_length + 7) // 8 for block in self._blocks)
+
+    @property
+    def first_ts(self) -> int | None:
+        """Timestamp of the oldest sample, None if empty"""
+
+        return self._blocks[0].first_ts if self._blocks else None
+
+    @property
+    def last_ts(self) -> int | None:
+        """Timestamp of the latest sample, None if empty"""
+
+        return self._blocks[-1].last_ts if self._blocks else None
+
+    def append(self, ts: int, value: float) -> bool:
+        """Add the sample at the timestamp in seconds. Returns False if the sample was dropped, as not later than the
+        latest sample."""
+
+        if self._blocks and ts <= self._blocks[-1].last_ts:
+            return False
+
+        if not self._blocks or self._blocks[-1].bit_length + _MAX_SAMPLE_BITS > BLOCK_SIZE * 8:
+            self._start_block(ts, value)
+            return True
+
+        block: _Block = self._blocks[-1]
+        delta: int = ts - block.last_ts
+        self._write_timestamp(block, delta - block.delta)
+        self._write_value(block, _float_bits(value))
+
+        block.delta = delta
+        block.last_ts = ts
+        block.count += 1
+
+        return True
+
+    def range(self, start_ts: int | None = None, end_ts: int | None = None) -> Iterator[tuple[int, float]]:
+        """Returns the timestamp and value of the samples from start to end timestamp, both included, oldest first"""
+
+        for block in list(self._blocks):
+            if (start_ts is not None and block.last_ts < start_ts) or (end_ts is not None and block.first_ts > end_ts):
+                continue
+
+            for ts, value in self._decode(block):
+                if end_ts is not None and ts > end_ts:
+                    return
+                if start_ts is None or ts >= start_ts:
+                    yield ts, value
+
+    def downsample(
+        self, step: int, start_ts: int | None = None, end_ts: int | None = None
+    ) -> Iterator[tuple[int, float, float, float]]:
+        """Returns the start timestamp, mean, min and max of the samples per step seconds from start to end timestamp,
+        aligned to multiples of the step, skipping steps without samples"""
+
+        bucket_ts: int | None = None
+        values: list[float] = []
+
+        for ts, value in self.range(start_ts, end_ts):
+            if bucket_ts is not None and ts - ts % step != bucket_ts:
+                yield bucket_ts, math.fsum(values) / len(values), min(values), max(values)
+                values = []
+
+            bucket_ts = ts - ts % step
+            values.append(value)
+
+        if values:
+            yield bucket_ts, math.fsum(values) / len(values), min(values), max(values)
+
+    def _start_block(self, ts: int, value: float):
+        if not self._free_offsets:
+            self._free_offsets.append(self._blocks.popleft().offset)
+
+        block = _Block(offset=self._free_offsets.pop(), first_ts=ts, last_ts=ts, count=1)
+        block.value_bits = _float_bits(value)
+        self._write_bits(block, ts, 64)
+        self._write_bits(block, block.value_bits, 64)
+        self._blocks.append(block)
+
+    def _write_timestamp(self, block: _Block, dod: int):
+        if dod == 0:
+            self._write_bits(block, 0b0, 1)
+            return
+
+        for prefix, prefix_bits, value_bits in _DOD_ENCODINGS:
+            if -(1 << (value_bits - 1)) < dod <= 1 << (value_bits - 1):
+                self._write_bits(block, prefix, prefix_bits)
+                self._write_bits(block, dod - 1 if dod > 0 else dod, value_bits)
+                return
+
+        self._write_bits(block, 0b1111, 4)
+        self._write_bits(block, dod, 32)
+
+    def _write_value(self, block: _Block, value_bits: int):
+        xor: int = value_bits ^ block.value_bits
+        block.value_bits = value_bits
+
+        if xor == 0:
+            self._write_bits(block, 0b0, 1)
+            return
+
+        leading: int = min(64 - xor.bit_length(), 31)
+        trailing: int = (xor & -xor).bit_length() - 1
+
+        if 0 <= block.leading <= leading and block.trailing <= trailing:
+            # The meaningful bits fit into the window of the previous value
+            self._write_bits(block, 0b10, 2)
+            self._write_bits(block, xor >> block.trailing, 64 - block.leading - block.trailing)
+            return
+
+        meaningful: int = 64 - leading - trailing
+        self._write_bits(block, 0b11, 2)
+        self._write_bits(block, leading, 5)
+        # 64 meaningful bits do not fit into 6 bits, and 0 meaningful bits do not occur
+        self._write_bits(block, meaningful & 0x3F, 6)
+        self._write_bits(block, xor >> trailing, meaningful)
+        block.leading = leading
+        block.trailing = trailing
+
+    def _write_bits(self, block: _Block, value: int, bit_count: int):
+        """Write the lowest bits of the value, most significant first"""
+
+        value &= (1 << bit_count) - 1
+        position: int = block.offset * 8 + block.bit_length
+        block.bit_length += bit_count
+
+        while bit_count > 0:
+            free: int = 8 - position % 8
+            chunk: int = min(free, bit_count)
+            bits: int = (value >> (bit_count - chunk)) & ((1 << chunk) - 1)
+            index: int = position // 8
+
+            # Blocks are reused, so the bits of a byte are cleared when its first bit is written
+            self._buffer[index] = (self._buffer[index] if free < 8 else 0) | (bits << (free - chunk))
+            position += chunk
+            bit_count -= chunk
+
+    def _decode(self, block: _Block) -> Iterator[tuple[int, float]]:
+        reader = _BitReader(self._buffer, block.offset * 8)
+        ts: int = reader.read(64)
+        value_bits: int = reader.read(64)
+        yield ts, _bits_float(value_bits)
+
+        delta: int = 0
+        leading: int = 0
+        trailing: int = 0
+
+        for _ in range(block.count - 1):
+            delta += self._read_dod(reader)
+            ts += delta
+
+            if reader.read(1):
+                if reader.read(1):
+                    leading = reader.read(5)
+                    trailing = 64 - leading - (reader.read(6) or 64)
+
+                value_bits ^= reader.read(64 - leading - trailing) << trailing
+
+            yield ts, _bits_float(value_bits)
+
+    @staticmethod
+    def _read_dod(reader: "_BitReader") -> int:
+        if not reader.read(1):
+            return 0
+
+        # Each further 1 bit of the prefix selects the next larger encoding
+        for _, _, value_bits in _DOD_ENCODINGS:
+            if not reader.read(1):
+                dod: int = _signed(reader.read(value_bits), value_bits)
+                return dod + 1 if dod >= 0 else dod
+
+        return _signed(reader.read(32), 32)
+
+
+class _BitReader:  # pylint: disable=R0903
+    """Reads bits of the buffer from the bit position, most significant first"""
+
+    _buffer: bytearray
+    _position: int
+
+    def __init__(self, buffer: bytearray, position: int):
+        self._buffer = buffer
+        self._position = position
+
+    def read(self, bit_count: int) -> int:
+        """Returns the next bits as unsigned integer"""
+
+        value: int = 0
+
+        while bit_count > 0:
+            available: int = 8 - self._position % 8
+            chunk: int = min(available, bit_count)
+            byte: int = self._buffer[self._position // 8]
+            value = (value << chunk) | ((byte >> (available - chunk)) & ((1 << chunk) - 1))
+            self._position += chunk
+            bit_count -= chunk
+
+        return value
+
+
+class SensorHistory:
+    """History of the numeric fields of the state of a sensor, one history ring per field, keyed by the path of the
+    field. The rings are preallocated when a field is first recorded. Thread safe, the history is recorded from the
+    refreshing threads and read from others."""
+
+    _ring_size: int
+    _rings: dict[tuple[str, ...], HistoryRing]
+    _lock: threading.Lock
+
+    def __init__(self, ring_size: int):
+        self._ring_size = ring_size
+        self._rings = {}
+        self._lock = threading.Lock()
+
+    def record(self, state: Any, ts: int):
+        """Record the numeric fields of the sensor state as dict at the timestamp in seconds"""
+
+        with self._lock:
+            for path, value in flatten_state(state):
+                # bool is a subclass of int, but is not a numeric field
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    self._rings.setdefault(path, HistoryRing(size=self._ring_size)).append(ts, float(value))
+
+    def fields(self) -> list[tuple[str, ...]]:
+        """Returns the paths of the recorded fields. Example: [('cpu_thermal', 'current_c')]"""
+
+        with self._lock:
+            return list(self._rings)
+
+    def range(
+        self, path: tuple[str, ...], start_ts: int | None = None, end_ts: int | None = None
+    ) -> list[tuple[int, float]]:
+        """Returns the timestamp and value of the samples of the field from start to end timestamp, both included"""
+
+        with self._lock:
+            ring: HistoryRing | None = self._rings.get(path)
+            return list(ring.range(start_ts, end_ts)) if ring is not None else []
+
+    def downsample(
+        self, path: tuple[str, ...], step: int, start_ts: int | None = None, end_ts: int | None = None
+    ) -> list[tuple[int, float, float, float]]:
+        """Returns the start timestamp, mean, min and max of the samples of the field per step seconds from start to
+        end timestamp"""
+
+        with self._lock:
+            ring: HistoryRing | None = self._rings.get(path)
+            return list(ring.downsample(step, start_ts, end_ts)) if ring is not None else []
+
+
+def _float_bits(value: float) -> int:
+    return struct.unpack("=Q", struct.pack("=d", value))[0]
+
+
+def _bits_float(bits: int) -> float:
+    return struct.unpack("=d", struct.pack("=Q", bits))[0]
+
+
+def _signed(value: int, bit_count: int) -> int:
+    return value - (1 << bit_count) if value >= 1 << (bit_count - 1) else value
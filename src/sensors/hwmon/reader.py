@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""Service reading the temperature and fan sensors of the hwmon and thermal sysfs classes"""
+
+import logging
+import os
+import re
+import threading
+from time import monotonic
+
+from sensors.hwmon.types import HwmonInput
+from sensors.pseudo_files import PseudoFileReader
+
+SYS_CLASS_ROOT = "/sys/class"
+"""Directory of the sysfs device classes"""
+
+RESCAN_INTERVAL_SEC = 300.0
+"""Seconds after which the sensor files are discovered again, to pick up hot plugged devices"""
+
+_TEMP_INPUT_PATTERN = re.compile(r"^(temp\d+)_input$")
+_FAN_INPUT_PATTERN = re.compile(r"^(fan\d+)_input$")
+_TRIP_POINT_TYPE_PATTERN = re.compile(r"^(trip_point_\d+)_type$")
+
+
+class HwmonReader:
+    """Reads the current values of the temperature and fan sensors. The 'temp*_input' and 'fan*_input' files of
+    '/sys/class/hwmon' (or the 'temp' files of '/sys/class/thermal' if hwmon has none temperature sensors) are
+    discovered once, together with the static labels and thresholds. A refresh reads only the value files, with pread()
+    on descriptors kept open, instead of walking all directories as psutil does on every call. The files are discovered
+    again after the rescan interval and after a read failed, i.e. when a device was unplugged. The root can be a fake
+    sysfs directory for tests."""
+
+    root: str
+    rescan_interval: float
+    _logger: logging.Logger
+    _lock: threading.Lock
+    _files: PseudoFileReader
+    _temperature_inputs: list[HwmonInput]
+    _fan_inputs: list[HwmonInput]
+    _discovered_at: float | None = None
+    """Monotonic time of the last discovery, None if the files must be discovered on the next read"""
+
+    def __init__(self, root: str = SYS_CLASS_ROOT, rescan_interval: float = RESCAN_INTERVAL_SEC):
+        self.root = root
+        self.rescan_interval = rescan_interval
+        self._logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._files = PseudoFileReader()
+        self._temperature_inputs = []
+        self._fan_inputs = []
+
+    def temperatures(self) -> list[tuple[HwmonInput, float]]:
+        """Returns the discovered temperature sensors with their current value, in celsius"""
+
+        with self._lock:
+            self._discover_if_due()
+            return [(hw_input, value / 1000.0) for hw_input, value in self._read_inputs(self._temperature_inputs)]
+
+    def fans(self) -> list[tuple[HwmonInput, int]]:
+        """Returns the discovered fan sensors with their current speed, in RPM"""
+
+        with self._lock:
+            self._discover_if_due()
+            return self._read_inputs(self._fan_inputs)
+
+    def rescan(self):
+        """Discover the sensor files again on the next read"""
+
+        with self._lock:
+            self._discovered_at = None
+
+    def close(self):
+        """Close the open files, which are opened again when read"""
+
+        self._files.close()
+
+    def _discover_if_due(self):
+        if self._discovered_at is not None and monotonic() - self._discovered_at < self.rescan_interval:
+            return
+
+        self._files.close()
+        self._temperature_inputs = self._discover_hwmon(_TEMP_INPUT_PATTERN) or self._discover_thermal_zones()
+        self._fan_inputs = self._discover_hwmon(_FAN_INPUT_PATTERN)
+        self._discovered_at = monotonic()
+
+        self._logger.debug(
+            "Discovered %d temperature and %d fan sensors", len(self._temperature_inputs), len(self._fan_inputs)
+        )
+
+    def _discover_hwmon(self, input_pattern: re.Pattern) -> list[HwmonInput]:
+        """Returns the readable value files of the hwmon devices matching the pattern, i.e. 'temp1_input'"""
+
+        hw_inputs: list[HwmonInput] = []
+
+        for device in self._list_dir(os.path.join(self.root, "hwmon")):
+            device_dir: str = os.path.join(self.root, "hwmon", device)
+            chip_name: str | None = self._read_text(os.path.join(device_dir, "name"))
+
+            # Older kernels expose the attributes in the device sub-directory
+            for attributes_dir in (device_dir, os.path.join(device_dir, "device")):
+                for entry in self._list_dir(attributes_dir):
+                    if not (match := input_pattern.match(entry)) or chip_name is None:
+                        continue
+
+                    base: str = os.path.join(attributes_dir, match.group(1))
+                    hw_input = HwmonInput(
+                        name=self._read_text(f"{base}_label") or chip_name,
+                        path=os.path.join(attributes_dir, entry),
+                        high=self._read_milli(f"{base}_max"),
+                        critical=self._read_milli(f"{base}_crit"),
+                    )
+
+                    if self._is_readable(hw_input):
+                        hw_inputs.append(hw_input)
+
+        return hw_inputs
+
+    def _discover_thermal_zones(self) -> list[HwmonInput]:
+        """Returns the readable temperature files of the thermal zones, with the high and critical trip points"""
+
+        hw_inputs: list[HwmonInput] = []
+
+        for zone in self._list_dir(os.path.join(self.root, "thermal")):
+            zone_dir: str = os.path.join(self.root, "thermal", zone)
+            zone_type: str | None = self._read_text(os.path.join(zone_dir, "type"))
+
+            if not zone.startswith("thermal_zone") or zone_type is None:
+                continue
+
+            trip_points: dict[str, float | None] = {}
+            for entry in self._list_dir(zone_dir):
+                if match := _TRIP_POINT_TYPE_PATTERN.match(entry):
+                    trip_type: str | None = self._read_text(os.path.join(zone_dir, entry))
+                    trip_points[trip_type] = self._read_milli(os.path.join(zone_dir, f"{match.group(1)}_temp"))
+
+            hw_input = HwmonInput(
+                name=zone_type,
+                path=os.path.join(zone_dir, "temp"),
+                high=trip_points.get("high"),
+                critical=trip_points.get("critical"),
+            )
+
+            if self._is_readable(hw_input):
+                hw_inputs.append(hw_input)
+
+        return hw_inputs
+
+    def _read_inputs(self, hw_inputs: list[HwmonInput]) -> list[tuple[HwmonInput, int]]:
+        values: list[tuple[HwmonInput, int]] = []
+
+        for hw_input in hw_inputs:
+            try:
+                values.append((hw_input, int(self._files.read(hw_input.path))))
+            except (OSError, ValueError) as err:
+                # The device may have been unplugged, skip the sensor and discover the files again on the next read
+                self._logger.warning("Failed to read sensor file %s: %s", hw_input.path, err)
+                self._discovered_at = None
+
+        return values
+
+    def _is_readable(self, hw_input: HwmonInput) -> bool:
+        try:
+            int(self._files.read(hw_input.path))
+            return True
+        except (OSError, ValueError):
+            return False
+
+    @staticmethod
+    def _list_dir(path: str) -> list[str]:
+        try:
+            return sorted(os.listdir(path))
+        except OSError:
+            return []
+
+    @staticmethod
+    def _read_text(path: str) -> str | None:
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                return file.read().strip()
+        except OSError:
+            return None
+
+    @classmethod
+    def _read_milli(cls, path: str) -> float | None:
+        text: str | None = cls._read_text(path)
+
+        try:
+            return int(text) / 1000.0 if text else None
+        except ValueError:
+            return None
+
+
+hwmon_reader = HwmonReader()
+"""Reader shared by all sensors"""
@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+"""Types in module Hwmon"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class HwmonInput:
+    """Class representing one sysfs file with the current value of a temperature or fan sensor, discovered once"""
+
+    name: str
+    """Label of the sensor, or the name of its chip or thermal zone if not labeled. Example: 'cpu_thermal'"""
+
+    path: str
+    """Path of the file with the current value. Example: '/sys/class/hwmon/hwmon0/temp1_input'"""
+
+    high: Optional[float] = None
+    """Threshold for high value, in the unit of the current value, read once when discovered. Example: '110.0'"""
+
+    critical: Optional[float] = None
+    """Threshold for critical value, in the unit of the current value, read once when discovered. Example: '110.0'"""
@@ -1,11 +1,13 @@
 #!/usr/bin/env python3
 """Service for reading all Rpi sensors and returning summary of all"""
 
+import logging
 from typing import List
 
+from sensors.adaptive import AdaptiveInterval
 from sensors.bootloader.sensor import BootloaderSensor
-from sensors.cpu.sensor import CpuLoadAvgSensor, CpuUsePctSensor
-from sensors.disk.sensor import DiskUseSensor
+from sensors.cpu.sensor import CpuLoadAvgSensor, CpuUseBreakdownSensor, CpuUsePctSensor
+from sensors.disk.sensor import DiskIoSensor, DiskMountsSensor, DiskUseSensor
 from sensors.fan.sensor import FanSpeedSensor
 from sensors.memory.sensor import MemoryUseSensor
 from sensors.model.sensor import RpiModelSensor
@@ -13,10 +15,19 @@ from sensors.network.sensor import (
     EthernetMacAddressSensor,
     HostnameSensor,
     IpAddressSensor,
+    NetworkInterfacesSensor,
+    NetworkThroughputSensor,
     WifiConnectionSensor,
+    WifiInterfacesSensor,
     WifiMacAddressSensor,
 )
-from sensors.os.sensor import AvailableUpdatesSensor, BootTimeSensor, OsKernelSensor, OsReleaseSensor
+from sensors.os.sensor import (
+    AvailableUpdatePackagesSensor,
+    AvailableUpdatesSensor,
+    BootTimeSensor,
+    OsKernelSensor,
+    OsReleaseSensor,
+)
 from sensors.temperature.sensor import TemperatureSensor
 from sensors.throttle.sensor import ThrottledSensor
 from sensors.types import RpiSensor
@@ -26,11 +37,14 @@ from settings.types import SensorsMonitoringSettings
 def create_sensors(sensor_settings: SensorsMonitoringSettings) -> List[RpiSensor]:
     """Return a list of all sensors for Rpi"""
 
-    return [
+    sensors: List[RpiSensor] = [
         BootloaderSensor(enabled=sensor_settings.boot_loader),
         CpuUsePctSensor(enabled=sensor_settings.cpu_use),
+        CpuUseBreakdownSensor(enabled=sensor_settings.cpu_use_breakdown),
         CpuLoadAvgSensor(enabled=sensor_settings.cpu_load),
         DiskUseSensor(enabled=sensor_settings.disk),
+        DiskMountsSensor(enabled=sensor_settings.disk_mounts, mount_points=sensor_settings.disk_mount_points),
+        DiskIoSensor(enabled=sensor_settings.disk_io),
         FanSpeedSensor(enabled=sensor_settings.fan),
         MemoryUseSensor(enabled=sensor_settings.memory),
         RpiModelSensor(enabled=sensor_settings.rpi_model),
@@ -39,14 +53,52 @@ def create_sensors(sensor_settings: SensorsMonitoringSettings) -> List[RpiSensor
         EthernetMacAddressSensor(enabled=sensor_settings.ethernet_mac_address),
         WifiMacAddressSensor(enabled=sensor_settings.wifi_mac_address),
         WifiConnectionSensor(enabled=sensor_settings.wifi_connection),
+        WifiInterfacesSensor(enabled=sensor_settings.wifi_interfaces),
+        NetworkInterfacesSensor(enabled=sensor_settings.network_interfaces),
+        NetworkThroughputSensor(enabled=sensor_settings.network_throughput),
         OsKernelSensor(enabled=sensor_settings.os_kernel),
         OsReleaseSensor(enabled=sensor_settings.os_release),
         AvailableUpdatesSensor(enabled=sensor_settings.available_updates),
+        AvailableUpdatePackagesSensor(enabled=sensor_settings.available_update_packages),
         BootTimeSensor(enabled=sensor_settings.boot_time),
         TemperatureSensor(enabled=sensor_settings.temperature),
         ThrottledSensor(enabled=sensor_settings.throttle),
     ]
 
+    configure_update_intervals(sensors=sensors, sensor_settings=sensor_settings)
+
+    return sensors
+
+
+def configure_update_intervals(sensors: List[RpiSensor], sensor_settings: SensorsMonitoringSettings):
+    """Override the default refresh intervals of the sensors with the intervals and adaptive intervals set by the user.
+    Sensor names set by the user that match no sensor are logged as warning."""
+
+    logger: logging.Logger = logging.getLogger(__name__)
+    sensor_names: set[str] = {sensor.name for sensor in sensors}
+
+    for name in sorted(set(sensor_settings.update_intervals) - sensor_names):
+        logger.warning("Unknown sensor '%s' in update intervals", name)
+
+    for name in sorted(set(sensor_settings.adaptive_update_intervals) - sensor_names):
+        logger.warning("Unknown sensor '%s' in adaptive update intervals", name)
+
+    # Override default refresh intervals with intervals set by the user
+    for sensor in sensors:
+        if sensor.name in sensor_settings.update_intervals:
+            sensor.update_interval = sensor_settings.update_intervals[sensor.name]
+
+    # Adapt the refresh intervals of numeric sensors to the rate of change of their value, if set by the user
+    for sensor in sensors:
+        if sensor.name not in sensor_settings.adaptive_update_intervals:
+            continue
+
+        if type(sensor).adaptive_value is RpiSensor.adaptive_value:
+            logger.warning("Sensor '%s' does not support adaptive update intervals", sensor.name)
+            continue
+
+        sensor.adaptive_interval = AdaptiveInterval(settings=sensor_settings.adaptive_update_intervals[sensor.name])
+
 
 def print_sensor_availability(sensors: list[RpiSensor]):
     """Print which sensors are available"""
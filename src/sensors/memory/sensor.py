@@ -1,10 +1,8 @@
 #!/usr/bin/env python3
 """Service for reading the Rpi memory usage"""
-from collections import namedtuple
-
-import psutil
 
 from sensors.memory.types import MemoryUse
+from sensors.procfs import ProcfsSnapshot, procfs_snapshot
 from sensors.types import RpiSensor, SensorNotAvailableException
 from sensors.utils import bytes_to_gibibytes, round_percent
 
@@ -13,6 +11,11 @@ class MemoryUseSensor(RpiSensor):
     """Sensor for memory usage"""
 
     _state: MemoryUse | None = None
+    _procfs: ProcfsSnapshot
+
+    def __init__(self, enabled: bool, procfs: ProcfsSnapshot = procfs_snapshot):
+        self._procfs = procfs
+        super().__init__(enabled=enabled)
 
     @property
     def name(self) -> str:
@@ -30,15 +33,21 @@ class MemoryUseSensor(RpiSensor):
     def _read_memory_use(self) -> MemoryUse:
         """Read statistics about system memory usage"""
 
-        # doc: https://psutil.readthedocs.io/en/latest/
-        if not hasattr(psutil, "virtual_memory"):
-            self.logger.warning("This platform does not support psutil.virtual_memory()")
-            raise SensorNotAvailableException("virtual_memory() not available for this Rpi")
+        # doc: https://www.kernel.org/doc/html/latest/filesystems/proc.html#meminfo
+        try:
+            meminfo: dict[str, int] = self._procfs.meminfo()
+        except OSError as err:
+            self.logger.warning("/proc/meminfo not available for this Rpi")
+            raise SensorNotAvailableException("/proc/meminfo not available for this Rpi") from err
+
+        if "MemTotal" not in meminfo or "MemAvailable" not in meminfo:
+            raise SensorNotAvailableException("Bad content of /proc/meminfo, none MemTotal or MemAvailable")
 
-        memory: namedtuple = psutil.virtual_memory()
+        total: int = meminfo["MemTotal"]
+        available: int = meminfo["MemAvailable"]
 
         return MemoryUse(
-            total_gib=bytes_to_gibibytes(memory.total),
-            available_gib=bytes_to_gibibytes(memory.available),
-            used_pct=round_percent(memory.percent),
+            total_gib=bytes_to_gibibytes(total),
+            available_gib=bytes_to_gibibytes(available),
+            used_pct=round_percent((total - available) / total * 100),
         )
@@ -1,12 +1,18 @@
 #!/usr/bin/env python3
 """Service for reading the Rpi model"""
+
+from sensors.constants import UPDATE_INTERVAL_STATIC
+from sensors.pseudo_files import pseudo_files
 from sensors.types import RpiSensor, SensorNotAvailableException
 
+RPI_MODEL_FILE = "/sys/firmware/devicetree/base/model"
+
 
 class RpiModelSensor(RpiSensor):
     """Sensor for Rpi model"""
 
     _state: str | None = None
+    default_update_interval = UPDATE_INTERVAL_STATIC
 
     @property
     def name(self) -> str:
@@ -24,11 +30,8 @@ class RpiModelSensor(RpiSensor):
     def _read_rpi_model(self) -> str:
         """Read Rpi model"""
 
-        model_file_name = "/sys/firmware/devicetree/base/model"
-
         try:
-            with open(model_file_name, "r", encoding="utf-8") as f:
-                model = f.readline().strip("\x00")
+            model = pseudo_files.read(RPI_MODEL_FILE).strip("\x00")
 
             return model
         except FileNotFoundError as err:
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Encoding and decoding of netlink messages, shared by the rtnetlink and generic netlink clients"""
+
+import errno
+import socket
+import struct
+from collections.abc import Callable, Iterator
+
+# doc: https://man7.org/linux/man-pages/man7/netlink.7.html
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+
+NLM_F_REQUEST = 0x1
+NLM_F_DUMP = 0x300
+
+NLA_F_NESTED = 0x8000
+NLA_TYPE_MASK = 0x3FFF
+"""Mask of the attribute type, without the flags for nested attributes and network byte order"""
+
+RECEIVE_BUFFER_SIZE = 65536
+"""Size in bytes of the buffer receiving the netlink messages"""
+
+_NLMSGHDR = struct.Struct("=IHHII")
+_NLATTR = struct.Struct("=HH")
+
+
+def pack_message(msg_type: int, flags: int, sequence: int, payload: bytes) -> bytes:
+    """Returns the netlink message with its header"""
+
+    return _NLMSGHDR.pack(_NLMSGHDR.size + len(payload), msg_type, flags, sequence, 0) + payload
+
+
+def pack_attribute(attribute_type: int, value: bytes) -> bytes:
+    """Returns the netlink attribute with its header, padded to the alignment of the attributes"""
+
+    length: int = _NLATTR.size + len(value)
+    return _NLATTR.pack(length, attribute_type) + value + bytes(_align(length) - length)
+
+
+def parse_messages(data: bytes) -> Iterator[tuple[int, int, bytes]]:
+    """Returns the type, sequence number and payload of the netlink messages in the received data"""
+
+    offset: int = 0
+
+    while offset + _NLMSGHDR.size <= len(data):
+        length, msg_type, _, sequence, _ = _NLMSGHDR.unpack_from(data, offset)
+        if length < _NLMSGHDR.size:
+            return
+
+        yield msg_type, sequence, data[offset + _NLMSGHDR.size : offset + length]
+        offset += _align(length)
+
+
+def parse_attributes(data: bytes) -> dict[int, bytes]:
+    """Returns the values of the netlink attributes, keyed by attribute type"""
+
+    attributes: dict[int, bytes] = {}
+    offset: int = 0
+
+    while offset + _NLATTR.size <= len(data):
+        length, attribute_type = _NLATTR.unpack_from(data, offset)
+        if length < _NLATTR.size:
+            break
+
+        attributes[attribute_type & NLA_TYPE_MASK] = data[offset + _NLATTR.size : offset + length]
+        offset += _align(length)
+
+    return attributes
+
+
+def parse_string(value: bytes) -> str:
+    """Returns the string of a null terminated attribute value"""
+
+    return value.split(b"\0", 1)[0].decode("utf-8", errors="replace")
+
+
+def parse_mac_address(value: bytes) -> str:
+    """Returns the mac address of an attribute value. Example: 'a8:3a:dd:b1:cc:45'"""
+
+    return ":".join(f"{byte:02x}" for byte in value)
+
+
+def request(  # pylint: disable=R0913, R0917
+    sock: socket.socket,
+    msg_type: int,
+    payload: bytes,
+    sequence: int,
+    dump: bool = False,
+    on_other: Callable[[int, bytes], object] | None = None,
+) -> Iterator[tuple[int, bytes]]:
+    """Send the request when iterated, and returns the type and payload of the replies as received, until the end of
+    the dump or the first reply otherwise. Messages with another sequence number, i.e. multicast notifications, are
+    passed to on_other in the order received. Raises OSError if the kernel answered with an error."""
+
+    sock.send(pack_message(msg_type, NLM_F_REQUEST | (NLM_F_DUMP if dump else 0), sequence, payload))
+
+    while True:
+        for reply_type, reply_sequence, reply in parse_messages(sock.recv(RECEIVE_BUFFER_SIZE)):
+            if reply_sequence != sequence:
+                if on_other is not None:
+                    on_other(reply_type, reply)
+            elif reply_type == NLMSG_DONE:
+                return
+            elif reply_type == NLMSG_ERROR:
+                error: int = -struct.unpack_from("=i", reply)[0]
+                if error:
+                    raise OSError(error, f"netlink request failed: {errno.errorcode.get(error, error)}")
+
+                # An error code 0 acknowledges the request
+                return
+            else:
+                yield reply_type, reply
+                if not dump:
+                    return
+
+
+def _align(length: int) -> int:
+    return (length + 3) & ~3
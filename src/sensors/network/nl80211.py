@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""Client of nl80211, the generic netlink family of the linux kernel for the configuration of wireless devices"""
+
+import errno
+import logging
+import socket
+import struct
+import threading
+from collections.abc import Callable
+
+from sensors.network.netlink import pack_attribute, parse_attributes, parse_mac_address, parse_string, request
+from sensors.network.types import WirelessInterface, WirelessStation
+
+# doc: https://docs.kernel.org/userspace-api/netlink/intro.html#generic-netlink
+NETLINK_GENERIC = 16
+GENL_ID_CTRL = 0x10
+CTRL_CMD_GETFAMILY = 3
+CTRL_ATTR_FAMILY_ID = 1
+CTRL_ATTR_FAMILY_NAME = 2
+
+# doc: https://github.com/torvalds/linux/blob/master/include/uapi/linux/nl80211.h
+NL80211_FAMILY_NAME = "nl80211"
+NL80211_CMD_GET_INTERFACE = 5
+NL80211_CMD_GET_STATION = 17
+
+NL80211_ATTR_IFINDEX = 3
+NL80211_ATTR_IFNAME = 4
+NL80211_ATTR_IFTYPE = 5
+NL80211_ATTR_MAC = 6
+NL80211_ATTR_STA_INFO = 21
+NL80211_ATTR_WIPHY_FREQ = 38
+NL80211_ATTR_SSID = 52
+
+NL80211_IFTYPE_STATION = 2
+
+NL80211_STA_INFO_SIGNAL = 7
+NL80211_STA_INFO_TX_BITRATE = 8
+NL80211_STA_INFO_RX_BITRATE = 14
+
+NL80211_RATE_INFO_BITRATE = 1
+NL80211_RATE_INFO_BITRATE32 = 5
+
+REQUEST_TIMEOUT_SEC = 1.0
+"""Seconds to wait for the reply of the kernel to a request"""
+
+_GENLMSGHDR = struct.Struct("=BBH")
+
+
+class Nl80211Client:
+    """Reads the state of the wireless network interfaces from the kernel with nl80211, as the 'iw' command does,
+    without spawning a process. The nl80211 family id is resolved once, and the generic netlink socket is kept open
+    between requests. The socket factory can be replaced to test with recorded netlink replies."""
+
+    _logger: logging.Logger
+    _socket_factory: Callable[[], socket.socket]
+    _socket: socket.socket | None = None
+    _lock: threading.Lock
+    _family_id: int = 0
+    _sequence: int = 0
+    _failed: bool = False
+    """Whether opening failed, i.e. nl80211 is not available on this platform"""
+
+    def __init__(self, socket_factory: Callable[[], socket.socket] | None = None):
+        self._logger = logging.getLogger(__name__)
+        self._socket_factory = socket_factory or _netlink_generic_socket
+        self._lock = threading.Lock()
+
+    def available(self) -> bool:
+        """Open the socket and resolve the nl80211 family, if not already done. Returns False if nl80211 is not
+        available on this platform, i.e. without wireless drivers."""
+
+        with self._lock:
+            return self._open()
+
+    def interfaces(self) -> list[WirelessInterface]:
+        """Returns the wireless network interfaces in station mode, i.e. connecting to an access point, ordered by
+        index. Raises OSError if nl80211 is not available or the request failed."""
+
+        with self._lock:
+            replies: list[dict[int, bytes]] = self._request(NL80211_CMD_GET_INTERFACE, b"", dump=True)
+
+        interfaces: list[WirelessInterface] = [
+            parse_interface(attributes)
+            for attributes in replies
+            if attributes.get(NL80211_ATTR_IFTYPE) == struct.pack("=I", NL80211_IFTYPE_STATION)
+        ]
+
+        return sorted(interfaces, key=lambda interface: interface.index)
+
+    def station(self, index: int) -> WirelessStation | None:
+        """Returns the access point the wireless network interface with the index is connected to, None if not
+        connected. Raises OSError if nl80211 is not available or the request failed."""
+
+        with self._lock:
+            replies: list[dict[int, bytes]] = self._request(
+                NL80211_CMD_GET_STATION, pack_attribute(NL80211_ATTR_IFINDEX, struct.pack("=I", index)), dump=True
+            )
+
+        return next((parse_station(attributes) for attributes in replies if NL80211_ATTR_STA_INFO in attributes), None)
+
+    def close(self):
+        """Close the socket, which is opened again on the next request"""
+
+        with self._lock:
+            self._close_socket()
+
+    def _open(self) -> bool:
+        if self._socket is not None or self._failed:
+            return not self._failed
+
+        try:
+            self._socket = self._socket_factory()
+            self._socket.settimeout(REQUEST_TIMEOUT_SEC)
+            self._family_id = self._resolve_family()
+        except (OSError, AttributeError) as err:
+            # AttributeError is raised on platforms without AF_NETLINK
+            self._logger.warning("nl80211 not available for this Rpi: %s", err)
+            self._failed = True
+            self._close_socket()
+            return False
+
+        self._logger.debug("Resolved nl80211 family id %d", self._family_id)
+        return True
+
+    def _resolve_family(self) -> int:
+        """Returns the id of the nl80211 family, assigned when the wireless subsystem registered it"""
+
+        self._sequence += 1
+        payload: bytes = _GENLMSGHDR.pack(CTRL_CMD_GETFAMILY, 1, 0) + pack_attribute(
+            CTRL_ATTR_FAMILY_NAME, NL80211_FAMILY_NAME.encode() + b"\0"
+        )
+
+        for _, reply in request(self._socket, GENL_ID_CTRL, payload, self._sequence):
+            family_id: bytes | None = parse_attributes(reply[_GENLMSGHDR.size :]).get(CTRL_ATTR_FAMILY_ID)
+            if family_id is not None:
+                return struct.unpack("=H", family_id)[0]
+
+        raise OSError(errno.ENOENT, "nl80211 family not registered")
+
+    def _request(self, command: int, attributes: bytes, dump: bool) -> list[dict[int, bytes]]:
+        """Returns the attributes of the replies to the nl80211 command"""
+
+        if not self._open():
+            raise OSError(errno.EAFNOSUPPORT, "nl80211 not available")
+
+        self._sequence += 1
+        payload: bytes = _GENLMSGHDR.pack(command, 0, 0) + attributes
+
+        try:
+            return [
+                parse_attributes(reply[_GENLMSGHDR.size :])
+                for _, reply in request(self._socket, self._family_id, payload, self._sequence, dump=dump)
+            ]
+        except OSError:
+            # Replies left of the failed request are dropped with the socket, which is opened again on the next request
+            self._close_socket()
+            raise
+
+    def _close_socket(self):
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+
+def _netlink_generic_socket() -> socket.socket:
+    return socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_GENERIC)
+
+
+def parse_interface(attributes: dict[int, bytes]) -> WirelessInterface:
+    """Returns the wireless network interface of the attributes of a NL80211_CMD_GET_INTERFACE reply"""
+
+    freq: bytes | None = attributes.get(NL80211_ATTR_WIPHY_FREQ)
+
+    return WirelessInterface(
+        index=struct.unpack("=I", attributes[NL80211_ATTR_IFINDEX])[0],
+        name=parse_string(attributes.get(NL80211_ATTR_IFNAME, b"")),
+        mac_addr=parse_mac_address(attributes.get(NL80211_ATTR_MAC, b"")),
+        # The SSID is not null terminated
+        ssid=attributes.get(NL80211_ATTR_SSID, b"").decode("utf-8", errors="replace"),
+        freq_mhz=struct.unpack("=I", freq)[0] if freq else 0,
+    )
+
+
+def parse_station(attributes: dict[int, bytes]) -> WirelessStation:
+    """Returns the access point of the attributes of a NL80211_CMD_GET_STATION reply"""
+
+    station_info: dict[int, bytes] = parse_attributes(attributes[NL80211_ATTR_STA_INFO])
+    signal: bytes | None = station_info.get(NL80211_STA_INFO_SIGNAL)
+
+    return WirelessStation(
+        mac_addr=parse_mac_address(attributes.get(NL80211_ATTR_MAC, b"")),
+        signal_strength_dbm=struct.unpack("=b", signal)[0] if signal else 0,
+        tx_bitrate_mbps=_parse_bitrate(station_info.get(NL80211_STA_INFO_TX_BITRATE)),
+        rx_bitrate_mbps=_parse_bitrate(station_info.get(NL80211_STA_INFO_RX_BITRATE)),
+    )
+
+
+def _parse_bitrate(rate_info: bytes | None) -> float:
+    """Returns the bitrate in Mbit/s of the nested rate info attributes, given in units of 100 kbit/s"""
+
+    attributes: dict[int, bytes] = parse_attributes(rate_info or b"")
+
+    # The 16 bit bitrate is not set for rates above 6.5 Gbit/s
+    if bitrate := attributes.get(NL80211_RATE_INFO_BITRATE32):
+        return struct.unpack("=I", bitrate)[0] / 10.0
+    if bitrate := attributes.get(NL80211_RATE_INFO_BITRATE):
+        return struct.unpack("=H", bitrate)[0] / 10.0
+
+    return 0.0
+
+
+nl80211_client = Nl80211Client()
+"""Client shared by all Wi-Fi sensors"""
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""Monitor of the network interfaces and IP addresses using rtnetlink, the routing socket of the linux kernel"""
+
+import errno
+import logging
+import socket
+import struct
+import threading
+from collections.abc import Callable
+
+from sensors.network.netlink import (
+    RECEIVE_BUFFER_SIZE,
+    parse_attributes,
+    parse_mac_address,
+    parse_messages,
+    parse_string,
+    request,
+)
+from sensors.network.types import NetworkAddress, NetworkLink
+
+# doc: https://man7.org/linux/man-pages/man7/rtnetlink.7.html
+RTM_NEWLINK = 16
+RTM_DELLINK = 17
+RTM_GETLINK = 18
+RTM_NEWADDR = 20
+RTM_DELADDR = 21
+RTM_GETADDR = 22
+
+RTMGRP_LINK = 0x1
+RTMGRP_IPV4_IFADDR = 0x10
+RTMGRP_IPV6_IFADDR = 0x100
+
+IFF_UP = 0x1
+IFF_LOOPBACK = 0x8
+
+IFLA_ADDRESS = 1
+IFLA_IFNAME = 3
+
+IFA_ADDRESS = 1
+IFA_LOCAL = 2
+
+SETTLE_TIME_SEC = 0.2
+"""Seconds without further messages after a change before the listeners are notified, so that a burst of messages
+(i.e. a link going up with its addresses) is reported as one change"""
+
+_IFINFOMSG = struct.Struct("=BxHiII")
+_IFADDRMSG = struct.Struct("=BBBBi")
+
+
+class RtnetlinkMonitor:
+    """Keeps the network interfaces and their IP addresses in memory. When started, the links and addresses are dumped
+    once with RTM_GETLINK and RTM_GETADDR, and a background thread applies the changes the kernel reports to the
+    subscribed multicast groups for links and IPv4 and IPv6 addresses. Reading the state does not make any syscall,
+    and listeners are notified as soon as the kernel reports a change. The socket factory can be replaced to test with
+    recorded netlink messages."""
+
+    _logger: logging.Logger
+    _socket_factory: Callable[[], socket.socket]
+    _socket: socket.socket | None = None
+    _thread: threading.Thread | None = None
+    _lock: threading.Lock
+    _links: dict[int, NetworkLink]
+    _addresses: dict[tuple[int, int, str], NetworkAddress]
+    _listeners: list[Callable[[], None]]
+    _sequence: int = 0
+    _failed: bool = False
+    """Whether starting failed, i.e. netlink is not available on this platform"""
+
+    def __init__(self, socket_factory: Callable[[], socket.socket] | None = None):
+        self._logger = logging.getLogger(__name__)
+        self._socket_factory = socket_factory or _netlink_route_socket
+        self._lock = threading.Lock()
+        self._links = {}
+        self._addresses = {}
+        self._listeners = []
+
+    def start(self) -> bool:
+        """Dump the links and addresses and start monitoring changes, if not already started. Returns False if
+        rtnetlink is not available on this platform."""
+
+        with self._lock:
+            if self._thread is not None or self._failed:
+                return not self._failed
+
+            try:
+                self._socket = self._socket_factory()
+                self._socket.bind((0, RTMGRP_LINK | RTMGRP_IPV4_IFADDR | RTMGRP_IPV6_IFADDR))
+                self._dump()
+            except (OSError, AttributeError) as err:
+                # AttributeError is raised on platforms without AF_NETLINK
+                self._logger.warning("rtnetlink not available for this Rpi: %s", err)
+                self._failed = True
+                self._close_socket()
+                return False
+
+            self._thread = threading.Thread(target=self._listen, name="rtnetlink_monitor", daemon=True)
+            self._thread.start()
+            self._logger.debug("Monitoring %d links and %d addresses", len(self._links), len(self._addresses))
+
+            return True
+
+    def close(self):
+        """Stop monitoring changes"""
+
+        with self._lock:
+            self._close_socket()
+
+    def add_listener(self, listener: Callable[[], None]):
+        """Add the listener, called from the monitor thread when links or addresses changed"""
+
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[], None]):
+        """Remove the listener"""
+
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def links(self) -> list[NetworkLink]:
+        """Returns the network interfaces, ordered by index"""
+
+        with self._lock:
+            return [self._links[index] for index in sorted(self._links)]
+
+    def link(self, name: str) -> NetworkLink | None:
+        """Returns the network interface with the name, i.e. 'eth0', or None if it does not exist"""
+
+        return next((link for link in self.links() if link.name == name), None)
+
+    def addresses(self) -> list[NetworkAddress]:
+        """Returns the IP addresses of all network interfaces, ordered by interface index and IP version"""
+
+        with self._lock:
+            return sorted(self._addresses.values(), key=lambda address: (address.index, address.version))
+
+    def _dump(self):
+        """Replace the links and addresses with a dump of the kernel. The socket is subscribed before, so that no
+        change is missed between the dump and listening."""
+
+        self._links.clear()
+        self._addresses.clear()
+
+        for msg_type, family_header in ((RTM_GETLINK, _IFINFOMSG.pack(0, 0, 0, 0, 0)), (RTM_GETADDR, bytes(8))):
+            self._sequence += 1
+
+            # Notifications received while dumping are applied in the order received, between the dumped messages
+            for reply_type, payload in request(
+                self._socket, msg_type, family_header, self._sequence, dump=True, on_other=self._apply
+            ):
+                self._apply(reply_type, payload)
+
+    def _listen(self):
+        sock: socket.socket = self._socket
+        changed: bool = False
+
+        while True:
+            try:
+                # Wait until the changes settled, before notifying the listeners
+                if sock.gettimeout() != (SETTLE_TIME_SEC if changed else None):
+                    sock.settimeout(SETTLE_TIME_SEC if changed else None)
+
+                data: bytes = sock.recv(RECEIVE_BUFFER_SIZE)
+            except TimeoutError:
+                changed = False
+                self._notify()
+                continue
+            except OSError as err:
+                if sock.fileno() == -1:
+                    return
+
+                if err.errno != errno.ENOBUFS:
+                    self._logger.warning("Stopped monitoring network changes: %s", err)
+                    return
+
+                # Messages were dropped as the socket buffer overflowed, the state is dumped again
+                self._logger.warning("Missed network changes, dumping the links and addresses again")
+                try:
+                    sock.settimeout(None)
+                    with self._lock:
+                        self._dump()
+                except OSError as dump_err:
+                    self._logger.warning("Stopped monitoring network changes: %s", dump_err)
+                    return
+
+                changed = True
+                continue
+
+            if not data:
+                return
+
+            with self._lock:
+                for msg_type, _, payload in parse_messages(data):
+                    changed = self._apply(msg_type, payload) or changed
+
+    def _apply(self, msg_type: int, payload: bytes) -> bool:
+        """Apply the link or address message to the state. Returns True if the state changed."""
+
+        if msg_type in (RTM_NEWLINK, RTM_DELLINK):
+            link: NetworkLink = parse_link(payload)
+            previous: NetworkLink | None = self._links.pop(link.index, None)
+
+            if msg_type == RTM_NEWLINK:
+                self._links[link.index] = link
+
+            return previous != (link if msg_type == RTM_NEWLINK else None)
+
+        if msg_type in (RTM_NEWADDR, RTM_DELADDR):
+            address: NetworkAddress | None = parse_address(payload)
+            if address is None:
+                return False
+
+            key: tuple[int, int, str] = (address.index, address.version, address.address)
+            previous_address: NetworkAddress | None = self._addresses.pop(key, None)
+
+            if msg_type == RTM_NEWADDR:
+                self._addresses[key] = address
+
+            return previous_address != (address if msg_type == RTM_NEWADDR else None)
+
+        return False
+
+    def _notify(self):
+        for listener in list(self._listeners):
+            # noinspection PyBroadException
+            # pylint: disable=W0718
+            try:
+                listener()
+            except Exception:
+                self._logger.error("Listener of network changes failed", exc_info=True)
+
+    def _close_socket(self):
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+
+def _netlink_route_socket() -> socket.socket:
+    return socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, socket.NETLINK_ROUTE)
+
+
+def parse_link(payload: bytes) -> NetworkLink:
+    """Returns the network interface of the RTM_NEWLINK or RTM_DELLINK message payload"""
+
+    _, _, index, flags, _ = _IFINFOMSG.unpack_from(payload)
+    attributes: dict[int, bytes] = parse_attributes(payload[_IFINFOMSG.size :])
+
+    return NetworkLink(
+        index=index,
+        name=parse_string(attributes.get(IFLA_IFNAME, b"")),
+        mac_addr=parse_mac_address(attributes.get(IFLA_ADDRESS, b"")),
+        up=bool(flags & IFF_UP),
+        loopback=bool(flags & IFF_LOOPBACK),
+    )
+
+
+def parse_address(payload: bytes) -> NetworkAddress | None:
+    """Returns the IP address of the RTM_NEWADDR or RTM_DELADDR message payload, None if not an IPv4 or IPv6 address"""
+
+    family, prefix_len, _, scope, index = _IFADDRMSG.unpack_from(payload)
+    attributes: dict[int, bytes] = parse_attributes(payload[_IFADDRMSG.size :])
+
+    # On point-to-point interfaces IFA_ADDRESS is the address of the peer, and IFA_LOCAL the local address
+    value: bytes | None = attributes.get(IFA_LOCAL, attributes.get(IFA_ADDRESS))
+    if family not in (socket.AF_INET, socket.AF_INET6) or value is None:
+        return None
+
+    return NetworkAddress(
+        index=index,
+        version=4 if family == socket.AF_INET else 6,
+        address=socket.inet_ntop(family, value),
+        prefix_len=prefix_len,
+        scope=scope,
+    )
+
+
+network_monitor = RtnetlinkMonitor()
+"""Monitor shared by all network sensors"""
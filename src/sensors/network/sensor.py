@@ -1,19 +1,57 @@
 #!/usr/bin/env python3
 """Service for reading network data for Rpi"""
 
-import re
 import socket
 import struct
 import subprocess
-
-from sensors.network.types import WiFiConnectionInfo
+from collections.abc import Iterable
+from dataclasses import astuple
+from typing import Any
+
+from sensors.constants import UPDATE_INTERVAL_SLOW, UPDATE_INTERVAL_STATIC
+from sensors.network.nl80211 import Nl80211Client, nl80211_client
+from sensors.network.rtnetlink import RtnetlinkMonitor, network_monitor
+from sensors.network.types import (
+    NetworkAddress,
+    NetworkCounters,
+    NetworkInterface,
+    NetworkLink,
+    NetworkThroughput,
+    WiFiConnectionInfo,
+    WirelessInterface,
+    WirelessStation,
+)
+from sensors.procfs import ProcfsSnapshot, procfs_snapshot
+from sensors.pseudo_files import pseudo_files
 from sensors.types import RpiSensor, SensorNotAvailableException
+from sensors.utils import counter_delta, run_command_async
+
+WIFI_INTERFACE = "wlan0"
+IW_LINK_ARGS = ["iw", WIFI_INTERFACE, "link"]
+PROC_NET_TCP_FILE = "/proc/net/tcp"
+HOSTNAME_FILE = "/proc/sys/kernel/hostname"
+MAC_ADDRESS_FILE = "/sys/class/net/{interface}/address"
+
+TCP_STATUS_OFFSET = 28
+"""Offset of the connection state after the id of a /proc/net/tcp line, following the local and remote address"""
+
+TCP_ESTABLISHED = "01"
+"""Connection state of an established connection in /proc/net/tcp"""
+
+RT_SCOPE_UNIVERSE = 0
+"""Scope of global IP addresses, reachable from other hosts"""
 
 
 class IpAddressSensor(RpiSensor):
     """Sensor for IP address"""
 
     _state: str | None = None
+    _monitor: RtnetlinkMonitor
+    network_events = True
+
+    def __init__(self, enabled: bool, monitor: RtnetlinkMonitor = network_monitor):
+        self._monitor = monitor
+        super().__init__(enabled=enabled)
 
     @property
     def name(self) -> str:
@@ -29,16 +67,19 @@ class IpAddressSensor(RpiSensor):
         self.logger.debug("Refreshing sensor state successfully")
 
     def _read_ip(self) -> str:
-        """Read Rpi IP"""
+        """Read Rpi IP, the first global IPv4 address of the network interfaces reported by rtnetlink, or the local
+        address of the first established TCP connection if rtnetlink is not available"""
 
-        ip_pipe_file_name = "/proc/net/tcp"
+        if self._monitor.start():
+            return _primary_ipv4_address(self._monitor)
 
+        # The file is streamed line by line and closed at the first established connection, as the kernel generates
+        # the lines while read and the file can have tens of thousands of lines
         try:
-            with open(ip_pipe_file_name, "r", encoding="utf-8") as f:
-                tcp_content = f.read().strip("\x00")
-                ip = _parse_ip_from_tcp_content(tcp_content)
+            with open(PROC_NET_TCP_FILE, "r", encoding="ascii") as f:
+                ip = _parse_ip_from_tcp_lines(f)
 
-                return ip
+            return ip
         except Exception as err:
             self.logger.warning("Ip address file not available for this Rpi")
             raise SensorNotAvailableException("Ip address file not available for this Rpi", err) from err
@@ -48,6 +89,7 @@ class HostnameSensor(RpiSensor):
     """Sensor for hostname"""
 
     _state: str | None = None
+    default_update_interval = UPDATE_INTERVAL_SLOW
 
     @property
     def name(self) -> str:
@@ -63,15 +105,12 @@ class HostnameSensor(RpiSensor):
         self.logger.debug("Refreshing sensor state successfully")
 
     def _read_hostname(self) -> str:
-        """Read Rpi hostname"""
-
-        host_name_file_name = "/etc/hostname"
+        """Read Rpi hostname, as set in the kernel from /etc/hostname"""
 
         try:
-            with open(host_name_file_name, "r", encoding="utf-8") as f:
-                hostname = f.readline().strip()
+            hostname = pseudo_files.read(HOSTNAME_FILE).strip()
 
-                return hostname
+            return hostname
         except Exception as err:
             self.logger.warning("Hostname file not available for this Rpi")
             raise SensorNotAvailableException("hostname file not available for this Rpi", err) from err
@@ -81,6 +120,13 @@ class EthernetMacAddressSensor(RpiSensor):
     """Sensor for Ethernet Mac address"""
 
     _state: str | None = None
+    _monitor: RtnetlinkMonitor
+    default_update_interval = UPDATE_INTERVAL_STATIC
+    network_events = True
+
+    def __init__(self, enabled: bool, monitor: RtnetlinkMonitor = network_monitor):
+        self._monitor = monitor
+        super().__init__(enabled=enabled)
 
     @property
     def name(self) -> str:
@@ -99,7 +145,7 @@ class EthernetMacAddressSensor(RpiSensor):
         """Read the RPI mac address of the ethernet (eth0) network interface"""
 
         try:
-            mac_address = _read_mac_address_for_interface("eth0")
+            mac_address = _read_mac_address_for_interface("eth0", monitor=self._monitor)
 
             return mac_address
         except SensorNotAvailableException as err:
@@ -111,6 +157,13 @@ class WifiMacAddressSensor(RpiSensor):
     """Sensor for Wi-Fi Mac address"""
 
     _state: str | None = None
+    _monitor: RtnetlinkMonitor
+    default_update_interval = UPDATE_INTERVAL_STATIC
+    network_events = True
+
+    def __init__(self, enabled: bool, monitor: RtnetlinkMonitor = network_monitor):
+        self._monitor = monitor
+        super().__init__(enabled=enabled)
 
     @property
     def name(self) -> str:
@@ -128,7 +181,7 @@ class WifiMacAddressSensor(RpiSensor):
     def _read_wifi_mac_address(self) -> str:
         """Read the RPI mac address of the Wi-Fi (wlan0) network interface"""
         try:
-            mac_address = _read_wifi_mac_address()
+            mac_address = _read_wifi_mac_address(monitor=self._monitor)
 
             return mac_address
         except SensorNotAvailableException as err:
@@ -140,6 +193,15 @@ class WifiConnectionSensor(RpiSensor):
     """Sensor for Wi-Fi connection"""
 
     _state: WiFiConnectionInfo | None = None
+    _monitor: RtnetlinkMonitor
+    _nl80211: Nl80211Client
+
+    def __init__(
+        self, enabled: bool, monitor: RtnetlinkMonitor = network_monitor, nl80211: Nl80211Client = nl80211_client
+    ):
+        self._monitor = monitor
+        self._nl80211 = nl80211
+        super().__init__(enabled=enabled)
 
     @property
     def name(self) -> str:
@@ -154,18 +216,61 @@ class WifiConnectionSensor(RpiSensor):
         self._state = self._read_wifi_connection()
         self.logger.debug("Refreshing sensor state successfully")
 
+    async def refresh_state_async(self) -> None:
+        self.logger.debug("Refreshing sensor state")
+        self._state = await self._read_wifi_connection_async()
+        self.logger.debug("Refreshing sensor state successfully")
+
     def _read_wifi_connection(self) -> WiFiConnectionInfo:
-        """Read Wi-Fi connection, such as ssid and signal strength"""
+        """Read Wi-Fi connection, such as ssid and signal strength, with nl80211 or the 'iw' command if nl80211 is not
+        available"""
+
+        if self._nl80211.available():
+            return self._read_wifi_connection_nl80211()
 
         # doc: https://wireless.wiki.kernel.org/en/users/Documentation/iw
-        args = ["iw", "wlan0", "link"]
+        try:
+            result = subprocess.run(IW_LINK_ARGS, capture_output=True, text=True, check=False)
+        except FileNotFoundError as err:
+            self.logger.warning("Command 'iw' not found for this Rpi")
+            raise SensorNotAvailableException("Wi-Fi connection info not available for this Rpi") from err
+
+        return self._parse_wifi_connection(result)
+
+    async def _read_wifi_connection_async(self) -> WiFiConnectionInfo:
+        """Read Wi-Fi connection, such as ssid and signal strength, with nl80211 or the 'iw' command as asyncio
+        subprocess if nl80211 is not available"""
+
+        # The kernel answers the nl80211 requests right away, they do not block the event loop
+        if self._nl80211.available():
+            return self._read_wifi_connection_nl80211()
 
         try:
-            result = subprocess.run(args, capture_output=True, text=True, check=False)
+            result = await run_command_async(IW_LINK_ARGS)
         except FileNotFoundError as err:
             self.logger.warning("Command 'iw' not found for this Rpi")
             raise SensorNotAvailableException("Wi-Fi connection info not available for this Rpi") from err
 
+        return self._parse_wifi_connection(result)
+
+    def _read_wifi_connection_nl80211(self) -> WiFiConnectionInfo:
+        """Read Wi-Fi connection of the Wi-Fi (wlan0) network interface with nl80211"""
+
+        try:
+            interface: WirelessInterface | None = next(
+                (interface for interface in self._nl80211.interfaces() if interface.name == WIFI_INTERFACE), None
+            )
+            if interface is None:
+                raise SensorNotAvailableException(f"Wi-Fi interface '{WIFI_INTERFACE}' not available for this Rpi")
+
+            return _read_wireless_connection(self._nl80211, interface)
+        except OSError as err:
+            self.logger.warning("Failed to read Wi-Fi connection with nl80211: %s", err)
+            raise SensorNotAvailableException("Failed to read Wi-Fi connection", err) from err
+
+    def _parse_wifi_connection(self, result: subprocess.CompletedProcess) -> WiFiConnectionInfo:
+        """Parse Wi-Fi connection from the completed 'iw' process"""
+
         if result.returncode != 0:
             self.logger.warning("Process 'iw' returned code %s: %s", str(result.returncode), str(result.stderr))
             raise SensorNotAvailableException("Failed to read Wi-Fi connection", result.stderr)
@@ -174,10 +279,12 @@ class WifiConnectionSensor(RpiSensor):
         ssid: str = ""
         signal: int = 0
         freq: int = 0
+        tx_bitrate: float = 0.0
+        rx_bitrate: float = 0.0
         status: str = "on"
 
         try:
-            mac_address: str = _read_wifi_mac_address()
+            mac_address: str = _read_wifi_mac_address(monitor=self._monitor)
         except SensorNotAvailableException as err:
             self.logger.warning("Failed reading Wi-fi mac address")
             raise err
@@ -193,55 +300,313 @@ class WifiConnectionSensor(RpiSensor):
             elif item_stripped.startswith("freq:"):
                 item_split = item_stripped.split("freq: ")
                 freq = int(item_split[1].strip())
+            elif item_stripped.startswith("tx bitrate:"):
+                tx_bitrate = float(item_stripped.split()[2])
+            elif item_stripped.startswith("rx bitrate:"):
+                rx_bitrate = float(item_stripped.split()[2])
 
         if result == "Not connected." or ssid == "":
             self.logger.debug("Wifi not connected, result='%s' ssid='%s'", str(result), str(ssid))
             status = "off"
 
         return WiFiConnectionInfo(
-            status=status, ssid=ssid, signal_strength_dbm=signal, freq_mhz=freq, mac_addr=mac_address
+            status=status,
+            ssid=ssid,
+            signal_strength_dbm=signal,
+            freq_mhz=freq,
+            mac_addr=mac_address,
+            tx_bitrate_mbps=tx_bitrate,
+            rx_bitrate_mbps=rx_bitrate,
+        )
+
+
+class NetworkInterfacesSensor(RpiSensor):
+    """Sensor for the network interfaces with their IPv4 and IPv6 addresses"""
+
+    _state: dict[str, NetworkInterface] | None = None
+    _monitor: RtnetlinkMonitor
+    network_events = True
+
+    def __init__(self, enabled: bool, monitor: RtnetlinkMonitor = network_monitor):
+        self._monitor = monitor
+        super().__init__(enabled=enabled)
+
+    @property
+    def name(self) -> str:
+        return "network_interfaces"
+
+    @property
+    def state(self) -> dict[str, NetworkInterface] | None:
+        return self._state
+
+    @property
+    def state_as_dict(self) -> dict[str, dict[str, Any]] | None:
+        return self._nested_state_as_dict
+
+    def refresh_state(self) -> None:
+        self.logger.debug("Refreshing sensor state")
+        self._state = self._read_network_interfaces()
+        self.logger.debug("Refreshing sensor state successfully")
+
+    def _read_network_interfaces(self) -> dict[str, NetworkInterface]:
+        """Read the network interfaces, except loopback, with their addresses as reported by rtnetlink"""
+
+        if not self._monitor.start():
+            self.logger.warning("rtnetlink not available for this Rpi")
+            raise SensorNotAvailableException("rtnetlink not available for this Rpi")
+
+        addresses: list[NetworkAddress] = self._monitor.addresses()
+        interfaces: dict[str, NetworkInterface] = {}
+
+        for link in self._monitor.links():
+            if link.loopback:
+                continue
+
+            link_addresses: list[NetworkAddress] = [address for address in addresses if address.index == link.index]
+            interfaces[link.name] = NetworkInterface(
+                mac_addr=link.mac_addr,
+                up=link.up,
+                ipv4_addrs=[f"{a.address}/{a.prefix_len}" for a in link_addresses if a.version == 4],
+                ipv6_addrs=[f"{a.address}/{a.prefix_len}" for a in link_addresses if a.version == 6],
+            )
+
+        return interfaces
+
+
+class WifiInterfacesSensor(RpiSensor):
+    """Sensor for the Wi-Fi connections of all wireless network interfaces"""
+
+    _state: dict[str, WiFiConnectionInfo] | None = None
+    _nl80211: Nl80211Client
+
+    def __init__(self, enabled: bool, nl80211: Nl80211Client = nl80211_client):
+        self._nl80211 = nl80211
+        super().__init__(enabled=enabled)
+
+    @property
+    def name(self) -> str:
+        return "wifi_interfaces"
+
+    @property
+    def state(self) -> dict[str, WiFiConnectionInfo] | None:
+        return self._state
+
+    @property
+    def state_as_dict(self) -> dict[str, dict[str, Any]] | None:
+        return self._nested_state_as_dict
+
+    def refresh_state(self) -> None:
+        self.logger.debug("Refreshing sensor state")
+        self._state = self._read_wifi_interfaces()
+        self.logger.debug("Refreshing sensor state successfully")
+
+    def _read_wifi_interfaces(self) -> dict[str, WiFiConnectionInfo]:
+        """Read the Wi-Fi connection of the wireless network interfaces in station mode with nl80211"""
+
+        if not self._nl80211.available():
+            self.logger.warning("nl80211 not available for this Rpi")
+            raise SensorNotAvailableException("nl80211 not available for this Rpi")
+
+        try:
+            return {
+                interface.name: _read_wireless_connection(self._nl80211, interface)
+                for interface in self._nl80211.interfaces()
+            }
+        except OSError as err:
+            self.logger.warning("Failed to read Wi-Fi interfaces with nl80211: %s", err)
+            raise SensorNotAvailableException("Failed to read Wi-Fi interfaces", err) from err
+
+
+class NetworkThroughputSensor(RpiSensor):
+    """Sensor for the traffic of the network interfaces. The rates are computed from the difference of the counters in
+    /proc/net/dev since the previous refresh, read for all interfaces in one pass. The first refresh covers the time
+    since boot."""
+
+    _state: dict[str, NetworkThroughput] | None = None
+    _procfs: ProcfsSnapshot
+    _previous_counters: dict[str, NetworkCounters]
+    """Traffic counters per interface read in the previous refresh"""
+    _previous_uptime: float = 0.0
+    """Seconds since boot of the previous refresh"""
+
+    def __init__(self, enabled: bool, procfs: ProcfsSnapshot = procfs_snapshot):
+        self._procfs = procfs
+        self._previous_counters = {}
+        super().__init__(enabled=enabled)
+
+    @property
+    def name(self) -> str:
+        return "network_throughput"
+
+    @property
+    def state(self) -> dict[str, NetworkThroughput] | None:
+        return self._state
+
+    @property
+    def state_as_dict(self) -> dict[str, dict[str, Any]] | None:
+        return self._nested_state_as_dict
+
+    def refresh_state(self) -> None:
+        self.logger.debug("Refreshing sensor state")
+        self._state = self._read_network_throughput()
+        self.logger.debug("Refreshing sensor state successfully")
+
+    def _read_network_throughput(self) -> dict[str, NetworkThroughput]:
+        """Read the traffic per network interface, except loopback, since the previous refresh"""
+
+        # doc: https://www.kernel.org/doc/html/latest/networking/statistics.html#proc-net-dev
+        try:
+            current_counters: dict[str, NetworkCounters] = parse_network_counters(self._procfs.read("net/dev"))
+            uptime: float = self._procfs.uptime()
+        except (OSError, ValueError, IndexError) as err:
+            self.logger.warning("/proc/net/dev not available for this Rpi")
+            raise SensorNotAvailableException("/proc/net/dev not available for this Rpi") from err
+
+        elapsed: float = uptime - self._previous_uptime
+        previous_counters: dict[str, NetworkCounters] = self._previous_counters
+        self._previous_counters = current_counters
+        self._previous_uptime = uptime
+
+        # Interfaces created since the previous refresh are counted from 0
+        return {
+            name: self._throughput(_counters_delta(counters, previous_counters.get(name)), elapsed)
+            for name, counters in current_counters.items()
+            if name != "lo"
+        }
+
+    @staticmethod
+    def _throughput(delta: NetworkCounters, elapsed: float) -> NetworkThroughput:
+        def per_sec(value: int) -> float:
+            return round(value / elapsed, 1) if elapsed > 0 else 0.0
+
+        return NetworkThroughput(
+            rx_bytes_per_sec=per_sec(delta.rx_bytes),
+            tx_bytes_per_sec=per_sec(delta.tx_bytes),
+            rx_packets_per_sec=per_sec(delta.rx_packets),
+            tx_packets_per_sec=per_sec(delta.tx_packets),
+            rx_errors=delta.rx_errors,
+            tx_errors=delta.tx_errors,
+            rx_dropped=delta.rx_dropped,
+            tx_dropped=delta.tx_dropped,
         )
 
 
-def _read_wifi_mac_address() -> str:
+def parse_network_counters(proc_net_dev: str) -> dict[str, NetworkCounters]:
+    """Parse the traffic counters per network interface from the content of /proc/net/dev.
+    Example line: '  eth0: 1502352 12005 0 3 0 0 0 120 987654 8120 0 0 0 0 0 0'"""
+
+    counters: dict[str, NetworkCounters] = {}
+
+    for line in proc_net_dev.splitlines():
+        # The two header lines have no ':' separator, older kernels print no space between name and first counter
+        name, separator, values = line.partition(":")
+        if not separator:
+            continue
+
+        fields: list[int] = [int(value) for value in values.split()]
+        counters[name.strip()] = NetworkCounters(
+            rx_bytes=fields[0],
+            rx_packets=fields[1],
+            rx_errors=fields[2],
+            rx_dropped=fields[3],
+            tx_bytes=fields[8],
+            tx_packets=fields[9],
+            tx_errors=fields[10],
+            tx_dropped=fields[11],
+        )
+
+    return counters
+
+
+def _counters_delta(current: NetworkCounters, previous: NetworkCounters | None) -> NetworkCounters:
+    """Returns the traffic between the previous and current counters"""
+
+    if previous is None:
+        return current
+
+    return NetworkCounters(
+        *[
+            counter_delta(current_value, previous_value)
+            for current_value, previous_value in zip(astuple(current), astuple(previous))
+        ]
+    )
+
+
+def _read_wireless_connection(nl80211: Nl80211Client, interface: WirelessInterface) -> WiFiConnectionInfo:
+    """Read the Wi-Fi connection of the wireless network interface, with the access point if connected"""
+
+    station: WirelessStation | None = nl80211.station(interface.index) if interface.ssid else None
+
+    if station is None:
+        return WiFiConnectionInfo(status="off", ssid="", signal_strength_dbm=0, freq_mhz=0, mac_addr=interface.mac_addr)
+
+    return WiFiConnectionInfo(
+        status="on",
+        ssid=interface.ssid,
+        signal_strength_dbm=station.signal_strength_dbm,
+        freq_mhz=interface.freq_mhz,
+        mac_addr=interface.mac_addr,
+        tx_bitrate_mbps=station.tx_bitrate_mbps,
+        rx_bitrate_mbps=station.rx_bitrate_mbps,
+    )
+
+
+def _read_wifi_mac_address(monitor: RtnetlinkMonitor = network_monitor) -> str:
     """Read the RPI mac address of the Wi-Fi (wlan0) network interface"""
 
-    return _read_mac_address_for_interface("wlan0")
+    return _read_mac_address_for_interface(WIFI_INTERFACE, monitor=monitor)
+
 
+def _read_mac_address_for_interface(interface: str, monitor: RtnetlinkMonitor = network_monitor) -> str:
+    """Read the RPI mac address for specific network interface, as reported by rtnetlink or from sysfs if rtnetlink is
+    not available"""
 
-def _read_mac_address_for_interface(interface: str) -> str:
-    """Read the RPI mac address for specific network interface"""
+    if monitor.start():
+        link: NetworkLink | None = monitor.link(interface)
+        if link is None:
+            raise SensorNotAvailableException(f"Failed to read mac address for interface '{interface}'")
 
-    mac_address_file_name = f"/sys/class/net/{interface}/address"
+        return link.mac_addr
 
     try:
-        with open(mac_address_file_name, "r", encoding="utf-8") as f:
-            return f.readline().strip()
+        return pseudo_files.read(MAC_ADDRESS_FILE.format(interface=interface)).strip()
     except Exception as err:
         raise SensorNotAvailableException(f"Failed to read mac address for interface '{interface}'", err) from err
 
 
-def _parse_ip_from_tcp_content(content: str) -> str:
-    ip: str = ""
+def _parse_ip_from_tcp_lines(lines: Iterable[str]) -> str:
+    """Returns the local IPv4 address of the first established connection, without reading the remaining lines"""
 
-    for line in content.split("\n"):
+    for line in lines:
         #
         # Example:
-        # 3: 8D01A8C0:0016 B801A8C0:E3A7 01 00000000:00000000 02:00096E3C 00000000
-        # |   |                           |--> status: connection state
-        # |   |
-        # |   |
-        # |   |
-        # |   |---------------------------> addr: local IPv4 address
-        # |----------------------------------> id
+        #    3: 8D01A8C0:0016 B801A8C0:E3A7 01 00000000:00000000 02:00096E3C 00000000
+        #    |  |             |             |--> status: connection state
+        #    |  |             |----------------> rem_address: remote IPv4 address and port
+        #    |  |------------------------------> local_address: local IPv4 address and port
+        #    |---------------------------------> sl: id, wider than 4 characters from 10000 connections
         #
-        mo = re.match("^.{2}(?P<id>.{2}).{2}(?P<addr>.{8})..{4} .{8}..{4} (?P<status>.{2}).*|", line, re.MULTILINE)
-        if mo and mo.group("id") != "sl":
-            status = int(mo.group("status"), 16)  # convert from hex to decimal
-            if status == 1:  # connection established
-                ip = _little_endian_hex_to_ip(mo.group("addr"))
-                break
-    return ip
+        # The fields have a fixed width after the id, the header line has no ': ' separator
+        start: int = line.find(": ") + 2
+        if start == 1:
+            continue
+
+        if line[start + TCP_STATUS_OFFSET : start + TCP_STATUS_OFFSET + 2] == TCP_ESTABLISHED:
+            return _little_endian_hex_to_ip(line[start : start + 8])
+
+    return ""
+
+
+def _primary_ipv4_address(monitor: RtnetlinkMonitor) -> str:
+    """Returns the first global IPv4 address of the network interfaces that are up, ordered by interface index"""
+
+    up_links: set[int] = {link.index for link in monitor.links() if link.up and not link.loopback}
+
+    for address in monitor.addresses():
+        if address.version == 4 and address.scope == RT_SCOPE_UNIVERSE and address.index in up_links:
+            return address.address
+
+    return ""
 
 
 def _little_endian_hex_to_ip(little_endian_hex: str) -> str:
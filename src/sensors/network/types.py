@@ -21,7 +21,13 @@ class WiFiConnectionInfo:
     """The frequency of connected Wi-Fi network, in megahertz (MHz). Example '5520'"""
 
     mac_addr: str
-    """The mac address of the Wi-Fi (wlan0) network interface"""
+    """The mac address of the Wi-Fi network interface, i.e. wlan0"""
+
+    tx_bitrate_mbps: float = 0.0
+    """The bitrate of the last frame sent to the access point, in megabits per second (Mbit/s). Example '433.3'"""
+
+    rx_bitrate_mbps: float = 0.0
+    """The bitrate of the last frame received from the access point, in megabits per second (Mbit/s). Example '433.3'"""
 
     def __post_init__(self):
         self.signal_strength_quality = self.__signal_strength_quality()
@@ -59,3 +65,140 @@ class WiFiConnectionInfo:
             return "Not good"
 
         return "Unusable"
+
+
+@dataclass
+class NetworkLink:
+    """Class representing a network interface reported by the kernel"""
+
+    index: int
+    """The index of the network interface. Example '2'"""
+
+    name: str
+    """The name of the network interface. Example 'eth0'"""
+
+    mac_addr: str
+    """The mac address of the network interface, empty if none. Example 'a8:3a:dd:b1:cc:45'"""
+
+    up: bool
+    """Whether the network interface is administratively up"""
+
+    loopback: bool
+    """Whether the network interface is a loopback interface"""
+
+
+@dataclass
+class NetworkAddress:
+    """Class representing an IP address of a network interface reported by the kernel"""
+
+    index: int
+    """The index of the network interface. Example '2'"""
+
+    version: int
+    """The IP version, 4 or 6"""
+
+    address: str
+    """The IP address. Example '192.168.1.141'"""
+
+    prefix_len: int
+    """The prefix length of the network. Example '24'"""
+
+    scope: int
+    """The scope of the address, 0 for global addresses, 253 for link local and 254 for host addresses"""
+
+
+@dataclass
+class NetworkInterface:
+    """Class representing the state of a network interface with its IP addresses"""
+
+    mac_addr: str
+    """The mac address of the network interface, empty if none. Example 'a8:3a:dd:b1:cc:45'"""
+
+    up: bool
+    """Whether the network interface is administratively up"""
+
+    ipv4_addrs: list[str]
+    """The IPv4 addresses with prefix length. Example '['192.168.1.141/24']'"""
+
+    ipv6_addrs: list[str]
+    """The IPv6 addresses with prefix length. Example '['fe80::aa3a:ddff:feb1:cc45/64']'"""
+
+
+@dataclass
+class WirelessInterface:
+    """Class representing a wireless network interface reported by nl80211"""
+
+    index: int
+    """The index of the network interface. Example '3'"""
+
+    name: str
+    """The name of the network interface. Example 'wlan0'"""
+
+    mac_addr: str
+    """The mac address of the network interface. Example 'a9:3a:dd:b1:cc:46'"""
+
+    ssid: str
+    """The SSID of the connected Wi-Fi network, empty if not connected. Example 'my-network'"""
+
+    freq_mhz: int
+    """The frequency of the operating channel, in megahertz (MHz), 0 if none. Example '5520'"""
+
+
+@dataclass
+class WirelessStation:
+    """Class representing the access point a wireless network interface is connected to, reported by nl80211"""
+
+    mac_addr: str
+    """The mac address (BSSID) of the access point. Example '04:42:1a:cf:15:c8'"""
+
+    signal_strength_dbm: int
+    """The signal strength of the last received frame, in decibel-milliwatts (dBm). Example '-43'"""
+
+    tx_bitrate_mbps: float
+    """The bitrate of the last frame sent, in megabits per second (Mbit/s). Example '433.3'"""
+
+    rx_bitrate_mbps: float
+    """The bitrate of the last frame received, in megabits per second (Mbit/s). Example '433.3'"""
+
+
+@dataclass
+class NetworkCounters:
+    """Class representing the cumulative traffic counters of a network interface in /proc/net/dev"""
+
+    rx_bytes: int
+    rx_packets: int
+    rx_errors: int
+    rx_dropped: int
+    tx_bytes: int
+    tx_packets: int
+    tx_errors: int
+    tx_dropped: int
+
+
+@dataclass
+class NetworkThroughput:
+    """Class representing the traffic of a network interface since the previous refresh"""
+
+    rx_bytes_per_sec: float
+    """Bytes received per second. Example: '125000.0'"""
+
+    tx_bytes_per_sec: float
+    """Bytes sent per second. Example: '4250.5'"""
+
+    rx_packets_per_sec: float
+    """Packets received per second. Example: '85.2'"""
+
+    tx_packets_per_sec: float
+    """Packets sent per second. Example: '41.0'"""
+
+    rx_errors: int
+    """Receive errors since the previous refresh. Example: '0'"""
+
+    tx_errors: int
+    """Transmit errors since the previous refresh. Example: '0'"""
+
+    rx_dropped: int
+    """Received packets dropped since the previous refresh. Example: '0'"""
+
+    tx_dropped: int
+    """Packets to send dropped since the previous refresh. Example: '0'"""
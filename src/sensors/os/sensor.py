@@ -1,12 +1,20 @@
 #!/usr/bin/env python3
 """Service for reading the Rpi OS sensor"""
 
+import logging
+import os
 import subprocess
+import threading
 
-import psutil
-
+from sensors.constants import UPDATE_INTERVAL_SLOW, UPDATE_INTERVAL_STATIC
+from sensors.os.types import AvailableUpdates
+from sensors.procfs import ProcfsSnapshot, procfs_snapshot
 from sensors.types import RpiSensor, SensorNotAvailableException
-from sensors.utils import epoch_to_iso_datetime
+from sensors.utils import epoch_to_iso_datetime, run_command_async
+
+UNAME_ARGS = ["uname", "-rvm"]
+APT_LISTS_DIR = "/var/lib/apt/lists"
+DPKG_STATUS_FILE = "/var/lib/dpkg/status"
 
 # Apt is not available on Mac
 APT_AVAILABLE = True
@@ -21,6 +29,7 @@ class OsKernelSensor(RpiSensor):
     """Sensor for OS kernel"""
 
     _state: str | None = None
+    default_update_interval = UPDATE_INTERVAL_SLOW
 
     @property
     def name(self) -> str:
@@ -35,18 +44,37 @@ class OsKernelSensor(RpiSensor):
         self._state = self._read_rpi_os_kernel()
         self.logger.debug("Refreshing sensor state successfully")
 
+    async def refresh_state_async(self) -> None:
+        self.logger.debug("Refreshing sensor state")
+        self._state = await self._read_rpi_os_kernel_async()
+        self.logger.debug("Refreshing sensor state successfully")
+
     def _read_rpi_os_kernel(self) -> str:
         """Read OS kernel version"""
 
         # doc: https://www.raspberrypi.com/documentation/computers/linux_kernel.html#kernel
-        args = ["uname", "-rvm"]
+        try:
+            result = subprocess.run(UNAME_ARGS, capture_output=True, text=True, check=False)
+        except FileNotFoundError as err:
+            self.logger.warning("Command 'uname' not available for this Rpi")
+            raise SensorNotAvailableException("os kernel info not available for this Rpi") from err
+
+        return self._parse_rpi_os_kernel(result)
+
+    async def _read_rpi_os_kernel_async(self) -> str:
+        """Read OS kernel version as asyncio subprocess"""
 
         try:
-            result = subprocess.run(args, capture_output=True, text=True, check=False)
+            result = await run_command_async(UNAME_ARGS)
         except FileNotFoundError as err:
             self.logger.warning("Command 'uname' not available for this Rpi")
             raise SensorNotAvailableException("os kernel info not available for this Rpi") from err
 
+        return self._parse_rpi_os_kernel(result)
+
+    def _parse_rpi_os_kernel(self, result: subprocess.CompletedProcess) -> str:
+        """Parse OS kernel version from the completed 'uname' process"""
+
         if result.returncode != 0:
             self.logger.warning("Process 'uname' returned code %s: %s", str(result.returncode), str(result.stderr))
             raise SensorNotAvailableException("Failed to read OS kernel version", result.stderr)
@@ -60,6 +88,7 @@ class OsReleaseSensor(RpiSensor):
     """Sensor for OS release"""
 
     _state: str | None = None
+    default_update_interval = UPDATE_INTERVAL_SLOW
 
     @property
     def name(self) -> str:
@@ -89,10 +118,86 @@ class OsReleaseSensor(RpiSensor):
             raise SensorNotAvailableException("OS release file not available for this Rpi", err) from err
 
 
+class AvailableUpdatesReader:  # pylint: disable=R0903
+    """Reads the available package updates from the apt cache for the available updates sensors. The apt cache is only
+    opened when the package lists or the dpkg status have changed since the last read, otherwise the last updates are
+    returned."""
+
+    _logger: logging.Logger
+    _lock: threading.Lock
+    _updates: AvailableUpdates | None = None
+    _watermark: tuple | None = None
+    """Inode, modification time and size of the apt and dpkg files when the updates were read"""
+
+    def __init__(self):
+        self._logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+
+    def read(self) -> AvailableUpdates:
+        """Read available package updates (using apt) if the apt or dpkg files have changed, otherwise return the last
+        updates. Raises SensorNotAvailableException if apt not available"""
+
+        if not APT_AVAILABLE:
+            self._logger.warning("apt not available for this Rpi")
+            raise SensorNotAvailableException("apt not available for this Rpi")
+
+        with self._lock:
+            watermark: tuple | None = self._read_watermark()
+
+            if self._updates is not None and watermark is not None and watermark == self._watermark:
+                self._logger.debug("apt and dpkg files not changed, keeping available updates")
+                return self._updates
+
+            self._updates = self._read_available_updates_from_apt_cache()
+            self._watermark = watermark
+
+            return self._updates
+
+    def _read_watermark(self) -> tuple | None:
+        """Returns inode, modification time and size of the dpkg status file, the apt lists directory and the files
+        in it, which change when packages are installed or the package lists are updated. Returns None if not
+        readable."""
+
+        try:
+            entries: list[os.stat_result] = [os.stat(DPKG_STATUS_FILE), os.stat(APT_LISTS_DIR)]
+
+            with os.scandir(APT_LISTS_DIR) as it:
+                entries.extend(entry.stat(follow_symlinks=False) for entry in sorted(it, key=lambda e: e.name))
+        except OSError:
+            self._logger.debug("apt and dpkg files not readable, reading available updates", exc_info=True)
+            return None
+
+        return tuple((stat.st_ino, stat.st_mtime_ns, stat.st_size) for stat in entries)
+
+    @staticmethod
+    def _read_available_updates_from_apt_cache() -> AvailableUpdates:
+        """Read available package updates from a new apt cache, which is not kept to release its memory"""
+
+        cache = apt.Cache()
+        cache.open(None)
+        # apt update will be run automatically every day by the OS, so at some point of time the upgrade will report
+        # available updates. We could run cache.update(), but this command requires sudo
+        cache.upgrade()
+        # Get marked changes
+        changes = cache.get_changes()
+        packages: list[str] = sorted(package.name for package in changes)
+
+        return AvailableUpdates(count=len(packages), packages=packages)
+
+
+available_updates_reader = AvailableUpdatesReader()
+"""Reader of the available package updates shared by the sensors"""
+
+
 class AvailableUpdatesSensor(RpiSensor):
-    """Sensor for available updates"""
+    """Sensor for the number of available updates"""
 
     _state: int | None = None
+    _reader: AvailableUpdatesReader
+
+    def __init__(self, enabled: bool, reader: AvailableUpdatesReader = available_updates_reader):
+        self._reader = reader
+        super().__init__(enabled=enabled)
 
     @property
     def name(self) -> str:
@@ -104,34 +209,44 @@ class AvailableUpdatesSensor(RpiSensor):
 
     def refresh_state(self) -> None:
         self.logger.debug("Refreshing sensor state")
-        self._state = self._read_number_of_available_updates()
+        self._state = self._reader.read().count
         self.logger.debug("Refreshing sensor state successfully")
 
-    def _read_number_of_available_updates(self) -> int:
-        """Read number of available package updates (using apt),
-        returns SensorNotAvailableException if apt not available"""
 
-        if APT_AVAILABLE:
-            cache = apt.Cache()
-            cache.open(None)
-            # apt update will be run automatically every day by the OS, so at some point of time the upgrade will report
-            # available updates. We could run cache.update(), but this command requires sudo
-            cache.upgrade()
-            # Get marked changes
-            changes = cache.get_changes()
+class AvailableUpdatePackagesSensor(RpiSensor):
+    """Sensor for the sorted names of the packages with available updates"""
 
-            # Return number of changes
-            return len(changes)
+    _state: list[str] | None = None
+    _reader: AvailableUpdatesReader
 
-        # apt not available
-        self.logger.warning("apt not available for this Rpi")
-        raise SensorNotAvailableException("apt not available for this Rpi")
+    def __init__(self, enabled: bool, reader: AvailableUpdatesReader = available_updates_reader):
+        self._reader = reader
+        super().__init__(enabled=enabled)
+
+    @property
+    def name(self) -> str:
+        return "available_update_packages"
+
+    @property
+    def state(self) -> list[str] | None:
+        return self._state
+
+    def refresh_state(self) -> None:
+        self.logger.debug("Refreshing sensor state")
+        self._state = self._reader.read().packages
+        self.logger.debug("Refreshing sensor state successfully")
 
 
 class BootTimeSensor(RpiSensor):
     """Sensor for boot time of Rpi"""
 
     _state: str | None = None
+    _procfs: ProcfsSnapshot
+    default_update_interval = UPDATE_INTERVAL_STATIC
+
+    def __init__(self, enabled: bool, procfs: ProcfsSnapshot = procfs_snapshot):
+        self._procfs = procfs
+        super().__init__(enabled=enabled)
 
     @property
     def name(self) -> str:
@@ -149,11 +264,15 @@ class BootTimeSensor(RpiSensor):
     def _read_rpi_boot_time(self) -> str:
         """Return the Rpi boot time. Example: '2024-01-22T12:51:19+00:00'"""
 
-        if not hasattr(psutil, "boot_time"):
-            self.logger.warning("psutil boot_time() not available for this Rpi")
-            raise SensorNotAvailableException("psutil boot_time() not available for this Rpi")
+        try:
+            proc_stat: str = self._procfs.read("stat")
+        except OSError as err:
+            self.logger.warning("/proc/stat not available for this Rpi")
+            raise SensorNotAvailableException("boot time not available for this Rpi") from err
 
-        boot_time_seconds: float = psutil.boot_time()
-        boot_time_iso_datetime: str = epoch_to_iso_datetime(timestamp=boot_time_seconds)
+        # Example line: 'btime 1705927879', boot time in seconds since the epoch
+        for line in proc_stat.splitlines():
+            if line.startswith("btime "):
+                return epoch_to_iso_datetime(timestamp=float(line.split()[1]))
 
-        return boot_time_iso_datetime
+        raise SensorNotAvailableException("Bad content of /proc/stat, none btime line")
@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+"""Types in module OS"""
+
+from dataclasses import dataclass
+
+
+@dataclass
+class AvailableUpdates:
+    """Class representing available package updates"""
+
+    count: int
+    """Number of packages to be installed or upgraded by an upgrade. Example: 3"""
+
+    packages: list[str]
+    """Sorted names of the packages to be installed or upgraded by an upgrade. Example: ['curl', 'libcurl4']"""
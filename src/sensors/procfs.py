@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Snapshot of the procfs files shared by the sensors, read at most once per refresh"""
+
+import os
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from sensors.pseudo_files import PseudoFileReader
+
+PROC_ROOT = "/proc"
+"""Mount point of procfs"""
+
+
+class ProcfsSnapshot:
+    """Reads procfs files, such as 'stat', 'meminfo', 'loadavg' and 'uptime' below the procfs root. Within a tick, that
+    is one refresh of the sensors, each file is read once and the content is shared by all sensors. Outside a tick the
+    files are read on every access. The files are kept open and read with pread() into a buffer reused per file (see
+    PseudoFileReader). The root can be a fake procfs directory for tests."""
+
+    root: str
+    _lock: threading.Lock
+    _files: PseudoFileReader
+    _contents: dict[str, str] | None = None
+    """Contents of the files read in the current tick, None outside a tick"""
+
+    def __init__(self, root: str = PROC_ROOT):
+        self.root = root
+        self._lock = threading.Lock()
+        self._files = PseudoFileReader()
+
+    @contextmanager
+    def tick(self) -> Iterator[None]:
+        """Context of one refresh of the sensors, sharing the file contents until exited"""
+
+        with self._lock:
+            self._contents = {}
+
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._contents = None
+
+    def read(self, name: str) -> str:
+        """Returns the content of the procfs file, for example 'stat', or its content already read in the current
+        tick. Raises OSError if the file is not available."""
+
+        with self._lock:
+            if self._contents is not None and name in self._contents:
+                return self._contents[name]
+
+            content: str = self._files.read(os.path.join(self.root, name))
+
+            if self._contents is not None:
+                self._contents[name] = content
+
+            return content
+
+    def meminfo(self) -> dict[str, int]:
+        """Returns the memory statistics of 'meminfo' in bytes, keyed by name. Example: {'MemTotal': 8443887616}"""
+
+        meminfo: dict[str, int] = {}
+
+        # Example line: 'MemTotal:        8245984 kB'
+        for line in self.read("meminfo").splitlines():
+            name, _, value = line.partition(":")
+            fields: list[str] = value.split()
+
+            if fields:
+                meminfo[name] = int(fields[0]) * 1024 if len(fields) > 1 and fields[1] == "kB" else int(fields[0])
+
+        return meminfo
+
+    def loadavg(self) -> tuple[float, float, float]:
+        """Returns the system load average over the last 1, 5 and 15 minutes of 'loadavg'"""
+
+        # Example content: '0.28 0.08 0.02 1/231 4321'
+        fields: list[str] = self.read("loadavg").split()
+
+        return float(fields[0]), float(fields[1]), float(fields[2])
+
+    def uptime(self) -> float:
+        """Returns the seconds since boot of 'uptime'"""
+
+        # Example content: '350735.47 234388.90'
+        return float(self.read("uptime").split()[0])
+
+    def close(self):
+        """Close the open files, which are opened again when read"""
+
+        self._files.close()
+
+
+procfs_snapshot = ProcfsSnapshot()
+"""Snapshot shared by all sensors"""
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Reader of sysfs and procfs pseudo-files keeping the files open between reads"""
+
+import errno
+import os
+import threading
+
+INITIAL_BUFFER_SIZE = 4096
+"""Initial size in bytes of the buffer per file, grown when a file does not fit"""
+
+REOPEN_ERRNOS = (errno.ESTALE, errno.ENOENT)
+"""Errors reading a kept open file after which the file is opened again, i.e. when its device was re-created"""
+
+
+class PseudoFileReader:
+    """Reads pseudo-files of sysfs and procfs, such as '/sys/class/net/eth0/address'. Each file is opened once and kept
+    open. The kernel generates the content again when read from offset 0, so a read is a single pread() into a buffer
+    reused per file, instead of an open(), read() and close() with new allocations. A file failing with ESTALE or
+    ENOENT is opened again once. Regular files replaced on disk are not detected, the reader is meant for
+    pseudo-files only."""
+
+    _lock: threading.Lock
+    _fds: dict[str, int]
+    _buffers: dict[str, bytearray]
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._fds = {}
+        self._buffers = {}
+
+    def read(self, path: str) -> str:
+        """Returns the content of the file. Raises OSError if the file is not available."""
+
+        with self._lock:
+            try:
+                return self._read_file(path)
+            except OSError as err:
+                if err.errno not in REOPEN_ERRNOS or path not in self._fds:
+                    raise
+
+                self._close_file(path)
+                return self._read_file(path)
+
+    def close(self):
+        """Close the open files, which are opened again when read"""
+
+        with self._lock:
+            for path in list(self._fds):
+                self._close_file(path)
+
+    def _read_file(self, path: str) -> str:
+        fd: int | None = self._fds.get(path)
+
+        if fd is None:
+            fd = os.open(path, os.O_RDONLY | os.O_CLOEXEC)
+            self._fds[path] = fd
+
+        buffer: bytearray = self._buffers.setdefault(path, bytearray(INITIAL_BUFFER_SIZE))
+
+        # A full buffer means the content may not fit, the content is generated again when read from offset 0
+        while (size := os.preadv(fd, [buffer], 0)) == len(buffer):
+            buffer.extend(bytes(len(buffer)))
+
+        return str(memoryview(buffer)[:size], "utf-8")
+
+    def _close_file(self, path: str):
+        os.close(self._fds.pop(path))
+
+
+pseudo_files = PseudoFileReader()
+"""Reader shared by all sensors"""
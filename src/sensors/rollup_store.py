@@ -0,0 +1,479 @@
+#!/usr/bin/env python3
+"""Memory-mapped file of the numeric fields of the sensor states, with rollups per second, minute and hour"""
+
+import errno
+import logging
+import math
+import mmap
+import os
+import struct
+import threading
+from collections import deque
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from enum import IntEnum
+from time import monotonic
+from typing import Any
+
+from sensors.utils import flatten_state
+from settings.types import RollupStoreSettings
+
+PAGE_SIZE = mmap.PAGESIZE
+"""Bytes per memory page, the unit of the writes to the file"""
+
+MAGIC = b"RPIROLL1"
+VERSION = 1
+
+NAME_SIZE = 128
+"""Bytes per series name in the name table, utf-8 encoded and null padded"""
+
+# Magic, version, page size, max series, series count
+_HEADER = struct.Struct("<8sIIII")
+# Records, head and count of a tier
+_TIER = struct.Struct("<III")
+_TS = struct.Struct("<q")
+_VALUE = struct.Struct("<f")
+# Count of the samples of a rollup bucket, and mean, min and max of a series
+_ROLLUP_COUNT = struct.Struct("<I4x")
+_ROLLUP_VALUES = struct.Struct("<3f")
+
+
+class RollupResolution(IntEnum):
+    """Seconds per record of the tiers of the rollup store"""
+
+    SECOND = 1
+    MINUTE = 60
+    HOUR = 3600
+
+
+@dataclass
+class RollupPoint:
+    """Value of a series in a record of the rollup store"""
+
+    ts: int
+    """Timestamp in whole seconds since epoch, the start of the bucket for rollups"""
+    mean: float
+    min: float
+    max: float
+    count: int
+    """Number of records of the second tier rolled up, 1 in the second tier"""
+
+
+@dataclass
+class _Bucket:
+    """Rollup of the records of the second tier in the bucket being filled"""
+
+    ts: int
+    count: int = 0
+    sums: list[float] = field(default_factory=list)
+    mins: list[float] = field(default_factory=list)
+    maxs: list[float] = field(default_factory=list)
+    samples: list[int] = field(default_factory=list)
+
+    def add(self, values: tuple[float, ...]):
+        """Add the values of a record of the second tier, NaN for a series not in the record"""
+
+        if not self.sums:
+            self.sums = [0.0] * len(values)
+            self.mins = [math.inf] * len(values)
+            self.maxs = [-math.inf] * len(values)
+            self.samples = [0] * len(values)
+
+        self.count += 1
+        for index, value in enumerate(values):
+            if not math.isnan(value):
+                self.sums[index] += value
+                self.mins[index] = min(self.mins[index], value)
+                self.maxs[index] = max(self.maxs[index], value)
+                self.samples[index] += 1
+
+    def pack(self) -> bytes:
+        """Returns the record of the rollup"""
+
+        values: list[float] = []
+        for index, samples in enumerate(self.samples):
+            if samples:
+                values.extend((self.sums[index] / samples, self.mins[index], self.maxs[index]))
+            else:
+                values.extend((math.nan, math.nan, math.nan))
+
+        return _TS.pack(self.ts) + _ROLLUP_COUNT.pack(self.count) + struct.pack(f"<{len(values)}f", *values)
+
+
+@dataclass
+class _Tier:
+    """Ring of fixed-size records in the file, with the records appended since the last sync kept in memory"""
+
+    resolution: RollupResolution
+    records: int
+    record_size: int
+    offset: int
+    """Byte offset of the ring in the file, at a page boundary"""
+    head: int = 0
+    """Index of the next record to write, including the pending records"""
+    count: int = 0
+    """Number of records in the ring, including the pending records"""
+    pending: deque[bytes] = field(default_factory=deque)
+    """Records appended since the last sync, written to the file on the next sync"""
+    bucket: _Bucket | None = None
+    """Rollup being filled, None in the second tier"""
+
+    @property
+    def size(self) -> int:
+        """Bytes of the ring in the file, rounded up to whole pages"""
+
+        return _page_align(self.records * self.record_size)
+
+
+class RollupStore:
+    """Stores the numeric fields of the sensor states in a file of fixed size, preallocated and memory-mapped, so that
+    the trends of the last days survive restarts. The file holds a header page, a table of the series names, i.e.
+    'temperature.soc.current_c', and three tiers of records: the values per second as recorded, and their mean, min
+    and max per minute and per hour. Each tier is a ring, the oldest records are overwritten when full. Values are
+    stored as 32 bit floats, NaN for a series not in a record.
+
+    Records are only appended. They are kept in memory and written to the file once per sync interval, with one
+    msync() per run of dirty pages followed by the header, so that the flash of an SD card is written in whole pages
+    and at most once per sync interval, and a crash loses at most the records since the last sync. The rollups of the
+    minute and hour being filled are restored from the second tier when opened."""
+
+    path: str
+    sync_interval: float
+    _logger: logging.Logger
+    _lock: threading.Lock
+    _map: mmap.mmap | None = None
+    _max_series: int
+    _series: dict[str, int]
+    """Index of each series in the records, keyed by name"""
+    _skipped_series: set[str]
+    """Series not stored as the name table is full"""
+    _synced_series: int = 0
+    """Number of series names written to the file"""
+    _tiers: dict[RollupResolution, _Tier]
+    _last_ts: int | None = None
+    _synced_at: float
+
+    def __init__(self, settings: RollupStoreSettings):
+        self.path = settings.path
+        self.sync_interval = settings.sync_interval
+        self._logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._max_series = settings.max_series
+        self._series = {}
+        self._skipped_series = set()
+
+        offset: int = PAGE_SIZE + _page_align(self._max_series * NAME_SIZE)
+        self._tiers = {}
+        for resolution, records in (
+            (RollupResolution.SECOND, settings.second_records),
+            (RollupResolution.MINUTE, settings.minute_records),
+            (RollupResolution.HOUR, settings.hour_records),
+        ):
+            record_size: int = (
+                _TS.size + _VALUE.size * self._max_series
+                if resolution == RollupResolution.SECOND
+                else _TS.size + _ROLLUP_COUNT.size + _ROLLUP_VALUES.size * self._max_series
+            )
+            self._tiers[resolution] = _Tier(
+                resolution=resolution, records=records, record_size=record_size, offset=offset
+            )
+            offset += self._tiers[resolution].size
+
+        self._open(file_size=offset)
+        self._synced_at = monotonic()
+
+    @property
+    def series(self) -> list[str]:
+        """Returns the names of the series in the file, in the order first recorded"""
+
+        with self._lock:
+            return list(self._series)
+
+    def record(self, states: dict[str, Any], ts: int) -> bool:
+        """Appends the numeric fields of the states at the timestamp in whole seconds since epoch, and syncs the file if
+        the sync interval passed. Returns False if the timestamp is not after the last record."""
+
+        with self._lock:
+            if self._map is None or (self._last_ts is not None and ts <= self._last_ts):
+                return False
+
+            values: list[float] = [math.nan] * self._max_series
+            for path, value in flatten_state(states):
+                # bool is a subclass of int, but has no trend
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    if (index := self._series_index(".".join(path))) is not None:
+                        values[index] = float(value)
+
+            self._append(self._tiers[RollupResolution.SECOND], _TS.pack(ts) + struct.pack(f"<{len(values)}f", *values))
+            self._roll_up(ts, tuple(values))
+            self._last_ts = ts
+
+            if monotonic() - self._synced_at >= self.sync_interval:
+                self._sync()
+
+            return True
+
+    def read(
+        self,
+        name: str,
+        resolution: RollupResolution = RollupResolution.SECOND,
+        start: int | None = None,
+        end: int | None = None,
+    ) -> list[RollupPoint]:
+        """Returns the values of the series in the tier with the resolution, within start and end inclusive if given,
+        ordered by timestamp. Records without a value of the series are skipped, as is the rollup being filled."""
+
+        with self._lock:
+            index: int | None = self._series.get(name)
+            if self._map is None or index is None:
+                return []
+
+            tier: _Tier = self._tiers[resolution]
+            points: list[RollupPoint] = []
+
+            for buffer, offset in self._records(tier):
+                point: RollupPoint = _unpack_point(tier, buffer, offset, index)
+                if (
+                    (start is None or point.ts >= start)
+                    and (end is None or point.ts <= end)
+                    and not math.isnan(point.mean)
+                ):
+                    points.append(point)
+
+            return points
+
+    def sync(self):
+        """Writes the records appended since the last sync to the file"""
+
+        with self._lock:
+            if self._map is not None:
+                self._sync()
+
+    def close(self):
+        """Syncs and unmaps the file. Records are not appended after closing."""
+
+        with self._lock:
+            if self._map is not None:
+                self._sync()
+                self._map.close()
+                self._map = None
+
+    def _open(self, file_size: int):
+        """Maps the file, created and preallocated if missing. The file is started empty if its layout differs from
+        the settings, i.e. after changing the number of records."""
+
+        if directory := os.path.dirname(self.path):
+            os.makedirs(directory, exist_ok=True)
+
+        fd: int = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_CLOEXEC, 0o644)
+        try:
+            if os.fstat(fd).st_size != file_size:
+                os.ftruncate(fd, file_size)
+
+            # Allocate the blocks now, a write to a hole of a mapped file raises SIGBUS if the disk is full
+            try:
+                os.posix_fallocate(fd, 0, file_size)
+            except OSError as err:
+                if err.errno not in (errno.EINVAL, errno.EOPNOTSUPP):
+                    raise
+
+            self._map = mmap.mmap(fd, file_size)
+        finally:
+            os.close(fd)
+
+        if self._load():
+            self._logger.debug("Opened rollup store %s with %d series", self.path, len(self._series))
+        else:
+            self._logger.info("Starting empty rollup store %s", self.path)
+            self._write_header()
+            self._map.flush(0, PAGE_SIZE)
+
+    def _load(self) -> bool:
+        """Loads the series names and the rings from the file. Returns False if the file has another layout."""
+
+        magic, version, page_size, max_series, series_count = _HEADER.unpack_from(self._map, 0)
+        if (magic, version, page_size, max_series) != (MAGIC, VERSION, PAGE_SIZE, self._max_series):
+            return False
+
+        rings: list[tuple[int, int, int]] = [
+            _TIER.unpack_from(self._map, _HEADER.size + _TIER.size * position) for position in range(len(self._tiers))
+        ]
+        if any(records != tier.records for (records, _, _), tier in zip(rings, self._tiers.values())):
+            return False
+
+        for (_, head, count), tier in zip(rings, self._tiers.values()):
+            tier.head, tier.count = head, count
+
+        for index in range(series_count):
+            name: bytes = self._map[PAGE_SIZE + index * NAME_SIZE : PAGE_SIZE + (index + 1) * NAME_SIZE]
+            self._series[name.rstrip(b"\0").decode("utf-8")] = index
+        self._synced_series = series_count
+
+        self._restore_buckets()
+        return True
+
+    def _restore_buckets(self):
+        """Rolls up the records of the second tier after the last rollup of each tier again, which restores the rollup
+        being filled and appends the rollups missed by a crash"""
+
+        second: _Tier = self._tiers[RollupResolution.SECOND]
+        records: list[tuple[int, tuple[float, ...]]] = [
+            (
+                _TS.unpack_from(buffer, offset)[0],
+                struct.unpack_from(f"<{self._max_series}f", buffer, offset + _TS.size),
+            )
+            for buffer, offset in self._records(second)
+        ]
+
+        for tier in self._tiers.values():
+            if tier.resolution == RollupResolution.SECOND:
+                continue
+
+            last_rollups: list[tuple[bytes | mmap.mmap, int]] = list(self._records(tier))[-1:]
+            since: int | None = _TS.unpack_from(*last_rollups[0])[0] + tier.resolution if last_rollups else None
+
+            for ts, values in records:
+                if since is None or ts >= since:
+                    self._roll_up_tier(tier, ts, values)
+
+        if records:
+            self._last_ts = records[-1][0]
+
+    def _series_index(self, name: str) -> int | None:
+        """Returns the index of the series, added if new. Returns None if the name table is full."""
+
+        if (index := self._series.get(name)) is not None:
+            return index
+
+        if name in self._skipped_series:
+            return None
+
+        if len(self._series) >= self._max_series or len(name.encode("utf-8")) > NAME_SIZE:
+            self._logger.warning("Not storing rollups of '%s', the rollup store has no space for its name", name)
+            self._skipped_series.add(name)
+            return None
+
+        self._series[name] = len(self._series)
+        return self._series[name]
+
+    def _roll_up(self, ts: int, values: tuple[float, ...]):
+        for tier in self._tiers.values():
+            if tier.resolution != RollupResolution.SECOND:
+                self._roll_up_tier(tier, ts, values)
+
+    def _roll_up_tier(self, tier: _Tier, ts: int, values: tuple[float, ...]):
+        """Adds the values to the rollup of the bucket of the timestamp, appending the previous rollup if complete"""
+
+        bucket_ts: int = ts - ts % tier.resolution
+
+        if tier.bucket is not None and tier.bucket.ts != bucket_ts:
+            self._append(tier, tier.bucket.pack())
+            tier.bucket = None
+
+        if tier.bucket is None:
+            tier.bucket = _Bucket(ts=bucket_ts)
+
+        tier.bucket.add(values)
+
+    @staticmethod
+    def _append(tier: _Tier, record: bytes):
+        tier.pending.append(record)
+        if len(tier.pending) > tier.records:
+            # The oldest pending record would be overwritten before written
+            tier.pending.popleft()
+
+        tier.head = (tier.head + 1) % tier.records
+        tier.count = min(tier.count + 1, tier.records)
+
+    def _records(self, tier: _Tier) -> Iterator[tuple[bytes | mmap.mmap, int]]:
+        """Returns the buffer and offset of each record of the tier, from the oldest to the newest"""
+
+        written: int = tier.count - len(tier.pending)
+        first: int = (tier.head - tier.count) % tier.records
+
+        for position in range(written):
+            yield self._map, tier.offset + (first + position) % tier.records * tier.record_size
+
+        for record in tier.pending:
+            yield record, 0
+
+    def _sync(self):
+        """Writes the pending records and new series names to the mapped file and flushes the dirty pages, the header
+        last, so that the header never refers to records not yet on disk"""
+
+        pages: set[int] = set()
+
+        try:
+            for tier in self._tiers.values():
+                first: int = (tier.head - len(tier.pending)) % tier.records
+
+                for position, record in enumerate(tier.pending):
+                    offset: int = tier.offset + (first + position) % tier.records * tier.record_size
+                    self._map[offset : offset + tier.record_size] = record
+                    pages.update(range(offset // PAGE_SIZE, (offset + tier.record_size - 1) // PAGE_SIZE + 1))
+
+                tier.pending.clear()
+
+            names: list[tuple[str, int]] = list(self._series.items())
+            for name, index in names[self._synced_series :]:
+                offset = PAGE_SIZE + index * NAME_SIZE
+                self._map[offset : offset + NAME_SIZE] = name.encode("utf-8").ljust(NAME_SIZE, b"\0")
+                pages.update(range(offset // PAGE_SIZE, (offset + NAME_SIZE - 1) // PAGE_SIZE + 1))
+            self._synced_series = len(names)
+
+            for first_page, page_count in _page_runs(pages):
+                self._map.flush(first_page * PAGE_SIZE, page_count * PAGE_SIZE)
+
+            self._write_header()
+            self._map.flush(0, PAGE_SIZE)
+        except OSError as err:
+            self._logger.warning("Failed to sync rollup store %s: %s", self.path, err)
+
+        self._synced_at = monotonic()
+        self._logger.debug("Synced %d pages of rollup store %s", len(pages) + 1, self.path)
+
+    def _write_header(self):
+        _HEADER.pack_into(self._map, 0, MAGIC, VERSION, PAGE_SIZE, self._max_series, self._synced_series)
+
+        for position, tier in enumerate(self._tiers.values()):
+            _TIER.pack_into(self._map, _HEADER.size + _TIER.size * position, tier.records, tier.head, tier.count)
+
+
+def _unpack_point(tier: _Tier, buffer: bytes | mmap.mmap, offset: int, index: int) -> RollupPoint:
+    """Returns the value of the series with the index in the record of the tier at the offset"""
+
+    ts: int = _TS.unpack_from(buffer, offset)[0]
+
+    if tier.resolution == RollupResolution.SECOND:
+        value: float = _VALUE.unpack_from(buffer, offset + _TS.size + _VALUE.size * index)[0]
+        return RollupPoint(ts=ts, mean=value, min=value, max=value, count=1)
+
+    count: int = _ROLLUP_COUNT.unpack_from(buffer, offset + _TS.size)[0]
+    mean, minimum, maximum = _ROLLUP_VALUES.unpack_from(
+        buffer, offset + _TS.size + _ROLLUP_COUNT.size + _ROLLUP_VALUES.size * index
+    )
+    return RollupPoint(ts=ts, mean=mean, min=minimum, max=maximum, count=count)
+
+
+def _page_align(size: int) -> int:
+    return (size + PAGE_SIZE - 1) // PAGE_SIZE * PAGE_SIZE
+
+
+def _page_runs(pages: set[int]) -> Iterator[tuple[int, int]]:
+    """Returns the first page and number of pages of each run of consecutive pages"""
+
+    first_page: int | None = None
+    page_count: int = 0
+
+    for page in sorted(pages):
+        if first_page is not None and page == first_page + page_count:
+            page_count += 1
+            continue
+
+        if first_page is not None:
+            yield first_page, page_count
+
+        first_page, page_count = page, 1
+
+    if first_page is not None:
+        yield first_page, page_count
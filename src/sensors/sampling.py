@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Fixed-size rings of numeric samples taken between two updates, and their summary statistics"""
+
+import math
+from array import array
+from dataclasses import dataclass
+
+
+@dataclass
+class SampleStats:
+    """Class representing the summary statistics of the samples of a numeric field since the previous update"""
+
+    mean: float
+    """Arithmetic mean of the samples. Example: '42.35'"""
+
+    min: float
+    """Lowest sample. Example: '40.1'"""
+
+    max: float
+    """Highest sample. Example: '51.2'"""
+
+    p95: float
+    """95th percentile of the samples, nearest rank. Example: '49.8'"""
+
+    stddev: float
+    """Population standard deviation of the samples. Example: '2.71'"""
+
+    count: int
+    """Number of samples. Example: '60'"""
+
+
+class SampleRing:
+    """Ring of the last samples of a numeric field, preallocated with the size given. When full, a new sample
+    overwrites the oldest, so the memory used does not grow when updates are late."""
+
+    _samples: array
+    _next: int = 0
+    _count: int = 0
+
+    def __init__(self, size: int):
+        self._samples = array("d", bytes(8 * size))
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, value: float):
+        """Add the sample, overwriting the oldest sample when full"""
+
+        self._samples[self._next] = value
+        self._next = (self._next + 1) % len(self._samples)
+        self._count = min(self._count + 1, len(self._samples))
+
+    def clear(self):
+        """Remove all samples"""
+
+        self._next = 0
+        self._count = 0
+
+    def stats(self) -> SampleStats | None:
+        """Returns the summary statistics of the samples, None if empty"""
+
+        if self._count == 0:
+            return None
+
+        values: list[float] = sorted(self._samples[: self._count])
+        mean: float = math.fsum(values) / self._count
+        variance: float = math.fsum((value - mean) ** 2 for value in values) / self._count
+
+        return SampleStats(
+            mean=round(mean, 2),
+            min=values[0],
+            max=values[-1],
+            p95=values[math.ceil(0.95 * self._count) - 1],
+            stddev=round(math.sqrt(variance), 2),
+            count=self._count,
+        )
@@ -2,20 +2,28 @@
 """Service for reading the Rpi temperatures (i.e. for CPU and GPU) by running linux commands"""
 
 import subprocess
-from collections import defaultdict
 from typing import Any
 
-import psutil
-
+from sensors.hwmon.reader import HwmonReader, hwmon_reader
+from sensors.hwmon.types import HwmonInput
 from sensors.temperature.types import HwTemperature
 from sensors.types import RpiSensor, SensorNotAvailableException
 from sensors.utils import round_temp
+from sensors.videocore.broker import run_vcgencmd, run_vcgencmd_async
+
+VCGENCMD_MEASURE_TEMP_ARGS = ["vcgencmd", "measure_temp"]
 
 
 class TemperatureSensor(RpiSensor):
     """Sensor for temperature"""
 
     _state: dict[str, HwTemperature] | None = None
+    _hwmon: HwmonReader
+    vcgencmd_commands = [VCGENCMD_MEASURE_TEMP_ARGS]
+
+    def __init__(self, enabled: bool, hwmon: HwmonReader = hwmon_reader):
+        self._hwmon = hwmon
+        super().__init__(enabled=enabled)
 
     @property
     def name(self) -> str:
@@ -29,11 +37,22 @@ class TemperatureSensor(RpiSensor):
     def state_as_dict(self) -> dict[str, dict[str, Any]] | None:
         return self._nested_state_as_dict
 
+    def adaptive_value(self) -> float | None:
+        # The hottest component ramps first when throttling
+        return max((temp.current_c for temp in self._state.values()), default=None) if self._state else None
+
     def refresh_state(self) -> None:
         self.logger.debug("Refreshing sensor state")
         self._state = self._read_temperature()
         self.logger.debug("Refreshing sensor state successfully")
 
+    async def refresh_state_async(self) -> None:
+        self.logger.debug("Refreshing sensor state")
+        temps: dict[str, HwTemperature] = self._read_temperatures()
+        temps["gpu"] = await self._read_gpu_temperature_async()
+        self._state = temps
+        self.logger.debug("Refreshing sensor state successfully")
+
     def _read_temperature(self) -> dict[str, HwTemperature]:
         """Read available temperatures for hardware components, such as for CPU and GPU"""
 
@@ -44,43 +63,53 @@ class TemperatureSensor(RpiSensor):
         return temps
 
     def _read_temperatures(self) -> dict[str, HwTemperature]:
-        """Read available temperatures, such as for CPU and ADC using the psutil module"""
+        """Read available temperatures, such as for CPU and ADC from the hwmon or thermal sysfs files"""
         hw_temperatures: dict[str, HwTemperature] = {}
 
-        # doc: https://psutil.readthedocs.io/en/latest/
-        if not hasattr(psutil, "sensors_temperatures"):
-            self.logger.warning("psutil sensors_temperatures() not available for this Rpi")
-            raise SensorNotAvailableException("sensors_temperatures() not available for this Rpi")
-
-        temps: defaultdict[str, list] = psutil.sensors_temperatures()
+        # doc: https://www.kernel.org/doc/html/latest/hwmon/sysfs-interface.html
+        temps: list[tuple[HwmonInput, float]] = self._hwmon.temperatures()
 
         if not temps:
             self.logger.warning("none temperatures detected for this Rpi")
             raise SensorNotAvailableException("none temperatures detected for this Rpi")
 
-        for temp_name, temp_measurements in temps.items():
-            for temp_measurement in temp_measurements:
-                name: str = temp_measurement.label or temp_name
-                hw_temperatures[name] = HwTemperature(
-                    current_c=round_temp(temp_measurement.current),
-                    high_c=temp_measurement.high,
-                    critical_c=temp_measurement.critical,
-                )
+        for hw_input, current_c in temps:
+            hw_temperatures[hw_input.name] = HwTemperature(
+                current_c=round_temp(current_c),
+                high_c=hw_input.high,
+                critical_c=hw_input.critical,
+            )
 
         self.logger.debug("Reading hw temperatures successfully")
         return hw_temperatures
 
     def _read_gpu_temperature(self) -> HwTemperature:
-        """Read GPU temperature of the RPI using the RPI vcgencmd cli"""
+        """Read GPU temperature of the RPI using vcgencmd through the VideoCore mailbox, or the RPI vcgencmd cli"""
 
         # doc: https://www.raspberrypi.com/documentation/computers/os.html#vcgencmd
-        args = ["vcgencmd", "measure_temp"]
         try:
-            result = subprocess.run(args, capture_output=True, text=True, check=False)
+            result = run_vcgencmd(VCGENCMD_MEASURE_TEMP_ARGS)
         except FileNotFoundError as err:
             self.logger.warning("vcgencmd not available for this Rpi")
             raise SensorNotAvailableException("vcgencmd not available for this Rpi") from err
 
+        return self._parse_gpu_temperature(result)
+
+    async def _read_gpu_temperature_async(self) -> HwTemperature:
+        """Read GPU temperature of the RPI using vcgencmd through the VideoCore mailbox, or the RPI vcgencmd cli as
+        asyncio subprocess"""
+
+        try:
+            result = await run_vcgencmd_async(VCGENCMD_MEASURE_TEMP_ARGS)
+        except FileNotFoundError as err:
+            self.logger.warning("vcgencmd not available for this Rpi")
+            raise SensorNotAvailableException("vcgencmd not available for this Rpi") from err
+
+        return self._parse_gpu_temperature(result)
+
+    def _parse_gpu_temperature(self, result: subprocess.CompletedProcess) -> HwTemperature:
+        """Parse GPU temperature from the completed 'vcgencmd measure_temp' process"""
+
         if result.returncode != 0:
             self.logger.warning(
                 "Process 'vcgencmd measure_temp' returned code: %s, err: %s", str(result.returncode), str(result.stderr)
@@ -8,12 +8,16 @@ from mqtt.constants import PAYLOAD_LWT_OFFLINE, PAYLOAD_LWT_ONLINE
 from mqtt.types import RpiMqttTopics
 from sensors.throttle.types import SystemThrottleStatus
 from sensors.types import MqttDiscoveryEntity, MqttDiscoveryMessage, RpiSensor, SensorNotAvailableException
+from sensors.videocore.broker import run_vcgencmd, run_vcgencmd_async
+
+VCGENCMD_GET_THROTTLED_ARGS = ["vcgencmd", "get_throttled"]
 
 
 class ThrottledSensor(RpiSensor):
     """Sensor for thermal throttling"""
 
     _state: SystemThrottleStatus | None = None
+    vcgencmd_commands = [VCGENCMD_GET_THROTTLED_ARGS]
 
     @property
     def name(self) -> str:
@@ -27,21 +31,24 @@ class ThrottledSensor(RpiSensor):
     # noinspection DuplicatedCode
     # TODO: clean up the duplicated code
     def mqtt_discovery_messages(self, topics: RpiMqttTopics) -> List[MqttDiscoveryMessage]:
+        state_topic, value_template = topics.discovery_state(self.name, "status")
+        json_attributes_topic, json_attributes_template = topics.discovery_json_attributes(self.name)
+
         binary_sensor = MqttDiscoveryEntity(
             name="Rpi Throttled",
             unique_id="rpi_throttled_status",
             component="binary_sensor",
             device_class=None,
-            value_template=f"{{{{ value_json.{self.name}.status }}}}",
+            value_template=value_template,
             base_topic=topics.sensor_states_base_topic,
-            state_topic=topics.sensor_states_topic_abbr,
+            state_topic=state_topic,
             availability_topic=topics.sensor_states_lwt_topic_abbr,
             payload_available=PAYLOAD_LWT_ONLINE,
             payload_not_available=PAYLOAD_LWT_OFFLINE,
             payload_on="throttled",
             payload_off="not throttled",
-            json_attributes_topic=topics.sensor_states_topic_abbr,
-            json_attributes_template=f"{{{{ value_json.{self.name} | tojson }}}}",
+            json_attributes_topic=json_attributes_topic,
+            json_attributes_template=json_attributes_template,
         )
 
         binary_sensor_dict: dict = vars(binary_sensor)
@@ -70,18 +77,38 @@ class ThrottledSensor(RpiSensor):
         self._state = self._read_throttle_status()
         self.logger.debug("Refreshing sensor state successfully")
 
+    async def refresh_state_async(self) -> None:
+        self.logger.debug("Refreshing sensor state")
+        self._state = await self._read_throttle_status_async()
+        self.logger.debug("Refreshing sensor state successfully")
+
     def _read_throttle_status(self) -> SystemThrottleStatus:
         """Read current system thermal throttled status"""
 
         # doc: https://www.raspberrypi.com/documentation/computers/os.html#get_throttled
 
-        args = ["vcgencmd", "get_throttled"]
         try:
-            result = subprocess.run(args, capture_output=True, text=True, check=False)
+            result = run_vcgencmd(VCGENCMD_GET_THROTTLED_ARGS)
         except FileNotFoundError as err2:
             self.logger.warning("vcgencmd not available for this Rpi")
             raise SensorNotAvailableException("vcgencmd not available for this Rpi") from err2
 
+        return self._parse_throttle_status(result)
+
+    async def _read_throttle_status_async(self) -> SystemThrottleStatus:
+        """Read current system thermal throttled status, falling back to the vcgencmd cli as asyncio subprocess"""
+
+        try:
+            result = await run_vcgencmd_async(VCGENCMD_GET_THROTTLED_ARGS)
+        except FileNotFoundError as err:
+            self.logger.warning("vcgencmd not available for this Rpi")
+            raise SensorNotAvailableException("vcgencmd not available for this Rpi") from err
+
+        return self._parse_throttle_status(result)
+
+    def _parse_throttle_status(self, result: subprocess.CompletedProcess) -> SystemThrottleStatus:
+        """Parse throttled status from the completed 'vcgencmd get_throttled' process"""
+
         if result.returncode != 0:
             self.logger.warning(
                 "Process 'vcgencmd get_throttled' returned code %s: %s", str(result.returncode), str(result.stderr)
@@ -1,15 +1,29 @@
 #!/usr/bin/env python3
 """Common types in module Sensors"""
 
+import asyncio
 import logging
+import threading
 from abc import ABC, abstractmethod
 from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass
+from time import monotonic, time
 from typing import Any, List
 
 from date_utils import now_to_iso_datetime
+from mqtt.scheduler import FixedRateScheduler
 from mqtt.types import RpiMqttTopics
-from settings.types import ScriptSettings
+from sensors.adaptive import AdaptiveInterval
+from sensors.history import SensorHistory
+from sensors.network.nl80211 import nl80211_client
+from sensors.network.rtnetlink import network_monitor
+from sensors.procfs import procfs_snapshot
+from sensors.rollup_store import RollupStore
+from sensors.sampling import SampleRing
+from sensors.utils import flatten_state
+from sensors.videocore.broker import vcgencmd_broker
+from settings.types import RefreshMode, ScriptSettings, SensorsMonitoringSettings
 
 
 @dataclass
@@ -27,6 +41,23 @@ class RpiSensor(ABC):
 
     logger: logging.Logger
 
+    default_update_interval: int | None = None
+    """Default refresh interval in seconds for this sensor class. None means refreshing on every update."""
+
+    update_interval: int | None
+    """Refresh interval in seconds for this sensor, overriding the default interval if set by the user."""
+
+    adaptive_interval: AdaptiveInterval | None = None
+    """Refresh interval adapted to the rate of change of the adaptive value if set by the user, overriding the update
+    interval after each refresh."""
+
+    vcgencmd_commands: List[List[str]] = []
+    """vcgencmd commands read by this sensor, run once per refresh by the shared broker for all sensors."""
+
+    network_events: bool = False
+    """Whether this sensor is refreshed as soon as the kernel reports a change of the network interfaces or addresses,
+    in addition to its refresh interval."""
+
     @property
     @abstractmethod
     def name(self) -> str:
@@ -47,6 +78,12 @@ class RpiSensor(ABC):
 
         return self.state
 
+    def adaptive_value(self) -> float | None:
+        """Returns the numeric value of the state whose rate of change adapts the refresh interval, None if this sensor
+        does not support adaptive refresh intervals or has no state."""
+
+        return None
+
     def mqtt_discovery_messages(self, topics: RpiMqttTopics) -> List[MqttDiscoveryMessage]:
         """Returns list of mqtt discovery messages"""
 
@@ -68,6 +105,7 @@ class RpiSensor(ABC):
 
     def __init__(self, enabled: bool):
         self._enabled = enabled
+        self.update_interval = self.default_update_interval
         logger_name: str = f"{__name__}.{self.name}"
         self.logger = logging.getLogger(logger_name)
 
@@ -83,6 +121,13 @@ class RpiSensor(ABC):
 
         raise NotImplementedError("read() must be implemented in sensor sub-class.")
 
+    async def refresh_state_async(self) -> None:
+        """Refresh current state of this sensor as coroutine on the asyncio event loop. By default the state is
+        refreshed in a worker thread, so that a sensor blocking on a file or kernel interface does not block the event
+        loop. Sensors running subprocesses may override this function to await the subprocess instead."""
+
+        await asyncio.to_thread(self.refresh_state)
+
     def available(self) -> bool:
         """Indicate if this sensor is available on running Rpi platform."""
 
@@ -103,8 +148,46 @@ class AllRpiSensors:
     sensors_total: int = 0
     sensors_available: int = 0
 
-    def __init__(self, sensors: List[RpiSensor], script_settings: ScriptSettings):
+    _next_refresh_ts: dict[str, float]
+    """Monotonic timestamp per sensor name when the sensor is due for next refresh"""
+
+    _executor: ThreadPoolExecutor | None = None
+    """Worker pool refreshing sensors concurrently, None when sensors are refreshed sequentially"""
+
+    _refresh_timeout: float
+    _pending_refreshes: dict[str, Future | asyncio.Task]
+    """Concurrent refreshes, or refreshes as coroutines, per sensor name that did not complete within the refresh
+    timeout"""
+
+    _refresh_lock: threading.Lock
+    _refresh_lock_async: asyncio.Lock
+
+    _sampled_sensors: List[RpiSensor]
+    """Available sensors refreshed by the sample scheduler instead of on update"""
+    _sample_buffer_size: int
+    _samples: dict[str, dict[tuple[str, ...], SampleRing]]
+    """Samples since the previous update per sensor name, keyed by path of the numeric field"""
+    _samples_lock: threading.Lock
+    _sample_stats: dict[str, dict[str, Any]]
+    """Statistics of the samples per sensor name, taken on the previous update"""
+    _sample_scheduler: FixedRateScheduler | None = None
+
+    _histories: dict[str, SensorHistory]
+    """In-memory history of the numeric fields per sensor name, of the sensors with history"""
+
+    _rollup_store: RollupStore | None = None
+    """File storing the numeric fields of the sensor states on every scheduled refresh, None if not enabled or not
+    available"""
+
+    def __init__(
+        self,
+        sensors: List[RpiSensor],
+        script_settings: ScriptSettings,
+        sensor_settings: SensorsMonitoringSettings = SensorsMonitoringSettings(),
+    ):
+        self._logger = logging.getLogger(__name__)
         self.sensors = sensors
+        self.available_sensors = []
 
         for sensor in self.sensors:
             if sensor.available():
@@ -114,6 +197,65 @@ class AllRpiSensors:
         self.sensors_total = len(self.sensors)
         self.sensors_available = len(self.available_sensors)
 
+        # Sensors have read their state when created, so the first refresh is due after one interval
+        now: float = monotonic()
+        self._next_refresh_ts = {
+            sensor.name: now + self.sensor_update_interval(sensor) for sensor in self.available_sensors
+        }
+        self._adapt_update_intervals(self.available_sensors, now)
+
+        self._refresh_timeout = script_settings.refresh_timeout
+        self._pending_refreshes = {}
+        self._refresh_lock = threading.Lock()
+        self._refresh_lock_async = asyncio.Lock()
+
+        if script_settings.refresh_mode == RefreshMode.CONCURRENT:
+            self._executor = ThreadPoolExecutor(
+                max_workers=script_settings.refresh_workers, thread_name_prefix="sensor_refresh"
+            )
+
+        self._histories = {
+            sensor.name: SensorHistory(ring_size=sensor_settings.history_size_kib * 1024)
+            for sensor in self.available_sensors
+            if sensor.name in sensor_settings.history_sensors
+        }
+        self._record_history(self.available_sensors)
+
+        if sensor_settings.rollup_store.enabled:
+            try:
+                self._rollup_store = RollupStore(sensor_settings.rollup_store)
+            except (OSError, ValueError) as err:
+                self._logger.warning(
+                    "Rollup store %s not available, not storing sensor states: %s",
+                    sensor_settings.rollup_store.path,
+                    err,
+                )
+
+        self._sampled_sensors = [
+            sensor for sensor in self.available_sensors if sensor.name in sensor_settings.sampled_sensors
+        ]
+        self._sample_buffer_size = sensor_settings.sample_buffer_size
+        self._samples = {}
+        self._samples_lock = threading.Lock()
+        self._sample_stats = {}
+
+        if self._sampled_sensors:
+            # Sampled sensors have read their state when created, which is the first sample
+            self._record_samples()
+            self._sample_scheduler = FixedRateScheduler(
+                name="sensor_sample_scheduler", interval=sensor_settings.sample_interval, function=self.sample_sensors
+            )
+            self._sample_scheduler.start()
+
+    def sensor_update_interval(self, sensor: RpiSensor) -> int:
+        """Returns the effective refresh interval in seconds for the sensor. Sensors are refreshed at most once per
+        update, so intervals shorter than the update interval are refreshed on every update."""
+
+        if sensor.update_interval is None:
+            return self.update_interval
+
+        return max(sensor.update_interval, self.update_interval)
+
     def _metadata_properties(self) -> dict[str, str | int]:
         """Returns dictionary with metadata properties"""
         return {
@@ -123,14 +265,262 @@ class AllRpiSensors:
             "sensors_available": self.sensors_available,
         }
 
-    def refresh_available_sensors(self):
-        """Refreshes state of all sensors that are available for this Rpi."""
+    def due_sensors(self, now: float) -> List[RpiSensor]:
+        """Returns the available sensors that are due for refresh at monotonic timestamp now"""
 
-        for sensor in self.available_sensors:
-            sensor.refresh_state()
+        # Allow half an update of slack, so that timer jitter does not postpone a refresh by a whole update
+        slack: float = self.update_interval / 2
+
+        return [
+            sensor
+            for sensor in self.available_sensors
+            if now + slack >= self._next_refresh_ts[sensor.name] and sensor not in self._sampled_sensors
+        ]
+
+    @staticmethod
+    def _vcgencmd_commands(sensors: List[RpiSensor]) -> List[List[str]]:
+        """Returns the vcgencmd commands registered by the sensors"""
+
+        return [args for sensor in sensors for args in sensor.vcgencmd_commands]
+
+    @property
+    def network_event_sensors(self) -> List[RpiSensor]:
+        """Returns the available sensors refreshed as soon as the kernel reports a network change"""
+
+        return [sensor for sensor in self.available_sensors if sensor.network_events]
+
+    def refresh_available_sensors(self, sensors: List[RpiSensor] | None = None) -> List[RpiSensor]:
+        """Refreshes state of the given sensors, or of the sensors that are available for this Rpi and due for refresh
+        if None. Refreshes triggered at the same time, i.e. by a network change, run one after the other.
+        Returns the refreshed sensors."""
 
-    def as_dict(self) -> OrderedDict:
-        """Sensor states as ordered dict"""
+        with self._refresh_lock:
+            return self._refresh_sensors(sensors)
+
+    def _refresh_sensors(self, sensors: List[RpiSensor] | None) -> List[RpiSensor]:
+        now: float = monotonic()
+        due_sensors: List[RpiSensor] = self.due_sensors(now) if sensors is None else sensors
+
+        for sensor in due_sensors:
+            self._next_refresh_ts[sensor.name] = now + self.sensor_update_interval(sensor)
+
+        with procfs_snapshot.tick(), vcgencmd_broker.tick(commands=self._vcgencmd_commands(due_sensors)):
+            if self._executor is None:
+                for sensor in due_sensors:
+                    sensor.refresh_state()
+
+                refreshed_sensors: List[RpiSensor] = due_sensors
+            else:
+                refreshed_sensors = self._refresh_concurrently(due_sensors)
+
+        self._adapt_update_intervals(refreshed_sensors, now)
+        self._record_history(refreshed_sensors)
+
+        if sensors is None:
+            self._record_rollups()
+
+        return refreshed_sensors
+
+    def _adapt_update_intervals(self, refreshed_sensors: List[RpiSensor], now: float):
+        """Adapts the refresh interval of the refreshed sensors with adaptive intervals to the rate of change of their
+        value, and reschedules their next refresh"""
+
+        for sensor in refreshed_sensors:
+            if sensor.adaptive_interval is None or (value := sensor.adaptive_value()) is None:
+                continue
+
+            sensor.update_interval = sensor.adaptive_interval.update(value, now)
+            self._next_refresh_ts[sensor.name] = now + self.sensor_update_interval(sensor)
+
+    def _refresh_concurrently(self, due_sensors: List[RpiSensor]) -> List[RpiSensor]:
+        """Refreshes the sensors on the worker pool and waits until all are refreshed or the refresh timeout expires.
+        Sensors failing or not refreshed in time keep their last state. Returns the refreshed sensors."""
+
+        futures: dict[Future, RpiSensor] = {}
+
+        for sensor in due_sensors:
+            pending: Future | asyncio.Task | None = self._pending_refreshes.get(sensor.name)
+            if pending is not None and not pending.done():
+                self._logger.warning("Skipping refresh of sensor '%s', previous refresh still running", sensor.name)
+                continue
+
+            futures[self._executor.submit(sensor.refresh_state)] = sensor
+
+        # All sensors are submitted at once, so the timeout is the deadline of each sensor in this refresh
+        _, not_done = wait(futures, timeout=self._refresh_timeout)
+        refreshed_sensors: List[RpiSensor] = []
+
+        for future, sensor in futures.items():
+            if future in not_done:
+                self._logger.warning(
+                    "Refresh of sensor '%s' exceeded timeout of %.1f sec, keeping last state",
+                    sensor.name,
+                    self._refresh_timeout,
+                )
+                self._pending_refreshes[sensor.name] = future
+            elif future.exception() is not None:
+                self._logger.warning(
+                    "Refresh of sensor '%s' failed, keeping last state", sensor.name, exc_info=future.exception()
+                )
+            else:
+                refreshed_sensors.append(sensor)
+
+        return refreshed_sensors
+
+    async def refresh_available_sensors_async(self, sensors: List[RpiSensor] | None = None) -> List[RpiSensor]:
+        """Refreshes state of the given sensors, or of the sensors that are available for this Rpi and due for refresh
+        if None, as concurrent coroutines on the asyncio event loop. Sensors failing or not refreshed within the
+        refresh timeout keep their last state. Returns the refreshed sensors."""
+
+        async with self._refresh_lock_async:
+            return await self._refresh_sensors_async(sensors)
+
+    async def _refresh_sensors_async(self, sensors: List[RpiSensor] | None) -> List[RpiSensor]:
+        now: float = monotonic()
+        due_sensors: List[RpiSensor] = self.due_sensors(now) if sensors is None else sensors
+
+        for sensor in due_sensors:
+            self._next_refresh_ts[sensor.name] = now + self.sensor_update_interval(sensor)
+
+        refreshing_sensors: List[RpiSensor] = []
+
+        for sensor in due_sensors:
+            pending: Future | asyncio.Task | None = self._pending_refreshes.get(sensor.name)
+            if pending is not None and not pending.done():
+                self._logger.warning("Skipping refresh of sensor '%s', previous refresh still running", sensor.name)
+                continue
+
+            refreshing_sensors.append(sensor)
+
+        with procfs_snapshot.tick():
+            async with vcgencmd_broker.tick_async(commands=self._vcgencmd_commands(refreshing_sensors)):
+                tasks: list[asyncio.Task] = [
+                    asyncio.ensure_future(sensor.refresh_state_async()) for sensor in refreshing_sensors
+                ]
+                # Shielded, a refresh exceeding the timeout keeps running, like a refresh running in a worker thread
+                results: list = await asyncio.gather(
+                    *[asyncio.wait_for(asyncio.shield(task), timeout=self._refresh_timeout) for task in tasks],
+                    return_exceptions=True,
+                )
+
+        refreshed_sensors: List[RpiSensor] = []
+
+        for sensor, task, result in zip(refreshing_sensors, tasks, results):
+            if isinstance(result, asyncio.TimeoutError):
+                self._logger.warning(
+                    "Refresh of sensor '%s' exceeded timeout of %.1f sec, keeping last state",
+                    sensor.name,
+                    self._refresh_timeout,
+                )
+                self._pending_refreshes[sensor.name] = task
+            elif isinstance(result, Exception):
+                self._logger.warning("Refresh of sensor '%s' failed, keeping last state", sensor.name, exc_info=result)
+            else:
+                refreshed_sensors.append(sensor)
+
+        self._adapt_update_intervals(refreshed_sensors, now)
+        self._record_history(refreshed_sensors)
+
+        if sensors is None:
+            self._record_rollups()
+
+        return refreshed_sensors
+
+    def sample_sensors(self):
+        """Refreshes the sampled sensors and records the values of their numeric fields, called every sample interval
+        by the sample scheduler. Sensors failing keep their last state and are not sampled."""
+
+        for sensor in self._sampled_sensors:
+            # noinspection PyBroadException
+            # pylint: disable=W0718
+            try:
+                sensor.refresh_state()
+            except Exception:
+                self._logger.warning("Sampling sensor '%s' failed, keeping last state", sensor.name, exc_info=True)
+
+        self._record_samples()
+        self._record_history(self._sampled_sensors)
+
+    def _record_samples(self):
+        with self._samples_lock:
+            for sensor in self._sampled_sensors:
+                rings: dict[tuple[str, ...], SampleRing] = self._samples.setdefault(sensor.name, {})
+
+                for path, value in flatten_state(sensor.state_as_dict):
+                    # bool is a subclass of int, but has no statistics
+                    if isinstance(value, (int, float)) and not isinstance(value, bool):
+                        rings.setdefault(path, SampleRing(size=self._sample_buffer_size)).append(value)
+
+    def history(self, name: str) -> SensorHistory | None:
+        """Returns the in-memory history of the numeric fields of the sensor, None if the sensor has no history"""
+
+        return self._histories.get(name)
+
+    def _record_history(self, refreshed_sensors: List[RpiSensor]):
+        """Records the numeric fields of the refreshed sensors with history, at the current time in whole seconds"""
+
+        ts: int = int(time())
+
+        for sensor in refreshed_sensors:
+            if (sensor_history := self._histories.get(sensor.name)) is not None:
+                sensor_history.record(sensor.state_as_dict, ts)
+
+    def _record_rollups(self):
+        """Stores the numeric fields of the states of the available sensors in the rollup store if enabled, at the
+        current time in whole seconds. Called on the scheduled refreshes only, so that the records are evenly spaced
+        and not dropped for a timestamp already recorded by a refresh on a network change."""
+
+        if self._rollup_store is not None:
+            self._rollup_store.record(
+                {sensor.name: sensor.state_as_dict for sensor in self.available_sensors}, int(time())
+            )
+
+    @property
+    def rollup_store(self) -> RollupStore | None:
+        """Returns the file storing the numeric fields of the sensor states, None if not enabled or not available"""
+
+        return self._rollup_store
+
+    def _take_sample_stats(self, name: str) -> dict[str, Any]:
+        """Returns the statistics of the samples of the sensor since the previous update, nested like the fields of
+        the sensor state, and starts sampling the next update"""
+
+        stats: dict[str, Any] = {}
+
+        with self._samples_lock:
+            for path, ring in self._samples.get(name, {}).items():
+                if (sample_stats := ring.stats()) is None or not path:
+                    continue
+
+                parent: dict[str, Any] = stats
+                for key in path[:-1]:
+                    parent = parent.setdefault(key, {})
+
+                parent[path[-1]] = vars(sample_stats)
+                ring.clear()
+
+        return stats
+
+    def close(self):
+        """Stops the worker pool refreshing sensors concurrently, without waiting for running refreshes, stops
+        sampling, syncs and closes the rollup store, stops monitoring network changes and closes the nl80211 socket"""
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+        if self._sample_scheduler is not None:
+            self._sample_scheduler.cancel()
+
+        if self._rollup_store is not None:
+            self._rollup_store.close()
+
+        network_monitor.close()
+        nl80211_client.close()
+
+    def as_dict(self, take_stats: bool = True) -> OrderedDict:
+        """Sensor states as ordered dict. The states of sampled sensors contain the statistics of the samples since the
+        previous update in 'stats', which are taken and the next samples started if take_stats, otherwise the
+        statistics taken on the previous update are repeated."""
 
         sensors_as_dict: OrderedDict = OrderedDict()
 
@@ -138,6 +528,16 @@ class AllRpiSensors:
         for sensor in self.available_sensors:
             sensors_as_dict[sensor.name] = sensor.state_as_dict
 
+        for sensor in self._sampled_sensors:
+            if isinstance(sensors_as_dict[sensor.name], dict):
+                if take_stats:
+                    self._sample_stats[sensor.name] = self._take_sample_stats(sensor.name)
+
+                sensors_as_dict[sensor.name] = {
+                    **sensors_as_dict[sensor.name],
+                    "stats": self._sample_stats.get(sensor.name, {}),
+                }
+
         # Add metadata properties
         sensors_as_dict["metadata"] = self._metadata_properties()
 
@@ -1,7 +1,15 @@
 #!/usr/bin/env python3
 """Common utility functions used across Rpi sensors"""
 
+import asyncio
+import subprocess
+from collections.abc import Iterator
 from datetime import datetime, timezone
+from typing import Any
+
+COUNTER_32_BIT_WRAP = 2**32
+COUNTER_64_BIT_WRAP = 2**64
+"""Values at which the unsigned long counters of procfs wrap, on 32 bit and 64 bit kernels"""
 
 
 def date_and_timestamp_to_iso_datetime(datetime_and_ts: str) -> str:
@@ -37,3 +45,43 @@ def bytes_to_gibibytes(value_bytes: int) -> float:
     value_gibibytes: float = value_bytes / 1024.0 / 1024.0 / 1024.0
 
     return round(value_gibibytes, 2)
+
+
+def counter_delta(current: int, previous: int) -> int:
+    """Returns the difference of the counter values. A counter lower than before wrapped around, at 32 bit if the
+    previous value fitted, or was reset, i.e. when a network interface was re-created. A wrapped difference of more
+    than half the counter range is taken as reset, then the current value is used."""
+
+    if current >= previous:
+        return current - previous
+
+    wrap: int = COUNTER_32_BIT_WRAP if previous < COUNTER_32_BIT_WRAP else COUNTER_64_BIT_WRAP
+    wrapped: int = current - previous + wrap
+
+    return wrapped if wrapped < wrap // 2 else current
+
+
+def flatten_state(state: Any, path: tuple[str, ...] = ()) -> Iterator[tuple[tuple[str, ...], Any]]:
+    """Returns the path of keys and the value of each field of the nested sensor state as dict. Lists are returned as
+    one field. Example input {'memory': {'used_pct': 42.0}} will return (('memory', 'used_pct'), 42.0)."""
+
+    if isinstance(state, dict):
+        for key, value in state.items():
+            yield from flatten_state(value, (*path, str(key)))
+    else:
+        yield path, state
+
+
+async def run_command_async(args: list[str]) -> subprocess.CompletedProcess:
+    """Run command as asyncio subprocess and return the completed process with decoded stdout and stderr, like
+    subprocess.run(args, capture_output=True, text=True, check=False). Raises FileNotFoundError if the command does
+    not exist."""
+
+    process = await asyncio.create_subprocess_exec(
+        *args, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+    )
+    stdout, stderr = await process.communicate()
+
+    return subprocess.CompletedProcess(
+        args=args, returncode=process.returncode, stdout=stdout.decode(), stderr=stderr.decode()
+    )
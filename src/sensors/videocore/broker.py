@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""Shared service running the vcgencmd commands of all sensors at most once per refresh"""
+
+import asyncio
+import logging
+import subprocess
+import threading
+from collections.abc import AsyncIterator, Iterable, Iterator
+from contextlib import asynccontextmanager, contextmanager
+
+from sensors.videocore.vcgencmd import Vcgencmd
+
+_CacheEntry = subprocess.CompletedProcess | OSError
+"""Completed vcgencmd command, or the error raised running it (i.e. FileNotFoundError)"""
+
+
+class VcgencmdBroker:
+    """Runs vcgencmd commands on behalf of all sensors. Within a tick, that is one refresh of the sensors, each
+    distinct command is run once and its result is cached and handed to every sensor asking for it. Sensors register
+    their commands (see RpiSensor.vcgencmd_commands), which are run together when the tick starts. Outside a tick the
+    commands are run directly."""
+
+    _logger: logging.Logger
+    _vcgencmd: Vcgencmd
+    _lock: threading.Lock
+    _cache: dict[tuple[str, ...], _CacheEntry] | None = None
+    """Results of the commands run in the current tick, None outside a tick"""
+
+    def __init__(self, vcgencmd: Vcgencmd | None = None):
+        self._logger = logging.getLogger(__name__)
+        self._vcgencmd = vcgencmd or Vcgencmd()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def tick(self, commands: Iterable[list[str]] = ()) -> Iterator[None]:
+        """Context of one refresh of the sensors, running the registered commands once when entered and caching the
+        results until exited"""
+
+        self._begin_tick()
+
+        try:
+            for args in self._distinct(commands):
+                self._run_cached(args)
+
+            yield
+        finally:
+            self._end_tick()
+
+    @asynccontextmanager
+    async def tick_async(self, commands: Iterable[list[str]] = ()) -> AsyncIterator[None]:
+        """Context of one refresh of the sensors as coroutines, running the registered commands concurrently once
+        when entered and caching the results until exited"""
+
+        self._begin_tick()
+
+        try:
+            await asyncio.gather(*[self._run_cached_async(args) for args in self._distinct(commands)])
+            yield
+        finally:
+            self._end_tick()
+
+    def run(self, args: list[str]) -> subprocess.CompletedProcess:
+        """Run the vcgencmd command, or return its result if already run in the current tick. Raises
+        FileNotFoundError if the vcgencmd cli does not exist."""
+
+        return self._result(self._run_cached(args))
+
+    async def run_async(self, args: list[str]) -> subprocess.CompletedProcess:
+        """Run the vcgencmd command as coroutine, or return its result if already run in the current tick. Raises
+        FileNotFoundError if the vcgencmd cli does not exist."""
+
+        return self._result(await self._run_cached_async(args))
+
+    def _begin_tick(self):
+        with self._lock:
+            self._cache = {}
+
+    def _end_tick(self):
+        with self._lock:
+            self._logger.debug("Ran %d distinct vcgencmd commands in tick", len(self._cache or {}))
+            self._cache = None
+
+    def _run_cached(self, args: list[str]) -> _CacheEntry:
+        # The lock is held while running the command, so that concurrent sensors asking for the same command wait
+        # for the first one instead of running it again
+        with self._lock:
+            if self._cache is not None and tuple(args) in self._cache:
+                return self._cache[tuple(args)]
+
+            try:
+                entry: _CacheEntry = self._vcgencmd.run(args)
+            except OSError as err:
+                entry = err
+
+            if self._cache is not None:
+                self._cache[tuple(args)] = entry
+
+            return entry
+
+    async def _run_cached_async(self, args: list[str]) -> _CacheEntry:
+        # Coroutines of the tick are prefetched together, so only commands not registered can be run twice
+        if self._cache is not None and tuple(args) in self._cache:
+            return self._cache[tuple(args)]
+
+        try:
+            entry: _CacheEntry = await self._vcgencmd.run_async(args)
+        except OSError as err:
+            entry = err
+
+        if self._cache is not None:
+            self._cache[tuple(args)] = entry
+
+        return entry
+
+    @staticmethod
+    def _distinct(commands: Iterable[list[str]]) -> list[list[str]]:
+        return [list(args) for args in dict.fromkeys(tuple(args) for args in commands)]
+
+    @staticmethod
+    def _result(entry: _CacheEntry) -> subprocess.CompletedProcess:
+        if isinstance(entry, OSError):
+            raise entry
+
+        return entry
+
+
+vcgencmd_broker = VcgencmdBroker()
+"""Broker shared by all sensors"""
+
+
+def run_vcgencmd(args: list[str]) -> subprocess.CompletedProcess:
+    """Run the vcgencmd command using the shared broker, through the VideoCore mailbox or the vcgencmd cli"""
+
+    return vcgencmd_broker.run(args)
+
+
+async def run_vcgencmd_async(args: list[str]) -> subprocess.CompletedProcess:
+    """Run the vcgencmd command using the shared broker, through the VideoCore mailbox or the vcgencmd cli as asyncio
+    subprocess"""
+
+    return await vcgencmd_broker.run_async(args)
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Client for the VideoCore firmware property mailbox on /dev/vcio, the interface used by the vcgencmd cli"""
+
+import fcntl
+import os
+import struct
+import threading
+from collections.abc import Callable
+
+VCIO_DEVICE_PATH = "/dev/vcio"
+"""Character device of the VideoCore mailbox"""
+
+GET_GENCMD_RESULT_TAG = 0x00030080
+"""Property tag running a vcgencmd command and returning its response"""
+
+MAX_STRING = 1024
+"""Maximum length in bytes of the command and of the response, including the terminating NUL"""
+
+PROCESS_REQUEST = 0x00000000
+"""Request code of a property buffer sent to the firmware"""
+
+REQUEST_SUCCESSFUL = 0x80000000
+"""Response code of a property buffer processed by the firmware"""
+
+IOCTL_MBOX_PROPERTY = (3 << 30) | (struct.calcsize("P") << 16) | (100 << 8) | 0
+"""Request number _IOWR(100, 0, char *) of the property ioctl"""
+
+# Property buffer: size, request code, tag, value buffer size, request length, error, value buffer and end tag
+_HEADER_FORMAT = "=6I"
+_HEADER_WORDS = 6
+_END_TAG_FORMAT = "=I"
+
+
+class VcioMailboxException(Exception):
+    """Exception raised when the firmware does not process the property buffer"""
+
+
+class VcioMailbox:
+    """Sends vcgencmd commands to the firmware through the property mailbox ioctl, without spawning a vcgencmd
+    process. The device is opened once and kept open. The ioctl function can be replaced to test without a device."""
+
+    device_path: str
+    _ioctl: Callable
+    _fd: int | None = None
+    _lock: threading.Lock
+
+    def __init__(self, device_path: str = VCIO_DEVICE_PATH, ioctl: Callable = fcntl.ioctl):
+        self.device_path = device_path
+        self._ioctl = ioctl
+        self._lock = threading.Lock()
+
+    def open(self):
+        """Open the mailbox device. Raises FileNotFoundError if the device does not exist, PermissionError if the user
+        is not allowed to use it (i.e. not member of the video group)"""
+
+        with self._lock:
+            if self._fd is None:
+                self._fd = os.open(self.device_path, os.O_RDWR)
+
+    def close(self):
+        """Close the mailbox device"""
+
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+    def gencmd(self, command: str) -> tuple[int, str]:
+        """Run the vcgencmd command, for example 'measure_temp', and return the error code (0 on success) and the
+        response, for example "temp=51.0'C". Raises OSError if the ioctl fails and VcioMailboxException if the
+        firmware does not process the request."""
+
+        command_bytes: bytes = command.encode("ascii")
+        if len(command_bytes) + 1 >= MAX_STRING:
+            raise ValueError(f"vcgencmd command longer than {MAX_STRING - 1} bytes")
+
+        buffer = bytearray(self._request(command_bytes))
+
+        self.open()
+        with self._lock:
+            self._ioctl(self._fd, IOCTL_MBOX_PROPERTY, buffer, True)
+
+        _, response_code, _, _, _, error_code = struct.unpack_from(_HEADER_FORMAT, buffer)
+        if response_code != REQUEST_SUCCESSFUL:
+            raise VcioMailboxException(f"Mailbox request failed with response code {response_code:#x}")
+
+        value: bytes = bytes(buffer[_HEADER_WORDS * 4 : _HEADER_WORDS * 4 + MAX_STRING])
+        response: str = value.split(b"\0", 1)[0].decode("ascii", errors="replace")
+
+        return error_code, response
+
+    @staticmethod
+    def _request(command_bytes: bytes) -> bytes:
+        """Returns the property buffer with the GET_GENCMD_RESULT tag for the command"""
+
+        size: int = struct.calcsize(_HEADER_FORMAT) + MAX_STRING + struct.calcsize(_END_TAG_FORMAT)
+        header: bytes = struct.pack(_HEADER_FORMAT, size, PROCESS_REQUEST, GET_GENCMD_RESULT_TAG, MAX_STRING, 0, 0)
+
+        return header + command_bytes.ljust(MAX_STRING, b"\0") + struct.pack(_END_TAG_FORMAT, 0)
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Running vcgencmd commands through the VideoCore mailbox, falling back to the vcgencmd cli"""
+
+import logging
+import subprocess
+
+from sensors.utils import run_command_async
+from sensors.videocore.mailbox import VcioMailbox, VcioMailboxException
+
+
+class Vcgencmd:
+    """Runs vcgencmd commands, given as cli arguments such as ['vcgencmd', 'measure_temp'], through the VideoCore
+    mailbox. Falls back to running the vcgencmd process when the mailbox device is missing or not accessible, or when
+    a mailbox request fails. The result is returned as completed process, as if the vcgencmd cli was run."""
+
+    _logger: logging.Logger
+    _mailbox: VcioMailbox
+    _mailbox_available: bool | None = None
+
+    def __init__(self, mailbox: VcioMailbox | None = None):
+        self._logger = logging.getLogger(__name__)
+        self._mailbox = mailbox or VcioMailbox()
+
+    def run(self, args: list[str]) -> subprocess.CompletedProcess:
+        """Run the vcgencmd command. Raises FileNotFoundError if falling back to the vcgencmd cli, which does not
+        exist."""
+
+        result: subprocess.CompletedProcess | None = self._run_mailbox(args)
+        if result is not None:
+            return result
+
+        return subprocess.run(args, capture_output=True, text=True, check=False)
+
+    async def run_async(self, args: list[str]) -> subprocess.CompletedProcess:
+        """Run the vcgencmd command, falling back to the vcgencmd cli as asyncio subprocess. The mailbox request is
+        answered by the firmware without waiting on I/O and runs inline."""
+
+        result: subprocess.CompletedProcess | None = self._run_mailbox(args)
+        if result is not None:
+            return result
+
+        return await run_command_async(args)
+
+    def _run_mailbox(self, args: list[str]) -> subprocess.CompletedProcess | None:
+        """Run the vcgencmd command through the mailbox, returns None if the mailbox is not available"""
+
+        if not self._is_mailbox_available():
+            return None
+
+        command: str = " ".join(args[1:])
+
+        try:
+            error_code, response = self._mailbox.gencmd(command)
+        except (OSError, VcioMailboxException):
+            self._logger.warning(
+                "Failed running '%s' through VideoCore mailbox, running vcgencmd", command, exc_info=True
+            )
+            return None
+
+        if error_code != 0:
+            return subprocess.CompletedProcess(args=args, returncode=error_code, stdout="", stderr=response)
+
+        return subprocess.CompletedProcess(args=args, returncode=0, stdout=f"{response}\n", stderr="")
+
+    def _is_mailbox_available(self) -> bool:
+        """Open the mailbox device on first use, remembering if it is not available"""
+
+        if self._mailbox_available is None:
+            try:
+                self._mailbox.open()
+                self._mailbox_available = True
+                self._logger.info("Using VideoCore mailbox '%s' for vcgencmd", self._mailbox.device_path)
+            except OSError as err:
+                self._mailbox_available = False
+                self._logger.info(
+                    "VideoCore mailbox '%s' not available (%s), running vcgencmd", self._mailbox.device_path, err
+                )
+
+        return self._mailbox_available
@@ -1,9 +1,10 @@
 #!/usr/bin/env python3
 """Types in module Settings"""
+
 from enum import Enum
 from typing import Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, NonNegativeFloat, PositiveFloat, PositiveInt
 
 
 class MqttAuthentication(BaseModel):
@@ -64,6 +65,20 @@ class LogLevel(str, Enum):
     NOTSET = "NOTSET"
 
 
+class RefreshMode(str, Enum):
+    """Enum for available modes of refreshing sensors"""
+
+    SEQUENTIAL = "sequential"
+    CONCURRENT = "concurrent"
+
+
+class Engine(str, Enum):
+    """Enum for available engines running the sensor refresh and MQTT network loop"""
+
+    THREADING = "threading"
+    ASYNCIO = "asyncio"
+
+
 class ScriptSettings(BaseModel):
     """General settings for this python script"""
 
@@ -71,6 +86,80 @@ class ScriptSettings(BaseModel):
         default=60, description="The interval in seconds to update sensor data to the MQTT broker"
     )
     log_level: LogLevel = Field(default=LogLevel.INFO, description="The log level of this python script")
+    refresh_mode: RefreshMode = Field(
+        default=RefreshMode.SEQUENTIAL,
+        description="Refresh sensors one after another (sequential) or in parallel on a worker pool (concurrent)",
+    )
+    refresh_workers: PositiveInt = Field(
+        default=4, description="The number of worker threads refreshing sensors in concurrent refresh mode"
+    )
+    refresh_timeout: PositiveFloat = Field(
+        default=10.0,
+        description="The deadline in seconds for refreshing a sensor in concurrent refresh mode and asyncio engine. "
+        "Sensors not refreshed in time keep their last state.",
+    )
+    engine: Engine = Field(
+        default=Engine.THREADING,
+        description="Run timers and the MQTT network loop in threads (threading) or in a single asyncio event loop "
+        "refreshing sensors as coroutines (asyncio)",
+    )
+
+
+class AdaptiveUpdateInterval(BaseModel):
+    """Refresh interval of a numeric sensor adapted to the rate of change of its value"""
+
+    min_interval: PositiveInt = Field(
+        default=2,
+        description="The shortest refresh interval in seconds, when the value changes fast. Sensors refresh at most "
+        "once per script update_interval",
+    )
+    max_interval: PositiveInt = Field(
+        default=60, description="The longest refresh interval in seconds, when the value is stable"
+    )
+    target_change: PositiveFloat = Field(
+        default=1.0,
+        description="The change of the value between two refreshes to aim for, in units of the value (e.g. celsius "
+        "or percent). The faster the value changes, the shorter the refresh interval",
+    )
+    smoothing: float = Field(
+        default=0.3,
+        gt=0.0,
+        le=1.0,
+        description="The weight of the latest rate of change in its exponentially weighted moving average. Higher "
+        "values adapt faster to changes, lower values are less sensitive to noise",
+    )
+
+
+class RollupStoreSettings(BaseModel):
+    """Settings for the file storing the numeric fields of the sensor states, with rollups per minute and hour"""
+
+    enabled: bool = Field(
+        default=False,
+        description="Store the numeric fields of the sensor states on every update in a memory-mapped file of fixed "
+        "size, with their mean, min and max per minute and per hour, so that the trends survive restarts",
+    )
+    path: str = Field(default="/var/lib/rpi-mqtt/rollups.bin", description="The path of the file")
+    max_series: PositiveInt = Field(
+        default=64,
+        description="The maximum number of numeric fields stored, fields first seen when the maximum is reached are "
+        "not stored",
+    )
+    second_records: PositiveInt = Field(
+        default=3600,
+        description="The number of updates kept as recorded, the oldest are overwritten. At an update_interval of 60 "
+        "seconds, 3600 records hold 2.5 days",
+    )
+    minute_records: PositiveInt = Field(
+        default=10080, description="The number of rollups per minute kept, 10080 hold 7 days"
+    )
+    hour_records: PositiveInt = Field(
+        default=2160, description="The number of rollups per hour kept, 2160 hold 90 days"
+    )
+    sync_interval: PositiveFloat = Field(
+        default=300.0,
+        description="The seconds between two writes of the new records to the file, longer intervals write the SD card "
+        "less often and lose more records on a crash. With the defaults the file takes about 10 MiB",
+    )
 
 
 class SensorsMonitoringSettings(BaseModel):
@@ -78,8 +167,20 @@ class SensorsMonitoringSettings(BaseModel):
 
     boot_loader: bool = Field(default=True, description="Enable the bootloader sensor")
     cpu_use: bool = Field(default=True, description="Enable the CPU usage sensor")
+    cpu_use_breakdown: bool = Field(
+        default=True, description="Enable the CPU usage breakdown sensor, with the usage per state and per core"
+    )
     cpu_load: bool = Field(default=True, description="Enable the CPU load sensor")
     disk: bool = Field(default=True, description="Enable the disk usage sensor")
+    disk_mounts: bool = Field(default=True, description="Enable the disk usage sensor of multiple mount points")
+    disk_mount_points: list[str] = Field(
+        default=[],
+        description="The mount points of the disk mounts sensor (e.g. ['/', '/mnt/usb']). If empty, all filesystems "
+        "mounted from block devices.",
+    )
+    disk_io: bool = Field(
+        default=True, description="Enable the disk I/O sensor, with the throughput, IOPS and latency per block device"
+    )
     fan: bool = Field(default=True, description="Enable the fan speed sensor")
     memory: bool = Field(default=True, description="Enable the memory usage sensor")
     rpi_model: bool = Field(default=True, description="Enable the Rpi model sensor")
@@ -88,12 +189,176 @@ class SensorsMonitoringSettings(BaseModel):
     ethernet_mac_address: bool = Field(default=True, description="Enable the ethernet mac address sensor")
     wifi_mac_address: bool = Field(default=True, description="Enable the wifi mac address sensor")
     wifi_connection: bool = Field(default=True, description="Enable the wifi connection info sensor")
+    wifi_interfaces: bool = Field(
+        default=True, description="Enable the wifi connection info sensor of all wireless interfaces, requires nl80211"
+    )
+    network_interfaces: bool = Field(
+        default=True, description="Enable the network interfaces sensor, with the IPv4 and IPv6 addresses"
+    )
+    network_throughput: bool = Field(
+        default=True, description="Enable the network throughput sensor, with the traffic rates per interface"
+    )
     os_kernel: bool = Field(default=True, description="Enable the os kernel sensor")
     os_release: bool = Field(default=True, description="Enable the os release sensor")
     available_updates: bool = Field(default=True, description="Enable the available updates sensor")
+    available_update_packages: bool = Field(
+        default=True, description="Enable the available update packages sensor, with the names of the packages"
+    )
     boot_time: bool = Field(default=True, description="Enable the boot time sensor")
     temperature: bool = Field(default=True, description="Enable the temperature sensor")
     throttle: bool = Field(default=True, description="Enable the throttling sensor")
+    update_intervals: dict[str, PositiveInt] = Field(
+        default={},
+        description="Override the refresh interval in seconds per sensor, keyed by sensor name (e.g. rpi_model: 3600). "
+        "Sensors refresh at most once per script update_interval.",
+    )
+    adaptive_update_intervals: dict[str, AdaptiveUpdateInterval] = Field(
+        default={},
+        description="Adapt the refresh interval to the rate of change of the value per sensor, keyed by sensor name. "
+        "Supported by the temperature, cpu_use_pct and cpu_load_avg sensors. Overrides update_intervals.",
+    )
+    sampled_sensors: list[str] = Field(
+        default=[],
+        description="Sample the numeric fields of the sensors locally every sample_interval, keyed by sensor name "
+        "(e.g. ['cpu_use_breakdown', 'temperature']), and publish the mean, min, max, p95, stddev and count of the "
+        "samples since the previous update in the 'stats' of the sensor state. Sensors with a plain value as state, "
+        "such as cpu_use_pct, have no 'stats'",
+    )
+    sample_interval: PositiveFloat = Field(default=1.0, description="The seconds between two samples")
+    sample_buffer_size: PositiveInt = Field(
+        default=600,
+        description="The maximum number of samples kept per field between two updates, the oldest are overwritten",
+    )
+    history_sensors: list[str] = Field(
+        default=[],
+        description="Keep the history of the numeric fields of the sensors in memory, keyed by sensor name (e.g. "
+        "['temperature', 'cpu_use_pct'])",
+    )
+    history_size_kib: PositiveInt = Field(
+        default=256,
+        description="The memory in KiB preallocated for the history per numeric field, the oldest samples are dropped "
+        "when full. 24 hours of a temperature sampled every second take about 200 KiB",
+    )
+    rollup_store: RollupStoreSettings = Field(
+        default=RollupStoreSettings(),
+        description="Settings for the file storing the numeric fields of the sensor states, with rollups per minute "
+        "and hour",
+    )
+
+
+class OverflowPolicy(str, Enum):
+    """Enum for available policies when publishing to a full publish queue"""
+
+    DROP_OLDEST = "drop_oldest"
+    LATEST_PER_TOPIC = "latest_per_topic"
+    BLOCK = "block"
+
+
+class PublishMode(str, Enum):
+    """Enum for available modes of publishing the sensor states"""
+
+    FULL = "full"
+    CHANGED = "changed"
+
+
+class TopicLayout(str, Enum):
+    """Enum for available layouts of the sensor states topics"""
+
+    MONITOR = "monitor"
+    SENSOR = "sensor"
+    FIELD = "field"
+
+
+class Deadband(BaseModel):
+    """Deadband of a numeric field of the sensor states, a change within is not published"""
+
+    absolute: NonNegativeFloat = Field(
+        default=0.0, description="The change from the last published value not published, in units of the field"
+    )
+    relative_pct: NonNegativeFloat = Field(
+        default=0.0,
+        description="The change from the last published value not published, in percentage of the last published "
+        "value. The larger of the absolute and relative deadband applies",
+    )
+
+
+class OfflineBufferSettings(BaseModel):
+    """Settings for buffering the messages on disk while disconnected from the MQTT broker"""
+
+    enabled: bool = Field(
+        default=False,
+        description="Write the messages published while disconnected from the MQTT broker to a log of segment files on "
+        "disk instead of the publish queue, and replay them in order once connected again. The buffered messages "
+        "survive restarts",
+    )
+    directory: str = Field(default="/var/lib/rpi-mqtt/offline", description="The directory of the segment files")
+    segment_size_kib: PositiveInt = Field(
+        default=1024, description="The size in KiB after which a new segment file is started"
+    )
+    max_segments: PositiveInt = Field(
+        default=64,
+        description="The maximum number of segment files, the oldest segment is deleted with its messages when full",
+    )
+    replay_rate: PositiveFloat = Field(
+        default=20.0,
+        description="The messages per second replayed once connected again, so that the MQTT broker and the consumers "
+        "are not flooded. Messages published meanwhile are published after the replay",
+    )
+
+
+class PublishSettings(BaseModel):
+    """Settings for publishing messages to the MQTT broker"""
+
+    queue_size: PositiveInt = Field(
+        default=100, description="The maximum number of messages waiting in the queue to be published"
+    )
+    overflow_policy: OverflowPolicy = Field(
+        default=OverflowPolicy.LATEST_PER_TOPIC,
+        description="When the queue is full, drop the oldest message (drop_oldest), replace a queued message for the "
+        "same topic and otherwise drop the oldest (latest_per_topic), or wait for free space up to block_timeout "
+        "and drop the new message (block). While disconnected, block drops the new message without waiting",
+    )
+    block_timeout: PositiveFloat = Field(
+        default=5.0, description="The seconds to wait for free space in the queue with the block overflow policy"
+    )
+    publish_timeout: PositiveFloat = Field(
+        default=5.0, description="The seconds to wait for the MQTT broker to acknowledge a published message"
+    )
+    mode: PublishMode = Field(
+        default=PublishMode.FULL,
+        description="Publish the states of all sensors on every update (full), or only the sensors whose state changed "
+        "since last published, with all sensors again as keyframe every keyframe_interval (changed)",
+    )
+    keyframe_interval: PositiveFloat = Field(
+        default=600.0, description="The seconds after which the states of all sensors are published in changed mode"
+    )
+    topic_layout: TopicLayout = Field(
+        default=TopicLayout.MONITOR,
+        description="Publish the states of all sensors as one message to the monitor topic (monitor), the state of "
+        "each sensor to its own topic below the sensor states base topic (sensor), or each scalar field of the sensor "
+        "states to its own topic (field). The queue_size should exceed the number of topics",
+    )
+    monitor_topic: bool = Field(
+        default=True,
+        description="Publish the states of all sensors to the monitor topic too, with the sensor and field topic "
+        "layouts",
+    )
+    deadbands: dict[str, Deadband] = Field(
+        default={},
+        description="Deadbands of the numeric fields of the sensor states in changed mode, keyed by the path of the "
+        "field (e.g. memory_use.used_pct) or of its sensor (e.g. temperature), wildcards allowed (e.g. "
+        "network_throughput.*.rx_bytes_per_sec). A value within the deadband of the last published value is not "
+        "published, the last published value is kept instead",
+    )
+    max_silence: PositiveFloat = Field(
+        default=300.0,
+        description="The seconds after which a value within the deadband of the last published value is published "
+        "anyway, so that a small lasting change is published eventually. Keyframes publish the values as read",
+    )
+    offline_buffer: OfflineBufferSettings = Field(
+        default=OfflineBufferSettings(),
+        description="Settings for buffering the messages on disk while disconnected from the MQTT broker",
+    )
 
 
 class Settings(BaseModel):
@@ -104,3 +369,6 @@ class Settings(BaseModel):
     sensors: SensorsMonitoringSettings = Field(
         default=SensorsMonitoringSettings(), description="Settings for monitoring sensors"
     )
+    publish: PublishSettings = Field(
+        default=PublishSettings(), description="Settings for publishing messages to the MQTT broker"
+    )
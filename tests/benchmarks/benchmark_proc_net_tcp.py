@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Benchmark of parsing the IP address from large synthetic /proc/net/tcp tables
+
+Compares reading the whole file and matching every line with a regex against streaming the lines and stopping at the
+first established connection. The regex of the previous implementation expects ids of 4 characters, so it misses
+connections from id 10000, which is printed in the 'whole found' column. Run with:
+
+    PYTHONPATH=src poetry run python -m tests.benchmarks.benchmark_proc_net_tcp
+"""
+
+import re
+import tempfile
+import timeit
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+
+from sensors.network.sensor import _little_endian_hex_to_ip, _parse_ip_from_tcp_lines
+
+HEADER = "  sl  local_address rem_address   st tx_queue rx_queue tr tm->when retrnsmt   uid  timeout inode\n"
+LISTENING = (
+    "00000000:0016 00000000:0000 0A 00000000:00000000 00:00000000 00000000     0        0 17591 1 00000000 100 0 0"
+)
+ESTABLISHED = (
+    "8D01A8C0:0016 B801A8C0:ECA4 01 00000000:00000000 02:0001C222 00000000     0        0 46224 2 00000000 20 4"
+)
+
+TABLE_SIZES = [1_000, 10_000, 50_000]
+"""Number of connections in the synthetic tables"""
+
+ESTABLISHED_POSITIONS = [0.01, 0.5, 1.0]
+"""Position of the first established connection in the table, as share of the connections"""
+
+REPEAT = 20
+
+
+def write_table(path: Path, size: int, established_position: float):
+    """Write a table of listening connections with one established connection at the position"""
+
+    established_sl: int = min(int(size * established_position), size - 1)
+
+    with open(path, "w", encoding="ascii") as f:
+        f.write(HEADER)
+        for sl in range(size):
+            f.write(f"{sl:4d}: {ESTABLISHED if sl == established_sl else LISTENING}\n")
+
+
+def read_whole_file(path: Path) -> str:
+    """Previous implementation, reading the whole file and matching every line with an uncompiled regex"""
+
+    with open(path, "r", encoding="utf-8") as f:
+        content: str = f.read().strip("\x00")
+
+    for line in content.split("\n"):
+        mo = re.match("^.{2}(?P<id>.{2}).{2}(?P<addr>.{8})..{4} .{8}..{4} (?P<status>.{2}).*|", line, re.MULTILINE)
+        if mo and mo.group("id") != "sl" and mo.group("status") and int(mo.group("status"), 16) == 1:
+            return _little_endian_hex_to_ip(mo.group("addr"))
+
+    return ""
+
+
+def read_streaming(path: Path) -> str:
+    """Current implementation, streaming the lines until the first established connection"""
+
+    with open(path, "r", encoding="ascii") as f:
+        return _parse_ip_from_tcp_lines(f)
+
+
+def measure(function: Callable[[Path], str], path: Path) -> tuple[float, int, bool]:
+    """Returns the mean duration in milliseconds, the peak allocated memory in bytes of the function and if it found
+    the IP of the established connection"""
+
+    found: bool = "192.168.1.141" == function(path)
+    duration_sec: float = timeit.timeit(lambda: function(path), number=REPEAT) / REPEAT
+
+    tracemalloc.start()
+    function(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return duration_sec * 1000, peak, found
+
+
+def main():
+    print(
+        f"{'connections':>11} {'position':>8} {'whole ms':>9} {'stream ms':>9} {'speedup':>7} {'whole KiB':>9} "
+        f"{'stream KiB':>10} {'whole found':>11}"
+    )
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir, "tcp")
+
+        for size in TABLE_SIZES:
+            for position in ESTABLISHED_POSITIONS:
+                write_table(path, size, position)
+                whole_ms, whole_peak, whole_found = measure(read_whole_file, path)
+                stream_ms, stream_peak, stream_found = measure(read_streaming, path)
+                assert stream_found
+
+                print(
+                    f"{size:>11} {position:>8.0%} {whole_ms:>9.2f} {stream_ms:>9.2f} {whole_ms / stream_ms:>6.1f}x "
+                    f"{whole_peak / 1024:>9.0f} {stream_peak / 1024:>10.0f} {str(whole_found):>11}"
+                )
+
+
+if __name__ == "__main__":
+    main()
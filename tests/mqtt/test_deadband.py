@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Tests to verify the deadbands of the numeric fields of the sensor states"""
+
+from collections import OrderedDict
+
+from mqtt.deadband import DeadbandFilter
+from settings.types import Deadband
+
+
+def _states(temp: float, used_pct: float, up: bool = True) -> OrderedDict:
+    return OrderedDict(
+        temperature={"cpu_thermal": {"current": temp, "critical": 110.0}},
+        memory_use={"used_pct": used_pct, "total_gib": 7.86},
+        network_interfaces={"eth0": {"up": up}},
+    )
+
+
+def test_values_within_deadband_replaced_by_last_published_value():
+    deadband_filter = DeadbandFilter(
+        deadbands={"temperature": Deadband(absolute=0.5), "memory_use.used_pct": Deadband(relative_pct=10.0)},
+        max_silence=300.0,
+    )
+
+    # Call function
+    first: OrderedDict = deadband_filter.apply(_states(temp=50.0, used_pct=20.0), now=0.0)
+    within: OrderedDict = deadband_filter.apply(_states(temp=50.4, used_pct=21.9), now=10.0)
+    outside: OrderedDict = deadband_filter.apply(_states(temp=50.6, used_pct=22.1), now=20.0)
+
+    # Assert values kept within the deadbands, and fields without deadband as read
+    assert _states(temp=50.0, used_pct=20.0) == first
+    assert _states(temp=50.0, used_pct=20.0) == within
+    assert _states(temp=50.6, used_pct=22.1) == outside
+
+
+def test_slow_drift_published_when_leaving_deadband_of_last_published_value():
+    deadband_filter = DeadbandFilter(deadbands={"temperature": Deadband(absolute=0.5)}, max_silence=300.0)
+
+    # Call function, temperature rising by 0.2 per update
+    temps: list[float] = [
+        deadband_filter.apply(_states(temp=temp, used_pct=20.0), now=now)["temperature"]["cpu_thermal"]["current"]
+        for now, temp in enumerate([50.0, 50.2, 50.4, 50.6, 50.8])
+    ]
+
+    # Assert change compared with the last published value, not the previous value
+    assert [50.0, 50.0, 50.0, 50.6, 50.6] == temps
+
+
+def test_value_within_deadband_published_after_max_silence_and_on_keyframe():
+    deadband_filter = DeadbandFilter(deadbands={"temperature.*.current": Deadband(absolute=0.5)}, max_silence=300.0)
+    deadband_filter.apply(_states(temp=50.0, used_pct=20.0), now=0.0)
+
+    # Call function
+    silent: OrderedDict = deadband_filter.apply(_states(temp=50.2, used_pct=20.0), now=299.0)
+    heartbeat: OrderedDict = deadband_filter.apply(_states(temp=50.3, used_pct=20.0), now=300.0)
+    keyframe: OrderedDict = deadband_filter.apply(_states(temp=50.4, used_pct=20.0), now=310.0, keyframe=True)
+
+    # Assert value as read after max silence and on keyframe
+    assert 50.0 == silent["temperature"]["cpu_thermal"]["current"]
+    assert 50.3 == heartbeat["temperature"]["cpu_thermal"]["current"]
+    assert 50.4 == keyframe["temperature"]["cpu_thermal"]["current"]
+
+
+def test_longest_matching_pattern_applies():
+    deadband_filter = DeadbandFilter(
+        deadbands={"memory_use": Deadband(absolute=5.0), "memory_use.used_pct": Deadband(absolute=1.0)},
+        max_silence=300.0,
+    )
+    deadband_filter.apply(_states(temp=50.0, used_pct=20.0), now=0.0)
+
+    # Call function
+    states: OrderedDict = deadband_filter.apply(_states(temp=50.0, used_pct=22.0), now=10.0)
+
+    # Assert deadband of the field, not of its sensor
+    assert 22.0 == states["memory_use"]["used_pct"]
+
+
+def test_states_returned_as_is_without_deadbands():
+    deadband_filter = DeadbandFilter(deadbands={}, max_silence=300.0)
+    states: OrderedDict = _states(temp=50.0, used_pct=20.0)
+
+    # Assert
+    assert states is deadband_filter.apply(states, now=0.0)
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""Tests to verify publishing the sensor states"""
+
+import asyncio
+import json
+import threading
+from collections import OrderedDict
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from mqtt.mqtt_pub import RpiMqttPublisher
+from mqtt.publish_queue import PublishQueueStats
+from mqtt.types import RpiMqttTopics
+from settings.types import Deadband, OverflowPolicy, PublishMode, PublishSettings, TopicLayout
+from tests.utils.settings_utils import read_test_settings
+
+
+def _states(cpu_use_pct: float, hostname: str = "rpi", throttled: str = "not throttled") -> OrderedDict:
+    return OrderedDict(
+        cpu_use_pct=cpu_use_pct,
+        hostname=hostname,
+        throttled={"status": throttled},
+        metadata={"states_refresh_ts": "2024-01-22T12:51:19+00:00", "sensors_available": 3},
+    )
+
+
+def _create_publisher(
+    mode: PublishMode,
+    keyframe_interval: float = 600.0,
+    topic_layout: TopicLayout = TopicLayout.MONITOR,
+    monitor_topic: bool = True,
+    deadbands: dict[str, Deadband] | None = None,
+) -> RpiMqttPublisher:
+    all_sensors = MagicMock()
+    all_sensors.available_sensors = []
+    publish_settings = PublishSettings(
+        mode=mode,
+        keyframe_interval=keyframe_interval,
+        topic_layout=topic_layout,
+        monitor_topic=monitor_topic,
+        deadbands=deadbands or {},
+    )
+    mqtt_topics = RpiMqttTopics(mqtt_settings=read_test_settings().mqtt, sensor_name="rpi", topic_layout=topic_layout)
+
+    with patch("mqtt.mqtt_pub.PublishQueue") as publish_queue_mock:
+        publish_queue_mock.return_value.stats = PublishQueueStats()
+        # noinspection PyTypeChecker
+        return RpiMqttPublisher(
+            mqtt_client=MagicMock(),
+            mqtt_topics=mqtt_topics,
+            all_sensors=all_sensors,
+            publish_settings=publish_settings,
+        )
+
+
+def _published_payloads(publisher: RpiMqttPublisher) -> list[dict]:
+    return [json.loads(call.args[0].payload) for call in publisher.publish_queue.put.call_args_list]
+
+
+def _published_messages(publisher: RpiMqttPublisher) -> list[tuple[str, str]]:
+    return [(call.args[0].topic, call.args[0].payload) for call in publisher.publish_queue.put.call_args_list]
+
+
+def test_publish_all_sensor_states_in_full_mode():
+    publisher = _create_publisher(mode=PublishMode.FULL)
+    publisher.all_sensors.as_dict.side_effect = [_states(10.0), _states(10.0)]
+
+    # Call function
+    publisher.pub_sensor_updates()
+    publisher.pub_sensor_updates()
+
+    # Assert unchanged states published again, without keyframe flag
+    assert [json.loads(json.dumps(_states(10.0)))] * 2 == _published_payloads(publisher)
+
+
+@patch("mqtt.mqtt_pub.monotonic")
+def test_publish_changed_sensor_states_with_keyframes(mock_monotonic):
+    publisher = _create_publisher(mode=PublishMode.CHANGED, keyframe_interval=600.0)
+    publisher.all_sensors.as_dict.side_effect = [_states(10.0), _states(12.5), _states(12.5), _states(12.5)]
+
+    # Call function, second and third publish within keyframe interval, fourth after
+    for now in [100.0, 160.0, 220.0, 700.0]:
+        mock_monotonic.return_value = now
+        publisher.pub_sensor_updates()
+
+    # Assert keyframe with all states, then changed states and metadata only, then keyframe again
+    payloads: list[dict] = _published_payloads(publisher)
+    assert ["cpu_use_pct", "hostname", "throttled", "metadata"] == list(payloads[0])
+    assert {"cpu_use_pct": 12.5, "metadata": payloads[1]["metadata"]} == payloads[1]
+    assert ["metadata"] == list(payloads[2])
+    assert ["cpu_use_pct", "hostname", "throttled", "metadata"] == list(payloads[3])
+    assert [True, False, False, True] == [payload["metadata"]["keyframe"] for payload in payloads]
+    assert 3 == payloads[1]["metadata"]["sensors_available"]
+
+
+@patch("mqtt.mqtt_pub.monotonic", return_value=100.0)
+def test_publish_changed_sensor_states_with_discovered_sensors(_):
+    publisher = _create_publisher(mode=PublishMode.CHANGED)
+    throttle_sensor = MagicMock()
+    throttle_sensor.name = "throttled"
+    throttle_sensor.mqtt_discovery_messages.return_value = [MagicMock(topic="discovery", payload={})]
+    publisher.all_sensors.available_sensors = [throttle_sensor]
+    publisher.all_sensors.as_dict.side_effect = [_states(10.0), _states(10.0)]
+
+    # Call function
+    publisher.pub_sensor_updates()
+    publisher.pub_discovery_message()
+    publisher.pub_sensor_updates()
+
+    # Assert unchanged state of discovered sensor published, as read by the templates of its entities
+    assert ["throttled", "metadata"] == list(_published_payloads(publisher)[1])
+
+
+@patch("mqtt.mqtt_pub.monotonic", return_value=100.0)
+def test_publish_keyframe_after_lost_messages(_):
+    publisher = _create_publisher(mode=PublishMode.CHANGED)
+    publisher.all_sensors.as_dict.side_effect = [_states(10.0), _states(10.0), _states(10.0)]
+
+    # Call function, publish queue dropping a message after the first publish
+    publisher.pub_sensor_updates()
+    publisher.publish_queue.stats = PublishQueueStats(dropped=1)
+    publisher.pub_sensor_updates()
+    publisher.pub_sensor_updates()
+
+    # Assert keyframe published again once
+    assert [True, True, False] == [payload["metadata"]["keyframe"] for payload in _published_payloads(publisher)]
+
+
+def test_publish_sensor_states_to_sensor_topics():
+    publisher = _create_publisher(mode=PublishMode.FULL, topic_layout=TopicLayout.SENSOR, monitor_topic=False)
+    publisher.all_sensors.as_dict.side_effect = [_states(10.0)]
+
+    # Call function
+    publisher.pub_sensor_updates()
+
+    # Assert state of each sensor published as json to its own topic, without the monitor topic
+    assert [
+        ("foo/bar/sensor/rpi/cpu_use_pct", "10.0"),
+        ("foo/bar/sensor/rpi/hostname", '"rpi"'),
+        ("foo/bar/sensor/rpi/throttled", '{"status": "not throttled"}'),
+        (
+            "foo/bar/sensor/rpi/metadata",
+            '{"states_refresh_ts": "2024-01-22T12:51:19+00:00", "sensors_available": 3}',
+        ),
+    ] == _published_messages(publisher)
+
+
+def test_publish_sensor_states_to_field_topics_and_monitor_topic():
+    publisher = _create_publisher(mode=PublishMode.FULL, topic_layout=TopicLayout.FIELD)
+    publisher.all_sensors.as_dict.side_effect = [_states(10.0)]
+
+    # Call function
+    publisher.pub_sensor_updates()
+
+    # Assert monitor topic published first, then each field with strings as is
+    messages: list[tuple[str, str]] = _published_messages(publisher)
+    assert "foo/bar/sensor/rpi/monitor" == messages[0][0]
+    assert [
+        ("foo/bar/sensor/rpi/cpu_use_pct", "10.0"),
+        ("foo/bar/sensor/rpi/hostname", "rpi"),
+        ("foo/bar/sensor/rpi/throttled/status", "not throttled"),
+        ("foo/bar/sensor/rpi/metadata/states_refresh_ts", "2024-01-22T12:51:19+00:00"),
+        ("foo/bar/sensor/rpi/metadata/sensors_available", "3"),
+    ] == messages[1:]
+
+
+@patch("mqtt.mqtt_pub.monotonic", return_value=100.0)
+def test_publish_changed_fields_to_field_topics(_):
+    publisher = _create_publisher(mode=PublishMode.CHANGED, topic_layout=TopicLayout.FIELD, monitor_topic=False)
+    publisher.all_sensors.as_dict.side_effect = [_states(10.0), _states(10.0, throttled="throttled")]
+
+    # Call function
+    publisher.pub_sensor_updates()
+    publisher.pub_sensor_updates()
+
+    # Assert keyframe with all fields, then the changed field and the metadata only
+    topics: list[str] = [topic for topic, _ in _published_messages(publisher)]
+    assert 6 == topics.index("foo/bar/sensor/rpi/metadata/keyframe") + 1
+    assert [
+        ("foo/bar/sensor/rpi/throttled/status", "throttled"),
+        ("foo/bar/sensor/rpi/metadata/states_refresh_ts", "2024-01-22T12:51:19+00:00"),
+        ("foo/bar/sensor/rpi/metadata/sensors_available", "3"),
+        ("foo/bar/sensor/rpi/metadata/keyframe", "false"),
+    ] == _published_messages(publisher)[6:]
+
+
+@patch("mqtt.mqtt_pub.monotonic", return_value=100.0)
+def test_publish_changed_sensor_states_outside_deadband(_):
+    publisher = _create_publisher(mode=PublishMode.CHANGED, deadbands={"cpu_use_pct": Deadband(absolute=2.0)})
+    publisher.all_sensors.as_dict.side_effect = [_states(10.0), _states(11.5), _states(12.5)]
+
+    # Call function
+    for _ in range(3):
+        publisher.pub_sensor_updates()
+
+    # Assert change within deadband not published
+    payloads: list[dict] = _published_payloads(publisher)
+    assert ["metadata"] == list(payloads[1])
+    assert 12.5 == payloads[2]["cpu_use_pct"]
+
+
+def test_publish_network_updates_without_taking_sample_stats():
+    publisher = _create_publisher(mode=PublishMode.FULL)
+    publisher.all_sensors.as_dict.return_value = _states(10.0)
+    publisher.all_sensors.refresh_available_sensors_async = AsyncMock()
+
+    # Call function
+    publisher.pub_network_updates()
+    asyncio.run(publisher.pub_network_updates_async())
+
+    # Assert network sensors refreshed, and the stats of the sampled sensors left for the scheduled update
+    publisher.all_sensors.refresh_available_sensors.assert_called_once()
+    publisher.all_sensors.refresh_available_sensors_async.assert_awaited_once()
+    assert [((), {"take_stats": False})] * 2 == publisher.all_sensors.as_dict.call_args_list
+    assert 2 == len(_published_payloads(publisher))
+
+
+def test_publish_async_with_block_policy_keeps_event_loop_running():
+    """Test a full queue with the block overflow policy does not block the event loop reading the acknowledgements"""
+
+    all_sensors = MagicMock()
+    all_sensors.available_sensors = []
+    all_sensors.as_dict.return_value = _states(10.0)
+    publish_settings = PublishSettings(
+        topic_layout=TopicLayout.SENSOR,
+        monitor_topic=False,
+        queue_size=1,
+        overflow_policy=OverflowPolicy.BLOCK,
+        block_timeout=2.0,
+        publish_timeout=1.0,
+    )
+    mqtt_topics = RpiMqttTopics(
+        mqtt_settings=read_test_settings().mqtt, sensor_name="rpi", topic_layout=TopicLayout.SENSOR
+    )
+    mqtt_client = MagicMock()
+    mqtt_client.is_connected.return_value = True
+
+    async def _pub_sensor_updates() -> RpiMqttPublisher:
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+
+        def _publish(**_) -> MagicMock:
+            # The acknowledgement of the message is read by the event loop
+            acknowledged = threading.Event()
+            loop.call_soon_threadsafe(acknowledged.set)
+            msg_info = MagicMock()
+            msg_info.wait_for_publish.side_effect = acknowledged.wait
+            msg_info.is_published.side_effect = acknowledged.is_set
+            return msg_info
+
+        mqtt_client.publish.side_effect = _publish
+        # noinspection PyTypeChecker
+        publisher = RpiMqttPublisher(
+            mqtt_client=mqtt_client, mqtt_topics=mqtt_topics, all_sensors=all_sensors, publish_settings=publish_settings
+        )
+
+        try:
+            await publisher.pub_sensor_updates_async(refresh_sensors=False)
+        finally:
+            await asyncio.to_thread(publisher.stop_publish_queue)
+
+        return publisher
+
+    # Call function
+    stats: PublishQueueStats = asyncio.run(_pub_sensor_updates()).publish_queue.stats
+
+    # Assert all sensor topics published, none dropped or failed waiting for the acknowledgement
+    assert 4 == stats.published
+    assert 0 == stats.failed
+    assert 0 == stats.dropped
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Tests to verify the append-only log of segment files buffering the messages while disconnected"""
+
+import os
+
+from mqtt.offline_log import OfflineLog, OfflineRecord
+from settings.types import OfflineBufferSettings
+
+
+def _create_log(tmp_path, max_segments: int = 4) -> OfflineLog:
+    return OfflineLog(
+        OfflineBufferSettings(enabled=True, directory=str(tmp_path), segment_size_kib=1, max_segments=max_segments)
+    )
+
+
+def _replay(offline_log: OfflineLog) -> list[OfflineRecord]:
+    records: list[OfflineRecord] = []
+
+    while (record := offline_log.peek()) is not None:
+        records.append(record)
+        offline_log.advance()
+
+    return records
+
+
+def _segments(tmp_path) -> list[str]:
+    return sorted(name for name in os.listdir(tmp_path) if name.endswith(".seg"))
+
+
+def test_records_replayed_in_order_across_segments(tmp_path):
+    offline_log = _create_log(tmp_path)
+    records: list[OfflineRecord] = [
+        OfflineRecord(ts=1705927860.0 + index, topic="rpi/state", payload="x" * 300 + str(index), retain=index == 0)
+        for index in range(10)
+    ]
+
+    # Call function
+    for record in records:
+        offline_log.append(record)
+
+    # Assert segments of 4 records started when full, and deleted once replayed except the segment appended to
+    assert ["0000000001.seg", "0000000002.seg", "0000000003.seg"] == _segments(tmp_path)
+    assert records == _replay(offline_log)
+    assert ["0000000003.seg"] == _segments(tmp_path)
+    assert None is offline_log.peek()
+
+
+def test_oldest_segment_dropped_when_full(tmp_path):
+    offline_log = _create_log(tmp_path, max_segments=2)
+
+    # Call function
+    for index in range(12):
+        offline_log.append(OfflineRecord(ts=0.0, topic="rpi/state", payload="x" * 300 + str(index)))
+
+    # Assert
+    assert 4 == offline_log.dropped
+    assert ["x" * 300 + str(index) for index in range(4, 12)] == [record.payload for record in _replay(offline_log)]
+
+
+def test_position_kept_across_restarts(tmp_path):
+    offline_log = _create_log(tmp_path)
+    for index in range(3):
+        offline_log.append(OfflineRecord(ts=0.0, topic="rpi/state", payload=str(index)))
+    offline_log.peek()
+    offline_log.advance()
+
+    # Call function
+    offline_log.close()
+    reopened = _create_log(tmp_path)
+    reopened.append(OfflineRecord(ts=0.0, topic="rpi/state", payload="3"))
+
+    # Assert not yet replayed records of the previous run replayed first
+    assert ["1", "2", "3"] == [record.payload for record in _replay(reopened)]
+
+
+def test_torn_record_ends_segment(tmp_path):
+    offline_log = _create_log(tmp_path)
+    for index in range(2):
+        offline_log.append(OfflineRecord(ts=0.0, topic="rpi/state", payload=str(index)))
+    offline_log.close()
+
+    # Call function, the last record written partially by a crash
+    with open(tmp_path / "0000000001.seg", "r+b") as file:
+        file.truncate(os.path.getsize(tmp_path / "0000000001.seg") - 1)
+
+    # Assert
+    assert ["0"] == [record.payload for record in _replay(_create_log(tmp_path))]
+    assert [] == _segments(tmp_path)
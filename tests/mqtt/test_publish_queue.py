@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""Tests to verify the bounded publish queue"""
+
+import threading
+import time
+
+from mqtt.publish_queue import PublishMessage, PublishQueue
+from settings.types import OfflineBufferSettings, OverflowPolicy, PublishSettings
+
+
+class FakeMessageInfo:
+    """Message info acknowledged immediately"""
+
+    def wait_for_publish(self, timeout: float | None = None):
+        pass
+
+    def is_published(self) -> bool:
+        return True
+
+
+class FakeMqttClient:
+    """Mqtt client recording the published messages"""
+
+    def __init__(self, connected: bool = True):
+        self.connected = connected
+        self.published: list[tuple[str, str]] = []
+        self.lock = threading.Lock()
+
+    def is_connected(self) -> bool:
+        return self.connected
+
+    # pylint: disable=W0613
+    def publish(self, topic: str, payload: str, qos: int = 0, retain: bool = False) -> FakeMessageInfo:
+        with self.lock:
+            self.published.append((topic, payload))
+        return FakeMessageInfo()
+
+
+def _create_queue(policy: OverflowPolicy, connected: bool = False) -> tuple[PublishQueue, FakeMqttClient]:
+    mqtt_client = FakeMqttClient(connected=connected)
+    settings = PublishSettings(queue_size=2, overflow_policy=policy, block_timeout=0.1, publish_timeout=1.0)
+    # noinspection PyTypeChecker
+    return PublishQueue(mqtt_client=mqtt_client, settings=settings), mqtt_client
+
+
+def _wait_until(condition, timeout: float = 2.0) -> bool:
+    deadline: float = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_drop_oldest_policy():
+    """Test the oldest message is dropped when the queue is full"""
+
+    publish_queue, mqtt_client = _create_queue(policy=OverflowPolicy.DROP_OLDEST)
+    for payload in ["1", "2", "3"]:
+        assert publish_queue.put(PublishMessage(topic="state", payload=payload))
+
+    assert publish_queue.stats.depth == 2
+    assert publish_queue.stats.dropped == 1
+
+    mqtt_client.connected = True
+    publish_queue.start()
+    assert _wait_until(lambda: publish_queue.stats.published == 2)
+    publish_queue.stop(timeout=1.0)
+
+    assert mqtt_client.published == [("state", "2"), ("state", "3")]
+    assert publish_queue.stats.depth == 0
+
+
+def test_latest_per_topic_policy():
+    """Test a queued message is replaced by a newer message for the same topic, keeping its position"""
+
+    publish_queue, mqtt_client = _create_queue(policy=OverflowPolicy.LATEST_PER_TOPIC)
+
+    assert publish_queue.put(PublishMessage(topic="state", payload="1"))
+    assert publish_queue.put(PublishMessage(topic="lwt", payload="online"))
+    assert publish_queue.put(PublishMessage(topic="state", payload="2"))
+
+    assert publish_queue.stats.depth == 2
+    assert publish_queue.stats.dropped == 1
+
+    # Queue full with a new topic, the oldest is dropped
+    assert publish_queue.put(PublishMessage(topic="other", payload="3"))
+    assert publish_queue.stats.dropped == 2
+
+    mqtt_client.connected = True
+    publish_queue.start()
+    publish_queue.stop(timeout=1.0)
+
+    assert mqtt_client.published == [("lwt", "online"), ("other", "3")]
+
+
+def test_block_policy_drops_new_message_after_timeout():
+    """Test the producer waits for free space and drops the new message when none becomes available"""
+
+    publish_queue, _ = _create_queue(policy=OverflowPolicy.BLOCK, connected=True)
+
+    assert publish_queue.put(PublishMessage(topic="state", payload="1"))
+    assert publish_queue.put(PublishMessage(topic="state", payload="2"))
+
+    start: float = time.monotonic()
+    assert not publish_queue.put(PublishMessage(topic="state", payload="3"))
+    assert time.monotonic() - start >= 0.09
+
+    assert publish_queue.stats.depth == 2
+    assert publish_queue.stats.dropped == 1
+
+
+def test_block_policy_drops_new_message_at_once_while_disconnected():
+    """Test the producer does not wait for free space while disconnected, the worker does not empty the queue"""
+
+    publish_queue, _ = _create_queue(policy=OverflowPolicy.BLOCK)
+    publish_queue.start()
+
+    assert publish_queue.put(PublishMessage(topic="state", payload="1"))
+    assert publish_queue.put(PublishMessage(topic="state", payload="2"))
+
+    start: float = time.monotonic()
+    for payload in ["3", "4", "5", "6", "7"]:
+        assert not publish_queue.put(PublishMessage(topic="state", payload=payload))
+    duration: float = time.monotonic() - start
+    publish_queue.stop()
+
+    # Waiting for the block timeout per message would take 0.5 sec
+    assert duration < 0.05
+    assert publish_queue.stats.depth == 2
+    assert publish_queue.stats.dropped == 5
+
+
+def test_messages_held_while_disconnected():
+    """Test the worker does not publish while the client is disconnected"""
+
+    publish_queue, mqtt_client = _create_queue(policy=OverflowPolicy.DROP_OLDEST)
+    publish_queue.connection_check_interval_sec = 0.01
+    publish_queue.start()
+
+    publish_queue.put(PublishMessage(topic="state", payload="1"))
+    time.sleep(0.05)
+    assert not mqtt_client.published
+    assert publish_queue.stats.depth == 1
+
+    mqtt_client.connected = True
+    assert _wait_until(lambda: publish_queue.stats.published == 1)
+    publish_queue.stop()
+
+    assert mqtt_client.published == [("state", "1")]
+
+
+def _create_buffered_queue(tmp_path, mqtt_client: FakeMqttClient) -> PublishQueue:
+    settings = PublishSettings(
+        queue_size=10,
+        publish_timeout=1.0,
+        offline_buffer=OfflineBufferSettings(enabled=True, directory=str(tmp_path), replay_rate=100.0),
+    )
+    # noinspection PyTypeChecker
+    publish_queue = PublishQueue(mqtt_client=mqtt_client, settings=settings)
+    publish_queue.connection_check_interval_sec = 0.01
+    return publish_queue
+
+
+def test_messages_buffered_on_disk_while_disconnected(tmp_path):
+    """Test messages put while disconnected are replayed in order and at the replay rate after connecting, before
+    the messages queued meanwhile"""
+
+    mqtt_client = FakeMqttClient(connected=True)
+    publish_queue = _create_buffered_queue(tmp_path, mqtt_client)
+    assert publish_queue.put(PublishMessage(topic="state", payload="1"))
+
+    # Call function, the queued message is older than the buffered messages
+    mqtt_client.connected = False
+    for payload in ["2", "3", "4"]:
+        assert publish_queue.put(PublishMessage(topic="state", payload=payload))
+
+    assert 0 == publish_queue.stats.depth
+    assert 4 == publish_queue.stats.buffered
+
+    mqtt_client.connected = True
+    assert publish_queue.put(PublishMessage(topic="state", payload="5"))
+    start: float = time.monotonic()
+    publish_queue.start()
+    publish_queue.replay()
+    assert _wait_until(lambda: publish_queue.stats.published == 5)
+    publish_queue.stop()
+
+    # Assert
+    assert [("state", str(payload)) for payload in range(1, 6)] == mqtt_client.published
+    assert 4 == publish_queue.stats.replayed
+    assert time.monotonic() - start >= 0.03
+
+
+def test_queued_messages_buffered_when_stopped(tmp_path):
+    """Test messages left in the queue are buffered when stopped, and replayed after a restart"""
+
+    mqtt_client = FakeMqttClient(connected=False)
+    publish_queue = _create_buffered_queue(tmp_path, mqtt_client)
+    mqtt_client.connected = True
+    publish_queue.put(PublishMessage(topic="state", payload="1"))
+    mqtt_client.connected = False
+
+    # Call function
+    publish_queue.stop()
+    restarted_queue = _create_buffered_queue(tmp_path, mqtt_client)
+    mqtt_client.connected = True
+    restarted_queue.start()
+    assert _wait_until(lambda: restarted_queue.stats.replayed == 1)
+    restarted_queue.stop()
+
+    # Assert
+    assert [("state", "1")] == mqtt_client.published
@@ -2,7 +2,7 @@
 """Tests to verify the RPI Mqtt topic configuration"""
 
 from mqtt.types import RpiMqttTopics
-from settings.types import MqttSettings, Settings
+from settings.types import MqttSettings, Settings, TopicLayout
 from tests.utils.settings_utils import read_test_settings
 
 # Sample settings file
@@ -42,3 +42,45 @@ def test_mqtt_discovery_topic():
     discovery_topic = topics.discovery_topic(component="binary_sensor", unique_id="update_available")
 
     assert discovery_topic == "homeassistant/binary_sensor/my_sensor/update_available/config"
+
+
+def test_mqtt_sensor_state_topics():
+    """Test Mqtt topics of the sensor states with the sensor and field topic layouts"""
+
+    # Create instance
+    topics: RpiMqttTopics = RpiMqttTopics(
+        mqtt_settings=mqtt_settings, sensor_name="my_sensor", topic_layout=TopicLayout.FIELD
+    )
+
+    # Assert topic names, with the characters not allowed within a topic level replaced
+    assert topics.sensor_state_topic("throttled") == "foo/bar/sensor/my_sensor/throttled"
+    assert topics.sensor_state_topic("memory_use", "used_pct") == "foo/bar/sensor/my_sensor/memory_use/used_pct"
+    assert topics.sensor_state_topic("disk_mounts", "/mnt/usb+", "used_pct") == (
+        "foo/bar/sensor/my_sensor/disk_mounts/_mnt_usb_/used_pct"
+    )
+
+
+def test_mqtt_discovery_state_per_topic_layout():
+    """Test state topic and templates of discovery entities for each topic layout"""
+
+    expected: dict[TopicLayout, tuple] = {
+        TopicLayout.MONITOR: (
+            ("~/monitor", "{{ value_json.throttled.status }}"),
+            ("~/monitor", "{{ value_json.throttled | tojson }}"),
+        ),
+        TopicLayout.SENSOR: (
+            ("~/throttled", "{{ value_json.status }}"),
+            ("~/throttled", "{{ value_json | tojson }}"),
+        ),
+        TopicLayout.FIELD: (("~/throttled/status", "{{ value }}"), (None, None)),
+    }
+
+    for topic_layout, (state, json_attributes) in expected.items():
+        # Create instance
+        topics: RpiMqttTopics = RpiMqttTopics(
+            mqtt_settings=mqtt_settings, sensor_name="my_sensor", topic_layout=topic_layout
+        )
+
+        # Assert discovery state and json attributes
+        assert topics.discovery_state("throttled", "status") == state
+        assert topics.discovery_json_attributes("throttled") == json_attributes
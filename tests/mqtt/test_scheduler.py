@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""Tests to verify the fixed rate scheduler"""
+
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+from mqtt.scheduler import STATS_LOG_INTERVAL_SEC, FixedRateSchedule, FixedRateScheduler, tick
+
+
+def test_schedule_deadlines_do_not_drift():
+    """Test deadlines stay at fixed offsets from the start regardless of execution duration"""
+
+    schedule = FixedRateSchedule(interval=10.0, start=100.0)
+    assert schedule.next_deadline == 110.0
+    assert schedule.seconds_until_next(now=104.0) == 6.0
+
+    # Each execution starts a bit late and takes a few seconds
+    for tick in range(1, 4):
+        deadline: float = 100.0 + tick * 10.0
+        schedule.begin_tick(now=deadline + 0.5)
+        assert schedule.end_tick(now=deadline + 3.0, failed=False) == 0
+
+    assert schedule.next_deadline == 140.0
+    assert schedule.seconds_until_next(now=141.0) == 0.0
+
+    stats = schedule.stats
+    assert stats.runs == 3
+    assert stats.failures == 0
+    assert stats.missed_ticks == 0
+    assert stats.last_lateness_sec == 0.5
+
+
+def test_schedule_coalesces_missed_ticks():
+    """Test ticks passing while the function overruns are skipped, not executed back-to-back"""
+
+    schedule = FixedRateSchedule(interval=10.0, start=0.0)
+
+    schedule.begin_tick(now=12.0)
+    assert schedule.end_tick(now=35.0, failed=True) == 2
+
+    assert schedule.next_deadline == 40.0
+    stats = schedule.stats
+    assert stats.runs == 1
+    assert stats.failures == 1
+    assert stats.missed_ticks == 2
+    assert stats.max_lateness_sec == 2.0
+
+
+def test_schedule_stats_is_a_copy():
+    """Test the stats returned cannot modify the schedule"""
+
+    schedule = FixedRateSchedule(interval=1.0, start=0.0)
+    schedule.stats.runs = 5
+
+    assert schedule.stats.runs == 0
+
+
+@patch("mqtt.scheduler.monotonic")
+def test_tick_records_failure_and_logs_stats(mock_monotonic):
+    """Test an exception raised in the tick is logged and counted, and the counters logged once per interval"""
+
+    logger = MagicMock()
+    schedule = FixedRateSchedule(interval=10.0, start=0.0)
+
+    # Call function, a failing tick and a tick after the counters are due
+    mock_monotonic.return_value = 10.0
+    with tick(schedule=schedule, logger=logger):
+        raise RuntimeError("sensor failure")
+
+    assert schedule.stats.failures == 1
+    logger.error.assert_called_once()
+    logger.info.assert_not_called()
+
+    mock_monotonic.return_value = STATS_LOG_INTERVAL_SEC
+    with tick(schedule=schedule, logger=logger):
+        pass
+
+    # Assert
+    assert schedule.stats.runs == 2
+    assert schedule.stats.missed_ticks > 0
+    logger.warning.assert_called_once()
+    assert 2 == logger.info.call_count
+    assert (2, 1) == logger.info.call_args.args[1:3]
+
+
+def test_scheduler_survives_failing_function():
+    """Test the scheduler keeps running after the function raises an exception"""
+
+    calls: list[int] = []
+    called_twice = threading.Event()
+
+    def failing_function():
+        calls.append(1)
+        if len(calls) >= 2:
+            called_twice.set()
+        raise RuntimeError("sensor failure")
+
+    scheduler = FixedRateScheduler(name="test_scheduler", interval=0.05, function=failing_function)
+    scheduler.start()
+
+    try:
+        assert called_twice.wait(timeout=2.0)
+    finally:
+        scheduler.cancel()
+        scheduler.join(timeout=2.0)
+
+    assert not scheduler.is_alive()
+    assert scheduler.stats.failures >= 2
+    assert scheduler.stats.runs == scheduler.stats.failures
+
+
+def test_scheduler_cancel_stops_executions():
+    """Test no executions happen after the scheduler is cancelled"""
+
+    calls: list[int] = []
+    scheduler = FixedRateScheduler(name="test_scheduler", interval=0.05, function=lambda: calls.append(1))
+    scheduler.start()
+    scheduler.cancel()
+    scheduler.join(timeout=2.0)
+    time.sleep(0.1)
+
+    assert not scheduler.is_alive()
+    assert not calls
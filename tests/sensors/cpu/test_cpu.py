@@ -1,64 +1,105 @@
 #!/usr/bin/env python3
 """Tests to verify the RPI CPU usage readings"""
-import importlib
-from unittest.mock import MagicMock
 
-import psutil
+from pathlib import Path
+
 import pytest
 
-from sensors.cpu.sensor import CpuLoadAvgSensor, CpuUsePctSensor
-from sensors.cpu.types import LoadAverage
+from sensors.cpu.sensor import CpuLoadAvgSensor, CpuUseBreakdownSensor, CpuUsePctSensor, parse_cpu_times
+from sensors.cpu.types import CpuTimes, CpuUsage, LoadAverage
 from sensors.types import SensorNotAvailableException
+from tests.utils.procfs_utils import fake_procfs
 
+PROC_STAT_BOOT = """cpu  1000 0 500 8000 100 0 0 0 0 0
+cpu0 600 0 200 3900 50 0 0 0 0 0
+cpu1 400 0 300 4100 50 0 0 0 0 0
+intr 162812 0 0 0
+ctxt 426616
+"""
 
-def test_read_cpu_use_percent():
-    # Mock psutil
-    psutil.cpu_percent = MagicMock(return_value=0.2)
+# 1000 ticks passed: cpu0 fully busy, cpu1 idle except 100 ticks of iowait
+PROC_STAT_TICK = """cpu  1400 100 900 8900 200 50 50 0 0 0
+cpu0 1000 100 600 3900 50 50 50 0 0 0
+cpu1 400 0 300 5000 150 0 0 0 0 0
+intr 172812 0 0 0
+ctxt 436616
+"""
 
-    # Call function
-    cpu_pct_sensor = CpuUsePctSensor(enabled=True)
+
+def test_read_cpu_use_percent(tmp_path):
+    procfs = fake_procfs(root=tmp_path, stat=PROC_STAT_BOOT)
+
+    # Call function, first state covers the time since boot
+    cpu_pct_sensor = CpuUsePctSensor(enabled=True, procfs=procfs)
+    assert 15.62 == cpu_pct_sensor.state
+
+    Path(tmp_path, "stat").write_text(PROC_STAT_TICK)
     cpu_pct_sensor.refresh_state()
-    cpu_use_percent: float = cpu_pct_sensor.state
 
-    # Assert
-    assert 0.2 == cpu_use_percent
+    # Assert utilization since previous refresh as plain value
+    assert 50.0 == cpu_pct_sensor.state
+    assert 50.0 == cpu_pct_sensor.state_as_dict
+    assert 50.0 == cpu_pct_sensor.adaptive_value()
 
 
-def test_read_cpu_use_percent_as_dict():
-    # Mock psutil
-    psutil.cpu_percent = MagicMock(return_value=0.2)
+def test_read_cpu_use_breakdown(tmp_path):
+    procfs = fake_procfs(root=tmp_path, stat=PROC_STAT_BOOT)
 
     # Call function
-    cpu_pct_sensor = CpuUsePctSensor(enabled=True)
-    cpu_pct_sensor.refresh_state()
-    cpu_use_percent: float = cpu_pct_sensor.state_as_dict
+    cpu_breakdown_sensor = CpuUseBreakdownSensor(enabled=True, procfs=procfs)
+    Path(tmp_path, "stat").write_text(PROC_STAT_TICK)
+    cpu_breakdown_sensor.refresh_state()
+    cpu_usage: CpuUsage = cpu_breakdown_sensor.state
+
+    # Assert utilization since previous refresh
+    assert 50.0 == cpu_usage.use_pct
+    assert 25.0 == cpu_usage.user_pct
+    assert 20.0 == cpu_usage.system_pct
+    assert 5.0 == cpu_usage.iowait_pct
+    assert 5.0 == cpu_usage.irq_pct
+    assert 0.0 == cpu_usage.steal_pct
+    assert [100.0, 0.0] == cpu_usage.cores_use_pct
+
+
+def test_read_cpu_use_breakdown_as_dict(tmp_path):
+    procfs = fake_procfs(root=tmp_path, stat=PROC_STAT_BOOT)
+
+    # Call function, without any time passed
+    cpu_breakdown_sensor = CpuUseBreakdownSensor(enabled=True, procfs=procfs)
+    cpu_breakdown_sensor.refresh_state()
+    cpu_use_breakdown: dict = cpu_breakdown_sensor.state_as_dict
+
+    # Assert
+    assert 0.0 == cpu_use_breakdown["use_pct"]
+    assert [0.0, 0.0] == cpu_use_breakdown["cores_use_pct"]
+
+
+def test_parse_cpu_times_of_older_kernel():
+    # Call function, kernel not reporting steal, guest and guest_nice
+    cpu_times: dict[str, CpuTimes] = parse_cpu_times("cpu  10 1 5 100 2 0 1\ncpu0 10 1 5 100 2 0 1\n")
 
     # Assert
-    assert 0.2 == cpu_use_percent
+    assert ["cpu", "cpu0"] == list(cpu_times)
+    assert CpuTimes(user=10, nice=1, system=5, idle=100, iowait=2, irq=0, softirq=1, steal=0) == cpu_times["cpu"]
+    assert 119 == cpu_times["cpu"].total
+    assert 17 == cpu_times["cpu"].busy
 
 
-def test_read_cpu_use_percent_not_available_for_platform():
-    # Mock psutil
-    # Make sure that sensors_fans attribute is deleted if it exists (depending on the platform tests are run)
-    if hasattr(psutil, "cpu_percent"):
-        del psutil.cpu_percent
+def test_read_cpu_use_percent_not_available_for_platform(tmp_path):
+    procfs = fake_procfs(root=tmp_path, stat=None)
 
     # Call function
     with pytest.raises(SensorNotAvailableException) as exec_info:
-        cpu_pct_sensor = CpuUsePctSensor(enabled=True)
+        cpu_pct_sensor = CpuUsePctSensor(enabled=True, procfs=procfs)
         cpu_pct_sensor.refresh_state()
 
     # Assert error message
-    assert "cpu_percent() not available for this Rpi" in str(exec_info)
+    assert "/proc/stat not available for this Rpi" in str(exec_info)
 
 
-def test_read_load_average():
-    # Mock psutil
-    psutil.cpu_count = MagicMock(return_value=4)
-    psutil.getloadavg = MagicMock(return_value=(0.28125, 0.0771484375, 0.02490234375))
-
+def test_read_load_average(tmp_path):
     # Call function
-    cpu_load_avg_sensor = CpuLoadAvgSensor(enabled=True)
+    cpu_load_avg_sensor = CpuLoadAvgSensor(enabled=True, procfs=fake_procfs(root=tmp_path))
     cpu_load_avg_sensor.refresh_state()
     load_average: LoadAverage = cpu_load_avg_sensor.state
 
@@ -67,15 +108,12 @@ def test_read_load_average():
     assert 7.03 == load_average.load_1min_pct
     assert 1.93 == load_average.load_5min_pct
     assert 0.62 == load_average.load_15min_pct
+    assert 7.03 == cpu_load_avg_sensor.adaptive_value()
 
 
-def test_read_load_average_as_dict():
-    # Mock psutil
-    psutil.cpu_count = MagicMock(return_value=4)
-    psutil.getloadavg = MagicMock(return_value=(0.28125, 0.0771484375, 0.02490234375))
-
+def test_read_load_average_as_dict(tmp_path):
     # Call function
-    cpu_load_avg_sensor = CpuLoadAvgSensor(enabled=True)
+    cpu_load_avg_sensor = CpuLoadAvgSensor(enabled=True, procfs=fake_procfs(root=tmp_path))
     cpu_load_avg_sensor.refresh_state()
     load_average: dict = cpu_load_avg_sensor.state_as_dict
 
@@ -86,34 +124,25 @@ def test_read_load_average_as_dict():
     assert 0.62 == load_average["load_15min_pct"]
 
 
-def test_read_load_average_cpu_count_not_available_for_platform():
-    # Mock psutil
-    # Make sure that attribute is deleted if it exists (depending on the platform tests are run)
-    importlib.reload(psutil)
-    if hasattr(psutil, "cpu_count"):
-        del psutil.cpu_count
+def test_read_load_average_cpu_count_not_available_for_platform(tmp_path):
+    procfs = fake_procfs(root=tmp_path, stat="intr 162812 0 0 0\n")
 
     # Call function
     with pytest.raises(SensorNotAvailableException) as exec_info:
-        cpu_load_avg_sensor = CpuLoadAvgSensor(enabled=True)
+        cpu_load_avg_sensor = CpuLoadAvgSensor(enabled=True, procfs=procfs)
         cpu_load_avg_sensor.refresh_state()
-        CpuLoadAvgSensor(enabled=True).refresh_state()
 
     # Assert error message
-    assert "cpu_count() not available for this Rpi" in str(exec_info)
+    assert "none cpu core line" in str(exec_info)
 
 
-def test_read_load_average_getloadavg_not_available_for_platform():
-    # Mock psutil
-    # Make sure that attribute is deleted if it exists (depending on the platform tests are run)
-    importlib.reload(psutil)
-    if hasattr(psutil, "getloadavg"):
-        del psutil.getloadavg
+def test_read_load_average_getloadavg_not_available_for_platform(tmp_path):
+    procfs = fake_procfs(root=tmp_path, loadavg=None)
 
     # Call function
     with pytest.raises(SensorNotAvailableException) as exec_info:
-        cpu_load_avg_sensor = CpuLoadAvgSensor(enabled=True)
+        cpu_load_avg_sensor = CpuLoadAvgSensor(enabled=True, procfs=procfs)
         cpu_load_avg_sensor.refresh_state()
 
     # Assert error message
-    assert "getloadavg() not available for this Rpi" in str(exec_info)
+    assert "load average not available for this Rpi" in str(exec_info)
@@ -1,15 +1,19 @@
 #!/usr/bin/env python3
 """Tests to verify the RPI disk usage readings"""
 
+import json
+import os
 from collections import namedtuple
-from unittest.mock import MagicMock
+from pathlib import Path
+from unittest.mock import MagicMock, patch
 
 import psutil
 import pytest
 
-from sensors.disk.sensor import DiskUseSensor
+from sensors.disk.sensor import DiskIoSensor, DiskMountsSensor, DiskUseSensor, parse_disk_counters
 from sensors.disk.types import DiskUse
 from sensors.types import SensorNotAvailableException
+from tests.utils.procfs_utils import PROC_DISKSTATS, PROC_MOUNTINFO, fake_procfs
 
 
 def test_read_disk_use():
@@ -44,3 +48,133 @@ def test_read_disk_not_available_for_platform():
 
     # Assert error message
     assert "disk_usage() not available for this Rpi" in str(exec_info)
+
+
+def _statvfs(blocks: int, bfree: int, bavail: int) -> os.statvfs_result:
+    return os.statvfs_result((4096, 4096, blocks, bfree, bavail, 0, 0, 0, 0, 255))
+
+
+@patch("sensors.disk.sensor.os.statvfs")
+def test_read_disk_mounts_of_block_devices(mock_statvfs, tmp_path):
+    mock_statvfs.return_value = _statvfs(blocks=7521863, bfree=4655979, bavail=4268924)
+
+    # Call function
+    disk_mounts_sensor = DiskMountsSensor(enabled=True, procfs=fake_procfs(root=tmp_path))
+    disk_mounts: dict = disk_mounts_sensor.state_as_dict
+
+    # Assert filesystems of block devices, without pseudo filesystems and bind mounts of sub-directories
+    assert ["/", "/boot/firmware", "/mnt/usb drive"] == list(disk_mounts)
+    assert {"path": "/", "total_gib": 28.69, "used_gib": 10.93, "used_pct": 40.17, "free_gib": 16.28} == disk_mounts[
+        "/"
+    ]
+
+    # Assert mount points enumerated once
+    disk_mounts_sensor.refresh_state()
+    Path(tmp_path, "self", "mountinfo").write_text("")
+    disk_mounts_sensor.refresh_state()
+    assert 3 == len(disk_mounts_sensor.state)
+
+    # Assert JSON serialization
+    json.dumps(disk_mounts)
+
+
+@patch("sensors.disk.sensor.os.statvfs")
+def test_read_disk_mounts_enumerated_again_after_unmount(mock_statvfs, tmp_path):
+    mock_statvfs.return_value = _statvfs(1000, 500, 400)
+    disk_mounts_sensor = DiskMountsSensor(enabled=True, procfs=fake_procfs(root=tmp_path))
+
+    # Call function, after the USB drive was unmounted
+    mock_statvfs.side_effect = lambda path: _statvfs(1000, 500, 400) if path != "/mnt/usb drive" else _raise_enoent()
+    Path(tmp_path, "self", "mountinfo").write_text(PROC_MOUNTINFO.replace("/mnt/usb", "/mnt/other"))
+    disk_mounts_sensor.refresh_state()
+
+    # Assert failed mount point skipped, and mount points enumerated again
+    assert ["/", "/boot/firmware"] == list(disk_mounts_sensor.state)
+    disk_mounts_sensor.refresh_state()
+    assert ["/", "/boot/firmware", "/mnt/other drive"] == list(disk_mounts_sensor.state)
+
+
+@patch("sensors.disk.sensor.os.statvfs")
+def test_read_disk_mounts_of_configured_mount_points(mock_statvfs, tmp_path):
+    mock_statvfs.return_value = _statvfs(1000, 500, 400)
+
+    # Call function, without mountinfo
+    disk_mounts_sensor = DiskMountsSensor(
+        enabled=True, mount_points=["/", "/data"], procfs=fake_procfs(root=tmp_path, **{"self/mountinfo": None})
+    )
+
+    # Assert configured mount points only
+    assert ["/", "/data"] == list(disk_mounts_sensor.state)
+    assert 55.56 == disk_mounts_sensor.state["/data"].used_pct
+
+
+def test_read_disk_mounts_not_available_for_platform(tmp_path):
+    # Call function
+    with pytest.raises(SensorNotAvailableException) as exec_info:
+        DiskMountsSensor(enabled=True, procfs=fake_procfs(root=tmp_path, **{"self/mountinfo": None})).refresh_state()
+
+    # Assert error message
+    assert "/proc/self/mountinfo not available for this Rpi" in str(exec_info)
+
+
+def test_read_disk_io(tmp_path):
+    procfs = fake_procfs(root=tmp_path, uptime="1000.00 3900.00\n")
+
+    # Call function, first state covers the time since boot
+    disk_io_sensor = DiskIoSensor(enabled=True, procfs=procfs)
+    assert ["mmcblk0"] == list(disk_io_sensor.state)
+    assert 10.0 == disk_io_sensor.state["mmcblk0"].read_iops
+
+    # 10 seconds passed: 50 reads of 4 KiB and 20 writes of 64 KiB, busy 1.5 seconds
+    Path(tmp_path, "diskstats").write_text(
+        PROC_DISKSTATS.replace(
+            "mmcblk0 10000 500 400000 20000 2000 300 100000 40000 0 30000 60000",
+            "mmcblk0 10050 500 400400 20100 2020 300 102560 40600 1 31500 60700",
+        )
+    )
+    Path(tmp_path, "uptime").write_text("1010.00 3940.00\n")
+    disk_io_sensor.refresh_state()
+    disk_io: dict = disk_io_sensor.state_as_dict
+
+    # Assert I/O since previous refresh, without partitions and devices without I/O
+    assert {
+        "mmcblk0": {
+            "read_bytes_per_sec": 20480.0,
+            "write_bytes_per_sec": 131072.0,
+            "read_iops": 5.0,
+            "write_iops": 2.0,
+            "read_latency_ms": 2.0,
+            "write_latency_ms": 30.0,
+            "busy_pct": 15.0,
+        }
+    } == disk_io
+
+    # Assert JSON serialization
+    json.dumps(disk_io)
+
+
+def test_parse_disk_counters_of_partitions():
+    # Call function, devices with digits in their name
+    counters = parse_disk_counters(
+        " 259 0 nvme0n1 10 0 80 5 10 0 80 5 0 10 10\n"
+        " 259 1 nvme0n1p1 10 0 80 5 10 0 80 5 0 10 10\n"
+        "   8 0 sda 10 0 80 5 10 0 80 5 0 10 10\n"
+        "   8 1 sda1 10 0 80 5 10 0 80 5 0 10 10\n"
+        " 254 0 zram0 10 0 80 5 10 0 80 5 0 10 10\n"
+    )
+
+    # Assert whole devices only
+    assert ["nvme0n1", "sda", "zram0"] == list(counters)
+
+
+def test_read_disk_io_not_available_for_platform(tmp_path):
+    # Call function
+    with pytest.raises(SensorNotAvailableException) as exec_info:
+        DiskIoSensor(enabled=True, procfs=fake_procfs(root=tmp_path, diskstats=None)).refresh_state()
+
+    # Assert error message
+    assert "/proc/diskstats not available for this Rpi" in str(exec_info)
+
+
+def _raise_enoent():
+    raise FileNotFoundError(2, "No such file or directory")
@@ -1,26 +1,21 @@
 #!/usr/bin/env python3
 """Tests to verify the fans speed of Rpi hardware components"""
+
 import json
-from collections import namedtuple
 from typing import Any
-from unittest.mock import MagicMock
 
-import psutil
 import pytest
 
 from sensors.fan.sensor import FanSpeedSensor
 from sensors.fan.types import FanSpeed
+from sensors.hwmon.reader import HwmonReader
 from sensors.types import SensorNotAvailableException
+from tests.utils.hwmon_utils import fake_rpi_hwmon, write_attributes
 
 
-def test_read_fans_speed():
-    # Mock psutil
-    fans_tuple = namedtuple("sfan", ["label", "current"])
-    psutil_mock: dict[str, list[fans_tuple]] = {"pwmfan": [fans_tuple(label="", current=2998)]}
-    psutil.sensors_fans = MagicMock(return_value=psutil_mock)
-
+def test_read_fans_speed(tmp_path):
     # Call function
-    fan_speed_sensor = FanSpeedSensor(enabled=True)
+    fan_speed_sensor = FanSpeedSensor(enabled=True, hwmon=fake_rpi_hwmon(root=tmp_path))
     fan_speed_sensor.refresh_state()
     fans_speed: dict[str, FanSpeed] = fan_speed_sensor.state
 
@@ -33,14 +28,9 @@ def test_read_fans_speed():
     assert 37.48 == fans_speed["pwmfan"].curr_speed_pct
 
 
-def test_read_fans_speed_as_dict():
-    # Mock psutil
-    fans_tuple = namedtuple("sfan", ["label", "current"])
-    psutil_mock: dict[str, list[fans_tuple]] = {"pwmfan": [fans_tuple(label="", current=2998)]}
-    psutil.sensors_fans = MagicMock(return_value=psutil_mock)
-
+def test_read_fans_speed_as_dict(tmp_path):
     # Call function
-    fan_speed_sensor = FanSpeedSensor(enabled=True)
+    fan_speed_sensor = FanSpeedSensor(enabled=True, hwmon=fake_rpi_hwmon(root=tmp_path))
     fan_speed_sensor.refresh_state()
     fans_speed: dict[str, dict[str, Any]] = fan_speed_sensor.state_as_dict
 
@@ -57,31 +47,14 @@ def test_read_fans_speed_as_dict():
     json.dumps(fans_speed)
 
 
-def test_read_fans_when_no_fans():
-    # Mock psutil
-    psutil.sensors_fans = MagicMock(return_value=None)
+def test_read_fans_when_no_fans(tmp_path):
+    # Only temperature sensors
+    write_attributes(tmp_path / "hwmon" / "hwmon0", name="cpu_thermal", temp1_input="46365")
 
     # Call function
     with pytest.raises(SensorNotAvailableException) as exec_info:
-        fan_speed_sensor = FanSpeedSensor(enabled=True)
+        fan_speed_sensor = FanSpeedSensor(enabled=True, hwmon=HwmonReader(root=str(tmp_path)))
         fan_speed_sensor.refresh_state()
-        FanSpeedSensor(enabled=True).refresh_state()
 
     # Assert error message
     assert "none fans detected for this Rpi" in str(exec_info)
-
-
-def test_read_fans_fan_not_available_for_platform():
-    # Mock psutil
-    # Make sure that attribute is deleted if it exists (depending on the platform tests are run)
-    if hasattr(psutil, "sensors_fans"):
-        del psutil.sensors_fans
-
-    # Call function
-    with pytest.raises(SensorNotAvailableException) as exec_info:
-        fan_speed_sensor = FanSpeedSensor(enabled=True)
-        fan_speed_sensor.refresh_state()
-        FanSpeedSensor(enabled=True).refresh_state()
-
-    # Assert error message
-    assert "sensors_fans() not available for this Rpi" in str(exec_info)
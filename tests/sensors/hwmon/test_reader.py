@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""Tests to verify the discovery and reading of the hwmon and thermal sensor files"""
+
+import os
+import shutil
+from pathlib import Path
+from unittest.mock import patch
+
+from sensors.hwmon.reader import HwmonReader
+from tests.utils.hwmon_utils import fake_rpi_hwmon, write_attributes
+
+
+def test_discover_once_and_read_values(tmp_path):
+    reader: HwmonReader = fake_rpi_hwmon(root=tmp_path)
+
+    # Call function, reading twice
+    with patch("sensors.hwmon.reader.os.listdir", wraps=os.listdir) as mock_listdir:
+        reader.temperatures()
+        discovery_calls: int = mock_listdir.call_count
+        Path(tmp_path, "hwmon", "hwmon0", "temp1_input").write_text("47000\n")
+        temps = reader.temperatures()
+        fans = reader.fans()
+
+    reader.close()
+
+    # Assert directories walked only for the first read, new value read from the kept open file
+    assert discovery_calls == mock_listdir.call_count
+    assert [("cpu_thermal", 47.0, 110.0, 110.0), ("rp1_adc", 54.31, None, None)] == [
+        (hw_input.name, value, hw_input.high, hw_input.critical) for hw_input, value in temps
+    ]
+    assert [("pwmfan", 2998)] == [(hw_input.name, value) for hw_input, value in fans]
+
+
+def test_label_used_as_name(tmp_path):
+    write_attributes(tmp_path / "hwmon" / "hwmon0", name="coretemp", temp1_input="40000", temp1_label="Core 0")
+    write_attributes(tmp_path / "hwmon" / "hwmon0" / "device", temp2_input="41000", temp2_label="Core 1")
+    reader = HwmonReader(root=str(tmp_path))
+
+    # Call function
+    temps = reader.temperatures()
+    reader.close()
+
+    # Assert labels of the attributes in the device and sub-directory
+    assert [("Core 0", 40.0), ("Core 1", 41.0)] == [(hw_input.name, value) for hw_input, value in temps]
+
+
+def test_thermal_zones_when_none_hwmon_temperatures(tmp_path):
+    write_attributes(
+        tmp_path / "thermal" / "thermal_zone0",
+        type="cpu-thermal",
+        temp="46365",
+        trip_point_0_type="critical",
+        trip_point_0_temp="110000",
+        trip_point_1_type="high",
+        trip_point_1_temp="90000",
+    )
+    write_attributes(tmp_path / "thermal" / "cooling_device0", type="pwm-fan")
+    reader = HwmonReader(root=str(tmp_path))
+
+    # Call function
+    temps = reader.temperatures()
+    reader.close()
+
+    # Assert temperature and trip points of the thermal zone
+    assert [("cpu-thermal", 46.365, 90.0, 110.0)] == [
+        (hw_input.name, value, hw_input.high, hw_input.critical) for hw_input, value in temps
+    ]
+
+
+def test_unreadable_input_not_discovered(tmp_path):
+    write_attributes(tmp_path / "hwmon" / "hwmon0", name="cpu_thermal", temp1_input="46365", temp2_input="N/A")
+    reader = HwmonReader(root=str(tmp_path))
+
+    # Call function
+    temps = reader.temperatures()
+    reader.close()
+
+    # Assert only the readable input
+    assert ["temp1_input"] == [os.path.basename(hw_input.path) for hw_input, _ in temps]
+
+
+def test_discover_again_after_rescan_interval(tmp_path):
+    reader: HwmonReader = HwmonReader(root=str(tmp_path), rescan_interval=60)
+    write_attributes(tmp_path / "hwmon" / "hwmon0", name="cpu_thermal", temp1_input="46365")
+
+    with patch("sensors.hwmon.reader.monotonic", return_value=1000.0):
+        assert [] == reader.fans()
+
+    # Fan plugged in
+    write_attributes(tmp_path / "hwmon" / "hwmon1", name="pwmfan", fan1_input="2998")
+
+    # Assert fan discovered only after the rescan interval
+    with patch("sensors.hwmon.reader.monotonic", return_value=1059.0):
+        assert [] == reader.fans()
+
+    with patch("sensors.hwmon.reader.monotonic", return_value=1060.0):
+        assert [2998] == [value for _, value in reader.fans()]
+
+    reader.close()
+
+
+def test_discover_again_after_read_failed(tmp_path):
+    reader: HwmonReader = fake_rpi_hwmon(root=tmp_path)
+    reader.fans()
+
+    # Fan unplugged, file removed and kept open file fails to read
+    shutil.rmtree(tmp_path / "hwmon" / "hwmon2")
+
+    with patch("sensors.pseudo_files.os.preadv", side_effect=OSError(19, "No such device")):
+        assert [] == reader.fans()
+
+    # Assert files discovered again on the next read, without the unplugged fan
+    assert [] == reader.fans()
+    assert 2 == len(reader.temperatures())
+
+    reader.close()
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """Tests to verify the RPI model readings"""
 
-from unittest.mock import mock_open, patch
+from unittest.mock import patch
 
 import pytest
 
@@ -10,7 +10,7 @@ from sensors.types import SensorNotAvailableException
 
 
 # noinspection PyUnusedLocal
-@patch("builtins.open", new_callable=mock_open, read_data="\x00Raspberry Pi 5 Model B Rev 1.0\x00")
+@patch("sensors.model.sensor.pseudo_files.read", return_value="\x00Raspberry Pi 5 Model B Rev 1.0\x00")
 def test_read_rpi_model_and_strip_specific_characters(mock_file):
     # Call function
     rpi_model_sensor = RpiModelSensor(enabled=True)
@@ -21,7 +21,7 @@ def test_read_rpi_model_and_strip_specific_characters(mock_file):
     assert "Raspberry Pi 5 Model B Rev 1.0" == model
 
 
-@patch("builtins.open", side_effect=FileNotFoundError("No such file or directory"))
+@patch("sensors.model.sensor.pseudo_files.read", side_effect=FileNotFoundError("No such file or directory"))
 def test_read_model_not_available_for_platform(_):
     # Call function
     with pytest.raises(SensorNotAvailableException) as exec_info:
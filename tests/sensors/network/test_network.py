@@ -1,25 +1,50 @@
 #!/usr/bin/env python3
 """Tests to verify the network readings of Rpi"""
+
 import json
-from unittest.mock import MagicMock, mock_open, patch
+from pathlib import Path
+from unittest.mock import MagicMock, patch
 
 import pytest
 
+from sensors.network.nl80211 import NL80211_CMD_GET_INTERFACE
+from sensors.network.rtnetlink import RTM_GETLINK
 from sensors.network.sensor import (
     EthernetMacAddressSensor,
     HostnameSensor,
     IpAddressSensor,
+    NetworkInterfacesSensor,
+    NetworkThroughputSensor,
     WifiConnectionSensor,
+    WifiInterfacesSensor,
     WifiMacAddressSensor,
-    _parse_ip_from_tcp_content,
+    _parse_ip_from_tcp_lines,
+    parse_network_counters,
 )
-from sensors.network.types import WiFiConnectionInfo
+from sensors.network.types import NetworkCounters, WiFiConnectionInfo
 from sensors.types import SensorNotAvailableException
+from tests.utils.netlink_utils import (
+    NL80211_FAMILY_ID,
+    fake_rpi_monitor,
+    fake_rpi_nl80211,
+    unavailable_monitor,
+    unavailable_nl80211,
+)
+from tests.utils.procfs_utils import PROC_NET_DEV, fake_procfs
+
+# 10 seconds passed: eth0 rx bytes wrapped around at 32 bit, tx counters reset as the interface was re-created
+PROC_NET_DEV_TICK = """Inter-|   Receive                                                |  Transmit
+ face |bytes    packets errs drop fifo frame compressed multicast|bytes    packets errs drop fifo colls carrier compressed
+    lo:  112400    1124    0    0    0     0          0         0   112400    1124    0    0    0     0       0          0
+  eth0:     704  121000    3    5    0     0          0       120    50000     400    0    0    0     0       0          0
+ wlan0:    8000      20    0    0    0     0          0         0     2000      10    0    0    0     0       0          0
+ wlan1:    5000      10    0    0    0     0          0         0        0       0    0    0    0     0       0          0
+"""
 
 
 # patching 'iw' command run by the subprocess.run and reading mac address for Wi-Fi interface
 @patch("sensors.network.sensor.subprocess.run")
-@patch("builtins.open", new_callable=mock_open, read_data="a9:3a:dd:b1:cc:46")
+@patch("sensors.network.sensor.pseudo_files.read", return_value="a9:3a:dd:b1:cc:46")
 def test_read_wifi_connection_when_connected(_, mock_run):
     # Mock subprocess.run running iw to read Wi-Fi connection
     iw_mock = (
@@ -40,7 +65,9 @@ def test_read_wifi_connection_when_connected(_, mock_run):
     mock_run.return_value = mock_proc
 
     # Call function
-    wifi_connection_sensor = WifiConnectionSensor(enabled=True)
+    wifi_connection_sensor = WifiConnectionSensor(
+        enabled=True, monitor=unavailable_monitor(), nl80211=unavailable_nl80211()
+    )
     wifi_connection_sensor.refresh_state()
     wifi_info: WiFiConnectionInfo = wifi_connection_sensor.state
 
@@ -50,11 +77,13 @@ def test_read_wifi_connection_when_connected(_, mock_run):
     assert -43 == wifi_info.signal_strength_dbm
     assert 5520 == wifi_info.freq_mhz
     assert "a9:3a:dd:b1:cc:46" == wifi_info.mac_addr
+    assert 433.3 == wifi_info.tx_bitrate_mbps
+    assert 433.3 == wifi_info.rx_bitrate_mbps
 
 
 # patching 'iw' command run by the subprocess.run and reading mac address for Wi-Fi interface
 @patch("sensors.network.sensor.subprocess.run")
-@patch("builtins.open", new_callable=mock_open, read_data="a9:3a:dd:b1:cc:46")
+@patch("sensors.network.sensor.pseudo_files.read", return_value="a9:3a:dd:b1:cc:46")
 def test_read_wifi_connection_when_connected_as_dict(_, mock_run):
     # Mock subprocess.run running iw to read Wi-Fi connection
     iw_mock = (
@@ -75,7 +104,9 @@ def test_read_wifi_connection_when_connected_as_dict(_, mock_run):
     mock_run.return_value = mock_proc
 
     # Call function
-    wifi_connection_sensor = WifiConnectionSensor(enabled=True)
+    wifi_connection_sensor = WifiConnectionSensor(
+        enabled=True, monitor=unavailable_monitor(), nl80211=unavailable_nl80211()
+    )
     wifi_connection_sensor.refresh_state()
     wifi_info: dict = wifi_connection_sensor.state_as_dict
 
@@ -92,14 +123,16 @@ def test_read_wifi_connection_when_connected_as_dict(_, mock_run):
 
 # patching 'iw' command run by the subprocess.run
 @patch("sensors.network.sensor.subprocess.run")
-@patch("builtins.open", new_callable=mock_open, read_data="a9:3a:dd:b1:cc:46")
+@patch("sensors.network.sensor.pseudo_files.read", return_value="a9:3a:dd:b1:cc:46")
 def test_read_wifi_connection_when_disconnected(_, mock_run):
     # Mock subprocess.run running vcgencmd to read GPU temperature
     mock_proc = MagicMock(returncode=0, stdout="Not connected.")
     mock_run.return_value = mock_proc
 
     # Call function
-    wifi_connection_sensor = WifiConnectionSensor(enabled=True)
+    wifi_connection_sensor = WifiConnectionSensor(
+        enabled=True, monitor=unavailable_monitor(), nl80211=unavailable_nl80211()
+    )
     wifi_connection_sensor.refresh_state()
     wifi_info: WiFiConnectionInfo = wifi_connection_sensor.state
 
@@ -111,10 +144,10 @@ def test_read_wifi_connection_when_disconnected(_, mock_run):
     assert "a9:3a:dd:b1:cc:46" == wifi_info.mac_addr
 
 
-@patch("builtins.open", new_callable=mock_open, read_data="a8:3a:dd:b1:cc:45")
+@patch("sensors.network.sensor.pseudo_files.read", return_value="a8:3a:dd:b1:cc:45")
 def test_read_ethernet_mac_address_when_success(_):
     # Call function
-    ethernet_mac_address_sensor = EthernetMacAddressSensor(enabled=True)
+    ethernet_mac_address_sensor = EthernetMacAddressSensor(enabled=True, monitor=unavailable_monitor())
     ethernet_mac_address_sensor.refresh_state()
     actual_mac_address = ethernet_mac_address_sensor.state
 
@@ -122,10 +155,10 @@ def test_read_ethernet_mac_address_when_success(_):
     assert "a8:3a:dd:b1:cc:45" == actual_mac_address
 
 
-@patch("builtins.open", new_callable=mock_open, read_data="a9:3a:dd:b1:cc:46")
+@patch("sensors.network.sensor.pseudo_files.read", return_value="a9:3a:dd:b1:cc:46")
 def test_read_wifi_mac_address_when_success(_):
     # Call function
-    wifi_mac_address_sensor = EthernetMacAddressSensor(enabled=True)
+    wifi_mac_address_sensor = EthernetMacAddressSensor(enabled=True, monitor=unavailable_monitor())
     wifi_mac_address_sensor.refresh_state()
     actual_mac_address = wifi_mac_address_sensor.state
 
@@ -133,7 +166,24 @@ def test_read_wifi_mac_address_when_success(_):
     assert "a9:3a:dd:b1:cc:46" == actual_mac_address
 
 
-def test_parse_ip_from_tcp_content():
+def test_read_ip_address(tmp_path):
+    tcp_file = tmp_path / "tcp"
+    tcp_file.write_text(
+        "  sl  local_address rem_address   st tx_queue rx_queue tr tm->when retrnsmt   uid  timeout inode\n"
+        "   0: 0100007F:0277 00000000:0000 0A 00000000:00000000 00:00000000 00000000     0        0 40517 1\n"
+        "   1: 8D01A8C0:0016 B801A8C0:ECA4 01 00000000:00000000 02:0001C222 00000000     0        0 46224 2\n"
+    )
+
+    # Call function
+    with patch("sensors.network.sensor.PROC_NET_TCP_FILE", str(tcp_file)):
+        ip_address_sensor = IpAddressSensor(enabled=True, monitor=unavailable_monitor())
+        ip_address_sensor.refresh_state()
+
+    # Assert local IP of the established connection
+    assert "192.168.1.141" == ip_address_sensor.state
+
+
+def test_parse_ip_from_tcp_lines():
     tcp_content: str = (
         "  sl  local_address rem_address   st tx_queue rx_queue tr tm->when retrnsmt   uid  timeout inode\n"
         "   0: 0100007F:0277 00000000:0000 0A 00000000:00000000 00:00000000 00000000     0        0 40517 1 00000000409e6c91 100 0 0 10 0\n"
@@ -145,11 +195,35 @@ def test_parse_ip_from_tcp_content():
         "   6: 8D01A8C0:0016 B801A8C0:ED34 01 00000000:00000000 02:000291B8 00000000     0        0 51427 2 00000000b4290d70 20 7 31 10 -1\n"
     )
 
-    ip = _parse_ip_from_tcp_content(tcp_content)
+    ip = _parse_ip_from_tcp_lines(tcp_content.splitlines())
 
     assert "192.168.1.141" == ip
 
 
+def test_parse_ip_from_tcp_lines_stops_at_first_established_connection():
+    listening: str = "00000000:0016 00000000:0000 0A 00000000:00000000 00:00000000 00000000     0        0 17591 1"
+    established: str = "8D01A8C0:0016 B801A8C0:ECA4 01 00000000:00000000 02:0001C222 00000000     0        0 46224 2"
+
+    def lines():
+        yield "  sl  local_address rem_address   st tx_queue rx_queue tr tm->when retrnsmt   uid  timeout inode"
+        for sl in range(12000):
+            yield f"{sl:4d}: {listening}"
+        yield f"12000: {established}"
+        raise AssertionError("Lines read after the first established connection")
+
+    # Assert IP of the connection with id wider than 4 characters
+    assert "192.168.1.141" == _parse_ip_from_tcp_lines(lines())
+
+
+def test_parse_ip_from_tcp_lines_when_none_established_connection():
+    assert "" == _parse_ip_from_tcp_lines(
+        [
+            "  sl  local_address rem_address   st tx_queue rx_queue tr tm->when retrnsmt   uid  timeout inode",
+            "   0: 0100007F:0277 00000000:0000 0A 00000000:00000000 00:00000000 00000000     0        0 40517 1",
+        ]
+    )
+
+
 @pytest.mark.parametrize(
     "strength, quality",
     [
@@ -184,13 +258,13 @@ def test_signal_strength_quality_when_disconnected():
 def test_read_ip_address_when_not_available_for_platform(_):
     # Call function
     with pytest.raises(SensorNotAvailableException) as exec_info:
-        IpAddressSensor(enabled=True).refresh_state()
+        IpAddressSensor(enabled=True, monitor=unavailable_monitor()).refresh_state()
 
     # Assert error message
     assert "Ip address file not available for this Rpi" in str(exec_info)
 
 
-@patch("builtins.open", side_effect=FileNotFoundError("No such file or directory"))
+@patch("sensors.network.sensor.pseudo_files.read", side_effect=FileNotFoundError("No such file or directory"))
 def test_read_hostname_when_not_available_for_platform(_):
     # Call function
     with pytest.raises(SensorNotAvailableException) as exec_info:
@@ -200,21 +274,21 @@ def test_read_hostname_when_not_available_for_platform(_):
     assert "hostname file not available for this Rpi" in str(exec_info)
 
 
-@patch("builtins.open", side_effect=FileNotFoundError("No such file or directory"))
+@patch("sensors.network.sensor.pseudo_files.read", side_effect=FileNotFoundError("No such file or directory"))
 def test_read_ethernet_mac_address_when_not_available_for_platform(_):
     # Call function
     with pytest.raises(SensorNotAvailableException) as exec_info:
-        EthernetMacAddressSensor(enabled=True).refresh_state()
+        EthernetMacAddressSensor(enabled=True, monitor=unavailable_monitor()).refresh_state()
 
     # Assert error message
     assert "Failed to read mac address" in str(exec_info)
 
 
-@patch("builtins.open", side_effect=FileNotFoundError("No such file or directory"))
+@patch("sensors.network.sensor.pseudo_files.read", side_effect=FileNotFoundError("No such file or directory"))
 def test_read_wifi_mac_address_when_not_available_for_platform(_):
     # Call function
     with pytest.raises(SensorNotAvailableException) as exec_info:
-        WifiMacAddressSensor(enabled=True).refresh_state()
+        WifiMacAddressSensor(enabled=True, monitor=unavailable_monitor()).refresh_state()
 
     # Assert error message
     assert "Failed to read mac address" in str(exec_info)
@@ -224,7 +298,180 @@ def test_read_wifi_mac_address_when_not_available_for_platform(_):
 def test_read_wifi_connection_when_not_available_for_platform(_):
     # Call function
     with pytest.raises(SensorNotAvailableException) as exec_info:
-        WifiConnectionSensor(enabled=True).refresh_state()
+        WifiConnectionSensor(enabled=True, monitor=unavailable_monitor(), nl80211=unavailable_nl80211()).refresh_state()
 
     # Assert error message
     assert "Wi-Fi connection info not available for this Rpi" in str(exec_info)
+
+
+def test_read_network_sensors_from_rtnetlink():
+    monitor, _ = fake_rpi_monitor()
+
+    # Call function
+    ip_address_sensor = IpAddressSensor(enabled=True, monitor=monitor)
+    ethernet_mac_address_sensor = EthernetMacAddressSensor(enabled=True, monitor=monitor)
+    wifi_mac_address_sensor = WifiMacAddressSensor(enabled=True, monitor=monitor)
+    network_interfaces_sensor = NetworkInterfacesSensor(enabled=True, monitor=monitor)
+    monitor.close()
+
+    # Assert global IPv4 address of the interface that is up, and mac addresses of the interfaces
+    assert "192.168.1.141" == ip_address_sensor.state
+    assert "a8:3a:dd:b1:cc:45" == ethernet_mac_address_sensor.state
+    assert "a9:3a:dd:b1:cc:46" == wifi_mac_address_sensor.state
+
+    # Assert interfaces with addresses, without loopback
+    interfaces: dict = network_interfaces_sensor.state_as_dict
+    assert ["eth0", "wlan0"] == list(interfaces)
+    assert {
+        "mac_addr": "a8:3a:dd:b1:cc:45",
+        "up": True,
+        "ipv4_addrs": ["192.168.1.141/24"],
+        "ipv6_addrs": ["fe80::aa3a:ddff:feb1:cc45/64"],
+    } == interfaces["eth0"]
+    assert {"mac_addr": "a9:3a:dd:b1:cc:46", "up": False, "ipv4_addrs": [], "ipv6_addrs": []} == interfaces["wlan0"]
+
+    # Assert JSON serialization
+    json.dumps(interfaces)
+
+
+def test_read_mac_address_when_interface_not_reported_by_rtnetlink():
+    monitor, fake_socket = fake_rpi_monitor()
+    fake_socket.dumps[RTM_GETLINK] = []
+
+    # Call function
+    with pytest.raises(SensorNotAvailableException) as exec_info:
+        EthernetMacAddressSensor(enabled=True, monitor=monitor).refresh_state()
+
+    monitor.close()
+
+    # Assert error message
+    assert "Failed to read mac address for interface 'eth0'" in str(exec_info)
+
+
+def test_read_network_interfaces_when_rtnetlink_not_available_for_platform():
+    # Call function
+    with pytest.raises(SensorNotAvailableException) as exec_info:
+        NetworkInterfacesSensor(enabled=True, monitor=unavailable_monitor()).refresh_state()
+
+    # Assert error message
+    assert "rtnetlink not available for this Rpi" in str(exec_info)
+
+
+@patch("sensors.network.sensor.subprocess.run")
+def test_read_wifi_connection_from_nl80211(mock_run):
+    nl80211, _ = fake_rpi_nl80211()
+
+    # Call function
+    wifi_connection_sensor = WifiConnectionSensor(enabled=True, monitor=unavailable_monitor(), nl80211=nl80211)
+    wifi_info: dict = wifi_connection_sensor.state_as_dict
+
+    # Assert read without running 'iw'
+    mock_run.assert_not_called()
+    assert {
+        "status": "on",
+        "ssid": "MyNetwork 5G-2",
+        "signal_strength_dbm": -43,
+        "freq_mhz": 5520,
+        "mac_addr": "a9:3a:dd:b1:cc:46",
+        "tx_bitrate_mbps": 433.3,
+        "rx_bitrate_mbps": 240.0,
+        "signal_strength_quality": "Excellent",
+    } == wifi_info
+
+
+def test_read_wifi_connection_when_wlan0_not_reported_by_nl80211():
+    nl80211, fake_socket = fake_rpi_nl80211()
+    fake_socket.replies[(NL80211_FAMILY_ID, NL80211_CMD_GET_INTERFACE, None)].pop(0)
+
+    # Call function
+    with pytest.raises(SensorNotAvailableException) as exec_info:
+        WifiConnectionSensor(enabled=True, monitor=unavailable_monitor(), nl80211=nl80211).refresh_state()
+
+    # Assert error message
+    assert "Wi-Fi interface 'wlan0' not available for this Rpi" in str(exec_info)
+
+
+def test_read_wifi_interfaces_from_nl80211():
+    nl80211, _ = fake_rpi_nl80211()
+
+    # Call function
+    wifi_interfaces_sensor = WifiInterfacesSensor(enabled=True, nl80211=nl80211)
+    interfaces: dict = wifi_interfaces_sensor.state_as_dict
+
+    # Assert interfaces in station mode, with the connection of the connected one
+    assert ["wlan0", "wlan1"] == list(interfaces)
+    assert "MyNetwork 5G-2" == interfaces["wlan0"]["ssid"]
+    assert -43 == interfaces["wlan0"]["signal_strength_dbm"]
+    assert {
+        "status": "off",
+        "ssid": "",
+        "signal_strength_dbm": 0,
+        "freq_mhz": 0,
+        "mac_addr": "00:c0:ca:b1:cc:48",
+        "tx_bitrate_mbps": 0.0,
+        "rx_bitrate_mbps": 0.0,
+        "signal_strength_quality": "N/A",
+    } == interfaces["wlan1"]
+
+    # Assert JSON serialization
+    json.dumps(interfaces)
+
+
+def test_read_wifi_interfaces_when_nl80211_not_available_for_platform():
+    # Call function
+    with pytest.raises(SensorNotAvailableException) as exec_info:
+        WifiInterfacesSensor(enabled=True, nl80211=unavailable_nl80211()).refresh_state()
+
+    # Assert error message
+    assert "nl80211 not available for this Rpi" in str(exec_info)
+
+
+def test_read_network_throughput(tmp_path):
+    procfs = fake_procfs(root=tmp_path, uptime="100.00 350.00\n")
+
+    # Call function, first state covers the time since boot
+    network_throughput_sensor = NetworkThroughputSensor(enabled=True, procfs=procfs)
+    assert ["eth0", "wlan0"] == list(network_throughput_sensor.state)
+    assert 42949670.0 == network_throughput_sensor.state["eth0"].rx_bytes_per_sec
+
+    Path(tmp_path, "net", "dev").write_text(PROC_NET_DEV_TICK)
+    Path(tmp_path, "uptime").write_text("110.00 390.00\n")
+    network_throughput_sensor.refresh_state()
+    throughput: dict = network_throughput_sensor.state_as_dict
+
+    # Assert traffic since previous refresh, without loopback, counting new interfaces from 0
+    assert ["eth0", "wlan0", "wlan1"] == list(throughput)
+    assert {
+        "rx_bytes_per_sec": 100.0,
+        "tx_bytes_per_sec": 5000.0,
+        "rx_packets_per_sec": 100.0,
+        "tx_packets_per_sec": 40.0,
+        "rx_errors": 1,
+        "tx_errors": 0,
+        "rx_dropped": 0,
+        "tx_dropped": 0,
+    } == throughput["eth0"]
+    assert 800.0 == throughput["wlan0"]["rx_bytes_per_sec"]
+    assert 500.0 == throughput["wlan1"]["rx_bytes_per_sec"]
+
+    # Assert JSON serialization
+    json.dumps(throughput)
+
+
+def test_parse_network_counters_of_older_kernel():
+    # Call function, without space between name and first counter
+    counters = parse_network_counters(PROC_NET_DEV.replace("  eth0: ", "eth0:"))
+
+    # Assert
+    assert NetworkCounters(4294967000, 120000, 2, 5, 98765432, 81200, 0, 1) == counters["eth0"]
+
+
+def test_read_network_throughput_not_available_for_platform(tmp_path):
+    procfs = fake_procfs(root=tmp_path, **{"net/dev": None})
+
+    # Call function
+    with pytest.raises(SensorNotAvailableException) as exec_info:
+        NetworkThroughputSensor(enabled=True, procfs=procfs).refresh_state()
+
+    # Assert error message
+    assert "/proc/net/dev not available for this Rpi" in str(exec_info)
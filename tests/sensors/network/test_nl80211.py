@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""Tests to verify reading the wireless network interfaces with nl80211"""
+
+import errno
+
+import pytest
+
+from sensors.network.netlink import pack_attribute, parse_attributes
+from sensors.network.nl80211 import (
+    CTRL_CMD_GETFAMILY,
+    GENL_ID_CTRL,
+    NL80211_CMD_GET_INTERFACE,
+    NL80211_CMD_GET_STATION,
+    Nl80211Client,
+)
+from tests.utils.netlink_utils import NL80211_FAMILY_ID, error_message, fake_rpi_nl80211, unavailable_nl80211
+
+
+def test_interfaces_in_station_mode():
+    nl80211, _ = fake_rpi_nl80211()
+
+    # Call function
+    interfaces = nl80211.interfaces()
+
+    # Assert interfaces ordered by index, without the access point interface
+    assert [(3, "wlan0"), (4, "wlan1")] == [(interface.index, interface.name) for interface in interfaces]
+    assert "a9:3a:dd:b1:cc:46" == interfaces[0].mac_addr
+    assert "MyNetwork 5G-2" == interfaces[0].ssid
+    assert 5520 == interfaces[0].freq_mhz
+    assert "" == interfaces[1].ssid
+    assert 0 == interfaces[1].freq_mhz
+
+
+def test_station_of_connected_interface():
+    nl80211, _ = fake_rpi_nl80211()
+
+    # Call function
+    station = nl80211.station(3)
+
+    # Assert access point with signal, and bitrates of the 32 bit and 16 bit attributes
+    assert "04:42:1a:cf:15:c8" == station.mac_addr
+    assert -43 == station.signal_strength_dbm
+    assert 433.3 == station.tx_bitrate_mbps
+    assert 240.0 == station.rx_bitrate_mbps
+
+
+def test_station_of_disconnected_interface():
+    nl80211, _ = fake_rpi_nl80211()
+
+    # Call function, assert none station dumped
+    assert nl80211.station(4) is None
+
+
+def test_family_resolved_once():
+    nl80211, fake_socket = fake_rpi_nl80211()
+
+    # Call function
+    nl80211.interfaces()
+    nl80211.station(3)
+    nl80211.interfaces()
+
+    # Assert family resolved with the first request only
+    assert [
+        (GENL_ID_CTRL, CTRL_CMD_GETFAMILY, None),
+        (NL80211_FAMILY_ID, NL80211_CMD_GET_INTERFACE, None),
+        (NL80211_FAMILY_ID, NL80211_CMD_GET_STATION, 3),
+        (NL80211_FAMILY_ID, NL80211_CMD_GET_INTERFACE, None),
+    ] == fake_socket.requests
+
+
+def test_socket_opened_again_after_failed_request():
+    nl80211, fake_socket = fake_rpi_nl80211()
+    replies = fake_socket.replies[(NL80211_FAMILY_ID, NL80211_CMD_GET_STATION, 3)]
+    fake_socket.replies[(NL80211_FAMILY_ID, NL80211_CMD_GET_STATION, 3)] = [error_message(errno.ENODEV)]
+
+    # Call function
+    with pytest.raises(OSError) as exec_info:
+        nl80211.station(3)
+
+    # Assert error of the kernel, and socket closed
+    assert errno.ENODEV == exec_info.value.errno
+    assert fake_socket.closed
+
+    # Call function, kernel answering again
+    fake_socket.replies[(NL80211_FAMILY_ID, NL80211_CMD_GET_STATION, 3)] = replies
+    assert -43 == nl80211.station(3).signal_strength_dbm
+
+    # Assert family resolved again
+    assert 2 == fake_socket.requests.count((GENL_ID_CTRL, CTRL_CMD_GETFAMILY, None))
+
+
+def test_not_available_when_family_not_registered():
+    nl80211 = unavailable_nl80211()
+
+    # Call function
+    assert not nl80211.available()
+
+    # Assert requests failing
+    with pytest.raises(OSError):
+        nl80211.interfaces()
+
+
+def test_not_available_on_platform_without_netlink():
+    def socket_factory():
+        raise AttributeError("module 'socket' has no attribute 'AF_NETLINK'")
+
+    # Call function, assert not available
+    assert not Nl80211Client(socket_factory=socket_factory).available()
+
+
+def test_parse_attributes_without_nested_flag():
+    # Call function, attribute type flagged as nested
+    attributes = parse_attributes(pack_attribute(0x8000 | 21, pack_attribute(7, b"\xd5")) + pack_attribute(3, b"ab"))
+
+    # Assert attributes keyed by type without flags, padding dropped
+    assert {21: pack_attribute(7, b"\xd5"), 3: b"ab"} == attributes
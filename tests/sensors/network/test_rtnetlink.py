@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""Tests to verify monitoring the network interfaces and addresses with rtnetlink"""
+
+import errno
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from sensors.network.rtnetlink import (
+    RTM_DELADDR,
+    RTM_GETADDR,
+    RTM_GETLINK,
+    RTMGRP_IPV4_IFADDR,
+    RTMGRP_IPV6_IFADDR,
+    RTMGRP_LINK,
+    RtnetlinkMonitor,
+)
+from tests.utils.netlink_utils import address_message, fake_rpi_monitor, link_message, unavailable_monitor
+
+
+def _wait_for_change(monitor: RtnetlinkMonitor) -> threading.Event:
+    changed = threading.Event()
+    monitor.add_listener(changed.set)
+    return changed
+
+
+def test_start_dumps_links_and_addresses():
+    monitor, fake_socket = fake_rpi_monitor()
+
+    # Call function
+    assert monitor.start()
+    monitor.close()
+
+    # Assert subscribed to changes before dumping links and addresses
+    assert RTMGRP_LINK | RTMGRP_IPV4_IFADDR | RTMGRP_IPV6_IFADDR == fake_socket.groups
+    assert [RTM_GETLINK, RTM_GETADDR] == fake_socket.requests
+    assert ["lo", "eth0", "wlan0"] == [link.name for link in monitor.links()]
+    assert "a8:3a:dd:b1:cc:45" == monitor.link("eth0").mac_addr
+    assert [
+        (1, 4, "127.0.0.1", 8),
+        (1, 6, "::1", 128),
+        (2, 4, "192.168.1.141", 24),
+        (2, 6, "fe80::aa3a:ddff:feb1:cc45", 64),
+    ] == [(a.index, a.version, a.address, a.prefix_len) for a in monitor.addresses()]
+
+
+@patch("sensors.network.rtnetlink.SETTLE_TIME_SEC", 0.05)
+def test_changes_applied_and_notified_once_settled():
+    monitor, fake_socket = fake_rpi_monitor()
+    monitor.start()
+    changed = _wait_for_change(monitor)
+
+    # Call function, Wi-Fi going up and getting an address in separate notifications
+    fake_socket.notify(link_message(3, "wlan0", "a9:3a:dd:b1:cc:46", up=True))
+    fake_socket.notify(address_message(3, "192.168.1.142", 24))
+    fake_socket.notify(address_message(2, "192.168.1.141", 24, msg_type=RTM_DELADDR))
+
+    # Assert listener notified with the changes applied
+    assert changed.wait(timeout=2)
+    monitor.close()
+
+    assert monitor.link("wlan0").up
+    assert ["127.0.0.1", "::1", "fe80::aa3a:ddff:feb1:cc45", "192.168.1.142"] == [
+        address.address for address in monitor.addresses()
+    ]
+
+
+@patch("sensors.network.rtnetlink.SETTLE_TIME_SEC", 0.05)
+def test_unchanged_state_not_notified():
+    monitor, fake_socket = fake_rpi_monitor()
+    monitor.start()
+    changed = _wait_for_change(monitor)
+
+    # Call function, kernel reporting the same link again
+    fake_socket.notify(link_message(2, "eth0", "a8:3a:dd:b1:cc:45"))
+
+    # Assert listener not notified
+    assert not changed.wait(timeout=0.2)
+    monitor.close()
+
+
+@patch("sensors.network.rtnetlink.SETTLE_TIME_SEC", 0.05)
+def test_dump_again_when_notifications_dropped():
+    monitor, fake_socket = fake_rpi_monitor()
+    monitor.start()
+    changed = _wait_for_change(monitor)
+
+    # Call function, socket buffer overflowed while the Ethernet address changed
+    fake_socket.dumps[RTM_GETADDR] = [address_message(2, "192.168.1.150", 24)]
+    fake_socket.fail(OSError(errno.ENOBUFS, "No buffer space available"))
+
+    # Assert links and addresses dumped again
+    assert changed.wait(timeout=2)
+    monitor.close()
+
+    assert [RTM_GETLINK, RTM_GETADDR, RTM_GETLINK, RTM_GETADDR] == fake_socket.requests
+    assert ["192.168.1.150"] == [address.address for address in monitor.addresses()]
+
+
+def test_start_when_rtnetlink_not_available_for_platform():
+    monitor: RtnetlinkMonitor = unavailable_monitor()
+
+    # Assert not started and not retried
+    assert not monitor.start()
+    assert not monitor.start()
+    assert [] == monitor.links()
+
+
+def test_start_with_kernel():
+    monitor = RtnetlinkMonitor()
+
+    if not monitor.start():
+        pytest.skip("rtnetlink not available on this platform")
+
+    monitor.close()
+
+    # Assert loopback interface reported by the kernel
+    assert any(link.loopback for link in monitor.links())
@@ -1,13 +1,23 @@
 #!/usr/bin/env python3
 """Tests to verify the Rpi OS sensor data"""
+
 import importlib
+import os
+from pathlib import Path
 from unittest.mock import MagicMock, mock_open, patch
 
-import psutil
 import pytest
 
-from sensors.os.sensor import AvailableUpdatesSensor, BootTimeSensor, OsKernelSensor, OsReleaseSensor
+from sensors.os.sensor import (
+    AvailableUpdatePackagesSensor,
+    AvailableUpdatesReader,
+    AvailableUpdatesSensor,
+    BootTimeSensor,
+    OsKernelSensor,
+    OsReleaseSensor,
+)
 from sensors.types import SensorNotAvailableException
+from tests.utils.procfs_utils import fake_procfs
 
 
 # Tests for OS Kernel sensor
@@ -95,21 +105,94 @@ def test_read_os_release_when_not_available_for_platform(_):
 def test_read_available_updates_when_not_available_for_platform():
     # Call function
     with pytest.raises(SensorNotAvailableException) as exec_info:
-        os_release_sensor = AvailableUpdatesSensor(enabled=True)
+        os_release_sensor = AvailableUpdatesSensor(enabled=True, reader=AvailableUpdatesReader())
         os_release_sensor.refresh_state()
 
     # Assert
     assert "apt not available for this Rpi" in str(exec_info)
 
 
-# Tests for Boot time sensor
-def test_read_rpi_boot_time():
-    # Mock psutil
-    psutil_mock: float = 1705927879.0
-    psutil.boot_time = MagicMock(return_value=psutil_mock)
+def _mock_apt_cache(package_names: list[str]) -> MagicMock:
+    changes = []
+    for package_name in package_names:
+        package = MagicMock()
+        package.name = package_name
+        changes.append(package)
+
+    apt_mock = MagicMock()
+    apt_mock.Cache.return_value.get_changes.return_value = changes
+    return apt_mock
+
+
+def test_read_available_updates_only_when_apt_files_changed(tmp_path):
+    # Fake apt lists and dpkg status files
+    lists_dir: Path = tmp_path / "lists"
+    lists_dir.mkdir()
+    (lists_dir / "deb.debian.org_debian_dists_bookworm_main_binary-arm64_Packages").write_text("Package: curl")
+    status_file: Path = tmp_path / "status"
+    status_file.write_text("Package: curl")
+
+    apt_mock = _mock_apt_cache(package_names=["libcurl4", "curl"])
+
+    with (
+        patch("sensors.os.sensor.APT_AVAILABLE", True),
+        patch("sensors.os.sensor.apt", apt_mock, create=True),
+        patch("sensors.os.sensor.APT_LISTS_DIR", str(lists_dir)),
+        patch("sensors.os.sensor.DPKG_STATUS_FILE", str(status_file)),
+    ):
+        # Call function, state is read when created
+        reader = AvailableUpdatesReader()
+        available_updates_sensor = AvailableUpdatesSensor(enabled=True, reader=reader)
+        packages_sensor = AvailableUpdatePackagesSensor(enabled=True, reader=reader)
+
+        # Assert count and sorted package names
+        assert 2 == available_updates_sensor.state
+        assert 2 == available_updates_sensor.state_as_dict
+        assert ["curl", "libcurl4"] == packages_sensor.state
+
+        # Assert apt cache not opened again when files not changed, also not by the other sensor
+        available_updates_sensor.refresh_state()
+        packages_sensor.refresh_state()
+        assert 1 == apt_mock.Cache.call_count
+
+        # Assert apt cache opened again when dpkg status changed, i.e. after upgrading packages
+        apt_mock.Cache.return_value.get_changes.return_value = []
+        stat: os.stat_result = status_file.stat()
+        os.utime(status_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
 
+        available_updates_sensor.refresh_state()
+        assert 2 == apt_mock.Cache.call_count
+        assert 0 == available_updates_sensor.state
+
+        # Assert apt cache opened again when package lists changed, i.e. after apt update
+        (lists_dir / "deb.debian.org_debian_dists_bookworm-updates_InRelease").write_text("Origin: Debian")
+
+        available_updates_sensor.refresh_state()
+        assert 3 == apt_mock.Cache.call_count
+
+
+def test_read_available_updates_when_apt_files_not_readable(tmp_path):
+    apt_mock = _mock_apt_cache(package_names=["curl"])
+
+    with (
+        patch("sensors.os.sensor.APT_AVAILABLE", True),
+        patch("sensors.os.sensor.apt", apt_mock, create=True),
+        patch("sensors.os.sensor.APT_LISTS_DIR", str(tmp_path / "missing")),
+        patch("sensors.os.sensor.DPKG_STATUS_FILE", str(tmp_path / "missing")),
+    ):
+        # Call function
+        available_updates_sensor = AvailableUpdatesSensor(enabled=True, reader=AvailableUpdatesReader())
+        available_updates_sensor.refresh_state()
+
+    # Assert apt cache opened on every refresh
+    assert 2 == apt_mock.Cache.call_count
+    assert 1 == available_updates_sensor.state
+
+
+# Tests for Boot time sensor
+def test_read_rpi_boot_time(tmp_path):
     # Call function
-    boot_time_sensor = BootTimeSensor(enabled=True)
+    boot_time_sensor = BootTimeSensor(enabled=True, procfs=fake_procfs(root=tmp_path))
     boot_time_sensor.refresh_state()
     boot_time: str = boot_time_sensor.state
 
@@ -117,17 +200,13 @@ def test_read_rpi_boot_time():
     assert "2024-01-22T12:51:19+00:00" == boot_time
 
 
-def test_read_rpi_boot_time_when_not_available_for_platform():
-    # Mock psutil
-    # Make sure that attribute is deleted if it exists (depending on the platform tests are run)
-    importlib.reload(psutil)
-    if hasattr(psutil, "boot_time"):
-        del psutil.boot_time
+def test_read_rpi_boot_time_when_not_available_for_platform(tmp_path):
+    procfs = fake_procfs(root=tmp_path, stat=None)
 
     # Call function
     with pytest.raises(SensorNotAvailableException) as exec_info:
-        boot_time_sensor = BootTimeSensor(enabled=True)
+        boot_time_sensor = BootTimeSensor(enabled=True, procfs=procfs)
         boot_time_sensor.refresh_state()
 
     # Assert error message
-    assert "boot_time() not available for this Rpi" in str(exec_info)
+    assert "boot time not available for this Rpi" in str(exec_info)
@@ -1,40 +1,32 @@
 #!/usr/bin/env python3
 """Tests to verify the temperature readings of Rpi hardware components"""
 
-import collections
-import importlib
+import asyncio
 import json
-from collections import defaultdict, namedtuple
+import subprocess
 from typing import Any
 from unittest.mock import MagicMock, patch
 
-import psutil
 import pytest
 
+from sensors.hwmon.reader import HwmonReader
 from sensors.temperature.sensor import TemperatureSensor
 from sensors.temperature.types import HwTemperature
 from sensors.types import SensorNotAvailableException
+from tests.utils.hwmon_utils import fake_rpi_hwmon
 
 # noinspection DuplicatedCode
 
 
-# patching vcgencmd command run by the subprocess.run
-@patch("sensors.temperature.sensor.subprocess.run")
-def test_read_temperature(mock_run):
-    # Mock psutil
-    ret: defaultdict[str, list] = collections.defaultdict(list)
-    shwtemp = namedtuple("shwtemp", ["label", "current", "high", "critical"])
-    ret["cpu_thermal"].append(shwtemp("", 46.365, 110.0, 110.0))
-    ret["rp1_adc"].append(shwtemp("", 54.31, None, None))
-
-    psutil.sensors_temperatures = MagicMock(return_value=ret)
-
-    # Mock subprocess.run running vcgencmd to read GPU temperature
+# patching vcgencmd command run through the mailbox or subprocess
+@patch("sensors.temperature.sensor.run_vcgencmd")
+def test_read_temperature(mock_run, tmp_path):
+    # Mock running vcgencmd to read GPU temperature
     mock_proc = MagicMock(returncode=0, stdout="temp=51.0'C")
     mock_run.return_value = mock_proc
 
     # Call function
-    temperature_sensor = TemperatureSensor(enabled=True)
+    temperature_sensor = TemperatureSensor(enabled=True, hwmon=fake_rpi_hwmon(root=tmp_path))
     temperature_sensor.refresh_state()
     temps: dict[str, HwTemperature] = temperature_sensor.state
 
@@ -59,24 +51,19 @@ def test_read_temperature(mock_run):
     assert None is gpu_temp.high_c
     assert None is gpu_temp.critical_c
 
+    # Assert hottest component tracked for adaptive update interval
+    assert 54.3 == temperature_sensor.adaptive_value()
 
-# patching vcgencmd command run by the subprocess.run
-@patch("sensors.temperature.sensor.subprocess.run")
-def test_read_temperature_as_dict(mock_run):
-    # Mock psutil
-    ret: defaultdict[str, list] = collections.defaultdict(list)
-    shwtemp = namedtuple("shwtemp", ["label", "current", "high", "critical"])
-    ret["cpu_thermal"].append(shwtemp("", 46.365, 110.0, 110.0))
-    ret["rp1_adc"].append(shwtemp("", 54.31, None, None))
-
-    psutil.sensors_temperatures = MagicMock(return_value=ret)
 
-    # Mock subprocess.run running vcgencmd to read GPU temperature
+# patching vcgencmd command run through the mailbox or subprocess
+@patch("sensors.temperature.sensor.run_vcgencmd")
+def test_read_temperature_as_dict(mock_run, tmp_path):
+    # Mock running vcgencmd to read GPU temperature
     mock_proc = MagicMock(returncode=0, stdout="temp=51.0'C")
     mock_run.return_value = mock_proc
 
     # Call function
-    temperature_sensor = TemperatureSensor(enabled=True)
+    temperature_sensor = TemperatureSensor(enabled=True, hwmon=fake_rpi_hwmon(root=tmp_path))
     temperature_sensor.refresh_state()
     temps: dict[str, dict[str, Any]] = temperature_sensor.state_as_dict
 
@@ -105,29 +92,32 @@ def test_read_temperature_as_dict(mock_run):
     json.dumps(temps)
 
 
-def test_read_temperature_when_sensors_temperatures_not_available_for_platform():
-    # Mock psutil
-    # Make sure that attribute is deleted if it exists (depending on the platform tests are run)
-    importlib.reload(psutil)
-    if hasattr(psutil, "sensors_temperatures"):
-        del psutil.sensors_temperatures
+# patching vcgencmd command run through the mailbox or subprocess, and as asyncio subprocess
+@patch("sensors.temperature.sensor.run_vcgencmd_async")
+@patch("sensors.temperature.sensor.run_vcgencmd")
+def test_read_temperature_async(mock_run, mock_run_async, tmp_path):
+    # Mock subprocess running vcgencmd to read GPU temperature
+    mock_run.return_value = MagicMock(returncode=0, stdout="temp=51.0'C")
+    mock_run_async.return_value = subprocess.CompletedProcess(
+        args=["vcgencmd", "measure_temp"], returncode=0, stdout="temp=53.2'C\n", stderr=""
+    )
 
     # Call function
-    with pytest.raises(SensorNotAvailableException) as exec_info:
-        temperature_sensor = TemperatureSensor(enabled=True)
-        temperature_sensor.refresh_state()
-
-    # Assert error message
-    assert "sensors_temperatures() not available for this Rpi" in str(exec_info)
+    temperature_sensor = TemperatureSensor(enabled=True, hwmon=fake_rpi_hwmon(root=tmp_path))
+    asyncio.run(temperature_sensor.refresh_state_async())
+    temps: dict[str, HwTemperature] = temperature_sensor.state
 
+    # Assert 3 temperature readings, GPU temperature read as asyncio subprocess
+    assert 3 == len(temps)
+    assert 46.4 == temps["cpu_thermal"].current_c
+    assert 53.2 == temps["gpu"].current_c
+    mock_run_async.assert_called_once_with(["vcgencmd", "measure_temp"])
 
-def test_read_temperature_when_none_temperatures_detected():
-    # Mock psutil
-    psutil.sensors_temperatures = MagicMock(return_value=None)
 
-    # Call function
+def test_read_temperature_when_none_temperatures_detected(tmp_path):
+    # Call function, without any hwmon or thermal device
     with pytest.raises(SensorNotAvailableException) as exec_info:
-        temperature_sensor = TemperatureSensor(enabled=True)
+        temperature_sensor = TemperatureSensor(enabled=True, hwmon=HwmonReader(root=str(tmp_path)))
         temperature_sensor.refresh_state()
 
     # Assert error message
@@ -135,19 +125,11 @@ def test_read_temperature_when_none_temperatures_detected():
 
 
 # noinspection DuplicatedCode
-@patch("sensors.temperature.sensor.subprocess.run", side_effect=FileNotFoundError("vcgencmd not found"))
-def test_read_temperature_when_vcgencmd_not_available_for_platform(_):
-    # Mock psutil
-    ret: defaultdict[str, list] = collections.defaultdict(list)
-    shwtemp = namedtuple("shwtemp", ["label", "current", "high", "critical"])
-    ret["cpu_thermal"].append(shwtemp("", 46.365, 110.0, 110.0))
-    ret["rp1_adc"].append(shwtemp("", 54.31, None, None))
-
-    psutil.sensors_temperatures = MagicMock(return_value=ret)
-
+@patch("sensors.temperature.sensor.run_vcgencmd", side_effect=FileNotFoundError("vcgencmd not found"))
+def test_read_temperature_when_vcgencmd_not_available_for_platform(_, tmp_path):
     # Call function
     with pytest.raises(SensorNotAvailableException) as exec_info:
-        temperature_sensor = TemperatureSensor(enabled=True)
+        temperature_sensor = TemperatureSensor(enabled=True, hwmon=fake_rpi_hwmon(root=tmp_path))
         temperature_sensor.refresh_state()
 
     # Assert error message
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""Tests to verify adapting the refresh interval to the rate of change of a sensor value"""
+
+from sensors.adaptive import AdaptiveInterval
+from settings.types import AdaptiveUpdateInterval
+
+
+def _adaptive_interval(smoothing: float = 1.0) -> AdaptiveInterval:
+    return AdaptiveInterval(
+        settings=AdaptiveUpdateInterval(min_interval=2, max_interval=60, target_change=1.0, smoothing=smoothing)
+    )
+
+
+def test_min_interval_until_rate_of_change_known():
+    adaptive_interval = _adaptive_interval()
+
+    # Call function
+    interval: int = adaptive_interval.update(50.0, now=0.0)
+
+    # Assert
+    assert 2 == interval
+    assert adaptive_interval.rate is None
+
+
+def test_interval_shortens_when_volatile_and_stretches_when_stable():
+    adaptive_interval = _adaptive_interval()
+    adaptive_interval.update(50.0, now=0.0)
+
+    # Call function, value stable, ramping by 0.1 per second, then by 2 per second
+    stable: int = adaptive_interval.update(50.0, now=10.0)
+    ramping: int = adaptive_interval.update(51.0, now=20.0)
+    volatile: int = adaptive_interval.update(71.0, now=30.0)
+
+    # Assert interval in which the value changes by the target change, within min and max interval
+    assert 60 == stable
+    assert 10 == ramping
+    assert 2 == volatile
+
+
+def test_rate_of_change_smoothed_with_ewma():
+    adaptive_interval = _adaptive_interval(smoothing=0.5)
+    adaptive_interval.update(50.0, now=0.0)
+
+    # Call function, one spike of 0.4 per second
+    adaptive_interval.update(54.0, now=10.0)
+    adaptive_interval.update(54.0, now=20.0)
+
+    # Assert rate of the spike halved, and interval of the smoothed rate
+    assert 0.2 == adaptive_interval.rate
+    assert 5 == adaptive_interval.interval
@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""Tests to verify refreshing all Rpi sensors"""
+
+import asyncio
+import threading
+import time
+from unittest.mock import patch
+
+from sensors.adaptive import AdaptiveInterval
+from sensors.types import AllRpiSensors, RpiSensor, SensorNotAvailableException
+from settings.types import (
+    AdaptiveUpdateInterval,
+    RefreshMode,
+    RollupStoreSettings,
+    ScriptSettings,
+    SensorsMonitoringSettings,
+)
+
+
+class CountingSensor(RpiSensor):
+    """Sensor counting number of refreshes"""
+
+    def __init__(self, name: str, update_interval: int | None = None):
+        self._name = name
+        self._state = 0
+        super().__init__(enabled=True)
+        self.update_interval = update_interval
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def state(self) -> int:
+        return self._state
+
+    def refresh_state(self) -> None:
+        self._state += 1
+
+
+class BlockingSensor(CountingSensor):
+    """Sensor blocking the refresh until released, or failing the refresh"""
+
+    def __init__(self, name: str, delay: float = 0.0, fail: bool = False):
+        self.delay = 0.0
+        self.fail = False
+        self.release = threading.Event()
+        super().__init__(name=name)
+        self.delay = delay
+        self.fail = fail
+
+    def refresh_state(self) -> None:
+        if self.fail:
+            raise SensorNotAvailableException("Failed to read sensor")
+
+        if self.delay > 0:
+            self.release.wait(self.delay)
+
+        super().refresh_state()
+
+
+class SleepingSensor(CountingSensor):
+    """Sensor awaiting the refresh as coroutine"""
+
+    def __init__(self, name: str, delay: float):
+        super().__init__(name=name)
+        self.delay = delay
+
+    async def refresh_state_async(self) -> None:
+        await asyncio.sleep(self.delay)
+        self.refresh_state()
+
+
+class RampingSensor(CountingSensor):
+    """Sensor whose value rises by the ramp per refresh"""
+
+    def __init__(self, name: str, ramp: float):
+        self.ramp = ramp
+        super().__init__(name=name)
+
+    def adaptive_value(self) -> float | None:
+        return self._state * self.ramp
+
+
+class LoadSensor(CountingSensor):
+    """Sensor with a state as dict, reading the next load of the given loads per refresh"""
+
+    def __init__(self, name: str, loads: list[float]):
+        self.loads = loads
+        super().__init__(name=name)
+
+    @property
+    def state_as_dict(self) -> dict:
+        return {"load_pct": self.loads[self._state - 1], "online": True, "cores": [1, 2]}
+
+
+def _concurrent_settings(refresh_timeout: float = 5.0) -> ScriptSettings:
+    return ScriptSettings(
+        update_interval=1, refresh_mode=RefreshMode.CONCURRENT, refresh_workers=4, refresh_timeout=refresh_timeout
+    )
+
+
+@patch("sensors.types.monotonic")
+def test_refresh_only_due_sensors(mock_monotonic):
+    mock_monotonic.return_value = 1000.0
+    fast_sensor = CountingSensor(name="fast")
+    slow_sensor = CountingSensor(name="slow", update_interval=300)
+    all_sensors = AllRpiSensors(sensors=[fast_sensor, slow_sensor], script_settings=ScriptSettings(update_interval=60))
+
+    # Both sensors have read their state when created
+    assert 1 == fast_sensor.state
+    assert 1 == slow_sensor.state
+
+    # Timer ticks every 60 seconds, slightly early or late
+    for tick, now in enumerate([1059.9, 1120.1, 1180.0, 1240.0], start=1):
+        mock_monotonic.return_value = now
+        refreshed: list[RpiSensor] = all_sensors.refresh_available_sensors()
+
+        assert [fast_sensor] == refreshed
+        assert 1 + tick == fast_sensor.state
+
+    mock_monotonic.return_value = 1300.0
+    refreshed = all_sensors.refresh_available_sensors()
+
+    assert [fast_sensor, slow_sensor] == refreshed
+    assert 6 == fast_sensor.state
+    assert 2 == slow_sensor.state
+
+
+@patch("sensors.types.monotonic")
+def test_interval_shorter_than_update_interval_refreshes_every_update(mock_monotonic):
+    mock_monotonic.return_value = 0.0
+    sensor = CountingSensor(name="sensor", update_interval=5)
+    all_sensors = AllRpiSensors(sensors=[sensor], script_settings=ScriptSettings(update_interval=60))
+
+    assert 60 == all_sensors.sensor_update_interval(sensor)
+
+    mock_monotonic.return_value = 60.0
+    assert [sensor] == all_sensors.refresh_available_sensors()
+
+
+@patch("sensors.types.monotonic", return_value=0.0)
+def test_refresh_network_event_sensors_when_not_due(_):
+    network_sensor = CountingSensor(name="network")
+    network_sensor.network_events = True
+    other_sensor = CountingSensor(name="other")
+    all_sensors = AllRpiSensors(sensors=[network_sensor, other_sensor], script_settings=ScriptSettings())
+
+    # Call function, as on a network change
+    refreshed = all_sensors.refresh_available_sensors(sensors=all_sensors.network_event_sensors)
+    refreshed_async = asyncio.run(all_sensors.refresh_available_sensors_async(sensors=[network_sensor]))
+
+    # Assert only the network sensor refreshed
+    assert [network_sensor] == refreshed
+    assert [network_sensor] == refreshed_async
+    assert 3 == network_sensor.state
+    assert 1 == other_sensor.state
+
+
+def test_sensor_default_update_interval():
+    sensor = CountingSensor(name="sensor")
+
+    assert None is sensor.update_interval
+
+    all_sensors = AllRpiSensors(sensors=[sensor], script_settings=ScriptSettings(update_interval=30))
+
+    assert 30 == all_sensors.sensor_update_interval(sensor)
+
+
+@patch("sensors.types.monotonic", side_effect=[0.0, 10.0])
+def test_concurrent_refresh_takes_as_long_as_slowest_sensor(_):
+    sensors = [BlockingSensor(name=f"slow_{i}", delay=0.2) for i in range(4)]
+    all_sensors = AllRpiSensors(sensors=sensors, script_settings=_concurrent_settings())
+
+    start: float = time.perf_counter()
+    refreshed: list[RpiSensor] = all_sensors.refresh_available_sensors()
+    duration: float = time.perf_counter() - start
+    all_sensors.close()
+
+    # Sequential refresh would take 0.8 sec
+    assert duration < 0.6
+    assert sensors == refreshed
+    assert all(2 == sensor.state for sensor in sensors)
+
+
+@patch("sensors.types.monotonic", side_effect=[0.0, 10.0, 20.0])
+def test_concurrent_refresh_keeps_last_state_when_timeout_exceeded(_):
+    fast_sensor = CountingSensor(name="fast")
+    hanging_sensor = BlockingSensor(name="hanging", delay=30.0)
+    all_sensors = AllRpiSensors(
+        sensors=[fast_sensor, hanging_sensor], script_settings=_concurrent_settings(refresh_timeout=0.1)
+    )
+
+    refreshed: list[RpiSensor] = all_sensors.refresh_available_sensors()
+
+    assert [fast_sensor] == refreshed
+    assert 2 == fast_sensor.state
+    assert 1 == hanging_sensor.state
+
+    # Hanging sensor is not refreshed again while the previous refresh is still running
+    refreshed = all_sensors.refresh_available_sensors()
+
+    assert [fast_sensor] == refreshed
+    assert 3 == fast_sensor.state
+
+    hanging_sensor.release.set()
+    all_sensors.close()
+
+
+@patch("sensors.types.monotonic", side_effect=[0.0, 10.0])
+def test_concurrent_refresh_keeps_last_state_when_sensor_fails(_):
+    fast_sensor = CountingSensor(name="fast")
+    failing_sensor = BlockingSensor(name="failing")
+    all_sensors = AllRpiSensors(sensors=[fast_sensor, failing_sensor], script_settings=_concurrent_settings())
+    failing_sensor.fail = True
+
+    refreshed: list[RpiSensor] = all_sensors.refresh_available_sensors()
+    all_sensors.close()
+
+    assert [fast_sensor] == refreshed
+    assert 1 == failing_sensor.state
+
+
+@patch("sensors.types.monotonic", side_effect=[0.0, 10.0])
+def test_async_refresh_takes_as_long_as_slowest_sensor(_):
+    sensors = [SleepingSensor(name=f"slow_{i}", delay=0.2) for i in range(4)]
+    all_sensors = AllRpiSensors(sensors=sensors, script_settings=ScriptSettings(update_interval=1))
+
+    start: float = time.perf_counter()
+    refreshed: list[RpiSensor] = asyncio.run(all_sensors.refresh_available_sensors_async())
+    duration: float = time.perf_counter() - start
+
+    # Sequential refresh would take 0.8 sec
+    assert duration < 0.6
+    assert sensors == refreshed
+    assert all(2 == sensor.state for sensor in sensors)
+
+
+@patch("sensors.types.monotonic", side_effect=[0.0, 10.0])
+def test_async_refresh_keeps_last_state_when_timeout_exceeded(_):
+    fast_sensor = CountingSensor(name="fast")
+    hanging_sensor = SleepingSensor(name="hanging", delay=30.0)
+    all_sensors = AllRpiSensors(
+        sensors=[fast_sensor, hanging_sensor], script_settings=ScriptSettings(update_interval=1, refresh_timeout=0.1)
+    )
+
+    refreshed: list[RpiSensor] = asyncio.run(all_sensors.refresh_available_sensors_async())
+
+    assert [fast_sensor] == refreshed
+    assert 2 == fast_sensor.state
+    assert 1 == hanging_sensor.state
+
+
+@patch("sensors.types.monotonic", side_effect=[0.0, 10.0, 20.0])
+def test_async_refresh_skips_sensor_still_refreshing_in_thread(_):
+    fast_sensor = CountingSensor(name="fast")
+    hanging_sensor = BlockingSensor(name="hanging", delay=30.0)
+    all_sensors = AllRpiSensors(
+        sensors=[fast_sensor, hanging_sensor], script_settings=ScriptSettings(update_interval=1, refresh_timeout=0.1)
+    )
+
+    async def _refresh_twice() -> tuple[list[RpiSensor], list[RpiSensor]]:
+        first: list[RpiSensor] = await all_sensors.refresh_available_sensors_async()
+        second: list[RpiSensor] = await all_sensors.refresh_available_sensors_async()
+        hanging_sensor.release.set()
+        return first, second
+
+    with patch.object(hanging_sensor, "refresh_state", wraps=hanging_sensor.refresh_state) as mock_refresh_state:
+        first_refreshed, second_refreshed = asyncio.run(_refresh_twice())
+
+    # Assert hanging sensor not refreshed again in a second thread while the previous refresh is still running
+    assert [fast_sensor] == first_refreshed
+    assert [fast_sensor] == second_refreshed
+    assert 3 == fast_sensor.state
+    assert 1 == mock_refresh_state.call_count
+
+
+@patch("sensors.types.monotonic")
+def test_adaptive_interval_follows_rate_of_change(mock_monotonic):
+    mock_monotonic.return_value = 0.0
+    sensor = RampingSensor(name="temperature", ramp=0.0)
+    sensor.adaptive_interval = AdaptiveInterval(
+        settings=AdaptiveUpdateInterval(min_interval=2, max_interval=60, target_change=1.0, smoothing=1.0)
+    )
+    all_sensors = AllRpiSensors(sensors=[sensor], script_settings=ScriptSettings(update_interval=1))
+
+    # Call function, stable value first, then ramping by 15 per refresh
+    refresh_ts: list[float] = []
+    for now in range(0, 120):
+        mock_monotonic.return_value = float(now)
+        if now == 60:
+            sensor.ramp = 15.0
+        if all_sensors.refresh_available_sensors():
+            refresh_ts.append(float(now))
+
+    # Assert min interval until the rate is known, max interval while stable, then shortened by the ramp
+    assert [2.0, 62.0, 64.0, 66.0] == refresh_ts[:4]
+    assert 2 == sensor.update_interval
+
+
+@patch("sensors.types.monotonic", return_value=0.0)
+def test_sampled_sensor_publishes_stats_of_samples_since_previous_update(_):
+    sampled_sensor = LoadSensor(name="cpu", loads=[10.0, 90.0, 20.0, 30.0, 40.0])
+    other_sensor = CountingSensor(name="other")
+    all_sensors = AllRpiSensors(
+        sensors=[sampled_sensor, other_sensor],
+        script_settings=ScriptSettings(update_interval=60),
+        sensor_settings=SensorsMonitoringSettings(sampled_sensors=["cpu"], sample_interval=3600),
+    )
+
+    # Call function, sampled twice after the first sample when created
+    all_sensors.sample_sensors()
+    all_sensors.sample_sensors()
+    first_update: dict = all_sensors.as_dict()["cpu"]
+    all_sensors.sample_sensors()
+    second_update: dict = all_sensors.as_dict()["cpu"]
+    all_sensors.close()
+
+    # Assert last sample as state, with the stats of the numeric fields since the previous update
+    assert 20.0 == first_update["load_pct"]
+    assert {"mean": 40.0, "min": 10.0, "max": 90.0, "p95": 90.0, "stddev": 35.59, "count": 3} == first_update["stats"][
+        "load_pct"
+    ]
+    assert ["load_pct"] == list(first_update["stats"])
+    assert 1 == second_update["stats"]["load_pct"]["count"]
+
+    # Assert sampled sensor not refreshed on update
+    assert [other_sensor] == all_sensors.due_sensors(now=60.0)
+
+
+@patch("sensors.types.monotonic", return_value=0.0)
+def test_sample_stats_not_taken_on_network_event(_):
+    sampled_sensor = LoadSensor(name="cpu", loads=[10.0, 90.0, 20.0, 30.0])
+    all_sensors = AllRpiSensors(
+        sensors=[sampled_sensor],
+        script_settings=ScriptSettings(update_interval=60),
+        sensor_settings=SensorsMonitoringSettings(sampled_sensors=["cpu"], sample_interval=3600),
+    )
+
+    # Call function, a network event publishing the states between two updates
+    all_sensors.sample_sensors()
+    first_update: dict = all_sensors.as_dict()["cpu"]
+    all_sensors.sample_sensors()
+    network_event: dict = all_sensors.as_dict(take_stats=False)["cpu"]
+    all_sensors.sample_sensors()
+    second_update: dict = all_sensors.as_dict()["cpu"]
+    all_sensors.close()
+
+    # Assert stats of the previous update repeated on the network event, and the window of the update not reset
+    assert first_update["stats"] == network_event["stats"]
+    assert 2 == second_update["stats"]["load_pct"]["count"]
+    assert 20.0 == second_update["stats"]["load_pct"]["min"]
+
+
+@patch("sensors.types.time")
+@patch("sensors.types.monotonic", return_value=0.0)
+def test_history_recorded_on_refresh(mock_monotonic, mock_time):
+    mock_time.return_value = 1705927860.5
+    history_sensor = LoadSensor(name="cpu", loads=[10.0, 20.0])
+    other_sensor = CountingSensor(name="other")
+    all_sensors = AllRpiSensors(
+        sensors=[history_sensor, other_sensor],
+        script_settings=ScriptSettings(update_interval=60),
+        sensor_settings=SensorsMonitoringSettings(history_sensors=["cpu"], history_size_kib=8),
+    )
+
+    # Call function
+    mock_monotonic.return_value = 60.0
+    mock_time.return_value = 1705927920.5
+    all_sensors.refresh_available_sensors()
+
+    # Assert state when created and refreshed state recorded, in whole seconds
+    assert [(1705927860, 10.0), (1705927920, 20.0)] == all_sensors.history("cpu").range(("load_pct",))
+    assert None is all_sensors.history("other")
+
+
+@patch("sensors.types.time")
+@patch("sensors.types.monotonic", return_value=0.0)
+def test_numeric_fields_stored_on_scheduled_refresh(_, mock_time, tmp_path):
+    mock_time.return_value = 1705927860.5
+    sampled_sensor = LoadSensor(name="cpu", loads=[10.0, 20.0, 30.0])
+    network_sensor = CountingSensor(name="network")
+    all_sensors = AllRpiSensors(
+        sensors=[sampled_sensor, network_sensor],
+        script_settings=ScriptSettings(),
+        sensor_settings=SensorsMonitoringSettings(
+            sampled_sensors=["cpu"], rollup_store=RollupStoreSettings(enabled=True, path=str(tmp_path / "rollups.bin"))
+        ),
+    )
+
+    # Call function, a scheduled refresh, a refresh on a network change and publishing the states
+    all_sensors.refresh_available_sensors()
+    mock_time.return_value = 1705927861.5
+    all_sensors.refresh_available_sensors(sensors=[network_sensor])
+    asyncio.run(all_sensors.refresh_available_sensors_async(sensors=[network_sensor]))
+    all_sensors.as_dict()
+
+    # Assert numeric fields of all sensors stored in whole seconds on the scheduled refresh only, without metadata and
+    # stats
+    assert ["cpu.load_pct", "network"] == all_sensors.rollup_store.series
+    assert [1705927860] == [point.ts for point in all_sensors.rollup_store.read("cpu.load_pct")]
+    assert [1705927860] == [point.ts for point in all_sensors.rollup_store.read("network")]
+    all_sensors.close()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Tests to verify the compressed in-memory history of the numeric fields of the sensor states"""
+
+import random
+
+from sensors.history import BLOCK_SIZE, HistoryRing, SensorHistory
+
+START_TS = 1705927860
+
+
+def test_samples_decoded_as_recorded():
+    ring = HistoryRing(size=64 * 1024)
+    # Irregular timestamps and values with special floats
+    samples: list[tuple[int, float]] = [
+        (START_TS, 46.4),
+        (START_TS + 1, 46.4),
+        (START_TS + 2, 46.5),
+        (START_TS + 4, -0.0),
+        (START_TS + 104, 1e308),
+        (START_TS + 5104, -2.5e-308),
+        (START_TS + 105104, float("inf")),
+        (START_TS + 105105, 0.1),
+    ]
+
+    # Call function
+    for ts, value in samples:
+        assert ring.append(ts, value)
+
+    # Assert
+    assert samples == list(ring.range())
+    assert 8 == len(ring)
+
+
+def test_day_of_temperatures_at_one_sample_per_second_fits_few_hundred_kib():
+    ring = HistoryRing(size=256 * 1024)
+    rng = random.Random(42)
+    temp: float = 45.0
+    samples: list[tuple[int, float]] = []
+
+    # Call function, temperature drifting by 0.1 celsius
+    for ts in range(START_TS, START_TS + 24 * 60 * 60):
+        temp = round(temp + rng.choice([-0.1, 0.0, 0.0, 0.0, 0.0, 0.1]), 1)
+        ring.append(ts, temp)
+        samples.append((ts, temp))
+
+    # Assert all samples kept, within the preallocated size
+    assert samples == list(ring.range())
+    assert ring.used < 256 * 1024
+    assert 256 * 1024 == ring.size
+
+
+def test_oldest_block_dropped_when_full():
+    ring = HistoryRing(size=2 * BLOCK_SIZE)
+    rng = random.Random(42)
+
+    # Call function, random values taking many bits
+    for ts in range(START_TS, START_TS + 5000):
+        ring.append(ts, rng.random())
+
+    # Assert latest samples kept in order
+    timestamps: list[int] = [ts for ts, _ in ring.range()]
+    assert START_TS + 4999 == timestamps[-1] == ring.last_ts
+    assert timestamps[0] == ring.first_ts > START_TS
+    assert list(range(timestamps[0], START_TS + 5000)) == timestamps
+
+
+def test_sample_not_later_than_latest_dropped():
+    ring = HistoryRing(size=BLOCK_SIZE)
+    ring.append(START_TS, 1.0)
+
+    # Call function
+    assert not ring.append(START_TS, 2.0)
+    assert not ring.append(START_TS - 1, 3.0)
+
+    # Assert
+    assert [(START_TS, 1.0)] == list(ring.range())
+
+
+def test_range_and_downsampled_reads():
+    ring = HistoryRing(size=64 * 1024)
+    for ts in range(0, 600):
+        ring.append(ts, float(ts % 60))
+
+    # Call function
+    samples: list[tuple[int, float]] = list(ring.range(start_ts=118, end_ts=121))
+    minutes: list[tuple[int, float, float, float]] = list(ring.downsample(step=60, start_ts=90, end_ts=239))
+
+    # Assert
+    assert [(118, 58.0), (119, 59.0), (120, 0.0), (121, 1.0)] == samples
+    assert [(60, 44.5, 30.0, 59.0), (120, 29.5, 0.0, 59.0), (180, 29.5, 0.0, 59.0)] == minutes
+
+
+def test_sensor_history_records_numeric_fields():
+    sensor_history = SensorHistory(ring_size=BLOCK_SIZE * 2)
+
+    # Call function
+    sensor_history.record({"cpu_thermal": {"current_c": 46.4, "high_c": None}, "up": True, "cores": [1]}, START_TS)
+    sensor_history.record({"cpu_thermal": {"current_c": 47.0, "high_c": None}, "up": True, "cores": [1]}, START_TS + 1)
+
+    # Assert
+    assert [("cpu_thermal", "current_c")] == sensor_history.fields()
+    assert [(START_TS, 46.4), (START_TS + 1, 47.0)] == sensor_history.range(("cpu_thermal", "current_c"))
+    assert [(START_TS, 46.7, 46.4, 47.0)] == sensor_history.downsample(("cpu_thermal", "current_c"), step=60)
+    assert [] == sensor_history.range(("unknown",))
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""Tests to verify configuring the refresh intervals of the sensors set by the user"""
+
+from unittest.mock import patch
+
+from sensors.main import configure_update_intervals
+from sensors.types import RpiSensor
+from settings.types import SensorsMonitoringSettings
+
+
+class FixedSensor(RpiSensor):
+    """Sensor with a fixed state"""
+
+    def __init__(self, name: str):
+        self._name = name
+        super().__init__(enabled=True)
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def state(self) -> int:
+        return 1
+
+    def refresh_state(self) -> None:
+        pass
+
+
+@patch("sensors.main.logging")
+def test_unknown_sensor_names_logged(mock_logging):
+    sensor = FixedSensor(name="cpu_use_pct")
+
+    # Call function
+    configure_update_intervals(
+        sensors=[sensor],
+        sensor_settings=SensorsMonitoringSettings(update_intervals={"cpu_use_pct": 30, "cpu_use_pc": 60}),
+    )
+
+    # Assert the known sensor configured, and the typo logged
+    assert 30 == sensor.update_interval
+    mock_logging.getLogger.return_value.warning.assert_called_once_with(
+        "Unknown sensor '%s' in update intervals", "cpu_use_pc"
+    )
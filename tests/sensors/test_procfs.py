@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Tests to verify the procfs snapshot shared by the sensors"""
+
+import os
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from sensors.procfs import ProcfsSnapshot
+from sensors.pseudo_files import INITIAL_BUFFER_SIZE
+from tests.utils.procfs_utils import fake_procfs
+
+
+def test_read_once_per_tick(tmp_path):
+    procfs = fake_procfs(root=tmp_path)
+
+    # Call function, reading the file twice within the tick
+    with patch("sensors.pseudo_files.os.preadv", wraps=os.preadv) as mock_preadv:
+        with procfs.tick():
+            first: str = procfs.read("stat")
+            Path(tmp_path, "stat").write_text("cpu  1 2 3 4 5 6 7 8 0 0\n")
+            second: str = procfs.read("stat")
+
+        # Assert content shared within the tick
+        assert first == second
+        assert 1 == mock_preadv.call_count
+
+        # Assert file read again outside the tick
+        assert "cpu  1 2 3 4 5 6 7 8 0 0\n" == procfs.read("stat")
+        assert 2 == mock_preadv.call_count
+
+    procfs.close()
+
+
+def test_read_without_tick(tmp_path):
+    procfs = fake_procfs(root=tmp_path)
+
+    # Call function
+    procfs.read("uptime")
+    Path(tmp_path, "uptime").write_text("1.50 2.00\n")
+
+    # Assert new content read from the kept open file
+    assert 1.5 == procfs.uptime()
+
+    procfs.close()
+
+
+def test_read_file_larger_than_buffer(tmp_path):
+    content: str = "".join(f"intr{i} {i}\n" for i in range(INITIAL_BUFFER_SIZE))
+    procfs = fake_procfs(root=tmp_path, stat=content)
+
+    # Call function
+    result: str = procfs.read("stat")
+    procfs.close()
+
+    # Assert whole content read
+    assert content == result
+
+
+def test_read_file_not_available(tmp_path):
+    procfs = ProcfsSnapshot(root=str(tmp_path / "missing"))
+
+    with pytest.raises(OSError):
+        procfs.read("stat")
+
+
+def test_parse_meminfo_loadavg_and_uptime(tmp_path):
+    procfs = fake_procfs(root=tmp_path)
+
+    # Call functions
+    with procfs.tick():
+        meminfo: dict[str, int] = procfs.meminfo()
+        loadavg: tuple[float, float, float] = procfs.loadavg()
+        uptime: float = procfs.uptime()
+
+    procfs.close()
+
+    # Assert values in bytes, unit less values kept as is
+    assert 8245984 * 1024 == meminfo["MemTotal"]
+    assert 6744736 * 1024 == meminfo["MemAvailable"]
+    assert 0 == meminfo["HugePages_Total"]
+    assert (0.28125, 0.0771484375, 0.02490234375) == loadavg
+    assert 350735.47 == uptime
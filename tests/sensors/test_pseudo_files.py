@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Tests to verify reading pseudo-files with descriptors kept open"""
+
+import errno
+import os
+from unittest.mock import patch
+
+import pytest
+
+from sensors.pseudo_files import PseudoFileReader
+
+
+def test_read_keeps_file_open(tmp_path):
+    address = tmp_path / "address"
+    address.write_text("a8:3a:dd:b1:cc:45\n")
+    reader = PseudoFileReader()
+
+    # Call function twice
+    with patch("sensors.pseudo_files.os.open", wraps=os.open) as mock_open:
+        first: str = reader.read(str(address))
+        address.write_text("a8:3a:dd:b1:cc:46\n")
+        second: str = reader.read(str(address))
+
+    reader.close()
+
+    # Assert file opened once and content read again
+    assert 1 == mock_open.call_count
+    assert "a8:3a:dd:b1:cc:45\n" == first
+    assert "a8:3a:dd:b1:cc:46\n" == second
+
+
+@pytest.mark.parametrize("error", [errno.ESTALE, errno.ENOENT])
+def test_read_reopens_file_after_error(tmp_path, error: int):
+    hostname = tmp_path / "hostname"
+    hostname.write_text("rpi\n")
+    reader = PseudoFileReader()
+    reader.read(str(hostname))
+
+    # Call function, failing once on the kept open file
+    with (
+        patch("sensors.pseudo_files.os.open", wraps=os.open) as mock_open,
+        patch("sensors.pseudo_files.os.preadv", side_effect=[OSError(error, os.strerror(error)), 4]),
+    ):
+        reader.read(str(hostname))
+
+    reader.close()
+
+    # Assert file opened again
+    assert 1 == mock_open.call_count
+
+
+def test_read_raises_other_errors(tmp_path):
+    hostname = tmp_path / "hostname"
+    hostname.write_text("rpi\n")
+    reader = PseudoFileReader()
+    reader.read(str(hostname))
+
+    # Call function
+    with patch("sensors.pseudo_files.os.preadv", side_effect=OSError(errno.EIO, os.strerror(errno.EIO))):
+        with pytest.raises(OSError):
+            reader.read(str(hostname))
+
+    reader.close()
+
+
+def test_read_missing_file(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        PseudoFileReader().read(str(tmp_path / "missing"))
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""Tests to verify the memory-mapped file of the numeric fields of the sensor states with rollups"""
+
+import os
+from unittest.mock import patch
+
+from sensors.rollup_store import PAGE_SIZE, RollupPoint, RollupResolution, RollupStore
+from settings.types import RollupStoreSettings
+
+START_TS = 1705928400
+"""Start of an hour"""
+
+
+def _settings(tmp_path, **kwargs) -> RollupStoreSettings:
+    return RollupStoreSettings(
+        enabled=True,
+        path=str(tmp_path / "rollups.bin"),
+        **{"max_series": 4, "second_records": 200, "minute_records": 100, "hour_records": 10, **kwargs},
+    )
+
+
+def _state(cpu: float, temperature: float | None = None) -> dict:
+    state: dict = {"cpu_use_pct": {"use_pct": cpu, "online": True}, "hostname": "rpi"}
+    if temperature is not None:
+        state["temperature"] = {"soc": {"current_c": temperature}}
+
+    return state
+
+
+def test_file_preallocated_with_page_aligned_tiers(tmp_path):
+    # Call function
+    store = RollupStore(_settings(tmp_path))
+    store.close()
+
+    # Assert header page, name table and the three tiers rounded up to whole pages
+    assert 0 == os.path.getsize(tmp_path / "rollups.bin") % PAGE_SIZE
+    assert PAGE_SIZE * 5 <= os.path.getsize(tmp_path / "rollups.bin")
+
+
+def test_numeric_fields_recorded_per_second(tmp_path):
+    store = RollupStore(_settings(tmp_path))
+
+    # Call function
+    assert store.record(_state(cpu=10, temperature=45.5), START_TS)
+    assert store.record(_state(cpu=20.5), START_TS + 60)
+    assert not store.record(_state(cpu=30), START_TS + 60)
+
+    # Assert numeric fields without bool and strings, a field missing in a record skipped
+    assert ["cpu_use_pct.use_pct", "temperature.soc.current_c"] == store.series
+    assert [
+        RollupPoint(ts=START_TS, mean=10.0, min=10.0, max=10.0, count=1),
+        RollupPoint(ts=START_TS + 60, mean=20.5, min=20.5, max=20.5, count=1),
+    ] == store.read("cpu_use_pct.use_pct")
+    assert [START_TS] == [point.ts for point in store.read("temperature.soc.current_c")]
+    assert [START_TS + 60] == [point.ts for point in store.read("cpu_use_pct.use_pct", start=START_TS + 1)]
+    assert [] == store.read("hostname")
+
+
+def test_rollups_per_minute_and_hour(tmp_path):
+    store = RollupStore(_settings(tmp_path, minute_records=200))
+
+    # Call function, every 20 seconds for two hours and a bit
+    for ts in range(START_TS, START_TS + 2 * 3600 + 60, 20):
+        store.record(_state(cpu=(ts - START_TS) // 20 % 3 * 10), ts)
+
+    # Assert complete buckets rolled up, the buckets being filled not yet
+    minutes: list[RollupPoint] = store.read("cpu_use_pct.use_pct", RollupResolution.MINUTE)
+    assert 120 == len(minutes)
+    assert RollupPoint(ts=START_TS, mean=10.0, min=0.0, max=20.0, count=3) == minutes[0]
+    assert [RollupPoint(ts=START_TS, mean=10.0, min=0.0, max=20.0, count=180)] == store.read(
+        "cpu_use_pct.use_pct", RollupResolution.HOUR, end=START_TS
+    )
+    assert 2 == len(store.read("cpu_use_pct.use_pct", RollupResolution.HOUR))
+
+
+def test_oldest_records_overwritten_when_full(tmp_path):
+    store = RollupStore(_settings(tmp_path, second_records=50))
+
+    # Call function
+    for ts in range(START_TS, START_TS + 120):
+        store.record(_state(cpu=ts - START_TS), ts)
+
+    # Assert latest records kept in order
+    assert list(range(START_TS + 70, START_TS + 120)) == [point.ts for point in store.read("cpu_use_pct.use_pct")]
+
+
+def test_series_beyond_max_series_not_stored(tmp_path):
+    store = RollupStore(_settings(tmp_path, max_series=1))
+
+    # Call function
+    store.record(_state(cpu=10, temperature=45.5), START_TS)
+
+    # Assert
+    assert ["cpu_use_pct.use_pct"] == store.series
+    assert [] == store.read("temperature.soc.current_c")
+
+
+def test_records_written_once_per_sync_interval(tmp_path):
+    with patch("sensors.rollup_store.monotonic", return_value=0.0) as mock_monotonic:
+        store = RollupStore(_settings(tmp_path, sync_interval=300))
+
+        with patch.object(store, "_sync", wraps=store._sync) as mock_sync:
+            # Call function
+            mock_monotonic.return_value = 299.0
+            store.record(_state(cpu=10), START_TS)
+            mock_monotonic.return_value = 300.0
+            store.record(_state(cpu=20), START_TS + 1)
+            store.record(_state(cpu=30), START_TS + 2)
+
+    # Assert
+    assert 1 == mock_sync.call_count
+
+
+def test_records_survive_restart(tmp_path):
+    store = RollupStore(_settings(tmp_path))
+    for ts in range(START_TS, START_TS + 90, 10):
+        store.record(_state(cpu=ts - START_TS, temperature=40), ts)
+    store.close()
+
+    # Call function
+    reopened = RollupStore(_settings(tmp_path))
+    reopened.record(_state(cpu=90, temperature=40), START_TS + 90)
+    reopened.record(_state(cpu=0, temperature=40), START_TS + 120)
+
+    # Assert records and series kept, and the minute being filled restored from the records per second
+    assert ["cpu_use_pct.use_pct", "temperature.soc.current_c"] == reopened.series
+    assert 11 == len(reopened.read("cpu_use_pct.use_pct"))
+    assert [
+        RollupPoint(ts=START_TS, mean=25.0, min=0.0, max=50.0, count=6),
+        RollupPoint(ts=START_TS + 60, mean=75.0, min=60.0, max=90.0, count=4),
+    ] == reopened.read("cpu_use_pct.use_pct", RollupResolution.MINUTE)
+    assert not reopened.record(_state(cpu=0), START_TS + 120)
+
+
+def test_file_with_other_layout_started_empty(tmp_path):
+    store = RollupStore(_settings(tmp_path))
+    store.record(_state(cpu=10), START_TS)
+    store.close()
+
+    # Call function
+    reopened = RollupStore(_settings(tmp_path, minute_records=50))
+
+    # Assert
+    assert [] == reopened.series
+    assert reopened.record(_state(cpu=10), START_TS)
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""Tests to verify the summary statistics of the numeric samples between two updates"""
+
+from sensors.sampling import SampleRing, SampleStats
+
+
+def test_stats_of_samples():
+    ring = SampleRing(size=100)
+
+    # Call function, with one spike in 20 samples
+    for value in [40.0] * 9 + [60.0] + [40.0] * 9 + [50.0]:
+        ring.append(value)
+
+    # Assert
+    assert SampleStats(mean=41.5, min=40.0, max=60.0, p95=50.0, stddev=4.77, count=20) == ring.stats()
+
+
+def test_oldest_samples_overwritten_when_full():
+    ring = SampleRing(size=3)
+
+    # Call function
+    for value in [1.0, 2.0, 3.0, 4.0, 5.0]:
+        ring.append(value)
+
+    # Assert
+    assert 3 == len(ring)
+    assert SampleStats(mean=4.0, min=3.0, max=5.0, p95=5.0, stddev=0.82, count=3) == ring.stats()
+
+
+def test_no_stats_when_empty():
+    ring = SampleRing(size=3)
+    ring.append(1.0)
+
+    # Call function
+    ring.clear()
+
+    # Assert
+    assert 0 == len(ring)
+    assert None is ring.stats()
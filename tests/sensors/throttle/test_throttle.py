@@ -13,10 +13,10 @@ from sensors.types import MqttDiscoveryMessage, SensorNotAvailableException
 from tests.utils.settings_utils import read_test_settings
 
 
-# patching vcgencmd command run by the subprocess.run
-@patch("sensors.throttle.sensor.subprocess.run")
+# patching vcgencmd command run through the mailbox or subprocess
+@patch("sensors.throttle.sensor.run_vcgencmd")
 def test_read_throttle_status_not_throttled(mock_run):
-    # Mock subprocess.run running vcgencmd to read throttle status
+    # Mock running vcgencmd to read throttle status
     mock_proc = MagicMock(returncode=0, stdout="throttled=0x0")
     mock_run.return_value = mock_proc
 
@@ -33,10 +33,10 @@ def test_read_throttle_status_not_throttled(mock_run):
     assert "Not throttled" == throttled_status.reason
 
 
-# patching vcgencmd command run by the subprocess.run
-@patch("sensors.throttle.sensor.subprocess.run")
+# patching vcgencmd command run through the mailbox or subprocess
+@patch("sensors.throttle.sensor.run_vcgencmd")
 def test_read_throttle_status_not_throttled_as_dict(mock_run):
-    # Mock subprocess.run running vcgencmd to read throttle status
+    # Mock running vcgencmd to read throttle status
     mock_proc = MagicMock(returncode=0, stdout="throttled=0x0")
     mock_run.return_value = mock_proc
 
@@ -56,9 +56,9 @@ def test_read_throttle_status_not_throttled_as_dict(mock_run):
     json.dumps(throttled_status)
 
 
-@patch("sensors.throttle.sensor.subprocess.run")
+@patch("sensors.throttle.sensor.run_vcgencmd")
 def test_read_throttle_status_throttled_under_voltage(mock_run):
-    # Mock subprocess.run running vcgencmd to read throttle status
+    # Mock running vcgencmd to read throttle status
     mock_proc = MagicMock(returncode=0, stdout="throttled=0x50000")
     mock_run.return_value = mock_proc
 
@@ -75,7 +75,7 @@ def test_read_throttle_status_throttled_under_voltage(mock_run):
     assert "Under-voltage has occurred. Throttling has occurred" == throttled_status.reason
 
 
-@patch("sensors.throttle.sensor.subprocess.run", side_effect=FileNotFoundError("vcgencmd not found"))
+@patch("sensors.throttle.sensor.run_vcgencmd", side_effect=FileNotFoundError("vcgencmd not found"))
 def test_read_throttle_status_when_not_available_for_platform(_):
     # Call function
     with pytest.raises(SensorNotAvailableException) as exec_info:
@@ -86,11 +86,11 @@ def test_read_throttle_status_when_not_available_for_platform(_):
     assert "vcgencmd not available for this Rpi" in str(exec_info)
 
 
-@patch("sensors.throttle.sensor.subprocess.run")
+@patch("sensors.throttle.sensor.run_vcgencmd")
 def test_read_throttle_status_not_throttled_mqtt_entities(mock_run):
     """Test reading throttle status when the current status is not throttled read as mqtt entities"""
 
-    # Mock subprocess.run running vcgencmd to read throttle status
+    # Mock running vcgencmd to read throttle status
     mock_proc = MagicMock(returncode=0, stdout="throttled=0x0")
     mock_run.return_value = mock_proc
 
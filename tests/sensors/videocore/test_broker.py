@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""Tests to verify the shared vcgencmd broker running commands once per tick"""
+
+import asyncio
+import subprocess
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from sensors.types import AllRpiSensors, RpiSensor
+from sensors.videocore.broker import VcgencmdBroker, run_vcgencmd, vcgencmd_broker
+from settings.types import ScriptSettings
+
+MEASURE_TEMP_ARGS = ["vcgencmd", "measure_temp"]
+GET_THROTTLED_ARGS = ["vcgencmd", "get_throttled"]
+
+
+def _completed(args: list[str]) -> subprocess.CompletedProcess:
+    return subprocess.CompletedProcess(args=args, returncode=0, stdout=f"{args[1]}=1\n", stderr="")
+
+
+def _fake_vcgencmd() -> MagicMock:
+    vcgencmd = MagicMock()
+    vcgencmd.run.side_effect = _completed
+    vcgencmd.run_async = AsyncMock(side_effect=_completed)
+    return vcgencmd
+
+
+class VcgencmdSensor(RpiSensor):
+    """Sensor reading a vcgencmd command"""
+
+    def __init__(self, name: str, args: list[str]):
+        self._name = name
+        self._state = None
+        self.vcgencmd_commands = [args]
+        super().__init__(enabled=True)
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def state(self) -> str | None:
+        return self._state
+
+    def refresh_state(self) -> None:
+        self._state = run_vcgencmd(self.vcgencmd_commands[0]).stdout
+
+
+def test_commands_run_once_per_tick():
+    vcgencmd = _fake_vcgencmd()
+    broker = VcgencmdBroker(vcgencmd=vcgencmd)
+
+    # Call function, registered command is run when the tick starts
+    with broker.tick(commands=[MEASURE_TEMP_ARGS, MEASURE_TEMP_ARGS]):
+        assert 1 == vcgencmd.run.call_count
+
+        assert "measure_temp=1\n" == broker.run(MEASURE_TEMP_ARGS).stdout
+        broker.run(GET_THROTTLED_ARGS)
+        broker.run(GET_THROTTLED_ARGS)
+
+    # Assert each distinct command run once
+    assert 2 == vcgencmd.run.call_count
+
+    # Assert commands are run again in the next tick
+    with broker.tick(commands=[MEASURE_TEMP_ARGS]):
+        broker.run(MEASURE_TEMP_ARGS)
+
+    assert 3 == vcgencmd.run.call_count
+
+
+def test_commands_not_cached_outside_tick():
+    vcgencmd = _fake_vcgencmd()
+    broker = VcgencmdBroker(vcgencmd=vcgencmd)
+
+    # Call function
+    broker.run(MEASURE_TEMP_ARGS)
+    broker.run(MEASURE_TEMP_ARGS)
+
+    # Assert command run every time
+    assert 2 == vcgencmd.run.call_count
+
+
+def test_error_cached_for_tick():
+    vcgencmd = MagicMock()
+    vcgencmd.run.side_effect = FileNotFoundError("vcgencmd not found")
+    broker = VcgencmdBroker(vcgencmd=vcgencmd)
+
+    # Call function
+    with broker.tick(commands=[MEASURE_TEMP_ARGS]):
+        with pytest.raises(FileNotFoundError):
+            broker.run(MEASURE_TEMP_ARGS)
+
+    # Assert command not run again to raise the error
+    assert 1 == vcgencmd.run.call_count
+
+
+def test_commands_run_once_per_async_tick():
+    vcgencmd = _fake_vcgencmd()
+    broker = VcgencmdBroker(vcgencmd=vcgencmd)
+
+    async def refresh() -> list[subprocess.CompletedProcess]:
+        async with broker.tick_async(commands=[MEASURE_TEMP_ARGS, GET_THROTTLED_ARGS, MEASURE_TEMP_ARGS]):
+            return await asyncio.gather(broker.run_async(MEASURE_TEMP_ARGS), broker.run_async(MEASURE_TEMP_ARGS))
+
+    # Call function
+    results = asyncio.run(refresh())
+
+    # Assert each distinct command run once
+    assert 2 == vcgencmd.run_async.call_count
+    assert ["measure_temp=1\n", "measure_temp=1\n"] == [result.stdout for result in results]
+
+
+def test_sensors_share_command_in_refresh():
+    vcgencmd = _fake_vcgencmd()
+
+    with patch.object(vcgencmd_broker, "_vcgencmd", vcgencmd):
+        sensors: list[RpiSensor] = [
+            VcgencmdSensor(name="temperature", args=MEASURE_TEMP_ARGS),
+            VcgencmdSensor(name="clock", args=MEASURE_TEMP_ARGS),
+        ]
+        all_sensors = AllRpiSensors(sensors=sensors, script_settings=ScriptSettings(update_interval=1))
+        vcgencmd.run.reset_mock()
+
+        # Call function, all sensors are due
+        with patch("sensors.types.monotonic", return_value=1e9):
+            refreshed: list[RpiSensor] = all_sensors.refresh_available_sensors()
+
+    # Assert both sensors refreshed with one command run
+    assert 2 == len(refreshed)
+    assert 1 == vcgencmd.run.call_count
+    assert ["measure_temp=1\n", "measure_temp=1\n"] == [sensor.state for sensor in sensors]
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""Tests to verify running vcgencmd commands through the VideoCore mailbox"""
+
+import asyncio
+import struct
+import subprocess
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from sensors.videocore.mailbox import (
+    GET_GENCMD_RESULT_TAG,
+    IOCTL_MBOX_PROPERTY,
+    MAX_STRING,
+    PROCESS_REQUEST,
+    REQUEST_SUCCESSFUL,
+    VcioMailbox,
+    VcioMailboxException,
+)
+from sensors.videocore.vcgencmd import Vcgencmd
+
+
+class FakeFirmware:
+    """Fake ioctl answering property buffers with the responses of the firmware"""
+
+    def __init__(self, responses: dict[str, str], error_code: int = 0, response_code: int = REQUEST_SUCCESSFUL):
+        self.responses = responses
+        self.error_code = error_code
+        self.response_code = response_code
+        self.commands: list[str] = []
+
+    # noinspection PyUnusedLocal
+    # pylint: disable=W0613
+    def ioctl(self, fd: int, request: int, buffer: bytearray, mutate_flag: bool):
+        assert IOCTL_MBOX_PROPERTY == request
+        assert mutate_flag
+
+        size, request_code, tag, value_size, _, _ = struct.unpack_from("=6I", buffer)
+        assert len(buffer) == size
+        assert PROCESS_REQUEST == request_code
+        assert GET_GENCMD_RESULT_TAG == tag
+        assert MAX_STRING == value_size
+
+        command: str = bytes(buffer[24 : 24 + MAX_STRING]).split(b"\0", 1)[0].decode("ascii")
+        self.commands.append(command)
+
+        response: bytes = self.responses.get(command, "").encode("ascii")
+        struct.pack_into("=I", buffer, 4, self.response_code)
+        struct.pack_into("=I", buffer, 20, self.error_code)
+        buffer[24 : 24 + MAX_STRING] = response.ljust(MAX_STRING, b"\0")
+
+
+def _fake_device(tmp_path: Path) -> str:
+    """Regular file opened as fake mailbox device, the requests are answered by the fake ioctl"""
+
+    device: Path = tmp_path / "vcio"
+    device.touch()
+    return str(device)
+
+
+def test_mailbox_gencmd(tmp_path):
+    firmware = FakeFirmware(responses={"measure_temp": "temp=51.0'C"})
+    mailbox = VcioMailbox(device_path=_fake_device(tmp_path), ioctl=firmware.ioctl)
+
+    # Call function
+    error_code, response = mailbox.gencmd("measure_temp")
+    mailbox.close()
+
+    # Assert response of the firmware
+    assert 0 == error_code
+    assert "temp=51.0'C" == response
+    assert ["measure_temp"] == firmware.commands
+
+
+def test_mailbox_gencmd_when_request_failed(tmp_path):
+    firmware = FakeFirmware(responses={}, response_code=0x80000001)
+    mailbox = VcioMailbox(device_path=_fake_device(tmp_path), ioctl=firmware.ioctl)
+
+    with pytest.raises(VcioMailboxException):
+        mailbox.gencmd("measure_temp")
+
+
+def test_vcgencmd_through_mailbox(tmp_path):
+    firmware = FakeFirmware(responses={"get_throttled": "throttled=0x50000"})
+    vcgencmd = Vcgencmd(mailbox=VcioMailbox(device_path=_fake_device(tmp_path), ioctl=firmware.ioctl))
+
+    # Call function, without spawning vcgencmd process
+    with patch("sensors.videocore.vcgencmd.subprocess.run") as mock_run:
+        result: subprocess.CompletedProcess = vcgencmd.run(["vcgencmd", "get_throttled"])
+        result_async: subprocess.CompletedProcess = asyncio.run(vcgencmd.run_async(["vcgencmd", "get_throttled"]))
+
+    # Assert result formatted as the vcgencmd cli output
+    mock_run.assert_not_called()
+    assert 0 == result.returncode
+    assert "throttled=0x50000\n" == result.stdout
+    assert result.stdout == result_async.stdout
+
+
+def test_vcgencmd_through_mailbox_when_command_failed(tmp_path):
+    firmware = FakeFirmware(responses={"foo": 'error=1 error_msg="Command not registered"'}, error_code=1)
+    vcgencmd = Vcgencmd(mailbox=VcioMailbox(device_path=_fake_device(tmp_path), ioctl=firmware.ioctl))
+
+    # Call function
+    result: subprocess.CompletedProcess = vcgencmd.run(["vcgencmd", "foo"])
+
+    # Assert error returned as failed process
+    assert 1 == result.returncode
+    assert "Command not registered" in result.stderr
+
+
+@patch("sensors.videocore.vcgencmd.subprocess.run")
+def test_vcgencmd_fallback_when_device_missing(mock_run, tmp_path):
+    mock_run.return_value = MagicMock(returncode=0, stdout="temp=51.0'C\n")
+    firmware = FakeFirmware(responses={})
+    vcgencmd = Vcgencmd(mailbox=VcioMailbox(device_path=str(tmp_path / "missing"), ioctl=firmware.ioctl))
+
+    # Call function twice
+    vcgencmd.run(["vcgencmd", "measure_temp"])
+    result = vcgencmd.run(["vcgencmd", "measure_temp"])
+
+    # Assert the vcgencmd cli is run instead
+    assert "temp=51.0'C\n" == result.stdout
+    assert 2 == mock_run.call_count
+    assert [] == firmware.commands
+
+
+@patch("sensors.videocore.vcgencmd.subprocess.run")
+def test_vcgencmd_fallback_when_ioctl_failed(mock_run, tmp_path):
+    mock_run.return_value = MagicMock(returncode=0, stdout="temp=51.0'C\n")
+    vcgencmd = Vcgencmd(
+        mailbox=VcioMailbox(device_path=_fake_device(tmp_path), ioctl=MagicMock(side_effect=OSError("ioctl failed")))
+    )
+
+    # Call function
+    result = vcgencmd.run(["vcgencmd", "measure_temp"])
+
+    # Assert the vcgencmd cli is run instead
+    assert "temp=51.0'C\n" == result.stdout
+    mock_run.assert_called_once_with(["vcgencmd", "measure_temp"], capture_output=True, text=True, check=False)
@@ -2,7 +2,22 @@
 """Tests to verify reading settings file"""
 
 from settings.settings import read_settings
-from settings.types import MqttSettings, ScriptSettings, SensorsMonitoringSettings, Settings
+from settings.types import (
+    AdaptiveUpdateInterval,
+    Deadband,
+    Engine,
+    MqttSettings,
+    OfflineBufferSettings,
+    OverflowPolicy,
+    PublishMode,
+    PublishSettings,
+    RefreshMode,
+    RollupStoreSettings,
+    ScriptSettings,
+    SensorsMonitoringSettings,
+    Settings,
+    TopicLayout,
+)
 from tests.utils.settings_utils import read_test_settings
 
 
@@ -22,10 +37,44 @@ def test_default_settings():
 
     # Assert Script Settings
     assert 60 == script_settings.update_interval
+    assert RefreshMode.SEQUENTIAL == script_settings.refresh_mode
+    assert 4 == script_settings.refresh_workers
+    assert 10.0 == script_settings.refresh_timeout
+    assert Engine.THREADING == script_settings.engine
 
     # Assert that all Sensors Monitoring Settings are enabled by default
-    for field_name in sensors_settings.__dict__:
-        assert True is sensors_settings.__dict__[field_name]
+    for field_name, field_value in sensors_settings.__dict__.items():
+        if isinstance(field_value, bool):
+            assert True is field_value
+
+    # Assert that none sensor update intervals are overridden and all mount points are reported by default
+    assert {} == sensors_settings.update_intervals
+    assert [] == sensors_settings.disk_mount_points
+    assert {} == sensors_settings.adaptive_update_intervals
+    assert [] == sensors_settings.sampled_sensors
+    assert 1.0 == sensors_settings.sample_interval
+    assert 600 == sensors_settings.sample_buffer_size
+    assert [] == sensors_settings.history_sensors
+    assert 256 == sensors_settings.history_size_kib
+    assert RollupStoreSettings() == sensors_settings.rollup_store
+    assert False is sensors_settings.rollup_store.enabled
+    assert 10080 == sensors_settings.rollup_store.minute_records
+
+    # Assert Publish Settings
+    publish_settings: PublishSettings = settings.publish
+    assert 100 == publish_settings.queue_size
+    assert OverflowPolicy.LATEST_PER_TOPIC == publish_settings.overflow_policy
+    assert 5.0 == publish_settings.block_timeout
+    assert 5.0 == publish_settings.publish_timeout
+    assert PublishMode.FULL == publish_settings.mode
+    assert 600.0 == publish_settings.keyframe_interval
+    assert TopicLayout.MONITOR == publish_settings.topic_layout
+    assert publish_settings.monitor_topic
+    assert {} == publish_settings.deadbands
+    assert 300.0 == publish_settings.max_silence
+    assert OfflineBufferSettings() == publish_settings.offline_buffer
+    assert False is publish_settings.offline_buffer.enabled
+    assert 20.0 == publish_settings.offline_buffer.replay_rate
 
 
 def test_settings_from_file():
@@ -54,3 +103,26 @@ def test_settings_from_file():
     assert False is sensors_settings.disk
     assert False is sensors_settings.memory
     assert False is sensors_settings.ethernet_mac_address
+    assert False is sensors_settings.available_update_packages
+    assert ["/", "/mnt/usb"] == sensors_settings.disk_mount_points
+    assert {"rpi_model": 7200, "cpu_use_pct": 30} == sensors_settings.update_intervals
+    assert {"temperature": AdaptiveUpdateInterval(min_interval=5, max_interval=120, target_change=0.5)} == (
+        sensors_settings.adaptive_update_intervals
+    )
+    assert ["cpu_use_pct", "temperature"] == sensors_settings.sampled_sensors
+    assert 0.5 == sensors_settings.sample_interval
+    assert ["temperature"] == sensors_settings.history_sensors
+    assert 512 == sensors_settings.history_size_kib
+    assert RollupStoreSettings(enabled=True, path="/tmp/rollups.bin", hour_records=720) == sensors_settings.rollup_store
+
+    # Assert Publish Settings
+    assert 10 == settings.publish.queue_size
+    assert OverflowPolicy.DROP_OLDEST == settings.publish.overflow_policy
+    assert TopicLayout.SENSOR == settings.publish.topic_layout
+    assert False is settings.publish.monitor_topic
+    assert {"temperature": Deadband(absolute=0.5), "memory_use.used_pct": Deadband(relative_pct=5.0)} == (
+        settings.publish.deadbands
+    )
+    assert OfflineBufferSettings(enabled=True, directory="/tmp/rpi-mqtt-offline", max_segments=8) == (
+        settings.publish.offline_buffer
+    )
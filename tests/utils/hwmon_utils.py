@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""Utility for creating a fake sysfs tree of hwmon and thermal devices during tests"""
+
+from pathlib import Path
+
+from sensors.hwmon.reader import HwmonReader
+
+
+def write_attributes(device_dir: Path, **attributes: str):
+    """Write the attribute files, such as 'name' or 'temp1_input', of the fake sysfs device"""
+
+    device_dir.mkdir(parents=True, exist_ok=True)
+
+    for attribute, value in attributes.items():
+        device_dir.joinpath(attribute).write_text(f"{value}\n", encoding="utf-8")
+
+
+def fake_rpi_hwmon(root: Path) -> HwmonReader:
+    """Write the hwmon devices of a Rpi 5 with active cooler below root and return a reader reading them"""
+
+    write_attributes(
+        root / "hwmon" / "hwmon0", name="cpu_thermal", temp1_input="46365", temp1_max="110000", temp1_crit="110000"
+    )
+    write_attributes(root / "hwmon" / "hwmon1", name="rp1_adc", temp1_input="54310")
+    write_attributes(root / "hwmon" / "hwmon2", name="pwmfan", fan1_input="2998", pwm1="75")
+
+    return HwmonReader(root=str(root))
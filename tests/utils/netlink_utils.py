@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""Utility for testing with recorded rtnetlink and nl80211 messages instead of the netlink sockets of the kernel"""
+
+import errno
+import queue
+import socket
+import struct
+
+from sensors.network.netlink import NLA_F_NESTED, NLM_F_DUMP, NLMSG_DONE, NLMSG_ERROR, pack_attribute, parse_attributes
+from sensors.network.nl80211 import (
+    CTRL_ATTR_FAMILY_ID,
+    CTRL_ATTR_FAMILY_NAME,
+    CTRL_CMD_GETFAMILY,
+    GENL_ID_CTRL,
+    NL80211_ATTR_IFINDEX,
+    NL80211_ATTR_IFNAME,
+    NL80211_ATTR_IFTYPE,
+    NL80211_ATTR_MAC,
+    NL80211_ATTR_SSID,
+    NL80211_ATTR_STA_INFO,
+    NL80211_ATTR_WIPHY_FREQ,
+    NL80211_CMD_GET_INTERFACE,
+    NL80211_CMD_GET_STATION,
+    NL80211_RATE_INFO_BITRATE,
+    NL80211_RATE_INFO_BITRATE32,
+    NL80211_STA_INFO_RX_BITRATE,
+    NL80211_STA_INFO_SIGNAL,
+    NL80211_STA_INFO_TX_BITRATE,
+    Nl80211Client,
+)
+from sensors.network.rtnetlink import (
+    IFA_ADDRESS,
+    IFF_LOOPBACK,
+    IFF_UP,
+    IFLA_ADDRESS,
+    IFLA_IFNAME,
+    RTM_GETADDR,
+    RTM_GETLINK,
+    RTM_NEWADDR,
+    RTM_NEWLINK,
+    RtnetlinkMonitor,
+)
+
+
+def netlink_message(msg_type: int, payload: bytes, sequence: int = 0) -> bytes:
+    """Returns the netlink message with header, sequence number 0 for multicast notifications"""
+
+    return struct.pack("=IHHII", 16 + len(payload), msg_type, 0, sequence, 0) + payload
+
+
+def link_message(index: int, name: str, mac_addr: str, up: bool = True, msg_type: int = RTM_NEWLINK, sequence=0):
+    """Returns the RTM_NEWLINK or RTM_DELLINK message of the network interface"""
+
+    flags: int = (IFF_UP if up else 0) | (IFF_LOOPBACK if name == "lo" else 0)
+    payload: bytes = (
+        struct.pack("=BxHiII", socket.AF_UNSPEC, 1, index, flags, 0)
+        + pack_attribute(IFLA_IFNAME, name.encode() + b"\0")
+        + pack_attribute(IFLA_ADDRESS, bytes.fromhex(mac_addr.replace(":", "")))
+    )
+    return netlink_message(msg_type, payload, sequence)
+
+
+def address_message(index: int, address: str, prefix_len: int, scope: int = 0, msg_type=RTM_NEWADDR, sequence=0):
+    """Returns the RTM_NEWADDR or RTM_DELADDR message of the IPv4 or IPv6 address"""
+
+    family: int = socket.AF_INET6 if ":" in address else socket.AF_INET
+    payload: bytes = struct.pack("=BBBBi", family, prefix_len, 0, scope, index) + pack_attribute(
+        IFA_ADDRESS, socket.inet_pton(family, address)
+    )
+    return netlink_message(msg_type, payload, sequence)
+
+
+def done_message(sequence: int) -> bytes:
+    """Returns the message ending a dump"""
+
+    return netlink_message(NLMSG_DONE, struct.pack("=i", 0), sequence)
+
+
+class FakeNetlinkSocket:
+    """Fake routing socket answering the dump requests with the recorded links and addresses, and returning the
+    notifications sent with notify()"""
+
+    def __init__(self, links: list[bytes], addresses: list[bytes]):
+        self.dumps: dict[int, list[bytes]] = {RTM_GETLINK: links, RTM_GETADDR: addresses}
+        self.groups: int | None = None
+        self.requests: list[int] = []
+        self._received: queue.Queue = queue.Queue()
+        self._timeout: float | None = None
+        self._closed: bool = False
+
+    def bind(self, address: tuple[int, int]):
+        self.groups = address[1]
+
+    def send(self, data: bytes):
+        _, msg_type, _, sequence, _ = struct.unpack_from("=IHHII", data)
+        self.requests.append(msg_type)
+        self._received.put(b"".join(self.dumps[msg_type]) + done_message(sequence))
+
+    def notify(self, *messages: bytes):
+        """Send the notifications of the kernel in one datagram"""
+
+        self._received.put(b"".join(messages))
+
+    def fail(self, error: OSError):
+        """Raise the error on the next receive, i.e. ENOBUFS when notifications were dropped"""
+
+        self._received.put(error)
+
+    def recv(self, _: int) -> bytes:
+        try:
+            data: bytes | OSError | None = self._received.get(timeout=self._timeout)
+        except queue.Empty as err:
+            raise TimeoutError("timed out") from err
+
+        if data is None:
+            raise OSError(9, "Bad file descriptor")
+
+        if isinstance(data, OSError):
+            raise data
+
+        return data
+
+    def gettimeout(self) -> float | None:
+        return self._timeout
+
+    def settimeout(self, timeout: float | None):
+        self._timeout = timeout
+
+    def fileno(self) -> int:
+        return -1 if self._closed else 3
+
+    def close(self):
+        self._closed = True
+        self._received.put(None)
+
+
+def fake_rpi_monitor() -> tuple[RtnetlinkMonitor, FakeNetlinkSocket]:
+    """Returns a monitor of the recorded links and addresses of a Rpi connected by Ethernet, and its fake socket"""
+
+    fake_socket = FakeNetlinkSocket(
+        links=[
+            link_message(1, "lo", "00:00:00:00:00:00"),
+            link_message(2, "eth0", "a8:3a:dd:b1:cc:45"),
+            link_message(3, "wlan0", "a9:3a:dd:b1:cc:46", up=False),
+        ],
+        addresses=[
+            address_message(1, "127.0.0.1", 8, scope=254),
+            address_message(2, "192.168.1.141", 24),
+            address_message(1, "::1", 128, scope=254),
+            address_message(2, "fe80::aa3a:ddff:feb1:cc45", 64, scope=253),
+        ],
+    )
+
+    return RtnetlinkMonitor(socket_factory=lambda: fake_socket), fake_socket
+
+
+def unavailable_monitor() -> RtnetlinkMonitor:
+    """Returns a monitor failing to start, as on platforms without rtnetlink"""
+
+    def socket_factory():
+        raise OSError(97, "Address family not supported by protocol")
+
+    return RtnetlinkMonitor(socket_factory=socket_factory)
+
+
+def genl_message(msg_type: int, command: int, attributes: bytes, sequence: int = 0) -> bytes:
+    """Returns the generic netlink message of the command with the attributes"""
+
+    return netlink_message(msg_type, struct.pack("=BBH", command, 1, 0) + attributes, sequence)
+
+
+def error_message(error: int, sequence: int = 0) -> bytes:
+    """Returns the error message of the kernel, with the positive errno"""
+
+    return netlink_message(NLMSG_ERROR, struct.pack("=i", -error) + bytes(16), sequence)
+
+
+def family_message(family_id: int) -> bytes:
+    """Returns the reply of the generic netlink controller with the id of the nl80211 family"""
+
+    return genl_message(
+        GENL_ID_CTRL,
+        CTRL_CMD_GETFAMILY,
+        pack_attribute(CTRL_ATTR_FAMILY_ID, struct.pack("=H", family_id))
+        + pack_attribute(CTRL_ATTR_FAMILY_NAME, b"nl80211\0"),
+    )
+
+
+def interface_message(
+    family_id: int, index: int, name: str, mac_addr: str, ssid: str = "", freq_mhz: int = 0, iftype=2
+):
+    """Returns the NL80211_CMD_GET_INTERFACE reply of the wireless network interface, connected if the SSID is set"""
+
+    attributes: bytes = (
+        pack_attribute(NL80211_ATTR_IFINDEX, struct.pack("=I", index))
+        + pack_attribute(NL80211_ATTR_IFNAME, name.encode() + b"\0")
+        + pack_attribute(NL80211_ATTR_IFTYPE, struct.pack("=I", iftype))
+        + pack_attribute(NL80211_ATTR_MAC, bytes.fromhex(mac_addr.replace(":", "")))
+    )
+    if ssid:
+        attributes += pack_attribute(NL80211_ATTR_SSID, ssid.encode())
+    if freq_mhz:
+        attributes += pack_attribute(NL80211_ATTR_WIPHY_FREQ, struct.pack("=I", freq_mhz))
+
+    return genl_message(family_id, NL80211_CMD_GET_INTERFACE, attributes)
+
+
+def station_message(family_id: int, index: int, mac_addr: str, signal: int, tx_bitrate: int, rx_bitrate: int) -> bytes:
+    """Returns the NL80211_CMD_GET_STATION reply of the access point, with the tx bitrate as 32 bit and the rx bitrate
+    as 16 bit attribute in units of 100 kbit/s, and the station info flagged as nested as sent by the kernel"""
+
+    station_info: bytes = (
+        pack_attribute(NL80211_STA_INFO_SIGNAL, struct.pack("=b", signal))
+        + pack_attribute(
+            NLA_F_NESTED | NL80211_STA_INFO_TX_BITRATE,
+            pack_attribute(NL80211_RATE_INFO_BITRATE32, struct.pack("=I", tx_bitrate)),
+        )
+        + pack_attribute(
+            NLA_F_NESTED | NL80211_STA_INFO_RX_BITRATE,
+            pack_attribute(NL80211_RATE_INFO_BITRATE, struct.pack("=H", rx_bitrate)),
+        )
+    )
+    attributes: bytes = (
+        pack_attribute(NL80211_ATTR_IFINDEX, struct.pack("=I", index))
+        + pack_attribute(NL80211_ATTR_MAC, bytes.fromhex(mac_addr.replace(":", "")))
+        + pack_attribute(NLA_F_NESTED | NL80211_ATTR_STA_INFO, station_info)
+    )
+
+    return genl_message(family_id, NL80211_CMD_GET_STATION, attributes)
+
+
+class FakeGenericNetlinkSocket:
+    """Fake generic netlink socket answering the requests with the recorded replies, keyed by message type, command
+    and interface index if any. The replies get the sequence number of the request, dumps are ended with NLMSG_DONE, and
+    requests without recorded replies are answered with ENOENT."""
+
+    def __init__(self, replies: dict[tuple[int, int, int | None], list[bytes]]):
+        self.replies: dict[tuple[int, int, int | None], list[bytes]] = replies
+        self.requests: list[tuple[int, int, int | None]] = []
+        self.closed: bool = False
+        self._received: list[bytes] = []
+        self._timeout: float | None = None
+
+    def send(self, data: bytes):
+        _, msg_type, flags, sequence, _ = struct.unpack_from("=IHHII", data)
+        index: bytes | None = parse_attributes(data[20:]).get(NL80211_ATTR_IFINDEX)
+        key: tuple[int, int, int | None] = (msg_type, data[16], struct.unpack("=I", index)[0] if index else None)
+        self.requests.append(key)
+
+        if key not in self.replies:
+            self._received.append(error_message(errno.ENOENT, sequence))
+            return
+
+        replies: list[bytearray] = [bytearray(reply) for reply in self.replies[key]]
+        for reply in replies:
+            struct.pack_into("=I", reply, 8, sequence)
+
+        self._received.append(b"".join(replies) + (done_message(sequence) if flags & NLM_F_DUMP else b""))
+
+    def recv(self, _: int) -> bytes:
+        if not self._received:
+            raise TimeoutError("timed out")
+
+        return self._received.pop(0)
+
+    def settimeout(self, timeout: float | None):
+        self._timeout = timeout
+
+    def close(self):
+        self.closed = True
+
+
+NL80211_FAMILY_ID = 0x1C
+"""Id of the nl80211 family in the recorded replies"""
+
+
+def fake_rpi_nl80211() -> tuple[Nl80211Client, FakeGenericNetlinkSocket]:
+    """Returns a nl80211 client of the recorded replies of a Rpi connected by Wi-Fi (wlan0), with a disconnected USB
+    Wi-Fi adapter (wlan1) and an access point interface (uap0), and its fake socket"""
+
+    fake_socket = FakeGenericNetlinkSocket(
+        replies={
+            (GENL_ID_CTRL, CTRL_CMD_GETFAMILY, None): [family_message(NL80211_FAMILY_ID)],
+            (NL80211_FAMILY_ID, NL80211_CMD_GET_INTERFACE, None): [
+                interface_message(NL80211_FAMILY_ID, 3, "wlan0", "a9:3a:dd:b1:cc:46", "MyNetwork 5G-2", 5520),
+                interface_message(NL80211_FAMILY_ID, 5, "uap0", "aa:3a:dd:b1:cc:47", "MyAccessPoint", 2412, iftype=3),
+                interface_message(NL80211_FAMILY_ID, 4, "wlan1", "00:c0:ca:b1:cc:48"),
+            ],
+            (NL80211_FAMILY_ID, NL80211_CMD_GET_STATION, 3): [
+                station_message(NL80211_FAMILY_ID, 3, "04:42:1a:cf:15:c8", -43, tx_bitrate=4333, rx_bitrate=2400)
+            ],
+            (NL80211_FAMILY_ID, NL80211_CMD_GET_STATION, 4): [],
+        }
+    )
+
+    return Nl80211Client(socket_factory=lambda: fake_socket), fake_socket
+
+
+def unavailable_nl80211() -> Nl80211Client:
+    """Returns a nl80211 client failing to open, as on platforms without wireless drivers"""
+
+    return Nl80211Client(socket_factory=lambda: FakeGenericNetlinkSocket(replies={}))
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Utility for creating a fake procfs root during tests"""
+
+from pathlib import Path
+
+from sensors.procfs import ProcfsSnapshot
+
+PROC_STAT = """cpu  1000 0 500 8000 100 0 0 0 0 0
+cpu0 250 0 125 2000 25 0 0 0 0 0
+cpu1 250 0 125 2000 25 0 0 0 0 0
+cpu2 250 0 125 2000 25 0 0 0 0 0
+cpu3 250 0 125 2000 25 0 0 0 0 0
+intr 162812 0 0 0
+ctxt 426616
+btime 1705927879
+processes 4321
+procs_running 1
+procs_blocked 0
+"""
+
+PROC_MEMINFO = """MemTotal:        8245984 kB
+MemFree:         5234560 kB
+MemAvailable:    6744736 kB
+Buffers:           81920 kB
+Cached:          1523712 kB
+SwapTotal:        102396 kB
+HugePages_Total:       0
+"""
+
+PROC_LOADAVG = "0.28125 0.0771484375 0.02490234375 1/231 4321\n"
+
+PROC_UPTIME = "350735.47 1234388.90\n"
+
+PROC_NET_DEV = """Inter-|   Receive                                                |  Transmit
+ face |bytes    packets errs drop fifo frame compressed multicast|bytes    packets errs drop fifo colls carrier compressed
+    lo:  102400    1024    0    0    0     0          0         0   102400    1024    0    0    0     0       0          0
+  eth0: 4294967000  120000    2    5    0     0          0       120 98765432   81200    0    1    0     0       0          0
+ wlan0:       0       0    0    0    0     0          0         0        0       0    0    0    0     0       0          0
+"""
+
+PROC_MOUNTINFO = """22 28 0:21 / /proc rw,nosuid,nodev,noexec,relatime shared:12 - proc proc rw
+24 1 179:2 / / rw,noatime shared:1 - ext4 /dev/mmcblk0p2 rw
+27 24 0:5 / /dev rw,nosuid,relatime shared:2 - devtmpfs udev rw,size=3945652k,nr_inodes=986413,mode=755
+31 24 179:1 / /boot/firmware rw,relatime shared:7 - vfat /dev/mmcblk0p1 rw,fmask=0022,dmask=0022
+35 24 8:1 / /mnt/usb\\040drive rw,relatime shared:9 - ext4 /dev/sda1 rw
+36 24 179:2 /var/lib/docker /var/lib/docker rw,noatime shared:1 - ext4 /dev/mmcblk0p2 rw
+"""
+
+PROC_DISKSTATS = """   1       0 ram0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0
+   7       0 loop0 56 0 2144 12 0 0 0 0 0 40 12 0 0 0 0 0 0
+ 179       0 mmcblk0 10000 500 400000 20000 2000 300 100000 40000 0 30000 60000 0 0 0 0 0 0
+ 179       1 mmcblk0p1 300 0 20000 400 2 0 2 4 0 300 404 0 0 0 0 0 0
+ 179       2 mmcblk0p2 9600 500 379000 19500 1998 300 99998 39996 0 29600 59496 0 0 0 0 0 0
+ 179      32 mmcblk0boot0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0
+"""
+
+
+def fake_procfs(root: Path, **files: str) -> ProcfsSnapshot:
+    """Write fake procfs files below root and return a snapshot reading them. Files not given get sample contents,
+    files given as None are not written."""
+
+    contents: dict[str, str | None] = {
+        "stat": PROC_STAT,
+        "meminfo": PROC_MEMINFO,
+        "loadavg": PROC_LOADAVG,
+        "uptime": PROC_UPTIME,
+        "net/dev": PROC_NET_DEV,
+        "self/mountinfo": PROC_MOUNTINFO,
+        "diskstats": PROC_DISKSTATS,
+    }
+    contents.update(files)
+
+    for name, content in contents.items():
+        if content is not None:
+            root.joinpath(name).parent.mkdir(parents=True, exist_ok=True)
+            root.joinpath(name).write_text(content, encoding="utf-8")
+
+    return ProcfsSnapshot(root=str(root))